@@ -693,9 +693,80 @@ def run_gst_fit(mdc_store, optimizer, objective_function_builder, verbosity=0):
     return opt_result, objective
 
 
+def run_gst_fit_multistart(mdc_store, optimizer, objective_function_builder, start_paramvecs, verbosity=0):
+    """
+    Performs Gate Set Tomography model optimization from several starting points.
+
+    This is like :func:`run_gst_fit` except that the model is optimized starting from
+    each of the parameter vectors in `start_paramvecs`, and the best fit is kept.  All
+    of the optimizations use the same objective function, and so share its circuit layout,
+    forward simulator and data-dependent quantities (e.g. counts), which are only computed
+    once rather than once per starting point.
+
+    Parameters
+    ----------
+    mdc_store : ModelDatasetCircuitsStore
+        An object holding a model, data set, and set of circuits.  This defines the model
+        to be optimized, the data to fit to, and the circuits where predicted vs. observed
+        comparisons should be made.  The model's parameter vector is irrelevant, as it is
+        set to each of `start_paramvecs` in turn.
+
+    optimizer : Optimizer or dict
+        The optimizer to use, or a dictionary of optimizer parameters
+        from which a default optimizer can be built.
+
+    objective_function_builder : ObjectiveFunctionBuilder
+        Defines the objective function that is optimized.  Can also be anything
+        readily converted to an objective function builder, e.g. `"logl"`.  If
+        `None`, then `mdc_store` must itself be an already-built objective function.
+
+    start_paramvecs : list
+        A list of 1D numpy arrays, the model parameter vectors to start the optimizations from.
+
+    verbosity : int, optional
+        How much detail to send to stdout.
+
+    Returns
+    -------
+    result : OptimizerResult
+        the result of the best (lowest objective function value) optimization
+    objfn_store : MDCObjectiveFunction
+        the objective function and store containing the best-fit model evaluated at the best-fit point.
+    all_results : list
+        the :class:`OptimizerResult` of the optimization from each starting point, in the order given.
+    """
+    optimizer = optimizer if isinstance(optimizer, _Optimizer) else _CustomLMOptimizer.cast(optimizer)
+    printer = VerbosityPrinter.create_printer(verbosity, mdc_store.resource_alloc.comm)
+    if len(start_paramvecs) == 0:
+        raise ValueError("At least one starting point must be given!")
+
+    if objective_function_builder is not None:
+        objective_function_builder = _objfns.ObjectiveFunctionBuilder.cast(objective_function_builder)
+        objective = objective_function_builder.build_from_store(mdc_store, printer)
+    else:
+        assert(isinstance(mdc_store, _objfns.ObjectiveFunction)), \
+            "When `objective_function_builder` is None, `mdc_store` must be an objective fn!"
+        objective = mdc_store
+
+    all_results = []
+    for i, paramvec in enumerate(start_paramvecs):
+        printer.log("--- Starting point %d of %d ---" % (i + 1, len(start_paramvecs)), 2)
+        objective.model.from_vector(paramvec)
+        opt_result, _ = run_gst_fit(objective, optimizer, None, printer)  # re-uses `objective` (& its layout)
+        all_results.append(opt_result)
+
+    iBest = int(_np.argmin([opt_result.f for opt_result in all_results]))
+    best_result = all_results[iBest]
+    printer.log("Best fit is from starting point %d of %d" % (iBest + 1, len(start_paramvecs)), 1)
+    if not _np.allclose(objective.model.to_vector(), best_result.x):
+        objective.lsvec(best_result.x)  # ensure `objective` is evaluated at the best-fit point
+
+    return best_result, objective, all_results
+
+
 def run_iterative_gst(dataset, start_model, circuit_lists,
                       optimizer, iteration_objfn_builders, final_objfn_builders,
-                      resource_alloc, verbosity=0):
+                      resource_alloc, verbosity=0, extend_layouts=False, extra_start_models=()):
     """
     Performs Iterative Gate Set Tomography on the dataset.
 
@@ -735,6 +806,19 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
     verbosity : int, optional
         How much detail to send to stdout.
 
+    extend_layouts : bool, optional
+        When `True`, and an iteration's circuit list begins with all the circuits of the
+        previous iteration's list, the previous iteration's layout is extended (see, e.g.,
+        :method:`MatrixCOPALayout.extend`) rather than a new layout being created from scratch.
+        This saves the time needed to re-process already-seen circuits, possibly at the cost of
+        slightly slower circuit simulation.  Only layouts that have an `extend` method can be extended.
+
+    extra_start_models : list, optional
+        Additional starting-point models, which must have the same parameterization as `start_model`.
+        When non-empty, the first optimization of the first iteration is performed from each of
+        `start_model` and these models (see :func:`run_gst_fit_multistart`), and the remaining
+        optimizations continue from the best fit.
+
     Returns
     -------
     models : list of Models
@@ -772,6 +856,7 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
         for artype, cnt in max_cnts.items(): ret += (artype,) * cnt
         return ret
 
+    mdc_store = None
     with printer.progress_logging(1):
         for (i, circuitsToEstimate) in enumerate(circuit_lists):
             extraMessages = []
@@ -788,14 +873,31 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
             array_types = optimizer.array_types + \
                 _max_array_types([builder.compute_array_types(method_names, mdl.sim)
                                   for builder in iteration_objfn_builders + final_objfn_builders])
+            precomp_layout = None
+            if extend_layouts and mdc_store is not None and hasattr(mdc_store.layout, 'extend'):
+                prev_circuits = mdc_store.global_circuits
+                num_prev = len(prev_circuits)
+                if isinstance(circuitsToEstimate, _CircuitList) \
+                   and circuitsToEstimate.op_label_aliases == prev_circuits.op_label_aliases \
+                   and list(circuitsToEstimate[0:num_prev]) == list(prev_circuits):
+                    precomp_layout = mdc_store.layout.extend(circuitsToEstimate[num_prev:], mdl, dataset,
+                                                             verbosity=printer - 1)
+
             initial_mdc_store = _objfns.ModelDatasetCircuitsStore(mdl, dataset, circuitsToEstimate, resource_alloc,
-                                                                  array_types=array_types, verbosity=printer - 1)
+                                                                  array_types=array_types,
+                                                                  precomp_layout=precomp_layout,
+                                                                  verbosity=printer - 1)
             mdc_store = initial_mdc_store
 
             for j, obj_fn_builder in enumerate(iteration_objfn_builders):
                 tNxt = _time.time()
                 optimizer.fditer = optimizer.first_fditer if (i == 0 and j == 0) else 0
-                opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
+                if i == 0 and j == 0 and len(extra_start_models) > 0:
+                    start_paramvecs = [mdl.to_vector()] + [m.to_vector() for m in extra_start_models]
+                    opt_result, mdc_store, _ = run_gst_fit_multistart(mdc_store, optimizer, obj_fn_builder,
+                                                                      start_paramvecs, printer - 1)
+                else:
+                    opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
                 profiler.add_time('run_iterative_gst: iter %d %s-opt' % (i + 1, obj_fn_builder.name), tNxt)
 
             tNxt = _time.time()
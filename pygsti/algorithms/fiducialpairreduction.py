@@ -22,6 +22,7 @@ from pygsti import circuits as _circuits
 
 from pygsti.circuits import circuitconstruction as _gsc
 from pygsti.modelmembers.operations import EigenvalueParamDenseOp as _EigenvalueParamDenseOp
+from pygsti.tools import mpitools as _mpit
 from pygsti.tools import remove_duplicates as _remove_duplicates
 from pygsti.tools import slicetools as _slct
 
@@ -42,11 +43,221 @@ def _random_combination(indices_tuple, r):
     return tuple(indices_tuple[i] for i in iis)
 
 
+def _pair_index_lists(all_pair_indices, n_needed_pairs, search_mode, n_random, seed, comm=None):
+    """
+    The lists of fiducial-pair indices of length `n_needed_pairs` to search over, in the order they're tested.
+
+    When `comm` is given, random pair lists are generated on the root processor and broadcast
+    so that every processor iterates over the same lists.
+    """
+    if search_mode == "sequential":
+        return _itertools.combinations(all_pair_indices, n_needed_pairs)
+
+    elif search_mode == "random":
+        nTotalPairCombos = _nCr(len(all_pair_indices), n_needed_pairs)
+        if n_random < nTotalPairCombos:
+            if comm is None or comm.Get_rank() == 0:
+                _random.seed(seed)  # ok if seed is None
+                pairIndexLists = [_random_combination(all_pair_indices, n_needed_pairs) for i in range(n_random)]
+            else:
+                pairIndexLists = None
+            return comm.bcast(pairIndexLists, root=0) if (comm is not None) else pairIndexLists
+        else:
+            return _itertools.combinations(all_pair_indices, n_needed_pairs)
+
+    else:
+        raise ValueError("Invalid `search_mode`: %s" % search_mode)
+
+
+class _IncrementalPairSVD(object):
+    """
+    Computes the singular values of the derivative-matrix rows selected by a list of fiducial pairs.
+
+    Since the singular values of a stacked matrix `[A; B]` equal those of `[S*Vh; B]`, where
+    `A = U*S*Vh` is the (thin) SVD of `A`, consecutive pair lists that differ only in their last
+    pair - as those produced by `itertools.combinations` usually do - can share the SVD of the
+    rows of their common leading pairs (prefix).  When a prefix is reused and selects more rows
+    than there are model parameters, its `S*Vh` factor, which has at most `num_params` rows,
+    is cached and stacked with the rows of each subsequent last pair in place of the prefix's
+    rows.
+
+    Parameters
+    ----------
+    dp : numpy.ndarray
+        The `(num_elements, num_params)` derivative matrix.
+
+    el_indices_for_pair : list
+        The row indices of `dp` corresponding to each fiducial pair.
+    """
+
+    def __init__(self, dp, el_indices_for_pair):
+        self.dp = dp
+        self.el_indices_for_pair = [_np.array(inds, _np.int64) for inds in el_indices_for_pair]
+        self._prefix = None  # the leading pair indices of the previously tested pair list
+        self._prefix_rows = None  # the rows (or S*Vh factor of the rows) selected by `_prefix`
+        self._prefix_factored = False
+
+    def singular_values(self, pair_indices):
+        """
+        The singular values of the rows of the derivative matrix selected by `pair_indices`.
+
+        Parameters
+        ----------
+        pair_indices : tuple
+            The indices of the fiducial pairs whose rows are selected.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        prefix = tuple(pair_indices[:-1])
+        if prefix != self._prefix:
+            self._prefix = prefix
+            self._prefix_rows = self.dp[_np.concatenate([self.el_indices_for_pair[i] for i in prefix]), :] \
+                if len(prefix) > 0 else self.dp[0:0, :]
+            self._prefix_factored = False
+        elif not self._prefix_factored and self._prefix_rows.shape[0] > self.dp.shape[1]:
+            _, s, Vh = _np.linalg.svd(self._prefix_rows, full_matrices=False)
+            self._prefix_rows = s[:, None] * Vh
+            self._prefix_factored = True
+
+        rows = self.dp[self.el_indices_for_pair[pair_indices[-1]], :]
+        return _np.linalg.svd(_np.concatenate((self._prefix_rows, rows), axis=0), compute_uv=False)
+
+
+def _find_first_sufficient_pair_list(pair_index_lists, test_fn, comm=None, block_size=10):
+    """
+    Find the first pair list among `pair_index_lists` that `test_fn` deems sufficient.
+
+    When `comm` is given, the pair lists are tested in blocks of `block_size` lists per
+    processor, and the processors stop as soon as a block contains a sufficient list.
+    The returned list is always the *first* sufficient one, so the result doesn't depend
+    on the number of processors.
+
+    Parameters
+    ----------
+    pair_index_lists : iterable
+        The pair lists (tuples of fiducial-pair indices) to test, in order.  This must
+        be identical on all the processors of `comm`.
+
+    test_fn : function
+        A function of a pair list that returns a `(score, sufficient)` tuple, where
+        `score` is a number (higher is better) and `sufficient` is a bool.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to test pair lists in parallel.
+
+    block_size : int, optional
+        The number of pair lists each processor tests between synchronizations.
+
+    Returns
+    -------
+    pair_index_list : tuple or None
+        The first sufficient pair list, or None if there isn't one.
+    best_score : int or float
+        The highest score of all the tested pair lists.
+    """
+    nprocs = 1 if (comm is None) else comm.Get_size()
+    pair_index_lists = iter(pair_index_lists)
+    bestScore = 0
+    while True:
+        block = list(_itertools.islice(pair_index_lists, nprocs * block_size))
+        if len(block) == 0: return None, bestScore
+
+        loc_indices, _, _ = _mpit.distribute_indices(list(range(len(block))), comm, False)
+        iFound = None
+        for i in loc_indices:  # (loc_indices are contiguous)
+            score, sufficient = test_fn(block[i])
+            bestScore = max(bestScore, score)
+            if sufficient:
+                iFound = i; break
+
+        if nprocs > 1:
+            results = comm.allgather((iFound, bestScore))
+            found = [i for i, _ in results if i is not None]
+            iFound = min(found) if len(found) > 0 else None
+            bestScore = max([score for _, score in results])
+
+        if iFound is not None:
+            return block[iFound], bestScore
+
+
+def _find_pair_list_greedily(dps, el_indices_for_pairs, test_fn, comm=None, printer=None):
+    """
+    Build up a pair list by repeatedly adding the fiducial pair that gives the highest score.
+
+    The rows of the derivative matrices selected by the chosen pairs are held as the
+    (at most `num_params`-row) `R` factors of their QR decompositions, which are updated
+    as each pair is added.  A candidate pair is scored using the singular values of each
+    of these factors stacked with the candidate's rows, which equal the singular values
+    of all the rows selected by the chosen pairs and the candidate.  Thus, each step costs
+    a small SVD per candidate pair rather than a search over all pair lists of a given size.
+
+    Parameters
+    ----------
+    dps : list
+        The `(num_elements, num_params)` derivative matrices (e.g. for different germ-power
+        lengths) whose rows are selected by the fiducial pairs.
+
+    el_indices_for_pairs : list
+        A list of the row indices of the corresponding matrix in `dps` for each fiducial pair.
+
+    test_fn : function
+        A function of a list of singular-value arrays, one per element of `dps`, that
+        returns a `(score, sufficient)` tuple, where `score` is a comparable object (higher
+        is better) and `sufficient` is a bool.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to score candidate pairs in parallel.
+
+    printer : VerbosityPrinter, optional
+        A printer used to log each chosen pair's score.
+
+    Returns
+    -------
+    tuple or None
+        The sorted indices of the chosen pairs, which are sufficient according to `test_fn`,
+        or `None` if not even all of the pairs together are sufficient.
+    """
+    nprocs = 1 if (comm is None) else comm.Get_size()
+    el_indices_for_pairs = [[_np.array(inds, _np.int64) for inds in el_indices_for_pair]
+                            for el_indices_for_pair in el_indices_for_pairs]
+    factors = [dp[0:0, :] for dp in dps]  # R factors of the rows selected by the chosen pairs
+    chosenPairIndices = []
+    remainingPairIndices = list(range(len(el_indices_for_pairs[0])))
+
+    while len(remainingPairIndices) > 0:
+        loc_indices, _, _ = _mpit.distribute_indices(remainingPairIndices, comm, False)
+        best = None  # (score, pair index, sufficient) of the best candidate (lowest index on ties)
+        for i in loc_indices:
+            singular_values = [_np.linalg.svd(_np.concatenate((R, dp[inds[i], :]), axis=0), compute_uv=False)
+                               for R, dp, inds in zip(factors, dps, el_indices_for_pairs)]
+            score, sufficient = test_fn(singular_values)
+            if best is None or score > best[0]:
+                best = (score, i, sufficient)
+
+        if nprocs > 1:
+            results = [r for r in comm.allgather(best) if r is not None]
+            best = max(results, key=lambda r: (r[0], -r[1]))
+
+        score, iBest, sufficient = best
+        chosenPairIndices.append(iBest)
+        remainingPairIndices.remove(iBest)
+        factors = [_np.linalg.qr(_np.concatenate((R, dp[inds[iBest], :]), axis=0), mode='r')
+                   for R, dp, inds in zip(factors, dps, el_indices_for_pairs)]
+        if printer is not None:
+            printer.log("Added pair %d (%d chosen) ==> score %s" % (iBest, len(chosenPairIndices), str(score)), 2)
+        if sufficient:
+            return tuple(sorted(chosenPairIndices))
+
+    return None
+
+
 def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials, germs,
                                    test_lengths=(256, 2048), prep_povm_tuples="first", tol=0.75,
                                    search_mode="sequential", n_random=100, seed=None,
                                    verbosity=0, test_pair_list=None, mem_limit=None,
-                                   minimum_pairs=1):
+                                   minimum_pairs=1, comm=None):
     """
     Finds a (global) set of fiducial pairs that are amplificationally complete.
 
@@ -97,12 +308,16 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
         The tolerance for the fraction of the expected amplification that must
         be observed to call a parameter "amplified".
 
-    search_mode : {"sequential","random"}, optional
+    search_mode : {"sequential","random","greedy"}, optional
         If "sequential", then all potential fiducial pair sets of a given length
         are considered in sequence before moving to sets of a larger size.  This
         can take a long time when there are many possible fiducial pairs.
         If "random", then only `n_random` randomly chosen fiducial pair sets are
         considered for each set size before the set is enlarged.
+        If "greedy", then a single fiducial pair set is built up by adding, one
+        at a time, the pair that amplifies the most parameters (breaking ties
+        by the smallest relevant singular value of the test matrix).  This
+        scales well to many fiducial pairs but may not find the smallest set.
 
     n_random : int, optional
         The number of random-pair-sets to consider for a given set size.
@@ -126,7 +341,11 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
     minimum_pairs : int, optional
         The minimium number of fiducial pairs to try (default == 1).  Set this
         to integers larger than 1 to avoid trying pair sets that are known to
-        be too small.
+        be too small.  Not used when `search_mode == "greedy"`.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to test candidate fiducial-pair
+        sets in parallel.  The result doesn't depend on the number of processors.
 
     Returns
     -------
@@ -134,7 +353,7 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
         A list of (prepfid_index,measfid_index) tuples of integers, specifying a list
         of fiducial pairs (indices are into `prep_fiducials` and `meas_fiducials`).
     """
-    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
     #trim LSGST list of all f1+germ^exp+f2 strings to just those needed to get full rank jacobian. (compressed sensing
     #like)
 
@@ -189,8 +408,7 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
 
     def get_number_amplified(m0, m1, len0, len1, verb):
         """ Return the number of amplified parameters """
-        printer = _baseobjs.VerbosityPrinter.create_printer(verb)
-        L_ratio = float(len1) / float(len0)
+        printer = _baseobjs.VerbosityPrinter.create_printer(verb, comm)
         try:
             s0 = _np.linalg.svd(m0, compute_uv=False)
             s1 = _np.linalg.svd(m1, compute_uv=False)
@@ -198,8 +416,14 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
             printer.warning("SVD error!!"); return 0  # pragma: no cover
             #SVD did not converge -> just say no amplified params...
 
-        numAmplified = 0
         printer.log("Amplified parameter test: matrices are %s and %s." % (m0.shape, m1.shape), 4)
+        return count_amplified(s0, s1, len0, len1, verb)
+
+    def count_amplified(s0, s1, len0, len1, verb):
+        """ Return the number of amplified parameters given the singular values of the two test matrices """
+        printer = _baseobjs.VerbosityPrinter.create_printer(verb, comm)
+        L_ratio = float(len1) / float(len0)
+        numAmplified = 0
         printer.log("Index : SV(L=%d)  SV(L=%d)  AmpTest ( > %g ?)" % (len0, len1, tol), 4)
         for i, (v0, v1) in enumerate(zip(sorted(s0, reverse=True), sorted(s1, reverse=True))):
             if abs(v0) > 0.1 and (v1 / v0) / L_ratio > tol:
@@ -241,47 +465,63 @@ def find_sufficient_fiducial_pairs(target_model, prep_fiducials, meas_fiducials,
         printer.log("Number of amplified parameters = %s" % nAmplified)
         return None
 
-    bestAmplified = 0
-    for nNeededPairs in range(minimum_pairs, nPossiblePairs):
-        printer.log("Beginning search for a good set of %d pairs (%d pair lists to test)" %
-                    (nNeededPairs, _nCr(nPossiblePairs, nNeededPairs)))
-
+    def pair_list(pair_indices):
+        """ Convert fiducial-pair indices to (prepfid_index, iEStr) tuples """
+        ret = []
+        for i in pair_indices:
+            prepfid_index = i // nEStrs
+            iEStr = i - prepfid_index * nEStrs
+            ret.append((prepfid_index, iEStr))
+        return ret
+
+    #Singular values of the test matrices are updated incrementally as pairs are added to the
+    # pair lists being tested (see _IncrementalPairSVD)
+    pairSVD0 = _IncrementalPairSVD(fullTestMx0, elIndices0)
+    pairSVD1 = _IncrementalPairSVD(fullTestMx1, elIndices1)
+
+    def test_pair_indices(pairIndicesToTest):
+        """ Return the number of amplified parameters and whether this is the maximum number """
+        try:
+            s0 = pairSVD0.singular_values(pairIndicesToTest)
+            s1 = pairSVD1.singular_values(pairIndicesToTest)
+        except _np.linalg.LinAlgError:                      # pragma: no cover
+            printer.warning("SVD error!!"); return 0, False  # pragma: no cover
+            #SVD did not converge -> just say no amplified params...
+        nAmplified = count_amplified(s0, s1, L0, L1, verbosity)
+        if printer.verbosity > 1:
+            printer.log("Pair list %s ==> %d amplified parameters" %
+                        (" ".join(map(str, pair_list(pairIndicesToTest))), nAmplified))
+        return nAmplified, (nAmplified == maxAmplified)
+
+    if search_mode == "greedy":
+        def greedy_test_fn(singular_values):
+            """ Score by the number of amplified parameters and then the smallest relevant L0 singular value """
+            s0, s1 = singular_values
+            nAmplified = count_amplified(s0, s1, L0, L1, verbosity)
+            sMin = s0[maxAmplified - 1] if 0 < maxAmplified <= len(s0) else 0.0  # s0 is sorted, descending
+            return (nAmplified, sMin), (nAmplified == maxAmplified)
+
+        goodPairIndices = _find_pair_list_greedily([fullTestMx0, fullTestMx1], [elIndices0, elIndices1],
+                                                   greedy_test_fn, comm, printer)
+        if goodPairIndices is not None:
+            printer.log("Greedy search found a set of %d pairs" % len(goodPairIndices))
+            return pair_list(goodPairIndices)
+        printer.log(" --> Greedy search didn't amplify all %d parameters" % maxAmplified)
+
+    else:
         bestAmplified = 0
-        if search_mode == "sequential":
-            pairIndicesToIterateOver = _itertools.combinations(allPairIndices, nNeededPairs)
-
-        elif search_mode == "random":
-            _random.seed(seed)  # ok if seed is None
-            nTotalPairCombos = _nCr(len(allPairIndices), nNeededPairs)
-            if n_random < nTotalPairCombos:
-                pairIndicesToIterateOver = [_random_combination(allPairIndices, nNeededPairs) for i in range(n_random)]
-            else:
-                pairIndicesToIterateOver = _itertools.combinations(allPairIndices, nNeededPairs)
-
-        for pairIndicesToTest in pairIndicesToIterateOver:
-            pairIndices0 = _np.concatenate([elIndices0[i] for i in pairIndicesToTest])
-            pairIndices1 = _np.concatenate([elIndices1[i] for i in pairIndicesToTest])
-            testMx0 = _np.take(fullTestMx0, pairIndices0, axis=0)
-            testMx1 = _np.take(fullTestMx1, pairIndices1, axis=0)
-            nAmplified = get_number_amplified(testMx0, testMx1, L0, L1, verbosity)
-            bestAmplified = max(bestAmplified, nAmplified)
-            if printer.verbosity > 1:
-                ret = []
-                for i in pairIndicesToTest:
-                    prepfid_index = i // nEStrs
-                    iEStr = i - prepfid_index * nEStrs
-                    ret.append((prepfid_index, iEStr))
-                printer.log("Pair list %s ==> %d amplified parameters" % (" ".join(map(str, ret)), nAmplified))
-
-            if nAmplified == maxAmplified:
-                ret = []
-                for i in pairIndicesToTest:
-                    prepfid_index = i // nEStrs
-                    iEStr = i - prepfid_index * nEStrs
-                    ret.append((prepfid_index, iEStr))
-                return ret
-
-    printer.log(" --> Highest number of amplified parameters was %d" % bestAmplified)
+        for nNeededPairs in range(minimum_pairs, nPossiblePairs):
+            printer.log("Beginning search for a good set of %d pairs (%d pair lists to test)" %
+                        (nNeededPairs, _nCr(nPossiblePairs, nNeededPairs)))
+
+            pairIndicesToIterateOver = _pair_index_lists(allPairIndices, nNeededPairs, search_mode,
+                                                         n_random, seed, comm)
+            goodPairIndices, bestAmplified = _find_first_sufficient_pair_list(
+                pairIndicesToIterateOver, test_pair_indices, comm)
+            if goodPairIndices is not None:
+                return pair_list(goodPairIndices)
+
+        printer.log(" --> Highest number of amplified parameters was %d" % bestAmplified)
 
     #if we tried all the way to nPossiblePairs-1 and no success, just return all the pairs, which by definition will hit
     #the "max-amplified" target
@@ -295,7 +535,7 @@ def find_sufficient_fiducial_pairs_per_germ(target_model, prep_fiducials, meas_f
                                             germs, pre_povm_tuples="first",
                                             search_mode="sequential", constrain_to_tp=True,
                                             n_random=100, seed=None, verbosity=0,
-                                            mem_limit=None):
+                                            mem_limit=None, comm=None):
     """
     Finds a per-germ set of fiducial pairs that are amplificationally complete.
 
@@ -342,12 +582,16 @@ def find_sufficient_fiducial_pairs_per_germ(target_model, prep_fiducials, meas_f
         (and default) value "first", which considers the first prep and POVM
         contained in `target_model`.
 
-    search_mode : {"sequential","random"}, optional
+    search_mode : {"sequential","random","greedy"}, optional
         If "sequential", then all potential fiducial pair sets of a given length
         are considered in sequence (per germ) before moving to sets of a larger
         size.  This can take a long time when there are many possible fiducial
         pairs.  If "random", then only `n_random` randomly chosen fiducial pair
         sets are considered for each set size before the set is enlarged.
+        If "greedy", then a single fiducial pair set is built up (per germ) by
+        adding, one at a time, the pair that most increases the rank (breaking
+        ties by the smallest relevant singular value).  This scales well to many
+        fiducial pairs but may not find the smallest set.
 
     constrain_to_tp : bool, optional
         Whether or not to consider non-TP parameters the the germs amplify.  If
@@ -366,6 +610,10 @@ def find_sufficient_fiducial_pairs_per_germ(target_model, prep_fiducials, meas_f
     mem_limit : int, optional
         A memory limit in bytes.
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to test candidate fiducial-pair
+        sets in parallel.  The result doesn't depend on the number of processors.
+
     Returns
     -------
     dict
@@ -375,7 +623,7 @@ def find_sufficient_fiducial_pairs_per_germ(target_model, prep_fiducials, meas_f
         `prep_fiducials` and `meas_fiducials`).
     """
 
-    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
 
     if pre_povm_tuples == "first":
         firstRho = list(target_model.preps.keys())[0]
@@ -451,53 +699,63 @@ def find_sufficient_fiducial_pairs_per_germ(target_model, prep_fiducials, meas_f
             nPossiblePairs = len(prep_fiducials) * len(meas_fiducials)
             allPairIndices = list(range(nPossiblePairs))
 
+            def pair_list(pair_indices):
+                """ Convert fiducial-pair indices to (prepfid_index, iEStr) tuples """
+                pairList = []
+                for i in pair_indices:
+                    prepfid_index = i // nEStrs; iEStr = i - prepfid_index * nEStrs
+                    pairList.append((prepfid_index, iEStr))
+                return pairList
+
+            # Same computation of rank as above, but with only a subset of the total
+            # fiducial pairs: the rank of dot(dP, dP.T) is the number of squared singular
+            # values of dP above RANK_TOL, and these are updated incrementally as pairs are
+            # added to the pair lists being tested (see _IncrementalPairSVD).
+            pairSVD = _IncrementalPairSVD(dPall, elIndicesForPair)
+
+            def test_pair_indices(pairIndicesToTest):
+                """ Return the rank and whether all of the germ's parameters are amplified """
+                rank = _np.count_nonzero(pairSVD.singular_values(pairIndicesToTest)**2 > RANK_TOL)
+                printer.log("Pair list %s ==> %d of %d amplified parameters"
+                            % (" ".join(map(str, pair_list(pairIndicesToTest))), rank,
+                               gsGerm.num_params), 3)
+                return rank, (rank == gsGerm.num_params)
+
             #Determine which fiducial-pair indices to iterate over
-            goodPairList = None; maxRank = 0
-            for nNeededPairs in range(gsGerm.num_params, nPossiblePairs):
-                printer.log("Beginning search for a good set of %d pairs (%d pair lists to test)" %
-                            (nNeededPairs, _nCr(nPossiblePairs, nNeededPairs)), 2)
-
-                if search_mode == "sequential":
-                    pairIndicesToIterateOver = _itertools.combinations(allPairIndices, nNeededPairs)
-
-                elif search_mode == "random":
-                    _random.seed(seed)  # ok if seed is None
-                    nTotalPairCombos = _nCr(len(allPairIndices), nNeededPairs)
-                    if n_random < nTotalPairCombos:
-                        pairIndicesToIterateOver = [_random_combination(
-                            allPairIndices, nNeededPairs) for i in range(n_random)]
-                    else:
-                        pairIndicesToIterateOver = _itertools.combinations(allPairIndices, nNeededPairs)
-
-                for pairIndicesToTest in pairIndicesToIterateOver:
-
-                    #Get list of pairs as tuples for printing & returning
-                    pairList = []
-                    for i in pairIndicesToTest:
-                        prepfid_index = i // nEStrs; iEStr = i - prepfid_index * nEStrs
-                        pairList.append((prepfid_index, iEStr))
-
-                    # Same computation of rank as above, but with only a
-                    # subset of the total fiducial pairs.
-                    elementIndicesToTest = _np.concatenate([elIndicesForPair[i] for i in pairIndicesToTest])
-                    dP = _np.take(dPall, elementIndicesToTest, axis=0)  # subset_of_num_elements x num_params
-                    rank = _np.linalg.matrix_rank(_np.dot(dP, dP.T), RANK_TOL)
-                    maxRank = max(maxRank, rank)
-
-                    printer.log("Pair list %s ==> %d of %d amplified parameters"
-                                % (" ".join(map(str, pairList)), rank,
-                                   gsGerm.num_params), 3)
-
-                    if rank == gsGerm.num_params:
-                        printer.log("Found a good set of %d pairs: %s" %
-                                    (nNeededPairs, " ".join(map(str, pairList))), 2)
-                        goodPairList = pairList
-                        break
+            goodPairList = None
+            if search_mode == "greedy":
+                def greedy_test_fn(singular_values):
+                    """ Score by rank and then by the smallest singular value that should be nonzero """
+                    s = singular_values[0]  # sorted, descending
+                    rank = _np.count_nonzero(s**2 > RANK_TOL)
+                    sMin = s[gsGerm.num_params - 1] if gsGerm.num_params <= len(s) else 0.0
+                    return (rank, sMin), (rank == gsGerm.num_params)
+
+                goodPairIndices = _find_pair_list_greedily([dPall], [elIndicesForPair], greedy_test_fn,
+                                                           comm, printer)
+                if goodPairIndices is not None:
+                    goodPairList = pair_list(goodPairIndices)
+                    printer.log("Found a good set of %d pairs: %s" %
+                                (len(goodPairList), " ".join(map(str, goodPairList))), 2)
 
-                if goodPairList is not None:
-                    break  # exit another loop level if a solution was found
+            else:
+                for nNeededPairs in range(gsGerm.num_params, nPossiblePairs):
+                    printer.log("Beginning search for a good set of %d pairs (%d pair lists to test)" %
+                                (nNeededPairs, _nCr(nPossiblePairs, nNeededPairs)), 2)
+
+                    pairIndicesToIterateOver = _pair_index_lists(allPairIndices, nNeededPairs, search_mode,
+                                                                 n_random, seed, comm)
+                    goodPairIndices, _ = _find_first_sufficient_pair_list(
+                        pairIndicesToIterateOver, test_pair_indices, comm)
+
+                    if goodPairIndices is not None:
+                        goodPairList = pair_list(goodPairIndices)
+                        printer.log("Found a good set of %d pairs: %s" %
+                                    (nNeededPairs, " ".join(map(str, goodPairList))), 2)
+                        break  # exit another loop level if a solution was found
 
-            assert(goodPairList is not None)
+            if goodPairList is None:
+                raise ValueError("Could not find a sufficient set of fiducial pairs for germ %s!" % str(germ))
             pairListDict[germ] = goodPairList  # add to final list of per-germ pairs
 
     return pairListDict
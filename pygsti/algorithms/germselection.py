@@ -10,6 +10,7 @@ Functions for selecting a complete set of germs for a GST analysis.
 # http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
 #***************************************************************************************************
 
+import itertools as _itertools
 import warnings as _warnings
 
 import numpy as _np
@@ -22,6 +23,7 @@ from pygsti import baseobjs as _baseobjs
 from pygsti.tools import mpitools as _mpit
 
 FLOATSIZE = 8  # in bytes: TODO: a better way
+TWIRLED_DERIV_CHUNK_MEM = 2**28  # rough memory (in bytes) used when computing a chunk of twirled derivatives
 
 
 def find_germs(target_model, randomize=True, randomization_strength=1e-2,
@@ -115,8 +117,8 @@ def find_germs(target_model, randomize=True, randomization_strength=1e-2,
         A rough memory limit in bytes which restricts the amount of intermediate
         values that are computed and stored.
 
-    comm : mpi4py.MPI.Comm, optional
-        When not None, an MPI communicator for distributing the computation
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator for distributing the computation
         across multiple processors.
 
     profiler : Profiler, optional
@@ -190,6 +192,7 @@ def find_germs(target_model, randomize=True, randomization_strength=1e-2,
             'force': force,
             'return_all': False,
             'score_func': 'all',
+            'comm': comm,
         }
         for key in default_kwargs:
             if key not in algorithm_kwargs:
@@ -220,6 +223,7 @@ def find_germs(target_model, randomize=True, randomization_strength=1e-2,
             'verbosity': max(0, verbosity - 1),
             'force': force,
             'score_func': 'all',
+            'comm': comm,
         }
         if ('slack_frac' not in algorithm_kwargs
                 and 'fixed_slack' not in algorithm_kwargs):
@@ -490,7 +494,19 @@ def compute_composite_germ_set_score(score_fn, threshold_ac=1e6, init_n=1,
 
     combinedDDD = _np.sum(partial_deriv_dagger_deriv, axis=0)
     sortedEigenvals = _np.sort(_np.real(_nla.eigvalsh(combinedDDD)))
-    observableEigenvals = sortedEigenvals[num_gauge_params:]
+    return _composite_score_from_eigenvalues(sortedEigenvals, score_fn, threshold_ac, init_n,
+                                             num_gauge_params, opScore, l1Score)
+
+
+def _composite_score_from_eigenvalues(sorted_eigenvals, score_fn, threshold_ac, init_n,
+                                      num_gauge_params, op_score=0.0, l1_score=0.0):
+    """
+    Compute the :class:`CompositeScore` of a germ set from the sorted eigenvalues of its combined `J.H*J`.
+
+    See :func:`compute_composite_germ_set_score`, which computes `sorted_eigenvals`
+    and the penalty terms, `op_score` and `l1_score`, before calling this function.
+    """
+    observableEigenvals = sorted_eigenvals[num_gauge_params:]
     N_AC = 0
     AC_score = _np.inf
     for N in range(init_n, len(observableEigenvals) + 1):
@@ -508,11 +524,9 @@ def compute_composite_germ_set_score(score_fn, threshold_ac=1e6, init_n=1,
     #minor_score = AC_score + l1Score + opScore
 
     # Apply penalties to the major score
-    major_score = -N_AC + opScore + l1Score
+    major_score = -N_AC + op_score + l1_score
     minor_score = AC_score
     ret = _scoring.CompositeScore(major_score, minor_score, N_AC)
-    #DEBUG: ret.extra = {'opScore': opScore,
-    #    'sum(germ_lengths)': _np.sum(germ_lengths), 'l1': l1Score}
     return ret
 
 
@@ -544,9 +558,9 @@ def _compute_bulk_twirled_ddd(model, germs_list, eps=1e-6, check=False,
     germ_lengths : numpy.ndarray, optional
         A pre-computed array of the length (depth) of each germ.
 
-    comm : mpi4py.MPI.Comm, optional
-        When not ``None``, an MPI communicator for distributing the computation
-        across multiple processors.
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not ``None``, a communicator for distributing the germs among
+        multiple processors.
 
     Returns
     -------
@@ -556,21 +570,28 @@ def _compute_bulk_twirled_ddd(model, germs_list, eps=1e-6, check=False,
     if germ_lengths is None:
         germ_lengths = _np.array([len(germ) for germ in germs_list])
 
-    twirledDeriv = _bulk_twirled_deriv(model, germs_list, eps, check, comm) / germ_lengths[:, None, None]
-
     #OLD: slow, I think because conjugate *copies* a large tensor, causing a memory bottleneck
     #twirledDerivDaggerDeriv = _np.einsum('ijk,ijl->ikl',
     #                                     _np.conjugate(twirledDeriv),
     #                                     twirledDeriv)
 
-    #NEW: faster, one-germ-at-a-time computation requires less memory.
-    nGerms, _, vec_model_dim = twirledDeriv.shape
-    twirledDerivDaggerDeriv = _np.empty((nGerms, vec_model_dim, vec_model_dim),
-                                        dtype=_np.complex)
-    for i in range(nGerms):
-        twirledDerivDaggerDeriv[i, :, :] = _np.dot(
-            twirledDeriv[i, :, :].conjugate().T, twirledDeriv[i, :, :])
+    if len(model.preps) > 0 or len(model.povms) > 0:
+        model = _remove_spam_vectors(model)
 
+    #NEW: faster, one-germ-at-a-time computation requires less memory.  The twirled
+    # derivatives are computed a chunk of germs at a time, so they're never all in memory.
+    # Each processor computes a contiguous block of germs, which are then gathered.
+    germ_slices, loc_slice, owners, _ = _mpit.distribute_slice(slice(0, len(germs_list)), comm, False)
+    twirledDerivDaggerDeriv = _np.empty((len(germs_list), model.num_params, model.num_params),
+                                        dtype=_np.complex)
+    for start, twirledDeriv in _bulk_twirled_deriv_chunks(model, germs_list[loc_slice], eps, check):
+        start += loc_slice.start
+        for i in range(twirledDeriv.shape[0]):
+            derivForGerm = twirledDeriv[i, :, :] / germ_lengths[start + i]
+            twirledDerivDaggerDeriv[start + i, :, :] = _np.dot(
+                derivForGerm.conjugate().T, derivForGerm)
+
+    _mpit.gather_slices(germ_slices, owners, twirledDerivDaggerDeriv, [], 0, comm)
     return twirledDerivDaggerDeriv
 
 
@@ -609,6 +630,149 @@ def _compute_twirled_ddd(model, germ, eps=1e-6):
     return twirledDerivDaggerDeriv
 
 
+def _compute_bulk_twirled_ddd_factors(model, germs_list, eps=1e-6, check=False,
+                                      germ_lengths=None, comm=None):
+    """
+    Calculate low-rank factors of the positive squares of the germ Jacobians.
+
+    Each germ's twirled Jacobian, `J`, has shape `(op_dim**2, vec_model_dim)` but
+    has low rank, since twirling projects onto the (usually `op_dim`-dimensional)
+    commutant of the germ.  This function computes, for each germ, a factor `F`
+    with only `rank(J)` rows such that `F.H*F == J.H*J`, using the singular value
+    decomposition of `J`.  Storing these factors requires far less memory than
+    storing the `(vec_model_dim, vec_model_dim)` matrices computed by
+    :func:`_compute_bulk_twirled_ddd`.
+
+    Parameters
+    ----------
+    model : Model
+        The model defining the parameters to differentiate with respect to.
+
+    germs_list : list
+        The germ set
+
+    eps : float, optional
+        Tolerance used for testing whether two eigenvectors are degenerate
+        (i.e. abs(eval1 - eval2) < eps ? )
+
+    check : bool, optional
+        Whether to perform internal consistency checks, at the expense of
+        making the function slower.
+
+    germ_lengths : numpy.ndarray, optional
+        A pre-computed array of the length (depth) of each germ.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not ``None``, a communicator for distributing the germs among
+        multiple processors.
+
+    Returns
+    -------
+    list
+        A list of complex arrays, one per germ, each of shape `(rank, model.num_params)`.
+    """
+    if germ_lengths is None:
+        germ_lengths = _np.array([len(germ) for germ in germs_list])
+
+    #Each processor computes the factors of a contiguous block of germs
+    _, loc_slice, _, _ = _mpit.distribute_slice(slice(0, len(germs_list)), comm, False)
+    factors = []
+    for start, twirledDeriv in _bulk_twirled_deriv_chunks(model, germs_list[loc_slice], eps, check):
+        start += loc_slice.start
+        for i in range(twirledDeriv.shape[0]):
+            _, sing_vals, Vh = _nla.svd(twirledDeriv[i] / germ_lengths[start + i], full_matrices=False)
+            rank_tol = sing_vals[0] * max(twirledDeriv.shape[1:]) * _np.finfo(float).eps \
+                if len(sing_vals) > 0 else 0
+            rank = _np.count_nonzero(sing_vals > rank_tol)
+            factors.append(sing_vals[0:rank, None] * Vh[0:rank, :])
+
+    if comm is not None and comm.Get_size() > 1:
+        factors = list(_itertools.chain.from_iterable(comm.allgather(factors)))
+    return factors
+
+
+class _GermSetGramian(object):
+    """
+    The sum of the `J.H*J` (see :func:`_compute_bulk_twirled_ddd`) of a set of germs, built up one germ at a time.
+
+    This object computes the eigenvalues of the Gramian that results from adding a candidate germ to
+    the current set *without* diagonalizing the full `(Np, Np)` Gramian for every candidate.  The current
+    Gramian is stored as its eigen-decomposition, `U * diag(evals) * U.H`, restricted to its (numerical)
+    range, so that `A = sqrt(evals) * U.H` satisfies `A.H*A == Gramian` and has only `rank(Gramian)` rows.
+    For a candidate germ with factor `F` (see :func:`_compute_bulk_twirled_ddd_factors`), the nonzero
+    eigenvalues of `Gramian + F.H*F` are those of the `(rank + rank(F))`-dimensional matrix `G * G.H`
+    where `G = [A; F]`.  Since the upper-left block of `G * G.H` is just `diag(evals)`, building this
+    matrix only requires `U.H * F.H`.  When the current set (or candidate) has high rank, this falls back
+    to diagonalizing `Gramian + F.H*F` directly.
+
+    Parameters
+    ----------
+    num_params : int
+        The number of model parameters, i.e. the dimension of the Gramian.
+    """
+
+    def __init__(self, num_params):
+        self.gramian = _np.zeros((num_params, num_params), 'complex')
+        self.evals = _np.zeros(0, 'd')
+        self._scaled_evecs_dag = _np.zeros((0, num_params), 'complex')  # A = sqrt(evals) * U.H
+
+    @property
+    def num_params(self):
+        """
+        The number of model parameters, i.e. the dimension of the Gramian.
+        """
+        return self.gramian.shape[0]
+
+    def add(self, factor):
+        """
+        Add the `J.H*J` of a germ, given by its low-rank factor `F`, to this Gramian.
+
+        Parameters
+        ----------
+        factor : numpy.ndarray
+            A `(rank, num_params)`-shaped array such that `F.H*F` is the germ's `J.H*J`.
+
+        Returns
+        -------
+        None
+        """
+        self.gramian += _np.dot(factor.conjugate().T, factor)
+        evals, U = _nla.eigh(self.gramian)
+        rank_tol = max(evals[-1], 0) * self.num_params * _np.finfo(float).eps
+        in_range = evals > rank_tol
+        self.evals = evals[in_range]
+        self._scaled_evecs_dag = _np.sqrt(self.evals)[:, None] * U[:, in_range].conjugate().T
+
+    def sorted_eigenvalues_with(self, factor):
+        """
+        The sorted eigenvalues of this Gramian after adding the `J.H*J` given by `factor`.
+
+        This Gramian is not updated (see :method:`add`).
+
+        Parameters
+        ----------
+        factor : numpy.ndarray
+            A `(rank, num_params)`-shaped array such that `F.H*F` is the candidate germ's `J.H*J`.
+
+        Returns
+        -------
+        numpy.ndarray
+            A real array of length `num_params`, sorted in ascending order.
+        """
+        rank = len(self.evals)
+        dim = rank + factor.shape[0]
+        if dim >= self.num_params:
+            return _np.sort(_np.real(_nla.eigvalsh(self.gramian + _np.dot(factor.conjugate().T, factor))))
+
+        GGdag = _np.empty((dim, dim), 'complex')
+        GGdag[0:rank, 0:rank] = _np.diag(self.evals)
+        GGdag[0:rank, rank:] = _np.dot(self._scaled_evecs_dag, factor.conjugate().T)
+        GGdag[rank:, 0:rank] = GGdag[0:rank, rank:].conjugate().T
+        GGdag[rank:, rank:] = _np.dot(factor, factor.conjugate().T)
+        nonzero_evals = _np.real(_nla.eigvalsh(GGdag))
+        return _np.sort(_np.concatenate((_np.zeros(self.num_params - dim, 'd'), nonzero_evals)))
+
+
 def _germ_set_score_slack(weights, model_num, score_func, deriv_dagger_deriv_list,
                           force_indices, force_score,
                           n_gauge_params, op_penalty, germ_lengths, l1_penalty=1e-2,
@@ -739,7 +903,7 @@ def randomize_model_list(model_list, randomization_strength, num_copies,
     return newmodelList
 
 
-def test_germs_list_completeness(model_list, germs_list, score_func, threshold):
+def test_germs_list_completeness(model_list, germs_list, score_func, threshold, comm=None):
     """
     Check to see if the germs_list is amplificationally complete (AC).
 
@@ -765,6 +929,10 @@ def test_germs_list_completeness(model_list, germs_list, score_func, threshold):
         parameter un-amplified when its reciprocal is greater than threshold.
         Also used for eigenvector degeneracy testing in twirling operation.
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not ``None``, a communicator for distributing the computation
+        across multiple processors.
+
     Returns
     -------
     int
@@ -774,7 +942,7 @@ def test_germs_list_completeness(model_list, germs_list, score_func, threshold):
     for modelNum, model in enumerate(model_list):
         initial_test = test_germ_set_infl(model, germs_list,
                                           score_func=score_func,
-                                          threshold=threshold)
+                                          threshold=threshold, comm=comm)
         if not initial_test:
             return modelNum
 
@@ -936,6 +1104,132 @@ def _twirled_deriv(model, circuit, eps=1e-6):
     return _np.dot(twirler, dProd)
 
 
+def _twirl_derivs(prods, d_prods, eps=1e-6):
+    """
+    Act with the perfect-twirl superoperators of a stack of operations on their derivatives.
+
+    This computes `_np.dot(_super_op_for_perfect_twirl(prods[i], eps), d_prods[i])` for
+    each `i` without forming the `(op_dim**2, op_dim**2)` twirling superoperators.  If
+    `prods[i] = M * diag(evals) * Minv`, the twirl of an operator `X` is
+    `M * ((Minv * X * M) o D) * Minv`, where `o` is the element-wise product and
+    `D[a,b] = sum_k C[k,a] * C[k,b] / sum_j C[k,j]`, with `C[k,a] = 1` when `evals[k]`
+    and `evals[a]` are degenerate and `0` otherwise.  Only the nonzero elements of `D`
+    contribute, so the twirling superoperator is the sum of `nnz(D)` rank-one terms,
+    `D[a,b] * vec(M[:,a] * Minv[b,:]) * vec(Minv[a,:].T * M[:,b].T).T`, and is applied
+    as the product of its `(op_dim**2, nnz(D))` and `(nnz(D), op_dim**2)` factors.
+    Typically `nnz(D)` is close to `op_dim`, making this much faster than a dense
+    twirler.  The eigen-decompositions and `D` matrices are computed for all the
+    operations at once.
+
+    Parameters
+    ----------
+    prods : numpy.ndarray
+        An array of shape `(n, op_dim, op_dim)` holding the operations (e.g. the
+        process matrices of circuits) to twirl with respect to.
+
+    d_prods : numpy.ndarray
+        An array of shape `(n, op_dim**2, num_params)` holding the derivatives of the
+        flattened `prods` with respect to the model parameters.
+
+    eps : float, optional
+        Tolerance used for testing whether two eigenvectors are degenerate
+        (i.e. abs(eval1 - eval2) < eps ? )
+
+    Returns
+    -------
+    numpy.ndarray
+        A complex array of shape `(n, op_dim**2, num_params)`.
+    """
+    n, op_dim, _ = prods.shape
+    evals, evecs = _np.linalg.eig(prods)
+    evecsInv = _np.linalg.inv(evecs)
+
+    # degenerate[i, k, a] == 1 when the k-th and a-th eigenvalues of prods[i] are degenerate
+    degenerate = (_np.abs(evals[:, :, None] - evals[:, None, :]) <= eps).astype('d')
+    projWeights = _np.matmul(_np.swapaxes(degenerate / _np.sum(degenerate, axis=2)[:, :, None], 1, 2), degenerate)
+
+    ret = _np.empty((n, op_dim**2, d_prods.shape[2]), 'complex')
+    for i in range(n):
+        M, Minv = evecs[i], evecsInv[i]
+        a, b = _np.nonzero(projWeights[i])
+        right = (Minv[a, :, None] * M[:, b].T[:, None, :]).reshape(len(a), op_dim**2)  # vec(Minv[a,:].T * M[:,b].T)
+        left = (M[:, a].T[:, :, None] * Minv[b, None, :]).reshape(len(a), op_dim**2)  # vec(M[:,a] * Minv[b,:])
+        if _np.iscomplexobj(d_prods):
+            eigbasisDeriv = _np.dot(right, d_prods[i])
+        else:  # avoid converting d_prods to a complex array
+            eigbasisDeriv = _np.dot(right.real, d_prods[i]) + 1j * _np.dot(right.imag, d_prods[i])
+        ret[i] = _np.dot(left.T * projWeights[i][a, b], eigbasisDeriv)
+    return ret
+
+
+def _bulk_twirled_deriv_chunks(model, circuits, eps=1e-6, check=False, comm=None, chunk_size=None):
+    """
+    Compute the "Twirled Derivative" of a set of circuits, one chunk of circuits at a time.
+
+    This generator computes the same twirled derivatives as :func:`_bulk_twirled_deriv`,
+    but only holds those of a single chunk of circuits (and the intermediate values needed
+    to compute them) in memory at a time.
+
+    Parameters
+    ----------
+    model : Model object
+        The Model which associates operation labels with operators.
+
+    circuits : list of Circuit objects
+        A twirled derivative of this circuit's action (process matrix) is taken.
+
+    eps : float, optional
+        Tolerance used for testing whether two eigenvectors are degenerate
+        (i.e. abs(eval1 - eval2) < eps ? )
+
+    check : bool, optional
+        Whether to perform internal consistency checks, at the expense of
+        making the function slower.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    chunk_size : int, optional
+        The number of circuits in each chunk.  If None, this is chosen so that
+        each chunk uses roughly `TWIRLED_DERIV_CHUNK_MEM` bytes.
+
+    Yields
+    ------
+    start : int
+        The index (into `circuits`) of the chunk's first circuit.
+
+    twirled_deriv : numpy.ndarray
+        An array of shape (chunk_size, op_dim^2, num_model_params)
+    """
+    if len(model.preps) > 0 or len(model.povms) > 0:
+        model = _remove_spam_vectors(model)
+        # This function assumes model has no spam elements so `lookup` below
+        #  gives indexes into products computed by evalTree.
+
+    resource_alloc = _baseobjs.ResourceAllocation(comm=comm)
+    fd = model.dim**2  # flattened gate dimension
+    if chunk_size is None:
+        # the derivatives and ~4 complex intermediate arrays of the same size
+        chunk_size = max(int(TWIRLED_DERIV_CHUNK_MEM // (9 * FLOATSIZE * fd * max(model.num_params, 1))), 1)
+
+    for start in range(0, len(circuits), chunk_size):
+        chunk = circuits[start:start + chunk_size]
+        dProds, prods = model.sim.bulk_dproduct(chunk, flat=True, return_prods=True, resource_alloc=resource_alloc)
+        twirledDeriv = _twirl_derivs(prods, dProds.reshape(len(chunk), fd, dProds.shape[1]), eps)
+
+        if check:
+            for i, circuit in enumerate(chunk):
+                chk_ret = _twirled_deriv(model, circuit, eps)
+                if _nla.norm(twirledDeriv[i] - chk_ret) > 1e-6:
+                    _warnings.warn("bulk twirled derivative norm mismatch = "
+                                   "%g - %g = %g"
+                                   % (_nla.norm(twirledDeriv[i]), _nla.norm(chk_ret),
+                                      _nla.norm(twirledDeriv[i] - chk_ret)))  # pragma: no cover
+
+        yield start, twirledDeriv  # chunk_size x flattened_op_dim x vec_model_dim
+
+
 def _bulk_twirled_deriv(model, circuits, eps=1e-6, check=False, comm=None):
     """
     Compute the "Twirled Derivative" of a set of circuits.
@@ -970,31 +1264,10 @@ def _bulk_twirled_deriv(model, circuits, eps=1e-6, check=False, comm=None):
     """
     if len(model.preps) > 0 or len(model.povms) > 0:
         model = _remove_spam_vectors(model)
-        # This function assumes model has no spam elements so `lookup` below
-        #  gives indexes into products computed by evalTree.
 
-    resource_alloc = _baseobjs.ResourceAllocation(comm=comm)
-    dProds, prods = model.sim.bulk_dproduct(circuits, flat=True, return_prods=True, resource_alloc=resource_alloc)
-    op_dim = model.dim
-    fd = op_dim**2  # flattened gate dimension
-    nCircuits = len(circuits)
-
-    ret = _np.empty((nCircuits, fd, dProds.shape[1]), 'complex')
-    for i in range(nCircuits):
-        # flattened_op_dim x flattened_op_dim
-        twirler = _super_op_for_perfect_twirl(prods[i], eps)
-
-        # flattened_op_dim x vec_model_dim
-        ret[i] = _np.dot(twirler, dProds[i * fd:(i + 1) * fd])
-
-    if check:
-        for i, circuit in enumerate(circuits):
-            chk_ret = _twirled_deriv(model, circuit, eps)
-            if _nla.norm(ret[i] - chk_ret) > 1e-6:
-                _warnings.warn("bulk twirled derivative norm mismatch = "
-                               "%g - %g = %g"
-                               % (_nla.norm(ret[i]), _nla.norm(chk_ret),
-                                  _nla.norm(ret[i] - chk_ret)))  # pragma: no cover
+    ret = _np.empty((len(circuits), model.dim**2, model.num_params), 'complex')
+    for start, twirledDeriv in _bulk_twirled_deriv_chunks(model, circuits, eps, check, comm):
+        ret[start:start + twirledDeriv.shape[0]] = twirledDeriv
 
     return ret  # nSimplifiedCircuits x flattened_op_dim x vec_model_dim
 
@@ -1067,7 +1340,7 @@ def test_germ_set_finitel(model, germs_to_test, length, weights=None,
 
 
 def test_germ_set_infl(model, germs_to_test, score_func='all', weights=None,
-                       return_spectrum=False, threshold=1e6, check=False):
+                       return_spectrum=False, threshold=1e6, check=False, comm=None):
     """
     Test whether a set of germs is able to amplify all non-gauge parameters.
 
@@ -1102,6 +1375,10 @@ def test_germ_set_infl(model, germs_to_test, score_func='all', weights=None,
         Whether to perform internal consistency checks, at the
         expense of making the function slower.
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not ``None``, a communicator for distributing the computation
+        across multiple processors.
+
     Returns
     -------
     success : bool
@@ -1119,7 +1396,7 @@ def test_germ_set_infl(model, germs_to_test, score_func='all', weights=None,
     germLengths = _np.array([len(germ) for germ in germs_to_test], _np.int64)
     twirledDerivDaggerDeriv = _compute_bulk_twirled_ddd(model, germs_to_test,
                                                         1. / threshold, check,
-                                                        germLengths)
+                                                        germLengths, comm)
     # result[i] = _np.dot( twirledDeriv[i].H, twirledDeriv[i] ) i.e. matrix
     # product
     # result[i,k,l] = sum_j twirledDerivH[i,k,j] * twirledDeriv(i,j,l)
@@ -1143,10 +1420,50 @@ def test_germ_set_infl(model, germs_to_test, score_func='all', weights=None,
     return (bSuccess, sortedEigenvals) if return_spectrum else bSuccess
 
 
+def _global_best_candidate(score, candidate, comm):
+    """
+    Find the lowest of the candidate scores computed by different processors.
+
+    Each processor of `comm` scores a contiguous block of the candidates and
+    passes its best (lowest) `score` along with the corresponding `candidate`.
+    Ties are broken in favor of the lowest-ranked processor, so that the result
+    is the same as scoring all the candidates on a single processor and taking
+    the first one with the lowest score.
+
+    Parameters
+    ----------
+    score : CompositeScore or float
+        The lowest score found by the current processor.
+
+    candidate : object
+        The candidate (e.g. germ index) with score `score`.
+
+    comm : mpi4py.MPI.Comm or ProcessComm
+        The communicator containing the processors to reduce over, or None.
+
+    Returns
+    -------
+    score : CompositeScore or float
+        The lowest score over all the processors.
+    candidate : object
+        The candidate with the lowest score.
+    owner : int
+        The rank of the processor that found `candidate`.
+    """
+    if comm is None or comm.Get_size() == 1:
+        return score, candidate, 0
+
+    results = comm.allgather((score, candidate))
+    owner = 0
+    for rank, (rank_score, _) in enumerate(results):
+        if rank_score < results[owner][0]: owner = rank
+    return results[owner][0], results[owner][1], owner
+
+
 def find_germs_depthfirst(model_list, germs_list, randomize=True,
                           randomization_strength=1e-3, num_copies=None, seed=0, op_penalty=0,
                           score_func='all', tol=1e-6, threshold=1e6, check=False,
-                          force="singletons", verbosity=0):
+                          force="singletons", comm=None, verbosity=0):
     """
     Greedy germ selection algorithm starting with 0 germs.
 
@@ -1209,6 +1526,10 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
         germ set.  If the special string "singletons" is given, then all of
         the single gates (length-1 sequences) must be included.
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator for distributing the computation
+        across multiple processors.
+
     verbosity : int, optional
         Level of detail printed to stdout.
 
@@ -1217,7 +1538,7 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
     list
         A list of the built-up germ set (a list of :class:`Circuit` objects).
     """
-    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
 
     model_list = _setup_model_list(model_list, randomize,
                                    randomization_strength, num_copies, seed)
@@ -1243,7 +1564,7 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
     undercompleteModelNum = test_germs_list_completeness(model_list,
                                                          germs_list,
                                                          score_func,
-                                                         threshold)
+                                                         threshold, comm)
     if undercompleteModelNum > -1:
         printer.warning("Complete initial germ set FAILS on model "
                         + str(undercompleteModelNum) + ". Aborting search.")
@@ -1254,7 +1575,7 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
     printer.log("Starting germ set optimization. Lower score is better.", 1)
 
     twirledDerivDaggerDerivList = [_compute_bulk_twirled_ddd(model, germs_list, tol,
-                                                             check, germLengths)
+                                                             check, germLengths, comm)
                                    for model in model_list]
 
     # Dict of keyword arguments passed to compute_score_non_AC that don't
@@ -1279,12 +1600,14 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
             # As long as there are some unused germs, see if you need to add
             # another one.
             if test_germ_set_infl(reducedModel, goodGerms,
-                                  score_func=score_func, threshold=threshold):
+                                  score_func=score_func, threshold=threshold, comm=comm):
                 # The germs are sufficient for the current model
                 break
-            candidateGerms = _np.where(weights == 0)[0]
-            candidateGermScores = []
-            for candidateGermIdx in _np.where(weights == 0)[0]:
+            loc_candidateIndices, _, _ = _mpit.distribute_indices(
+                _np.where(weights == 0)[0], comm, False)
+            bestGermScore = _scoring.CompositeScore(1.0e100, 0, None)  # lower is better
+            bestCandidateGerm = None
+            for candidateGermIdx in loc_candidateIndices:
                 # If the germs aren't sufficient, try adding a single germ
                 candidateWeights = weights.copy()
                 candidateWeights[candidateGermIdx] = 1
@@ -1292,10 +1615,14 @@ def find_germs_depthfirst(model_list, germs_list, randomize=True,
                     _np.where(candidateWeights == 1)[0], :, :]
                 candidateGermScore = compute_composite_germ_set_score(
                     partial_deriv_dagger_deriv=partialDDD, **nonAC_kwargs)
-                candidateGermScores.append(candidateGermScore)
-            # Add the germ that give the best score
-            bestCandidateGerm = candidateGerms[_np.array(
-                candidateGermScores).argmin()]
+                if candidateGermScore < bestGermScore:
+                    bestGermScore = candidateGermScore
+                    bestCandidateGerm = candidateGermIdx
+            # Add the germ that give the best score (over all processors)
+            _, bestCandidateGerm, _ = _global_best_candidate(bestGermScore, bestCandidateGerm, comm)
+            if bestCandidateGerm is None:
+                raise ValueError(("None of the remaining candidate germs has a score below 1e100 for model %d,"
+                                  " so the next germ cannot be chosen!") % modelNum)
             weights[bestCandidateGerm] = 1
             goodGerms.append(germs_list[bestCandidateGerm])
 
@@ -1380,8 +1707,8 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
         A rough memory limit in bytes which restricts the amount of intermediate
         values that are computed and stored.
 
-    comm : mpi4py.MPI.Comm, optional
-        When not None, an MPI communicator for distributing the computation
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator for distributing the computation
         across multiple processors.
 
     profiler : Profiler, optional
@@ -1395,9 +1722,6 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
     list
         A list of the built-up germ set (a list of :class:`Circuit` objects).
     """
-    if comm is not None and comm.Get_size() > 1:
-        from mpi4py import MPI  # not at top so pygsti doesn't require mpi4py
-
     printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
 
     model_list = _setup_model_list(model_list, randomize,
@@ -1433,7 +1757,7 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
         undercompleteModelNum = test_germs_list_completeness(model_list,
                                                              germs_list,
                                                              score_func,
-                                                             threshold)
+                                                             threshold, comm)
         if undercompleteModelNum > -1:
             printer.warning("Complete initial germ set FAILS on model "
                             + str(undercompleteModelNum) + ".")
@@ -1445,15 +1769,16 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
 
     printer.log("Starting germ set optimization. Lower score is better.", 1)
 
-    mode = "all-Jac"  # compute a all the possible germ's jacobians at once up
-    # front and store them separately (requires lots of mem)
+    mode = "low-rank"  # compute all the possible germs' jacobians at once up front and
+    # store only a low-rank factor of each germ's J.H*J.  Candidates are scored using
+    # the eigen-decomposition of the chosen germs' J-sum (see _GermSetGramian).
 
     if mem_limit is not None:
-        memEstimate = FLOATSIZE * len(model_list) * len(germs_list) * Np**2
-        # for _compute_bulk_twirled_ddd
-        memEstimate += FLOATSIZE * len(model_list) * len(germs_list) * dim**2 * Np
-        # for _bulk_twirled_deriv sub-call
-        printer.log("Memory estimate of %.1f GB (%.1f GB limit) for all-Jac mode." %
+        memEstimate = FLOATSIZE * len(model_list) * len(germs_list) * dim**2 * Np
+        # for the low-rank factors (no larger than the germs' twirled derivatives)
+        memEstimate += FLOATSIZE * 3 * len(model_list) * Np**2
+        #Factor of 3 accounts for the J-sum, its eigenvectors, and a candidate's J-sum
+        printer.log("Memory estimate of %.1f GB (%.1f GB limit) for low-rank mode." %
                     (memEstimate / 1024.0**3, mem_limit / 1024.0**3), 1)
 
         if memEstimate > mem_limit:
@@ -1468,17 +1793,20 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
             if memEstimate > mem_limit:
                 raise MemoryError("Too little memory, even for single-Jac mode!")
 
-    twirledDerivDaggerDerivList = None
+    twirledDDDFactorsList = None
+    currentGramianList = None
 
-    if mode == "all-Jac":
-        twirledDerivDaggerDerivList = \
-            [_compute_bulk_twirled_ddd(model, germs_list, tol,
-                                       check, germLengths, comm)
+    if mode == "low-rank":
+        twirledDDDFactorsList = \
+            [_compute_bulk_twirled_ddd_factors(model, germs_list, tol,
+                                               check, germLengths, comm)
              for model in model_list]
 
-        currentDDDList = []
-        for i, derivDaggerDeriv in enumerate(twirledDerivDaggerDerivList):
-            currentDDDList.append(_np.sum(derivDaggerDeriv[_np.where(weights == 1)[0], :, :], axis=0))
+        currentGramianList = []
+        for factors in twirledDDDFactorsList:
+            currentGramianList.append(_GermSetGramian(factors[0].shape[1]))
+            for goodGermIdx in _np.where(weights == 1)[0]:
+                currentGramianList[-1].add(factors[goodGermIdx])
 
     elif mode == "single-Jac":
         currentDDDList = [_np.zeros((Np, Np), 'complex') for mdl in model_list]
@@ -1501,7 +1829,7 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
         if comm is not None and comm.Get_size() > 1:
             for k, model in enumerate(model_list):
                 result = _np.empty((Np, Np), 'complex')
-                comm.Allreduce(currentDDDList[k], result, op=MPI.SUM)
+                comm.Allreduce(currentDDDList[k], result)  # (sum)
                 currentDDDList[k][:, :] = result[:, :]
                 result = None  # free mem
 
@@ -1546,20 +1874,21 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
 
                 # Loop over all models
                 testDDDs = []
-                for k, currentDDD in enumerate(currentDDDList):
-                    testDDD = currentDDD.copy()
-
-                    if mode == "all-Jac":
-                        #just get cached value of deriv-dagger-deriv
-                        derivDaggerDeriv = twirledDerivDaggerDerivList[k][candidateGermIdx]
-                        testDDD += derivDaggerDeriv
-
-                    elif mode == "single-Jac":
-                        #compute value of deriv-dagger-deriv
-                        model = model_list[k]
-                        testDDD += _compute_twirled_ddd(
-                            model, germs_list[candidateGermIdx], tol)
-                    # (else already checked above)
+                for k in range(len(model_list)):
+                    if mode == "low-rank":
+                        #score using the eigen-decomposition of the current germs' deriv-dagger-deriv
+                        germ_lengths = _np.array([len(germ) for germ in
+                                                  (goodGerms + [germs_list[candidateGermIdx]])])
+                        sortedEigenvals = currentGramianList[k].sorted_eigenvalues_with(
+                            twirledDDDFactorsList[k][candidateGermIdx])
+                        worstScore = max(worstScore, _composite_score_from_eigenvalues(
+                            sortedEigenvals, nonAC_kwargs['score_fn'], threshold, initN,
+                            numGaugeParams, op_penalty * _np.sum(germ_lengths)))
+                        continue
+
+                    #compute value of deriv-dagger-deriv (single-Jac mode)
+                    testDDD = currentDDDList[k].copy()
+                    testDDD += _compute_twirled_ddd(model_list[k], germs_list[candidateGermIdx], tol)
 
                     nonAC_kwargs['germ_lengths'] = \
                         _np.array([len(germ) for germ in
@@ -1580,16 +1909,14 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
                 testDDDs = None
 
         # Add the germ that gives the best germ score
-        if comm is not None and comm.Get_size() > 1:
-            #figure out which processor has best germ score and distribute
-            # its information to the rest of the procs
-            globalMinScore = comm.allreduce(bestGermScore, op=MPI.MIN)
-            toSend = comm.Get_rank() if (globalMinScore == bestGermScore) \
-                else comm.Get_size() + 1
-            winningRank = comm.allreduce(toSend, op=MPI.MIN)
-            bestGermScore = globalMinScore
-            toCast = iBestCandidateGerm if (comm.Get_rank() == winningRank) else None
-            iBestCandidateGerm = comm.bcast(toCast, root=winningRank)
+        #figure out which processor has best germ score and distribute
+        # its information to the rest of the procs
+        bestGermScore, iBestCandidateGerm, winningRank = _global_best_candidate(
+            bestGermScore, iBestCandidateGerm, comm)
+        if comm is not None and comm.Get_size() > 1 and mode != "low-rank":
+            # (in low-rank mode, all procs have all the germs' factors)
+            if comm.Get_rank() != winningRank:
+                bestDDDs = [_np.empty((Np, Np), 'complex') for mdl in model_list]
             for k in range(len(model_list)):
                 comm.Bcast(bestDDDs[k], root=winningRank)
 
@@ -1599,8 +1926,11 @@ def find_germs_breadthfirst(model_list, germs_list, randomize=True,
         goodGerms.append(germs_list[iBestCandidateGerm])
 
         for k in range(len(model_list)):
-            currentDDDList[k][:, :] = bestDDDs[k][:, :]
-            bestDDDs[k] = None
+            if mode == "low-rank":
+                currentGramianList[k].add(twirledDDDFactorsList[k][iBestCandidateGerm])
+            else:
+                currentDDDList[k][:, :] = bestDDDs[k][:, :]
+                bestDDDs[k] = None
 
             printer.log("Added %s to final germs (%s)" %
                         (germs_list[iBestCandidateGerm].str, str(bestGermScore)), 3)
@@ -1617,7 +1947,7 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
                              slack_frac=False, return_all=False, tol=1e-6,
                              check=False, force="singletons",
                              force_score=1e100, threshold=1e6,
-                             verbosity=1):
+                             comm=None, verbosity=1):
     """
     Find a locally optimal subset of the germs in germs_list.
 
@@ -1725,6 +2055,10 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
         Specifies a maximum score for the score matrix, above which the germ
         set is rejected as amplificationally incomplete.
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator for distributing the computation
+        across multiple processors.
+
     verbosity : int, optional
         Integer >= 0 indicating the amount of detail to print.
 
@@ -1733,7 +2067,7 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
     :class:`~pygsti.objects.Model`
     :class:`~pygsti.objects.Circuit`
     """
-    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
 
     model_list = _setup_model_list(model_list, randomize,
                                    randomization_strength, num_copies, seed)
@@ -1755,7 +2089,7 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
 
     undercompleteModelNum = test_germs_list_completeness(model_list,
                                                          germs_list, score_func,
-                                                         threshold)
+                                                         threshold, comm)
     if undercompleteModelNum > -1:
         printer.log("Complete initial germ set FAILS on model "
                     + str(undercompleteModelNum) + ".", 1)
@@ -1791,7 +2125,8 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
     else:
         forceIndices = None
 
-    twirledDerivDaggerDerivList = [_compute_bulk_twirled_ddd(model, germs_list, tol)
+    twirledDerivDaggerDerivList = [_compute_bulk_twirled_ddd(model, germs_list, tol,
+                                                             check, germLengths, comm)
                                    for model in model_list]
 
     # Dict of keyword arguments passed to _germ_set_score_slack that don't change from
@@ -1822,24 +2157,33 @@ def find_germs_integer_slack(model_list, germs_list, randomize=True,
             v[i] = (v[i] + 1) % 2  # Toggle v[i] btwn 0 and 1
             yield v
 
+    def _score_neighbors(bool_vec):
+        # Computes (and caches in scoreD) the scores of all of bool_vec's neighbors
+        # that haven't been scored yet, dividing the neighbors among the processors.
+        unscored = [neighbor for neighbor in _get_neighbors(bool_vec)
+                    if any([(model_num, tuple(neighbor)) not in scoreD for model_num in range(num_models)])]
+        loc_iNeighbors, _, _ = _mpit.distribute_indices(list(range(len(unscored))), comm, False)
+        locScoreD = {}
+        for iNeighbor in loc_iNeighbors:
+            for model_num in range(num_models):
+                _germ_set_score_slack(unscored[iNeighbor], model_num, **dict(cs_kwargs, score_dict=locScoreD))
+        if comm is not None and comm.Get_size() > 1:
+            for procScoreD in comm.allgather(locScoreD):
+                scoreD.update(procScoreD)
+        else:
+            scoreD.update(locScoreD)
+
     with printer.progress_logging(1):
         for iIter in range(max_iter):
             printer.show_progress(iIter, max_iter,
                                   suffix="score=%g, nGerms=%d" % (score, L1))
 
             bFoundBetterNeighbor = False
+            _score_neighbors(weights)
             for neighbor in _get_neighbors(weights):
-                neighborScoreList = []
-                for model_num in range(len(model_list)):
-                    if (model_num, tuple(neighbor)) not in scoreD:
-                        neighborL1 = sum(neighbor)
-                        neighborScoreList.append(_germ_set_score_slack(neighbor,
-                                                                       model_num,
-                                                                       **cs_kwargs))
-                    else:
-                        neighborL1 = sum(neighbor)
-                        neighborScoreList.append(scoreD[model_num,
-                                                        tuple(neighbor)])
+                neighborL1 = sum(neighbor)
+                neighborScoreList = [scoreD[model_num, tuple(neighbor)]
+                                     for model_num in range(len(model_list))]
 
                 neighborScore = _np.max(neighborScoreList)  # Take worst case.
                 # Move if we've found better position; if we've relaxed, we
@@ -1959,7 +2303,7 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
                      score_func='all', tol=1e-6, threshold=1e6,
                      check=False, force="singletons",
                      iterations=5, return_all=False, shuffle=False,
-                     verbosity=0):
+                     comm=None, verbosity=0):
     """
     Use GRASP to find a high-performing germ set.
 
@@ -2057,6 +2401,11 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
         random order (important since currently the local optimizer updates the
         solution to the first better solution it finds in the neighborhood).
 
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator for distributing the computation
+        across multiple processors.  The GRASP iterations are divided among
+        the processors.
+
     verbosity : int, optional
         Integer >= 0 indicating the amount of detail to print.
 
@@ -2065,7 +2414,7 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
     finalGermList : list of Circuit
         Sublist of `germs_list` specifying the final, optimal set of germs.
     """
-    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+    printer = _baseobjs.VerbosityPrinter.create_printer(verbosity, comm)
 
     model_list = _setup_model_list(model_list, randomize,
                                    randomization_strength, num_copies, seed)
@@ -2085,13 +2434,10 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
             for opstr in force:
                 initialWeights[germs_list.index(opstr)] = 1
 
-    def get_neighbors_fn(weights): return _grasp.get_swap_neighbors(
-        weights, forced_weights=initialWeights, shuffle=shuffle)
-
     undercompleteModelNum = test_germs_list_completeness(model_list,
                                                          germs_list,
                                                          score_func,
-                                                         threshold)
+                                                         threshold, comm)
     if undercompleteModelNum > -1:
         printer.warning("Complete initial germ set FAILS on model "
                         + str(undercompleteModelNum) + ".")
@@ -2104,7 +2450,7 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
     printer.log("Starting germ set optimization. Lower score is better.", 1)
 
     twirledDerivDaggerDerivList = [_compute_bulk_twirled_ddd(model, germs_list, tol,
-                                                             check, germLengths)
+                                                             check, germLengths, comm)
                                    for model in model_list]
 
     # Dict of keyword arguments passed to compute_score_non_AC that don't
@@ -2138,14 +2484,28 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
 
     def rcl_fn(x): return _scoring.filter_composite_rcl(x, alpha)
 
-    initialSolns = []
-    localSolns = []
+    # Each iteration is independent of all the others, so iterations are divided among
+    # the processors (groups of processors when there are more processors than iterations).
+    # Each iteration gets its own random number generator so that the results don't
+    # depend on the number of processors.
+    if seed is not None:
+        iterationSeeds = [seed + iteration for iteration in range(iterations)]
+    else:
+        iterationSeeds = list(_np.random.randint(0, 2**31 - 1, size=iterations))
+        if comm is not None: iterationSeeds = comm.bcast(iterationSeeds, root=0)
+
+    loc_iterations, _, loc_comm = _mpit.distribute_indices(list(range(iterations)), comm)
+    iterSolnsByIteration = {}
 
-    for iteration in range(iterations):
-        # This loop is parallelizable (each iteration is independent of all
-        # other iterations).
+    for iteration in loc_iterations:
         printer.log('Starting iteration {} of {}.'.format(iteration + 1,
                                                           iterations), 1)
+        randState = _np.random.RandomState(iterationSeeds[iteration])
+
+        def get_neighbors_fn(weights):
+            return _grasp.get_swap_neighbors(weights, forced_weights=initialWeights, shuffle=shuffle,
+                                             rand_state=randState)
+
         success = False
         failCount = 0
         while not success and failCount < 10:
@@ -2156,10 +2516,9 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
                     get_neighbors_fn=get_neighbors_fn,
                     feasible_fn=_feasible_fn,
                     initial_elements=initialWeights, seed=seed,
-                    verbosity=verbosity)
+                    verbosity=verbosity, rand_state=randState, comm=loc_comm)
 
-                initialSolns.append(iterSolns[0])
-                localSolns.append(iterSolns[1])
+                iterSolnsByIteration[iteration] = iterSolns
 
                 success = True
                 printer.log('Finished iteration {} of {}.'.format(
@@ -2168,6 +2527,15 @@ def find_germs_grasp(model_list, germs_list, alpha, randomize=True,
                 failCount += 1
                 raise e if (failCount == 10) else printer.warning(e)
 
+    if comm is not None and comm.Get_size() > 1:
+        # only the first processor of each group shares its iterations' solutions
+        locSolns = iterSolnsByIteration if (loc_comm is None or loc_comm.Get_rank() == 0) else {}
+        for procSolns in comm.allgather(locSolns):
+            iterSolnsByIteration.update(procSolns)
+
+    initialSolns = [iterSolnsByIteration[iteration][0] for iteration in range(iterations)]
+    localSolns = [iterSolnsByIteration[iteration][1] for iteration in range(iterations)]
+
     finalScores = _np.array([finalScoreFn(localSoln)
                              for localSoln in localSolns])
     bestSoln = localSolns[_np.argmin(finalScores)]
@@ -11,15 +11,15 @@ Functions to facilitate using GRASP.
 #***************************************************************************************************
 
 import itertools
-import random
 
 import numpy as _np
 
 from pygsti import baseobjs as _baseobjs
 from pygsti import circuits as _circuits
+from pygsti.tools import mpitools as _mpit
 
 
-def get_swap_neighbors(weights, forced_weights=None, shuffle=False):
+def get_swap_neighbors(weights, forced_weights=None, shuffle=False, rand_state=None):
     """
     Return the list of weights in the neighborhood of a given weight vector.
 
@@ -43,6 +43,10 @@ def get_swap_neighbors(weights, forced_weights=None, shuffle=False):
         the first better solution it finds in the neighborhood instead of
         exhaustively searching the neighborhood for the best solution).
 
+    rand_state : numpy.random.RandomState, optional
+        The random number generator used to shuffle the neighborhood when `shuffle`
+        is True.  If None, numpy's global random number generator is used.
+
     Returns
     -------
     list of numpy.array
@@ -62,13 +66,16 @@ def get_swap_neighbors(weights, forced_weights=None, shuffle=False):
         neighbors.append(neighbor)
 
     if shuffle:
-        random.shuffle(neighbors)
+        if rand_state is None:
+            rand_state = _np.random
+        rand_state.shuffle(neighbors)
 
     return neighbors
 
 
 def _grasp_construct_feasible_solution(elements, score_fn, rcl_fn, feasible_threshold=None,
-                                       feasible_fn=None, initial_elements=None):
+                                       feasible_fn=None, initial_elements=None, rand_state=None,
+                                       comm=None):
     """
     Constructs a subset of `elements` that represents a feasible solution.
 
@@ -118,6 +125,15 @@ def _grasp_construct_feasible_solution(elements, score_fn, rcl_fn, feasible_thre
         `elements` should be automatically included at the start of this
         construction.
 
+    rand_state : numpy.random.RandomState, optional
+        The random number generator used to choose elements from the reduced
+        candidate lists.  If None, numpy's global generator is used.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to divide the scoring of candidate
+        solutions among multiple processors.  All the processors must use
+        identically-seeded `rand_state` objects.
+
     Returns
     -------
     list
@@ -143,16 +159,22 @@ def _grasp_construct_feasible_solution(elements, score_fn, rcl_fn, feasible_thre
         raise ValueError('Must provide either feasible_fn or '
                          'feasible_threshold!')
 
+    if rand_state is None:
+        rand_state = _np.random
+
     feasible = False
 
     while _np.any(weights == 0) and not feasible:
         candidateIdxs = _np.where(weights == 0)[0]
         candidateSolns = [soln + [elements[idx]] for idx in candidateIdxs]
-        candidateScores = _np.array([score_fn(candidateSoln)
-                                     for candidateSoln in candidateSolns])
+        loc_iSolns, _, _ = _mpit.distribute_indices(list(range(len(candidateSolns))), comm, False)
+        candidateScores = [score_fn(candidateSolns[i]) for i in loc_iSolns]
+        if comm is not None and comm.Get_size() > 1:  # (loc_iSolns are contiguous)
+            candidateScores = list(itertools.chain.from_iterable(comm.allgather(candidateScores)))
+        candidateScores = _np.array(candidateScores)
         rclIdxs = rcl_fn(candidateScores)
         assert(len(rclIdxs) > 0), "Empty reduced candidate list!"
-        chosenIdx = _np.random.choice(rclIdxs)
+        chosenIdx = rand_state.choice(rclIdxs)
         soln = candidateSolns[chosenIdx]
         weights[candidateIdxs[chosenIdx]] = 1
         if feasibleTest == 'threshold':
@@ -267,7 +289,8 @@ def _grasp_local_search(initial_solution, score_fn, elements, get_neighbors_fn,
 
 def run_grasp_iteration(elements, greedy_score_fn, rcl_fn, local_score_fn,
                         get_neighbors_fn, feasible_threshold=None, feasible_fn=None,
-                        initial_elements=None, seed=None, verbosity=0):
+                        initial_elements=None, seed=None, verbosity=0, rand_state=None,
+                        comm=None):
     """
     Perform one iteration of GRASP (greedy construction and local search).
 
@@ -324,6 +347,15 @@ def run_grasp_iteration(elements, greedy_score_fn, rcl_fn, local_score_fn,
     verbosity : int
         Sets the level of logging messages the printer will display.
 
+    rand_state : numpy.random.RandomState, optional
+        The random number generator used by the greedy construction.  If
+        None, numpy's global generator is used.
+
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        When not None, a communicator used to divide the scoring of the greedy
+        construction's candidates among multiple processors.  All the processors
+        must use identically-seeded `rand_state` objects.
+
     Returns
     -------
     initialSoln : list
@@ -335,7 +367,7 @@ def run_grasp_iteration(elements, greedy_score_fn, rcl_fn, local_score_fn,
 
     initialSoln = _grasp_construct_feasible_solution(elements, greedy_score_fn, rcl_fn,
                                                      feasible_threshold, feasible_fn,
-                                                     initial_elements)
+                                                     initial_elements, rand_state, comm)
     printer.log('Initial construction:', 1)
     def to_str(x): return x.str if isinstance(x, _circuits.Circuit) else str(x)
     printer.log(str([to_str(element) for element in initialSoln]), 1)
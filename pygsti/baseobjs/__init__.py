@@ -18,4 +18,5 @@ from .label import Label, CircuitLabel
 from .outcomelabeldict import OutcomeLabelDict
 from .statespace import StateSpace, QubitSpace, ExplicitStateSpace
 from .resourceallocation import ResourceAllocation
+from .processcomm import ProcessComm
 from .qubitgraph import QubitGraph
@@ -0,0 +1,408 @@
+"""
+Defines the ProcessComm class, an MPI-communicator-like object built on `multiprocessing`.
+"""
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+
+import functools as _functools
+import multiprocessing as _mp
+import operator as _operator
+import os as _os
+import queue as _queue
+import traceback as _traceback
+
+import numpy as _np
+
+
+def _reduction_function(op):
+    """ Get a binary function that implements the MPI reduction operation `op` (default = sum) """
+    name = op if isinstance(op, str) else None
+    if name is None and op is not None:
+        try:
+            from mpi4py import MPI
+            names = [(MPI.SUM, 'sum'), (MPI.PROD, 'prod'), (MPI.MAX, 'max'), (MPI.MIN, 'min'),
+                     (MPI.LAND, 'land'), (MPI.LOR, 'lor')]  # (MPI.Op objects aren't hashable)
+            name = next((nm for mpi_op, nm in names if op == mpi_op), None)
+        except ImportError:
+            pass
+        if name is None:
+            raise ValueError("Unsupported reduction operation: %s" % str(op))
+
+    def _elementwise(array_fn, scalar_fn):
+        def fn(a, b):
+            if isinstance(a, _np.ndarray) or isinstance(b, _np.ndarray):
+                return array_fn(a, b)
+            return scalar_fn(a, b)
+        return fn
+
+    if name is None or name == 'sum': return _operator.add
+    if name == 'prod': return _operator.mul
+    if name == 'max': return _elementwise(_np.maximum, max)
+    if name == 'min': return _elementwise(_np.minimum, min)
+    if name == 'land': return _elementwise(_np.logical_and, lambda a, b: a and b)
+    if name == 'lor': return _elementwise(_np.logical_or, lambda a, b: a or b)
+    raise ValueError("Unsupported reduction operation: %s" % str(op))
+
+
+def _buffer_array(buf):
+    """ The numpy array of an mpi4py-style buffer specification (an array or a list beginning with one) """
+    return buf[0] if isinstance(buf, (list, tuple)) else buf
+
+
+class _ProcessCommWorld(object):
+    """
+    The per-process state shared by all the :class:`ProcessComm` objects of a process.
+
+    Holds the queues used to send messages to each process and the messages received by
+    this process that haven't been asked for yet.
+    """
+
+    def __init__(self, rank, inboxes):
+        self.rank = rank
+        self.inboxes = inboxes
+        self.pending = []  # received (key, payload) messages that haven't been matched yet
+
+    def send(self, dest, key, payload):
+        self.inboxes[dest].put((key, payload))
+
+    def recv(self, key):
+        for i, (k, payload) in enumerate(self.pending):
+            if k == key:
+                del self.pending[i]
+                return payload
+        while True:
+            k, payload = self.inboxes[self.rank].get()
+            if k == key: return payload
+            self.pending.append((k, payload))
+
+
+class _ProcessGroup(object):
+    """ A minimal stand-in for an MPI group: an ordered set of (parent communicator) ranks """
+
+    def __init__(self, ranks):
+        self.ranks = tuple(ranks)
+
+    @property
+    def size(self):
+        return len(self.ranks)
+
+    def Incl(self, ranks):  # noqa: N802
+        return _ProcessGroup([self.ranks[r] for r in ranks])
+
+
+class ProcessComm(object):
+    """
+    A communicator for processes on a single machine, started without MPI.
+
+    This object implements the subset of the `mpi4py.MPI.Comm` interface used by pyGSTi
+    (`bcast`, `gather`, `allgather`, `allreduce`, `scatter`, `barrier`, `Split`, the
+    buffer-based `Bcast`, `Allreduce`, `Gather(v)`, `Scatterv`, `Send` and `Recv`, etc.)
+    on top of `multiprocessing` queues, so that it can be given anywhere pyGSTi accepts
+    a `comm`.  The processes are started, and the communicators created, by
+    :method:`ProcessComm.run`, which plays the role of `mpiexec`.  Since all the processes
+    are on the same host, large arrays are shared between them using shared memory whenever
+    a :class:`ResourceAllocation` builds its host communicators (see
+    :method:`ResourceAllocation.build_hostcomms`).
+
+    Messages are pickled, so communication is slower than with a real MPI implementation;
+    this backend is best suited to computations, like the forward simulation of layout
+    atoms, that are dominated by local work.
+
+    Parameters
+    ----------
+    world : _ProcessCommWorld
+        The per-process messaging state.
+
+    ranks : tuple
+        The world ranks (process indices) that belong to this communicator, in the order
+        of their ranks within it.
+
+    context : tuple, optional
+        A value that uniquely identifies this communicator among those of the processes
+        in `ranks`, so messages sent within different communicators aren't confused.
+    """
+
+    @classmethod
+    def run(cls, fn, num_processes=None, args=(), kwargs=None, start_method=None):
+        """
+        Run `fn(comm, *args, **kwargs)` in `num_processes` processes, each given a :class:`ProcessComm`.
+
+        This is the analogue of launching a script with `mpiexec -n <num_processes>`, where
+        `comm` plays the role of `MPI.COMM_WORLD`.
+
+        Parameters
+        ----------
+        fn : function
+            The function to run.  Its first argument is the communicator.  When a start
+            method other than "fork" is used, `fn` and its arguments must be picklable.
+
+        num_processes : int, optional
+            The number of processes to use.  Defaults to the number of CPUs.
+
+        args : tuple, optional
+            Additional positional arguments to `fn`.
+
+        kwargs : dict, optional
+            Additional keyword arguments to `fn`.
+
+        start_method : str, optional
+            The `multiprocessing` start method ("fork", "spawn" or "forkserver").  If None,
+            the platform default is used.
+
+        Returns
+        -------
+        list
+            The return values of `fn` on each process, indexed by rank.
+        """
+        if num_processes is None: num_processes = _os.cpu_count() or 1
+        if kwargs is None: kwargs = {}
+        ctx = _mp.get_context(start_method)
+        inboxes = [ctx.Queue() for i in range(num_processes)]
+        results_queue = ctx.Queue()
+        processes = [ctx.Process(target=_run_process_comm_worker,
+                                 args=(fn, rank, inboxes, results_queue, args, kwargs), daemon=True)
+                     for rank in range(num_processes)]
+        for p in processes: p.start()
+
+        results = {}
+        try:
+            while len(results) < num_processes:
+                try:
+                    rank, ok, value = results_queue.get(timeout=1.0)
+                except _queue.Empty:
+                    dead = [rank for rank, p in enumerate(processes)
+                            if p.exitcode is not None and p.exitcode != 0 and rank not in results]
+                    if len(dead) > 0:
+                        raise RuntimeError("ProcessComm rank %d exited unexpectedly (exit code %d)"
+                                           % (dead[0], processes[dead[0]].exitcode))
+                    continue
+                if not ok:
+                    raise RuntimeError("ProcessComm rank %d raised an exception:\n%s" % (rank, value))
+                results[rank] = value
+        finally:
+            for p in processes:
+                if len(results) < num_processes and p.is_alive(): p.terminate()
+                p.join()
+        return [results[rank] for rank in range(num_processes)]
+
+    def __init__(self, world, ranks, context=()):
+        self._world = world
+        self._ranks = tuple(ranks)
+        self._context = context
+        self._num_collectives = 0
+        self._num_created_groups = {}
+        self.rank = self._ranks.index(world.rank)
+        self.size = len(self._ranks)
+        self.name = "ProcessComm"
+
+    def __getstate__(self):
+        raise TypeError("ProcessComm objects cannot be pickled")
+
+    def Get_rank(self):  # noqa: N802
+        """ The rank of this process within the communicator """
+        return self.rank
+
+    def Get_size(self):  # noqa: N802
+        """ The number of processes in the communicator """
+        return self.size
+
+    def Get_name(self):  # noqa: N802
+        """ The name of the communicator """
+        return self.name
+
+    def Set_name(self, name):  # noqa: N802
+        """ Set the name of the communicator """
+        self.name = name
+
+    @property
+    def group(self):
+        """ The group of processes in this communicator """
+        return _ProcessGroup(range(self.size))
+
+    def Get_group(self):  # noqa: N802
+        """ The group of processes in this communicator """
+        return self.group
+
+    def Free(self):  # noqa: N802
+        """ Free this communicator (a no-op) """
+        pass
+
+    # Point-to-point communication ---------------------------------------------------------------
+
+    def send(self, obj, dest, tag=0):
+        """ Send a (picklable) object to rank `dest` """
+        self._world.send(self._ranks[dest], (self._context, self._world.rank, ('p2p', tag)), obj)
+
+    def recv(self, buf=None, source=0, tag=0):
+        """ Receive an object from rank `source` """
+        return self._world.recv((self._context, self._ranks[source], ('p2p', tag)))
+
+    def Send(self, buf, dest, tag=0):  # noqa: N802
+        """ Send the contents of array `buf` to rank `dest` """
+        self.send(_np.array(_buffer_array(buf)), dest, tag)
+
+    def Recv(self, buf, source=0, tag=0):  # noqa: N802
+        """ Receive array data from rank `source` into array `buf` """
+        _buffer_array(buf)[...] = self.recv(None, source, tag)
+
+    # Collective communication -------------------------------------------------------------------
+
+    def _next_collective_tag(self):
+        self._num_collectives += 1
+        return ('coll', self._num_collectives)
+
+    def _key(self, source, tag):
+        return (self._context, self._ranks[source], tag)
+
+    def _bcast(self, obj, root, tag):
+        if self.rank == root:
+            for r in range(self.size):
+                if r != root: self._world.send(self._ranks[r], self._key(root, tag), obj)
+            return obj
+        return self._world.recv(self._key(root, tag))
+
+    def _gather(self, obj, root, tag):
+        if self.rank == root:
+            return [obj if (r == root) else self._world.recv(self._key(r, tag)) for r in range(self.size)]
+        self._world.send(self._ranks[root], self._key(self.rank, tag), obj)
+        return None
+
+    def bcast(self, obj, root=0):
+        """ Broadcast a (picklable) object from rank `root` to all ranks """
+        return self._bcast(obj, root, self._next_collective_tag())
+
+    def gather(self, sendobj, root=0):
+        """ Gather objects from all ranks into a list on rank `root` (other ranks get `None`) """
+        return self._gather(sendobj, root, self._next_collective_tag())
+
+    def allgather(self, sendobj):
+        """ Gather objects from all ranks into a list on every rank """
+        tag = self._next_collective_tag()
+        return self._bcast(self._gather(sendobj, 0, tag), 0, tag)
+
+    def scatter(self, sendobj, root=0):
+        """ Send the `i`-th element of `sendobj` on rank `root` to rank `i` """
+        tag = self._next_collective_tag()
+        if self.rank == root:
+            for r in range(self.size):
+                if r != root: self._world.send(self._ranks[r], self._key(root, tag), sendobj[r])
+            return sendobj[root]
+        return self._world.recv(self._key(root, tag))
+
+    def reduce(self, sendobj, op=None, root=0):
+        """ Reduce objects from all ranks using `op` (default = sum), with the result on rank `root` """
+        values = self._gather(sendobj, root, self._next_collective_tag())
+        return _functools.reduce(_reduction_function(op), values) if (self.rank == root) else None
+
+    def allreduce(self, sendobj, op=None):
+        """ Reduce objects from all ranks using `op` (default = sum), with the result on every rank """
+        tag = self._next_collective_tag()
+        values = self._gather(sendobj, 0, tag)
+        return self._bcast(_functools.reduce(_reduction_function(op), values) if (self.rank == 0) else None, 0, tag)
+
+    def barrier(self):
+        """ Wait until all ranks reach this point """
+        self.allgather(None)
+
+    Barrier = barrier
+
+    def Bcast(self, buf, root=0):  # noqa: N802
+        """ Broadcast the contents of array `buf` on rank `root` into `buf` on all ranks """
+        ar = _buffer_array(buf)
+        data = self.bcast(ar if (self.rank == root) else None, root)
+        if self.rank != root: ar[...] = data
+
+    def Allreduce(self, sendbuf, recvbuf, op=None):  # noqa: N802
+        """ Reduce array `sendbuf` over all ranks using `op` (default = sum), placing the result in `recvbuf` """
+        _buffer_array(recvbuf)[...] = self.allreduce(_np.array(_buffer_array(sendbuf)), op)
+
+    def Reduce(self, sendbuf, recvbuf, op=None, root=0):  # noqa: N802
+        """ Reduce array `sendbuf` over all ranks using `op` (default = sum), placing the result in `recvbuf` """
+        result = self.reduce(_np.array(_buffer_array(sendbuf)), op, root)
+        if self.rank == root: _buffer_array(recvbuf)[...] = result
+
+    def Gather(self, sendbuf, recvbuf, root=0):  # noqa: N802
+        """ Concatenate the (flattened) `sendbuf` arrays of all ranks into `recvbuf` on rank `root` """
+        self.Gatherv(sendbuf, recvbuf, root)
+
+    def Allgather(self, sendbuf, recvbuf):  # noqa: N802
+        """ Concatenate the (flattened) `sendbuf` arrays of all ranks into `recvbuf` on every rank """
+        data = self.allgather(_np.array(_buffer_array(sendbuf)).ravel())
+        _buffer_array(recvbuf).flat[:] = _np.concatenate(data)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0):  # noqa: N802
+        """
+        Gather the (flattened) `sendbuf` arrays of all ranks into `recvbuf` on rank `root`.
+
+        `recvbuf` may be an array, into which the data is concatenated, or a
+        `[array, counts, displacements, datatype]` list as for `mpi4py`.
+        """
+        data = self.gather(_np.array(_buffer_array(sendbuf)).ravel(), root)
+        if self.rank != root: return
+        ar = _buffer_array(recvbuf)
+        displacements = recvbuf[2] if (isinstance(recvbuf, (list, tuple)) and len(recvbuf) > 2) else None
+        if displacements is None:
+            ar.flat[:] = _np.concatenate(data)
+        else:
+            for d, displacement in zip(data, displacements):
+                ar.flat[displacement:displacement + len(d)] = d
+
+    def Scatterv(self, sendbuf, recvbuf, root=0):  # noqa: N802
+        """
+        Scatter segments of `sendbuf` on rank `root` into the `recvbuf` array of each rank.
+
+        `sendbuf` is a `[array, counts, displacements, datatype]` list as for `mpi4py`.
+        """
+        if self.rank == root:
+            ar, counts, displacements = sendbuf[0], sendbuf[1], sendbuf[2]
+            flat = _np.asarray(ar).ravel()
+            if displacements is None: displacements = _np.concatenate(([0], _np.cumsum(counts)[:-1]))
+            segments = [flat[d:d + c] for c, d in zip(counts, displacements)]
+        else:
+            segments = None
+        _buffer_array(recvbuf).flat[:] = self.scatter(segments, root)
+
+    def Split(self, color=0, key=0):  # noqa: N802
+        """
+        Divide this communicator into sub-communicators, one for each distinct `color`.
+
+        Within each new communicator, ranks are ordered by `key` (and then by their rank
+        in this communicator).  A `color` of `None` (or `MPI.UNDEFINED`) means that this
+        process doesn't belong to any new communicator, and `None` is returned.
+        """
+        tag = self._next_collective_tag()
+        colors_and_keys = self._bcast(self._gather((color, key), 0, tag), 0, tag)
+        if color is None or _is_mpi_undefined(color):
+            return None
+        members = sorted([r for r, (c, k) in enumerate(colors_and_keys) if c == color],
+                         key=lambda r: (colors_and_keys[r][1], r))
+        return ProcessComm(self._world, [self._ranks[r] for r in members], self._context + (tag, color))
+
+    def Create_group(self, group, tag=0):  # noqa: N802
+        """ Create a communicator from a group of this communicator's ranks (called only by its members) """
+        ranks = tuple(group.ranks)
+        count = self._num_created_groups.get((ranks, tag), 0)
+        self._num_created_groups[(ranks, tag)] = count + 1
+        return ProcessComm(self._world, [self._ranks[r] for r in ranks], self._context + (('group', tag, count),))
+
+
+def _is_mpi_undefined(color):
+    try:
+        from mpi4py import MPI
+        return color == MPI.UNDEFINED
+    except ImportError:
+        return False
+
+
+def _run_process_comm_worker(fn, rank, inboxes, results_queue, args, kwargs):
+    comm = ProcessComm(_ProcessCommWorld(rank, inboxes), range(len(inboxes)))
+    try:
+        results_queue.put((rank, True, fn(comm, *args, **kwargs)))
+    except Exception:
+        results_queue.put((rank, False, _traceback.format_exc()))
@@ -34,8 +34,10 @@ class ResourceAllocation(object):
 
     Parameters
     ----------
-    comm : mpi4py.MPI.Comm, optional
-        MPI communicator holding the number of available processors.
+    comm : mpi4py.MPI.Comm or ProcessComm, optional
+        MPI communicator holding the number of available processors.  A
+        :class:`ProcessComm` may be used instead to distribute computations
+        among the processes of a single machine without MPI.
 
     mem_limit : int, optional
         A rough per-processor memory limit in bytes.
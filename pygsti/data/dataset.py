@@ -14,6 +14,8 @@ import bisect as _bisect
 import copy as _copy
 import itertools as _itertools
 import numbers as _numbers
+import os as _os
+import pathlib as _pathlib
 import pickle as _pickle
 import uuid as _uuid
 import warnings as _warnings
@@ -889,7 +891,7 @@ class DataSet(object):
 
     file_to_load_from : string or file object
         Specify this argument and no others to create a static DataSet by loading
-        from a file (just like using the load(...) function).
+        from a file or columnar-format directory (just like using the load(...) function).
 
     collision_action : {"aggregate","overwrite","keepseparate"}
         Specifies how duplicate circuits should be handled.  "aggregate"
@@ -967,7 +969,7 @@ class DataSet(object):
 
         file_to_load_from : string or file object
             Specify this argument and no others to create a static DataSet by loading
-            from a file (just like using the load(...) function).
+            from a file or columnar-format directory (just like using the load(...) function).
 
         collision_action : {"aggregate","overwrite","keepseparate"}
             Specifies how duplicate circuits should be handled.  "aggregate"
@@ -2925,12 +2927,17 @@ class DataSet(object):
         Parameters
         ----------
         file_or_filename : str or buffer
-            The file or filename to load from.
+            The file or filename to load from.  If this is the name of a
+            directory, it is assumed to hold a columnar-format data set (see
+            :meth:`save_columnar`) which is loaded using memory-mapping.
 
         Returns
         -------
         None
         """
+        if isinstance(file_or_filename, (str, _pathlib.Path)) and _os.path.isdir(file_or_filename):
+            return self.load_columnar(file_or_filename)
+
         bOpen = isinstance(file_or_filename, str)
         if bOpen:
             if file_or_filename.endswith(".gz"):
@@ -3006,6 +3013,107 @@ class DataSet(object):
 
         if bOpen: f.close()
 
+    def save_columnar(self, dirname):
+        """
+        Save this DataSet to a directory using a columnar binary format.
+
+        The outcome-label-index, time, and repetition-count data are each stored
+        as a separate `.npy` file, along with an array of per-circuit offsets into
+        these arrays, so that the data can later be memory-mapped instead of read
+        into memory (see :meth:`load_columnar`).  The circuits, outcome labels and
+        other meta-data are pickled into an `index.pkl` file.
+
+        Parameters
+        ----------
+        dirname : str or Path
+            The directory to write.  It is created if it doesn't exist, and any
+            columnar data files already within it are overwritten.
+
+        Returns
+        -------
+        None
+        """
+        dirname = _pathlib.Path(dirname)
+        dirname.mkdir(parents=True, exist_ok=True)
+
+        rows = list(self.cirIndex.values())  # slices (static case) or list indices (non-static case)
+        offsets = _np.zeros(len(rows) + 1, _np.int64)
+        offsets[1:] = _np.cumsum([len(self.oliData[i]) for i in rows], dtype=_np.int64)
+
+        def column(data):
+            if self.bStatic and all([(slc.start == start and slc.stop == stop) for slc, start, stop
+                                     in zip(rows, offsets[:-1], offsets[1:])]) and len(data) == offsets[-1]:
+                return data  # rows already tile `data` in order, so it can be written as-is
+            return _np.concatenate([data[i] for i in rows]) if len(rows) > 0 else data[0:0]
+
+        _np.save(dirname / 'oli.npy', _np.asarray(column(self.oliData), self.oliType))
+        _np.save(dirname / 'time.npy', _np.asarray(column(self.timeData), self.timeType))
+        if self.repData is not None:
+            _np.save(dirname / 'rep.npy', _np.asarray(column(self.repData), self.repType))
+        _np.save(dirname / 'offsets.npy', offsets)
+
+        toPickle = {'cirIndexKeys': list(map(_cir.CompressedCircuit, self.cirIndex.keys())),
+                    'olIndex': self.olIndex,
+                    'olIndex_max': self.olIndex_max,
+                    'ol': self.ol,
+                    'oliType': _np.dtype(self.oliType).str,
+                    'timeType': _np.dtype(self.timeType).str,
+                    'repType': _np.dtype(self.repType).str,
+                    'useReps': bool(self.repData is not None),
+                    'collisionAction': self.collisionAction,
+                    'uuid': self.uuid,
+                    'auxInfo': self.auxInfo,
+                    'comment': self.comment}
+        with open(dirname / 'index.pkl', 'wb') as f:
+            _pickle.dump(toPickle, f)
+
+    def load_columnar(self, dirname, memory_map=True):
+        """
+        Load a DataSet saved using :meth:`save_columnar`, clearing any data is contained previously.
+
+        The loaded DataSet is always static.  When `memory_map` is True the data
+        arrays are memory-mapped read-only rather than read into memory, so that
+        each row's data is only read from disk when it is accessed.
+
+        Parameters
+        ----------
+        dirname : str or Path
+            The directory to load from.
+
+        memory_map : bool, optional
+            Whether the data arrays are memory-mapped (`True`) or read into memory.
+
+        Returns
+        -------
+        None
+        """
+        dirname = _pathlib.Path(dirname)
+        with open(dirname / 'index.pkl', 'rb') as f:
+            with _compat.patched_uuid():
+                state_dict = _pickle.load(f)
+
+        offsets = _np.load(dirname / 'offsets.npy')
+        cirIndexKeys = [cgstr.expand() for cgstr in state_dict['cirIndexKeys']]
+        self.cirIndex = _OrderedDict([(opstr, slice(int(start), int(stop))) for opstr, start, stop
+                                      in zip(cirIndexKeys, offsets[:-1], offsets[1:])])
+        self.olIndex = state_dict['olIndex']
+        self.olIndex_max = state_dict['olIndex_max']
+        self.ol = state_dict['ol']
+        self.bStatic = True
+        self.oliType = _np.dtype(state_dict['oliType'])
+        self.timeType = _np.dtype(state_dict['timeType'])
+        self.repType = _np.dtype(state_dict['repType'])
+        self.collisionAction = state_dict['collisionAction']
+        self.uuid = state_dict['uuid'] if (state_dict['uuid'] is not None) else _uuid.uuid4()
+        self.auxInfo = state_dict['auxInfo']
+        self.comment = state_dict['comment']
+
+        mmap_mode = 'r' if memory_map else None
+        self.oliData = _np.load(dirname / 'oli.npy', mmap_mode=mmap_mode)
+        self.timeData = _np.load(dirname / 'time.npy', mmap_mode=mmap_mode)
+        self.repData = _np.load(dirname / 'rep.npy', mmap_mode=mmap_mode) if state_dict['useReps'] else None
+        self.cnt_cache = {opstr: _ld.OutcomeLabelDict() for opstr in self.cirIndex}  # init cnt_cache afresh
+
     def rename_outcome_labels(self, old_to_new_dict):
         """
         Replaces existing output labels with new ones as per `old_to_new_dict`.
@@ -12,6 +12,7 @@ Functions for creating data
 
 import collections as _collections
 import itertools as _itertools
+import uuid as _uuid
 import warnings as _warnings
 
 import numpy as _np
@@ -20,12 +21,14 @@ import numpy.random as _rndm
 from pygsti.circuits import circuitconstruction as _gstrc
 from pygsti.data import dataset as _ds
 from pygsti.baseobjs import label as _lbl, outcomelabeldict as _ld
+from pygsti.baseobjs.resourceallocation import ResourceAllocation as _ResourceAllocation
+from pygsti.tools import slicetools as _slct
 
 
 def simulate_data(model_or_dataset, circuit_list, num_samples,
                   sample_error="multinomial", seed=None, rand_state=None,
                   alias_dict=None, collision_action="aggregate",
-                  record_zero_counts=True, comm=None, mem_limit=None, times=None):
+                  record_zero_counts=True, comm=None, mem_limit=None, times=None, vectorized=False):
     """
     Creates a DataSet using the probabilities obtained from a model.
 
@@ -109,6 +112,15 @@ def simulate_data(model_or_dataset, circuit_list, num_samples,
         each circuit in `circuit_list` will be evaluated with the given time
         value as its *start time*.
 
+    vectorized : bool, optional
+        When `True` and `model_or_dataset` is a model, the counts for all the
+        circuits are sampled in bulk from the flat probability array of a
+        :class:`CircuitOutcomeProbabilityArrayLayout` and written directly into
+        the arrays of a static :class:`DataSet`, rather than circuit-by-circuit.
+        The resulting data set is identical to the one obtained when `vectorized`
+        is `False` (for the same `seed` or `rand_state`).  If `circuit_list` contains
+        duplicate circuits, the non-vectorized code path is used.
+
     Returns
     -------
     DataSet
@@ -135,17 +147,47 @@ def simulate_data(model_or_dataset, circuit_list, num_samples,
     if isinstance(circuit_list, _ExperimentDesign):
         circuit_list = circuit_list.all_circuits_needing_data
 
+    if gsGen and vectorized:
+        # the vectorized path writes each circuit's data exactly once, so duplicates must be handled separately
+        dataset_circuits = [dataset._collisionaction_update_circuit(s) for s in circuit_list]
+        if len(set(dataset_circuits)) < len(dataset_circuits): vectorized = False
+    else:
+        vectorized = False
+
     if gsGen and times is None:
         if alias_dict is not None:
             trans_circuit_list = [_gstrc.translate_circuit(s, alias_dict)
                                   for s in circuit_list]
         else:
             trans_circuit_list = circuit_list
-        all_probs = gsGen.bulk_probabilities(trans_circuit_list, comm=comm, mem_limit=mem_limit)
+        if vectorized:
+            layout = gsGen.sim.create_layout(trans_circuit_list, array_types=('e',),
+                                             resource_alloc=_ResourceAllocation(comm, mem_limit))
+            local_probs = layout.allocate_local_array('e', 'd')
+            gsGen.sim.bulk_fill_probs(local_probs, layout)
+            all_probs = layout.gather_local_array('e', local_probs)  # only non-None on root processor
+            layout.free_local_array(local_probs)
+        else:
+            all_probs = gsGen.bulk_probabilities(trans_circuit_list, comm=comm, mem_limit=mem_limit)
     else:
         trans_circuit_list = circuit_list
-
-    if comm is None or comm.Get_rank() == 0:  # only root rank computes
+        if gsGen:  # compute the probabilities of all the circuits at all the times in bulk
+            layout = gsGen.sim.create_layout(trans_circuit_list, array_types=('e',),
+                                             resource_alloc=_ResourceAllocation(comm, mem_limit))
+            local_probs = _np.empty((len(times), layout.num_elements), 'd')
+            gsGen.sim.bulk_fill_probs_at_times(local_probs, layout, times)
+            all_probs = [layout.gather_local_array('e', local_probs_at_t)  # only non-None on root processor
+                         for local_probs_at_t in local_probs]
+
+    if vectorized:
+        if comm is None or comm.Get_rank() == 0:  # only root rank samples
+            rndm = _rndm.RandomState(seed) \
+                if (sample_error in ("binomial", "multinomial") and rand_state is None) else rand_state
+            dataset = _simulate_data_vectorized(layout.global_layout, dataset_circuits, all_probs, num_samples,
+                                                sample_error, rndm, times, collision_action,
+                                                record_zero_counts, TOL)
+
+    elif comm is None or comm.Get_rank() == 0:  # only root rank computes
 
         if sample_error in ("binomial", "multinomial") and rand_state is None:
             rndm = _rndm.RandomState(seed)  # ok if seed is None
@@ -155,20 +197,18 @@ def simulate_data(model_or_dataset, circuit_list, num_samples,
         circuit_times = times if times is not None else ["N/A dummy"]
         count_lists = _collections.OrderedDict()
 
-        for tm in circuit_times:
+        for i, tm in enumerate(circuit_times):
             #print("Time ", tm)
 
-            #It would be nice to be able to do something like this (time dependent calc for all probs at ptic time)
-            #if gsGen and times is not None:
-            #    all_probs = gsGen.bulk_probabilities(trans_circuit_list, comm=comm, mem_limit=mem_limit, time=tm)
-
             for k, (s, trans_s) in enumerate(zip(circuit_list, trans_circuit_list)):
 
                 if gsGen:
                     if times is None:
                         ps = all_probs[trans_s]
                     else:
-                        ps = gsGen.probabilities(trans_s, time=tm)
+                        elindices, outcomes = layout.global_layout.indices_and_outcomes_for_index(k)
+                        ps = _ld.OutcomeLabelDict([(ol, all_probs[i][ei]) for ei, ol
+                                                   in zip(_slct.to_array(elindices), outcomes)])
 
                     if sample_error in ("binomial", "multinomial"):
                         _adjust_probabilities_inbounds(ps, TOL)
@@ -279,6 +319,193 @@ def _sample_distribution(ps, sample_error, nSamples, rndm_state):
     return counts
 
 
+def _simulate_data_vectorized(layout, dataset_circuits, probs, num_samples, sample_error, rndm_state,
+                              times, collision_action, record_zero_counts, tol):
+    """
+    Samples counts for all the circuits of `layout` at once and builds a static DataSet directly.
+
+    This is the bulk analogue of the per-circuit loop in :function:`simulate_data`.  The
+    circuit outcome probabilities of all the circuits (at a single time) are held in one flat
+    array, indexed by `layout`, and the sampled counts are written straight into the
+    (concatenated) outcome-index, time and repetition arrays of the returned data set.  The
+    random draws are made in the same order as in the per-circuit loop, so that both code paths
+    produce the same data set for the same random state.
+
+    Parameters
+    ----------
+    layout : CircuitOutcomeProbabilityArrayLayout
+        A (global) layout for the translated circuit list, whose i-th circuit corresponds
+        to `dataset_circuits[i]`.
+
+    dataset_circuits : list
+        The (unique) circuits that label the rows of the returned data set.
+
+    probs : numpy.ndarray or list
+        The circuit outcome probabilities, indexed by `layout`.  When `times` is not None,
+        a list of such arrays, one per time.
+
+    num_samples : int or list of ints
+        The number of samples for all or each of the circuits.
+
+    sample_error : str
+        The type of sample error, as in :function:`simulate_data`.
+
+    rndm_state : numpy.random.RandomState
+        The random state used to draw binomial or multinomial samples.
+
+    times : iterable or None
+        The time stamps at which to sample data, if any.
+
+    collision_action : {"aggregate", "keepseparate", "overwrite"}
+        The collision action of the returned data set.
+
+    record_zero_counts : bool
+        Whether zero-counts are stored in the returned data set.
+
+    tol : float
+        The tolerance used when clipping and normalizing probabilities.
+
+    Returns
+    -------
+    DataSet
+    """
+    nCircuits = len(dataset_circuits)
+
+    # Gather the element indices & outcomes of each circuit.  Circuits are grouped by their (tuple of)
+    # outcome labels, which are usually the same for most circuits, so per-outcome work is done only once.
+    outcome_group_indices = _collections.OrderedDict()
+    group_of_circuit = _np.empty(nCircuits, _np.int64)
+    lengths = _np.empty(nCircuits, _np.int64)
+    element_indices = []
+    for i in range(nCircuits):
+        elindices, outcomes = layout.indices_and_outcomes_for_index(i)
+        group_of_circuit[i] = outcome_group_indices.setdefault(outcomes, len(outcome_group_indices))
+        lengths[i] = len(outcomes)
+        element_indices.append(elindices)
+    if all([isinstance(sl, slice) and sl.step in (None, 1) for sl in element_indices]):
+        starts = _np.array([sl.start for sl in element_indices], _np.int64)
+        element_indices = None  # flag that the fast slice-based indexing can be used below
+    offsets = _np.concatenate(([0], _np.cumsum(lengths)))
+    nElements = offsets[-1]
+    circuit_of_element = _np.repeat(_np.arange(nCircuits), lengths)
+    index_within_circuit = _np.arange(nElements) - offsets[circuit_of_element]
+    flat_indices = starts[circuit_of_element] + index_within_circuit if (element_indices is None) \
+        else _np.concatenate([_slct.to_array(elinds) for elinds in element_indices])
+
+    # DataSet rows hold each circuit's outcomes in sorted order, and outcome label indices are assigned in
+    # the order outcomes are first encountered (what `DataSet.add_count_dict` does).
+    outcome_label_indices = _collections.OrderedDict()
+    for outcomes in outcome_group_indices:
+        for ol in sorted(outcomes):
+            if ol not in outcome_label_indices: outcome_label_indices[ol] = len(outcome_label_indices)
+    sort_rank = {ol: i for i, ol in enumerate(sorted(outcome_label_indices.keys()))}
+    max_length = lengths.max() if (nCircuits > 0) else 0
+    group_olis = _np.zeros((len(outcome_group_indices), max_length), _np.int64)
+    group_ranks = _np.zeros((len(outcome_group_indices), max_length), _np.int64)
+    for outcomes, g in outcome_group_indices.items():
+        group_olis[g, 0:len(outcomes)] = [outcome_label_indices[ol] for ol in outcomes]
+        group_ranks[g, 0:len(outcomes)] = [sort_rank[ol] for ol in outcomes]
+    element_olis = group_olis[group_of_circuit[circuit_of_element], index_within_circuit]
+    label_order = _np.lexsort((group_ranks[group_of_circuit[circuit_of_element], index_within_circuit],
+                               circuit_of_element))
+
+    try:
+        circuit_nsamples = list(num_samples)  # try to treat num_samples as a list
+    except TypeError:
+        circuit_nsamples = [num_samples] * nCircuits  # if not iterable, num_samples should be a single number
+    assert(len(circuit_nsamples) == nCircuits), "Length of `num_samples` must equal the number of circuits!"
+
+    circuit_times = times if times is not None else [0]
+    probs_at_times = probs if times is not None else [probs]
+    counts = []
+    for probs_at_t in probs_at_times:
+        ps = probs_at_t[flat_indices]  # a copy, ordered by circuit
+        counts.append(_sample_distributions(ps, offsets, circuit_of_element, sample_error,
+                                            circuit_nsamples, rndm_state, tol)[label_order])
+
+    #Build the static data set arrays: each circuit's data holds its time steps in order, and
+    # the outcomes of each time step in sorted order.
+    nTimes = len(circuit_times)
+    dest = nTimes * offsets[circuit_of_element] + index_within_circuit
+    oli_data = _np.empty(nTimes * nElements, _ds.Oindex_type)
+    time_data = _np.empty(nTimes * nElements, _ds.Time_type)
+    rep_data = _np.empty(nTimes * nElements, _ds.Repcount_type)
+    for i, (tm, time_counts) in enumerate(zip(circuit_times, counts)):
+        dest_t = dest + i * lengths[circuit_of_element]
+        oli_data[dest_t] = element_olis[label_order]
+        time_data[dest_t] = tm
+        rep_data[dest_t] = time_counts
+
+    row_lengths = nTimes * lengths
+    if not record_zero_counts:
+        mask = rep_data != 0  # (note: == float comparison *is* desired)
+        row_lengths = _np.bincount(_np.repeat(_np.arange(nCircuits), row_lengths)[mask], minlength=nCircuits)
+        oli_data, time_data, rep_data = oli_data[mask], time_data[mask], rep_data[mask]
+    row_offsets = _np.concatenate(([0], _np.cumsum(row_lengths))).tolist()
+    circuit_indices = _collections.OrderedDict([(c, slice(row_offsets[i], row_offsets[i + 1]))
+                                                for i, c in enumerate(dataset_circuits)])
+
+    dataset = _ds.DataSet(oli_data, time_data, rep_data, circuit_indices=circuit_indices,
+                          outcome_label_indices=outcome_label_indices, static=True,
+                          collision_action=collision_action)
+    dataset.uuid = _uuid.uuid4()  # as set by `done_adding_data`
+    return dataset
+
+
+def _sample_distributions(ps, offsets, circuit_of_element, sample_error, circuit_nsamples, rndm_state, tol):
+    """
+    The vectorized version of :function:`_sample_distribution` for many circuits.
+
+    `ps` is a flat array of probabilities, where the outcomes of the i-th circuit
+    are given by `ps[offsets[i]:offsets[i+1]]`.  The returned counts are ordered as `ps`.
+    """
+    nCircuits = len(offsets) - 1
+    nsamples = _np.array(circuit_nsamples)
+    if sample_error in ("binomial", "multinomial"):
+        #Analogous to _adjust_probabilities_inbounds and _adjust_unit_sum
+        if _np.any(ps < -tol): _warnings.warn("Clipping probs < 0 to 0")
+        if _np.any(ps > (1 + tol)): _warnings.warn("Clipping probs > 1 to 1")
+        _np.clip(ps, 0.0, 1.0, out=ps)
+
+        psums = _np.add.reduceat(ps, offsets[:-1]) if (nCircuits > 0) else _np.empty(0, 'd')
+        to_adjust = _np.logical_or(psums > 1.0 + tol, psums < 1.0 - tol)
+        if _np.any(to_adjust):
+            _warnings.warn("Adjusting sum(probs) to 1 for %d circuits" % _np.count_nonzero(to_adjust))
+            ps /= _np.where(to_adjust, psums, 1.0)[circuit_of_element]
+            _warnings.warn('Adjustment finished')
+
+        #Outcomes of each circuit are sampled in order of increasing probability (a stable sort, as in
+        # _sample_distribution), and the draws are made circuit-by-circuit to consume the random state
+        # in the same order as the non-vectorized code.
+        by_prob = _np.lexsort((ps, circuit_of_element))
+        counts = _np.empty(len(ps), 'd')
+
+        if sample_error == "binomial":
+            lengths = offsets[1:] - offsets[:-1]
+            assert(_np.all(lengths <= 2)), "Binomial sampling requires at most two outcomes per circuit!"
+            single = offsets[:-1][lengths == 1]  # Special case when a circuit's only outcome has 100% prob
+            counts[by_prob[single]] = nsamples[lengths == 1]
+            first = by_prob[offsets[:-1][lengths == 2]]; second = by_prob[offsets[:-1][lengths == 2] + 1]
+            counts[first] = rndm_state.binomial(nsamples[lengths == 2], ps[first])
+            counts[second] = nsamples[lengths == 2] - counts[first]
+        else:  # "multinomial"
+            for i, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+                inds = by_prob[start:end]
+                counts[inds] = rndm_state.multinomial(circuit_nsamples[i], ps[inds], size=1)[0]
+
+    elif sample_error == "none":
+        counts = nsamples[circuit_of_element] * ps
+    elif sample_error == "clip":
+        counts = nsamples[circuit_of_element] * _np.clip(ps, 0, 1)
+    elif sample_error == "round":
+        counts = _np.round(nsamples[circuit_of_element] * _np.clip(ps, 0, 1))
+    else:
+        raise ValueError(
+            "Invalid sample error parameter: '%s'  "
+            "Valid options are 'none', 'round', 'binomial', or 'multinomial'" % sample_error)
+    return counts
+
+
 def aggregate_dataset_outcomes(dataset, label_merge_dict, record_zero_counts=True):
     """
     Creates a DataSet which merges certain outcomes in input DataSet.
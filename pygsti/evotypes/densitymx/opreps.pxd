@@ -28,7 +28,7 @@ ctypedef long long INT
 ctypedef unsigned long long UINT
 
 
-cdef extern from "opcreps.h" namespace "CReps_densitymx":
+cdef extern from "opcreps.h" namespace "CReps_densitymx" nogil:
     cdef cppclass OpCRep:
         OpCRep(INT) except +
         StateCRep* acton(StateCRep*, StateCRep*)
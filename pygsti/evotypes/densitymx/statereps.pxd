@@ -15,7 +15,7 @@ from .. cimport basereps_cython as _basereps_cython
 ctypedef long long INT
 ctypedef unsigned long long UINT
 
-cdef extern from "statecreps.h" namespace "CReps_densitymx":
+cdef extern from "statecreps.h" namespace "CReps_densitymx" nogil:
 
     cdef cppclass StateCRep:
         StateCRep() except +
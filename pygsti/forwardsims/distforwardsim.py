@@ -10,6 +10,7 @@ Defines the DistributableForwardSimulator calculator class
 # http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
 #***************************************************************************************************
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti.forwardsims.forwardsim import ForwardSimulator as _ForwardSimulator
 from pygsti.tools import mpitools as _mpit
@@ -57,6 +58,12 @@ class DistributableForwardSimulator(_ForwardSimulator):
         this can be a 0-, 1- or 2-tuple of integers or `None` values.  A block size of `None`
         means that there should be no division into blocks, and that each block processor
         computes all of its parameter indices at once.
+
+    layout_cache_dir : str or Path, optional
+        If not None, a directory where the processor-independent parts of created layouts
+        (circuit splittings and atoms) are persistently cached, keyed by a digest of the circuits,
+        model structure and observed outcomes.  Repeated analyses of the same circuits, e.g. on
+        new data with the same outcomes, then reuse these rather than rebuilding them.
     """
 
     @classmethod
@@ -68,13 +75,22 @@ class DistributableForwardSimulator(_ForwardSimulator):
             return cls._array_types_for_method('_bulk_fill_probs_block') \
                 + cls._array_types_for_method('_bulk_fill_dprobs_block') \
                 + cls._array_types_for_method('_bulk_fill_hprobs_block')
+        if method_name in ('bulk_fill_dprobs_dot', 'bulk_fill_dprobs_transpose_dot'):
+            # Note: doesn't include the (atom, parameter-block)-shaped derivative blocks, since layouts for these
+            # methods needn't have a parameter dimension.
+            return ('a',) + cls._array_types_for_method('_bulk_fill_probs_block')
+        if method_name == 'iter_dprobs_by_element_blocks':  # only a single atom's rows are held at once
+            return ('aP',) + cls._array_types_for_method('_bulk_fill_dprobs_block')
+        if method_name == 'bulk_dprobs_sparse':  # dense blocks have a single atom's rows
+            return ('aP',) + cls._array_types_for_method('_bulk_fill_dprobs_block')
         return super()._array_types_for_method(method_name)
 
-    def __init__(self, model=None, num_atoms=None, processor_grid=None, param_blk_sizes=None):
+    def __init__(self, model=None, num_atoms=None, processor_grid=None, param_blk_sizes=None, layout_cache_dir=None):
         super().__init__(model)
         self._num_atoms = num_atoms
         self._processor_grid = processor_grid
         self._pblk_sizes = param_blk_sizes
+        self._layout_cache_dir = layout_cache_dir
         self._default_distribute_method = "circuits"
 
     def _set_param_block_size(self, wrt_filter, wrt_block_size, comm):
@@ -127,8 +143,8 @@ class DistributableForwardSimulator(_ForwardSimulator):
 
             if blkSize is None:  # avoid unnecessary slice_up_range and block loop logic in 'else' block
                 #Compute all of our derivative columns at once
-                self._bulk_fill_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice, atom,
-                                            global_param_slice, param_resource_alloc)
+                self._bulk_fill_dependent_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice,
+                                                      layout, atom, global_param_slice, param_resource_alloc)
 
             else:  # Divide columns into blocks of at most blkSize
                 Np = _slct.length(global_param_slice)  # total number of parameters we're computing
@@ -138,8 +154,8 @@ class DistributableForwardSimulator(_ForwardSimulator):
                 for block in blocks:
                     host_param_slice_part = block  # _slct.shift(block, host_param_slice.start)  # into host's memory
                     global_param_slice_part = _slct.shift(block, global_param_slice.start)  # actual parameter indices
-                    self._bulk_fill_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice_part, atom,
-                                                global_param_slice_part, param_resource_alloc)
+                    self._bulk_fill_dependent_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice_part,
+                                                          layout, atom, global_param_slice_part, param_resource_alloc)
 
         atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
 
@@ -149,6 +165,153 @@ class DistributableForwardSimulator(_ForwardSimulator):
         self._bulk_fill_dprobs_block(array_to_fill, dest_param_slice,
                                      layout_atom.as_layout(resource_alloc), param_slice)
 
+    def _bulk_fill_dependent_dprobs_atom(self, array_to_fill, dest_param_slice, layout, layout_atom, param_slice,
+                                         resource_alloc):
+        """
+        Like :method:`_bulk_fill_dprobs_atom`, but skips parameters that none of the atom's circuits depend upon.
+
+        The derivatives are only computed for the smallest range of parameters within `param_slice` that
+        contains all the parameters the atom's circuits depend upon, as given by the layout's parameter
+        dependency index (see the layout's `param_dependency_index` method).  The derivatives with respect
+        to the parameters outside of this range are zero.
+        """
+        if param_slice is None: param_slice = slice(0, self.model.num_params)
+        if dest_param_slice is None: dest_param_slice = slice(0, _slct.length(param_slice))
+
+        def is_range(s):
+            return isinstance(s, slice) and s.step in (None, 1) and None not in (s.start, s.stop)
+
+        if not (is_range(param_slice) and is_range(dest_param_slice)):
+            return self._bulk_fill_dprobs_atom(array_to_fill, dest_param_slice, layout_atom, param_slice,
+                                               resource_alloc)
+
+        atom_params = layout.param_dependency_index(self.model).param_indices_for_elements(layout_atom.element_slice)
+        i0, i1 = _np.searchsorted(atom_params, [param_slice.start, param_slice.stop])
+        start, stop = (atom_params[i0], atom_params[i1 - 1] + 1) if (i1 > i0) else (param_slice.stop,) * 2
+        dest_offset = dest_param_slice.start - param_slice.start  # converts parameter indices to dest indices
+
+        if resource_alloc.is_host_leader:  # only leaders write to shared memory (see _bulk_fill_dprobs_atom)
+            array_to_fill[:, dest_param_slice.start:start + dest_offset] = 0.0
+            array_to_fill[:, stop + dest_offset:dest_param_slice.stop] = 0.0
+        if start < stop:
+            self._bulk_fill_dprobs_atom(array_to_fill, slice(start + dest_offset, stop + dest_offset), layout_atom,
+                                        slice(start, stop), resource_alloc)
+
+    def _bulk_fill_dprobs_param_blocks(self, array_to_fill, layout, param_slices, pr_array_to_fill):
+        """Note: like `_bulk_fill_dprobs`, `array_to_fill` holds only the columns of `layout.global_param_slice`"""
+        blkSize = layout.param_dimension_blk_sizes[0]
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param_resource_alloc = layout.resource_alloc('param-processing')
+        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
+
+        # restrict the requested parameter blocks to the parameters this processor computes
+        global_param_slice = layout.global_param_slice
+        global_param_slice_parts = []
+        for param_slice in param_slices:
+            start = max(param_slice.start, global_param_slice.start)
+            stop = min(param_slice.stop, global_param_slice.stop)
+            if start >= stop: continue
+            nBlks = 1 if (blkSize is None) else int(_np.ceil((stop - start) / blkSize))
+            global_param_slice_parts.extend([_slct.shift(block, start)
+                                             for block in _mpit.slice_up_range(stop - start, nBlks)])
+
+        for atom in layout.atoms:
+            if pr_array_to_fill is not None:
+                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+
+            for global_param_slice_part in global_param_slice_parts:
+                host_param_slice_part = _slct.shift(global_param_slice_part, -global_param_slice.start)
+                self._bulk_fill_dependent_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice_part,
+                                                      layout, atom, global_param_slice_part, param_resource_alloc)
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
+    def _bulk_fill_dprobs_dot(self, array_to_fill, layout, vec, pr_array_to_fill):
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
+
+        for atom in layout.atoms:
+            if pr_array_to_fill is not None:
+                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+            self._bulk_fill_dprobs_dot_atom(array_to_fill[atom.element_slice], atom, vec, atom_resource_alloc)
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
+    def _bulk_fill_dprobs_dot_atom(self, array_to_fill, layout_atom, vec, resource_alloc):
+        # Default: compute the atom's derivative columns one parameter block at a time (see _iter_atom_dprobs_blocks)
+        # so that only an (atom-elements, block-size) portion of the jacobian is ever held in memory.
+        result = _np.zeros(layout_atom.num_elements, 'd')
+        for param_slice, dprobs_blk in self._iter_atom_dprobs_blocks(layout_atom, resource_alloc):
+            result += _np.dot(dprobs_blk, vec[param_slice])
+        if resource_alloc.is_host_leader:
+            array_to_fill[:] = result
+
+    def _bulk_fill_dprobs_transpose_dot(self, array_to_fill, layout, vec):
+        array_to_fill[:] = 0.0
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        for atom in layout.atoms:
+            self._bulk_fill_dprobs_transpose_dot_atom(array_to_fill, atom, vec[atom.element_slice],
+                                                      atom_resource_alloc)
+
+    def _bulk_fill_dprobs_transpose_dot_atom(self, array_to_fill, layout_atom, vec, resource_alloc):
+        # Adds (rather than sets) this atom's contribution to `array_to_fill`
+        for param_slice, dprobs_blk in self._iter_atom_dprobs_blocks(layout_atom, resource_alloc):
+            if resource_alloc.is_host_leader:  # only leaders' blocks are computed (see _bulk_fill_dprobs_atom)
+                array_to_fill[param_slice] += _np.dot(vec, dprobs_blk)
+
+    def _iter_atom_dprobs_blocks(self, layout_atom, resource_alloc, blk_size=None):
+        """
+        Iterates over `(param_slice, dprobs_block)` pairs, where `dprobs_block` holds the derivatives of the
+        probabilities of `layout_atom` with respect to the model parameters in `param_slice`.
+
+        Blocks contain at most `blk_size` parameters.  When `blk_size` is None, the size of the blocks is
+        taken from the parameter block size of the forward simulator (and is all of the parameters if this
+        is None too).
+        """
+        Np = self.model.num_params
+        if blk_size is None: blk_size = self._pblk_sizes[0] if self._pblk_sizes else None
+        nBlks = 1 if (blk_size is None) else int(_np.ceil(Np / blk_size))
+        for param_slice in _mpit.slice_up_range(Np, nBlks):
+            dprobs_blk = _np.zeros((layout_atom.num_elements, _slct.length(param_slice)), 'd')
+            self._bulk_fill_dprobs_atom(dprobs_blk, slice(0, _slct.length(param_slice)), layout_atom,
+                                        param_slice, resource_alloc)
+            yield param_slice, dprobs_blk
+
+    def iter_dprobs_by_element_blocks(self, layout, blk_size=None):
+        # Compute the jacobian rows one atom at a time, so that at most a single atom's rows are held in memory
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        Np = self.model.num_params
+        blkSize = self._pblk_sizes[0] if self._pblk_sizes else None
+        nBlks = 1 if (blkSize is None) else int(_np.ceil(Np / blkSize))
+        param_blocks = _mpit.slice_up_range(Np, nBlks)
+
+        for atom in layout.atoms:
+            atom_dprobs = _np.zeros((atom.num_elements, Np), 'd')
+            for param_slice in param_blocks:
+                self._bulk_fill_dependent_dprobs_atom(atom_dprobs, param_slice, layout, atom, param_slice,
+                                                      atom_resource_alloc)
+            yield from self._iter_row_blocks(atom_dprobs, atom.element_slice.start, blk_size)
+            atom_dprobs = None  # free this atom's rows before computing the next atom's
+
+    def _bulk_dprobs_sparse(self, layout, pr_array_to_fill, blk_size):
+        # Compute the structurally non-zero derivatives one atom (and parameter block) at a time
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param_resource_alloc = layout.resource_alloc('param-processing')
+        if blk_size is None and self._pblk_sizes: blk_size = self._pblk_sizes[0]
+        indptr, indices = layout.param_dependency_index(self.model).element_sparsity_pattern()
+        data = _np.zeros(len(indices), 'd')
+
+        for atom in layout.atoms:
+            if pr_array_to_fill is not None:
+                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+
+            def fill_dprobs_block(array_to_fill, param_slice):
+                self._bulk_fill_dependent_dprobs_atom(array_to_fill, slice(0, _slct.length(param_slice)), layout,
+                                                      atom, param_slice, param_resource_alloc)
+            self._fill_sparse_dprobs_data(data, indptr, indices, atom.element_slice, fill_dprobs_block, blk_size)
+
+        return _sps.csr_matrix((data, indices, indptr), shape=(len(layout), self.model.num_params))
+
     def _bulk_fill_hprobs(self, array_to_fill, layout,
                           pr_array_to_fill, deriv1_array_to_fill, deriv2_array_to_fill):
         """Note: we expect that array_to_fill points to the memory specifically for this processor
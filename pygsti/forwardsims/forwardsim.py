@@ -11,9 +11,11 @@ Defines the ForwardSimulator calculator class
 #***************************************************************************************************
 
 import collections as _collections
+import itertools as _itertools
 import warnings as _warnings
 
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti.layouts.cachedlayout import CachedCOPALayout as _CachedCOPALayout
 from pygsti.layouts.copalayout import CircuitOutcomeProbabilityArrayLayout as _CircuitOutcomeProbabilityArrayLayout
@@ -71,6 +73,16 @@ class ForwardSimulator(object):
         if method_name == 'bulk_fill_probs': return cls._array_types_for_method('_bulk_fill_probs_block')
         if method_name == 'bulk_fill_dprobs': return cls._array_types_for_method('_bulk_fill_dprobs_block')
         if method_name == 'bulk_fill_hprobs': return cls._array_types_for_method('_bulk_fill_hprobs_block')
+        if method_name == 'bulk_fill_dprobs_param_blocks': return cls._array_types_for_method('bulk_fill_dprobs')
+        if method_name == 'bulk_fill_dprobs_dot': return ('eP',) + cls._array_types_for_method('bulk_fill_dprobs')
+        if method_name == 'bulk_fill_dprobs_transpose_dot':
+            return ('eP',) + cls._array_types_for_method('bulk_fill_dprobs')
+        if method_name == 'bulk_fill_hprobs_dot':
+            return ('P', 'P') + cls._array_types_for_method('bulk_fill_dprobs_transpose_dot')
+        if method_name == 'iter_dprobs_by_element_blocks':
+            return ('eP',) + cls._array_types_for_method('bulk_fill_dprobs')
+        if method_name == 'bulk_dprobs_sparse':  # (excludes the sparse data, which is much smaller than 'ep')
+            return ('eP',) + cls._array_types_for_method('_bulk_fill_dprobs_block')
         if method_name == '_bulk_fill_probs_block': return ()
         if method_name == '_bulk_fill_dprobs_block':
             return ('e',) + cls._array_types_for_method('_bulk_fill_probs_block')
@@ -558,6 +570,39 @@ class ForwardSimulator(object):
         # A separate function because computation with time-dependence is often approached differently
         return self._bulk_fill_probs_block_at_times(array_to_fill, layout, times)
 
+    def bulk_fill_probs_at_times(self, array_to_fill, layout, times):
+        """
+        Compute the outcome probabilities for a list circuits at each of several times.
+
+        This routine fills a 2D array, `array_to_fill`, whose i-th row holds the circuit
+        outcome probabilities, laid out as dictated by `layout`, when every circuit is
+        started at time `times[i]`.  This is the time-dependent analogue of
+        :method:`bulk_fill_probs`, and allows simulators to reuse the structures of
+        `layout` (e.g. evaluation trees) across all the given times.
+
+        Parameters
+        ----------
+        array_to_fill : numpy ndarray
+            an already-allocated 2D numpy array of shape `(len(times), len(layout))`.
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for the rows of `array_to_fill`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        times : list
+            The (start) times at which the circuits are evaluated.
+
+        Returns
+        -------
+        None
+        """
+        assert(array_to_fill.shape == (len(times), layout.num_elements)), "`array_to_fill` has the wrong shape!"
+        return self._bulk_fill_probs_at_timestamps(array_to_fill, layout, times)
+
+    def _bulk_fill_probs_at_timestamps(self, array_to_fill, layout, timestamps):
+        for probs_at_t, t in zip(array_to_fill, timestamps):
+            self._bulk_fill_probs_at_times(probs_at_t, layout, _itertools.repeat(t))
+
     def _bulk_fill_probs_block_at_times(self, array_to_fill, layout, times):
         for (element_indices, circuit, outcomes), time in zip(layout.iter_unique_circuits(), times):
             self._compute_circuit_outcome_probabilities(array_to_fill[element_indices], circuit,
@@ -603,8 +648,13 @@ class ForwardSimulator(object):
 
         #If _compute_circuit_outcome_probability_derivatives is implemented, use it!
         resource_alloc = layout.resource_alloc()
+        depends_on_params = self._circuits_depending_on(layout, param_slice)
         try:
-            for element_indices, circuit, outcomes in layout.iter_unique_circuits():
+            for depends, (element_indices, circuit, outcomes) in zip(depends_on_params,
+                                                                     layout.iter_unique_circuits()):
+                if not depends:  # circuit doesn't depend on any of the parameters, so its derivatives are zero
+                    array_to_fill[element_indices, dest_param_slice] = 0.0
+                    continue
                 self._compute_circuit_outcome_probability_derivatives(
                     array_to_fill[element_indices, dest_param_slice], circuit, outcomes, param_slice, resource_alloc)
             return
@@ -627,15 +677,326 @@ class ForwardSimulator(object):
 
         probs2 = _np.empty(len(layout), 'd')
         orig_vec = self.model.to_vector().copy()
+        dependent_params = set(layout.param_dependency_index(self.model).indices)
         for i in range(self.model.num_params):
             if i in iParamToFinal:
                 iFinal = iParamToFinal[i]
+                if i not in dependent_params:  # no circuit depends on parameter i
+                    array_to_fill[:, iFinal] = 0.0
+                    continue
                 vec = orig_vec.copy(); vec[i] += eps
                 self.model.from_vector(vec, close=True)
-                self._bulk_fill_probs_block(probs2, layout, resource_alloc)
+                self._bulk_fill_probs_block(probs2, layout)
                 array_to_fill[:, iFinal] = (probs2 - probs) / eps
         self.model.from_vector(orig_vec, close=True)
 
+    def _circuits_depending_on(self, layout, param_slice):
+        """
+        Whether each of `layout`'s unique circuits depends on any of the parameters in `param_slice`.
+
+        Circuits that don't depend on any of these parameters have zero derivatives with respect to
+        them, and needn't be computed.  The layout's parameter-dependency index is only used when `param_slice` is a
+        subset of the model's parameters, since nearly all circuits depend on *some* parameter.
+        """
+        if param_slice is None or _slct.length(param_slice) == self.model.num_params:
+            return _itertools.repeat(True)
+        return layout.param_dependency_index(self.model).circuits_depending_on(param_slice)
+
+    def bulk_fill_dprobs_param_blocks(self, array_to_fill, layout, param_slices, pr_array_to_fill=None):
+        """
+        Compute the outcome probability-derivatives with respect to only some of the model parameters.
+
+        This routine is like :method:`bulk_fill_dprobs` except that only the columns of
+        `array_to_fill` corresponding to the parameters in `param_slices` are computed; all
+        other columns are left unaltered.  This allows the derivative columns of parameters
+        that haven't changed (appreciably) to be reused from a previous computation.
+
+        Parameters
+        ----------
+        array_to_fill : numpy ndarray
+            an already-allocated 2D numpy array of shape `(len(layout), Np)`, where
+            `Np` is the number of model parameters being differentiated with respect to.
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for `array_to_fill`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        param_slices : list
+            A list of slices, each giving a contiguous block of (global) model-parameter
+            indices whose derivative columns should be computed.
+
+        pr_array_to_fill : numpy array, optional
+            when not None, an already-allocated length-`len(layout)` numpy array that is
+            filled with probabilities, just as in :method:`bulk_fill_probs`.
+
+        Returns
+        -------
+        None
+        """
+        return self._bulk_fill_dprobs_param_blocks(array_to_fill, layout, param_slices, pr_array_to_fill)
+
+    def _bulk_fill_dprobs_param_blocks(self, array_to_fill, layout, param_slices, pr_array_to_fill):
+        if pr_array_to_fill is not None:
+            self._bulk_fill_probs_block(pr_array_to_fill, layout)
+        for param_slice in param_slices:
+            self._bulk_fill_dprobs_block(array_to_fill, param_slice, layout, param_slice)
+
+    def bulk_fill_dprobs_dot(self, array_to_fill, layout, vec, pr_array_to_fill=None):
+        """
+        Compute the product of the outcome probability-derivatives (jacobian) and a parameter-space vector.
+
+        This routine fills a 1D array, `array_to_fill`, with `dot(dprobs, vec)`, where `dprobs`
+        is the `(len(layout), Np)` array computed by :method:`bulk_fill_dprobs`, without
+        requiring that all of `dprobs` be held in memory at once.  This is useful for
+        "matrix-free" optimization methods, which only need the action of the jacobian
+        on vectors.
+
+        Parameters
+        ----------
+        array_to_fill : numpy ndarray
+            an already-allocated 1D numpy array of length equal to the
+            total number of computed elements (i.e. `len(layout)`).
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for `array_to_fill`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        vec : numpy ndarray
+            A 1D array of length equal to the (total) number of model parameters.
+
+        pr_array_to_fill : numpy array, optional
+            when not None, an already-allocated length-`len(layout)` numpy array that is
+            filled with probabilities, just as in :method:`bulk_fill_probs`.
+
+        Returns
+        -------
+        None
+        """
+        assert(len(vec) == self.model.num_params), "`vec` must have length equal to the number of model parameters!"
+        return self._bulk_fill_dprobs_dot(array_to_fill, layout, vec, pr_array_to_fill)
+
+    def _bulk_fill_dprobs_dot(self, array_to_fill, layout, vec, pr_array_to_fill):
+        dprobs = _np.empty((len(layout), self.model.num_params), 'd')
+        self._bulk_fill_dprobs(dprobs, layout, pr_array_to_fill)
+        array_to_fill[:] = _np.dot(dprobs, vec)
+
+    def bulk_fill_dprobs_transpose_dot(self, array_to_fill, layout, vec):
+        """
+        Compute the product of a vector of per-element values and the outcome probability-derivatives (jacobian).
+
+        This routine fills a 1D array, `array_to_fill`, with `dot(vec, dprobs)`, where `dprobs`
+        is the `(len(layout), Np)` array computed by :method:`bulk_fill_dprobs`, without
+        requiring that all of `dprobs` be held in memory at once.  Only the elements local to
+        the current processor are summed over; use the layout's `allsum_local_quantity` method
+        to sum over the elements held by all the processors.
+
+        Parameters
+        ----------
+        array_to_fill : numpy ndarray
+            an already-allocated 1D numpy array of length equal to the
+            (total) number of model parameters.
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for `vec`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        vec : numpy ndarray
+            A 1D array of length equal to the total number of computed elements (i.e. `len(layout)`).
+
+        Returns
+        -------
+        None
+        """
+        assert(len(array_to_fill) == self.model.num_params), \
+            "`array_to_fill` must have length equal to the number of model parameters!"
+        return self._bulk_fill_dprobs_transpose_dot(array_to_fill, layout, vec)
+
+    def _bulk_fill_dprobs_transpose_dot(self, array_to_fill, layout, vec):
+        dprobs = _np.empty((len(layout), self.model.num_params), 'd')
+        self._bulk_fill_dprobs(dprobs, layout, None)
+        array_to_fill[:] = _np.dot(vec, dprobs)
+
+    def bulk_fill_hprobs_dot(self, array_to_fill, layout, vec, weights, eps=1e-5):
+        """
+        Compute a weighted sum of outcome probability-Hessians applied to a parameter-space vector.
+
+        This routine fills a 1D array, `array_to_fill`, with `sum_e weights[e] * dot(hprobs[e], vec)`,
+        where `hprobs` is the `(len(layout), Np, Np)` array computed by :method:`bulk_fill_hprobs`,
+        without ever holding any portion of `hprobs` in memory.  The product is computed as the
+        (central) directional derivative, along `vec`, of the analytic jacobian-transpose product
+        computed by :method:`bulk_fill_dprobs_transpose_dot`, and so requires two such products.
+        As with :method:`bulk_fill_dprobs_transpose_dot`, only the elements local to the current
+        processor are summed over.
+
+        Parameters
+        ----------
+        array_to_fill : numpy ndarray
+            an already-allocated 1D numpy array of length equal to the
+            (total) number of model parameters.
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for `weights`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        vec : numpy ndarray
+            A 1D array of length equal to the (total) number of model parameters.
+
+        weights : numpy ndarray
+            A 1D array of length equal to the total number of computed elements (i.e. `len(layout)`).
+
+        eps : float, optional
+            The size of the finite-difference step, relative to the norm of `vec`.
+
+        Returns
+        -------
+        None
+        """
+        assert(len(vec) == self.model.num_params), "`vec` must have length equal to the number of model parameters!"
+        assert(len(array_to_fill) == self.model.num_params), \
+            "`array_to_fill` must have length equal to the number of model parameters!"
+        return self._bulk_fill_hprobs_dot(array_to_fill, layout, vec, weights, eps)
+
+    def _bulk_fill_hprobs_dot(self, array_to_fill, layout, vec, weights, eps):
+        vec_norm = _np.linalg.norm(vec)
+        if vec_norm == 0:
+            array_to_fill[:] = 0.0; return
+
+        step = eps / vec_norm
+        orig_vec = self.model.to_vector().copy()
+        jtw_minus = _np.empty(len(array_to_fill), 'd')
+        try:
+            self.model.from_vector(orig_vec + step * vec, close=True)
+            self._bulk_fill_dprobs_transpose_dot(array_to_fill, layout, weights)
+            self.model.from_vector(orig_vec - step * vec, close=True)
+            self._bulk_fill_dprobs_transpose_dot(jtw_minus, layout, weights)
+        finally:
+            self.model.from_vector(orig_vec, close=True)
+
+        array_to_fill -= jtw_minus
+        array_to_fill /= 2 * step
+
+    def iter_dprobs_by_element_blocks(self, layout, blk_size=None):
+        """
+        Iterates over blocks of rows (elements) of the outcome probability-derivatives (jacobian).
+
+        Each iteration yields the derivatives of a contiguous range of the elements in `layout`
+        with respect to *all* the model parameters.  This allows quantities like `J^T J` to be
+        accumulated without holding the entire `(len(layout), Np)` jacobian in memory, provided
+        the forward simulator is able to compute portions of it independently (distributed forward
+        simulators compute one layout atom at a time).  This base implementation computes the entire
+        jacobian and then iterates over its blocks.
+
+        Only the elements local to the current processor are iterated over.  When the memory of a
+        block is shared between processors, only the block of the host-leader processor is guaranteed
+        to be correct.
+
+        Parameters
+        ----------
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout describing what circuit outcome each element corresponds to.  Usually given
+            by a prior call to :method:`create_layout`.
+
+        blk_size : int, optional
+            The maximum number of elements (rows) in each block.  If None, blocks are as large
+            as the forward simulator is able to compute them.
+
+        Returns
+        -------
+        iterator
+            An iterator over `(element_slice, dprobs_block)` pairs, where `dprobs_block` is a
+            `(len(element_slice), Np)`-shaped array.
+        """
+        dprobs = _np.empty((len(layout), self.model.num_params), 'd')
+        self._bulk_fill_dprobs(dprobs, layout, None)
+        return self._iter_row_blocks(dprobs, 0, blk_size)
+
+    def bulk_dprobs_sparse(self, layout, pr_array_to_fill=None, blk_size=None):
+        """
+        Compute the outcome probability-derivatives (jacobian) as a sparse matrix.
+
+        The probabilities of a circuit's outcomes can only depend on the parameters of the
+        operations, state preparation and POVM in the circuit (see the layout's `param_dependency_index`
+        method), and for models built from many small operations, e.g. local-noise and cloud-noise
+        models, this is usually a small fraction of all the model parameters.  This method only computes
+        and stores the derivatives with respect to these parameters, so that the full, dense,
+        `(len(layout), Np)` jacobian is never held in memory.  The derivatives are computed for
+        blocks of `blk_size` parameters at a time, and blocks that no outcome depends upon are
+        skipped entirely.
+
+        Only the elements local to the current processor are computed, and this method does
+        not yet support multiple processors.
+
+        Parameters
+        ----------
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout describing what circuit outcome each element corresponds to.  Usually given
+            by a prior call to :method:`create_layout`.
+
+        pr_array_to_fill : numpy array, optional
+            when not None, an already-allocated length-`len(layout)` numpy array that is
+            filled with probabilities, just as in :method:`bulk_fill_probs`.
+
+        blk_size : int, optional
+            The number of parameters whose derivatives are computed at once (so that the
+            derivatives of at most `blk_size` parameters are held in dense form).  If None,
+            this is set so that a dense block takes about as much memory as the sparse result.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            A `(len(layout), Np)`-shaped sparse matrix, where `Np` is the number of model parameters.
+        """
+        if layout.resource_alloc().comm_size > 1:
+            raise NotImplementedError("Sparse jacobians don't support multiple processors yet.")
+        return self._bulk_dprobs_sparse(layout, pr_array_to_fill, blk_size)
+
+    def _bulk_dprobs_sparse(self, layout, pr_array_to_fill, blk_size):
+        if pr_array_to_fill is not None:
+            self._bulk_fill_probs_block(pr_array_to_fill, layout)
+        indptr, indices = layout.param_dependency_index(self.model).element_sparsity_pattern()
+        data = _np.zeros(len(indices), 'd')
+
+        def fill_dprobs_block(array_to_fill, param_slice):
+            self._bulk_fill_dprobs_block(array_to_fill, slice(0, _slct.length(param_slice)), layout, param_slice)
+        self._fill_sparse_dprobs_data(data, indptr, indices, slice(0, len(layout)), fill_dprobs_block, blk_size)
+        return _sps.csr_matrix((data, indices, indptr), shape=(len(layout), self.model.num_params))
+
+    def _fill_sparse_dprobs_data(self, data, indptr, indices, row_slice, fill_dprobs_block, blk_size):
+        """
+        Fills the CSR `data` array for the rows in `row_slice`, computing dense blocks of derivatives as needed.
+
+        `fill_dprobs_block(array_to_fill, param_slice)` must fill the `(len(row_slice), len(param_slice))`
+        array `array_to_fill` with the derivatives of `row_slice`'s elements with respect to the
+        parameters in `param_slice`.  Parameter blocks that none of the rows depend upon are skipped.
+        """
+        r0, r1 = row_slice.start, row_slice.stop
+        entries = _np.arange(indptr[r0], indptr[r1])
+        if len(entries) == 0: return
+        rows = _np.repeat(_np.arange(r0, r1), _np.diff(indptr[r0:r1 + 1]))
+        cols = indices[entries]
+        by_col = _np.argsort(cols, kind='stable')
+        entries, rows, cols = entries[by_col], rows[by_col], cols[by_col]
+
+        Np = self.model.num_params
+        if blk_size is None:  # so a dense block holds about as many elements as the sparse rows
+            blk_size = int(_np.ceil(len(entries) / (r1 - r0)))
+        for p0 in range(0, Np, blk_size):
+            p1 = min(p0 + blk_size, Np)
+            i0, i1 = _np.searchsorted(cols, [p0, p1])
+            if i0 == i1: continue  # no element depends on these parameters
+            dprobs_blk = _np.zeros((r1 - r0, p1 - p0), 'd')
+            fill_dprobs_block(dprobs_blk, slice(p0, p1))
+            data[entries[i0:i1]] = dprobs_blk[rows[i0:i1] - r0, cols[i0:i1] - p0]
+
+    @staticmethod
+    def _iter_row_blocks(rows, offset, blk_size):
+        """ Yields `(element_slice, block)` pairs dividing `rows` into blocks of at most `blk_size` rows """
+        nrows = rows.shape[0]
+        if blk_size is None: blk_size = max(nrows, 1)
+        for start in range(0, nrows, blk_size):
+            stop = min(start + blk_size, nrows)
+            yield slice(offset + start, offset + stop), rows[start:stop, :]
+
     def bulk_fill_hprobs(self, array_to_fill, layout,
                          pr_array_to_fill=None, deriv1_array_to_fill=None, deriv2_array_to_fill=None):
         """
@@ -874,7 +1235,12 @@ class CacheForwardSimulator(ForwardSimulator):
                                                                    outcomes, layout.resource_alloc(), cache, time=None)
 
     def _bulk_fill_dprobs_block(self, array_to_fill, dest_param_slice, layout, param_slice):
-        for element_indices, circuit, outcomes, cache in layout.iter_unique_circuits_with_cache():
+        depends_on_params = self._circuits_depending_on(layout, param_slice)
+        for depends, (element_indices, circuit, outcomes, cache) in zip(depends_on_params,
+                                                                        layout.iter_unique_circuits_with_cache()):
+            if not depends:  # circuit doesn't depend on any of the parameters, so its derivatives are zero
+                array_to_fill[element_indices, dest_param_slice] = 0.0
+                continue
             self._compute_circuit_outcome_probability_derivatives_with_cache(
                 array_to_fill[element_indices, dest_param_slice], circuit, outcomes, param_slice,
                 layout.resource_alloc(), cache)
@@ -11,6 +11,7 @@ Defines the MapForwardSimulator calculator class
 #***************************************************************************************************
 
 import importlib as _importlib
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 
 import numpy as _np
 
@@ -133,6 +134,18 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         this can be a 0-, 1- or 2-tuple of integers or `None` values.  A block size of `None`
         means that there should be no division into blocks, and that each block processor
         computes all of its parameter indices at once.
+
+    layout_cache_dir : str or Path, optional
+        If not None, a directory where the processor-independent parts of created layouts
+        (circuit splittings and atoms) are persistently cached, keyed by a digest of the circuits,
+        model structure and observed outcomes.  Repeated analyses of the same circuits, e.g. on
+        new data with the same outcomes, then reuse these rather than rebuilding them.
+
+    num_threads : int, optional
+        If greater than 1, the number of threads used to compute the atoms of a layout
+        concurrently within each processor.  Threads share the model, so only the
+        per-atom state caches are duplicated.  This is most effective when the compiled
+        (Cython) calculation kernels, which release the GIL, are available.
     """
 
     @classmethod
@@ -148,10 +161,13 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         if method_name == 'bulk_fill_timedep_dchi2': return ('p',)  # just an additional parameter vector
         return super()._array_types_for_method(method_name)
 
-    def __init__(self, model=None, max_cache_size=0, num_atoms=None, processor_grid=None, param_blk_sizes=None):
+    def __init__(self, model=None, max_cache_size=0, num_atoms=None, processor_grid=None, param_blk_sizes=None,
+                 layout_cache_dir=None, num_threads=None):
         #super().__init__(model, num_atoms, processor_grid, param_blk_sizes)
-        _DistributableForwardSimulator.__init__(self, model, num_atoms, processor_grid, param_blk_sizes)
+        _DistributableForwardSimulator.__init__(self, model, num_atoms, processor_grid, param_blk_sizes,
+                                                layout_cache_dir)
         self._max_cache_size = max_cache_size
+        self._num_threads = num_threads
 
     def copy(self):
         """
@@ -162,7 +178,8 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         MapForwardSimulator
         """
         return MapForwardSimulator(self.model, self._max_cache_size, self._num_atoms,
-                                   self._processor_grid, self._pblk_sizes)
+                                   self._processor_grid, self._pblk_sizes, getattr(self, '_layout_cache_dir', None),
+                                   getattr(self, '_num_threads', None))
 
     def create_layout(self, circuits, dataset=None, resource_alloc=None, array_types=('E',),
                       derivative_dimension=None, verbosity=0):
@@ -229,13 +246,15 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         assert(_np.product((na,) + npp) <= nprocs), "Processor grid size exceeds available processors!"
 
         layout = _MapCOPALayout(circuits, self.model, dataset, self._max_cache_size, natoms, na, npp,
-                                param_dimensions, param_blk_sizes, resource_alloc, verbosity)
+                                param_dimensions, param_blk_sizes, resource_alloc, verbosity,
+                                getattr(self, '_layout_cache_dir', None))
 
         if mem_limit is not None:
-            loc_nparams1 = num_params / npp[0] if len(npp) > 0 else 0
-            loc_nparams2 = num_params / npp[1] if len(npp) > 1 else 0
-            blk1 = param_blk_sizes[0] if len(param_blk_sizes) > 0 else 0
-            blk2 = param_blk_sizes[1] if len(param_blk_sizes) > 1 else 0
+            # parameter dimensions that the layout doesn't distribute are held in full by every processor
+            loc_nparams1 = num_params / npp[0] if len(npp) > 0 else num_params
+            loc_nparams2 = num_params / npp[1] if len(npp) > 1 else num_params
+            blk1 = param_blk_sizes[0] if len(param_blk_sizes) > 0 else None
+            blk2 = param_blk_sizes[1] if len(param_blk_sizes) > 1 else None
             if blk1 is None: blk1 = loc_nparams1
             if blk2 is None: blk2 = loc_nparams2
             global_layout = layout.global_layout
@@ -252,7 +271,7 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
                 max_atom_cachesize = layout.max_atom_cachesize
             mem_estimate = _bytes_for_array_types(array_types, global_layout.num_elements, max_local_els, max_atom_els,
                                                   global_layout.num_circuits, max_local_circuits,
-                                                  layout._param_dimensions, (loc_nparams1, loc_nparams2),
+                                                  (num_params, num_params), (loc_nparams1, loc_nparams2),
                                                   (blk1, blk2), max_atom_cachesize, self.model.dim)
 
             #def approx_mem_estimate(nc, np1, np2):
@@ -267,6 +286,72 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
 
         return layout
 
+    def _uses_threads(self, layout):
+        num_threads = getattr(self, '_num_threads', None)
+        return num_threads is not None and num_threads > 1 and len(layout.atoms) > 1
+
+    def _prepare_atoms(self, layout):
+        # Note: this also ensures the model has created (and cached) all the layer operators needed by `layout`
+        # before multiple threads use them, so that these operators are updated by subsequent from_vector calls.
+        return [(atom, self.calclib.prepare_atom(self, atom)) for atom in layout.atoms]
+
+    def _fill_prepared_atoms_in_threads(self, executor, array_to_fill, prepared_atoms):
+        # Each atom fills a disjoint slice of `array_to_fill` and only reads the (shared) model's reps.
+        def fill_atom(atom_and_prepared):
+            atom, prepared = atom_and_prepared
+            self.calclib.mapfill_prepared_atom(prepared, array_to_fill[atom.element_slice])
+        list(executor.map(fill_atom, prepared_atoms))  # list(...) waits for all atoms & re-raises any exceptions
+
+    def _bulk_fill_probs(self, array_to_fill, layout):
+        if not self._uses_threads(layout):
+            return super()._bulk_fill_probs(array_to_fill, layout)
+
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        atom_resource_alloc.check_can_allocate_memory(self._num_threads * layout.max_atom_cachesize * self.model.dim)
+        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
+
+        if atom_resource_alloc.is_host_leader:  # don't fill assumed-shared array_to_fill on non-mem-leaders
+            prepared_atoms = self._prepare_atoms(layout)
+            with _ThreadPoolExecutor(max_workers=self._num_threads) as executor:
+                self._fill_prepared_atoms_in_threads(executor, array_to_fill, prepared_atoms)
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
+    def _bulk_fill_dprobs(self, array_to_fill, layout, pr_array_to_fill):
+        if not self._uses_threads(layout):
+            return super()._bulk_fill_dprobs(array_to_fill, layout, pr_array_to_fill)
+
+        # Rather than looping over parameters within each atom (as _bulk_fill_dprobs_atom does), loop over
+        # parameters once and compute all the atoms concurrently at each finite-difference point.  This also
+        # reduces the number of (potentially expensive) model.from_vector calls by a factor of len(layout.atoms).
+        eps = 1e-7  # same as calclib's mapfill_dprobs_atom
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param_resource_alloc = layout.resource_alloc('param-processing')
+        atom_resource_alloc.check_can_allocate_memory(self._num_threads * layout.max_atom_cachesize * self.model.dim)
+        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
+
+        prepared_atoms = self._prepare_atoms(layout)
+        with _ThreadPoolExecutor(max_workers=self._num_threads) as executor:
+            if pr_array_to_fill is not None and atom_resource_alloc.is_host_leader:
+                self._fill_prepared_atoms_in_threads(executor, pr_array_to_fill, prepared_atoms)
+
+            if param_resource_alloc.is_host_leader:  # don't fill assumed-shared array_to_fill on non-mem-leaders
+                orig_vec = self.model.to_vector().copy()
+                self.model.from_vector(orig_vec, close=False)  # ensure we call with close=False first
+
+                probs = _np.empty(layout.num_elements, 'd')
+                probs2 = _np.empty(layout.num_elements, 'd')
+                self._fill_prepared_atoms_in_threads(executor, probs, prepared_atoms)
+
+                for iFinal, i in enumerate(_slct.indices(layout.global_param_slice)):
+                    vec = orig_vec.copy(); vec[i] += eps
+                    self.model.from_vector(vec, close=True)
+                    self._fill_prepared_atoms_in_threads(executor, probs2, prepared_atoms)
+                    array_to_fill[:, iFinal] = (probs2 - probs) / eps
+                self.model.from_vector(orig_vec, close=True)
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
     def _bulk_fill_probs_atom(self, array_to_fill, layout_atom, resource_alloc):
         # Note: *don't* set dest_indices arg = layout.element_slice, as this is already done by caller
         resource_alloc.check_can_allocate_memory(layout_atom.cache_size * self.model.dim)
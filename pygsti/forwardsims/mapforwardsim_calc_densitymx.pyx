@@ -175,31 +175,92 @@ def mapfill_probs_atom(fwdsim, np.ndarray[double, mode="c", ndim=1] array_to_fil
     cdef vector[vector[INT]] elabel_indices_per_circuit = convert_dict_of_intlists(layout_atom.elbl_indices_by_expcircuit)
     cdef vector[vector[INT]] final_indices_per_circuit = convert_and_wrap_dict_of_intlists(
         layout_atom.elindices_by_expcircuit, dest_indices)
+    cdef double[:] array_to_fill_view = array_to_fill
+    cdef INT dim = fwdsim.model.dim
 
     if shared_mem_leader:
         #Note: dm_mapfill_probs could have taken a resource_alloc to employ multiple cpus to do computation.
         # Since array_fo_fill is assumed to be shared mem it would need to only update `array_to_fill` *if*
         # it were the host leader.
-        dm_mapfill_probs(array_to_fill, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
-                         elabel_indices_per_circuit, final_indices_per_circuit, fwdsim.model.dim)
+        with nogil:
+            dm_mapfill_probs(array_to_fill_view, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
+                             elabel_indices_per_circuit, final_indices_per_circuit, dim)
 
     free_rhocache(rho_cache)  #delete cache entries
 
 
-cdef dm_mapfill_probs(double[:] array_to_fill,
-                      vector[vector[INT]] c_layout_atom,
-                      vector[OpCRep*] c_opreps,
-                      vector[StateCRep*] c_rhoreps, vector[EffectCRep*] c_ereps,
-                      vector[StateCRep*]* prho_cache,
-                      vector[vector[INT]] elabel_indices_per_circuit,
-                      vector[vector[INT]] final_indices_per_circuit,
-                      INT dim):
+cdef class PreparedAtom:
+    """
+    The C-level data needed to compute a layout atom's probabilities, see :func:`prepare_atom`.
+    """
+    cdef vector[vector[INT]] c_layout_atom
+    cdef vector[StateCRep*] c_rhos
+    cdef vector[EffectCRep*] c_ereps
+    cdef vector[OpCRep*] c_opreps
+    cdef vector[vector[INT]] elabel_indices_per_circuit
+    cdef vector[vector[INT]] final_indices_per_circuit
+    cdef INT cache_size
+    cdef INT dim
+    cdef object reps  # holds references to the rep objects whose C-reps are used above
+
+
+def prepare_atom(fwdsim, layout_atom):
+    """
+    Convert a layout atom and the model's reps into C-level data that can be reused by :func:`mapfill_prepared_atom`.
+
+    The model's reps are updated in place by `fwdsim.model.from_vector`, so the returned object remains
+    valid for different model parameter values.
+    """
+    cdef PreparedAtom ret = PreparedAtom()
+    rho_lookup = { lbl:i for i,lbl in enumerate(layout_atom.rho_labels) } # rho labels -> ints for faster lookup
+    rhoreps = { i: fwdsim.model._circuit_layer_operator(rholbl, 'prep')._rep for rholbl,i in rho_lookup.items() }
+    operation_lookup = { lbl:i for i,lbl in enumerate(layout_atom.op_labels) } # operation labels -> ints for faster lookup
+    operationreps = { i:fwdsim.model._circuit_layer_operator(lbl, 'op')._rep for lbl,i in operation_lookup.items() }
+    ereps = [fwdsim.model._circuit_layer_operator(elbl, 'povm')._rep for elbl in layout_atom.full_effect_labels]
+
+    ret.c_layout_atom = convert_maplayout(layout_atom, operation_lookup, rho_lookup)
+    ret.c_rhos = convert_rhoreps(rhoreps)
+    ret.c_ereps = convert_ereps(ereps)
+    ret.c_opreps = convert_opreps(operationreps)
+    ret.elabel_indices_per_circuit = convert_dict_of_intlists(layout_atom.elbl_indices_by_expcircuit)
+    ret.final_indices_per_circuit = convert_dict_of_intlists(layout_atom.elindices_by_expcircuit)
+    ret.cache_size = layout_atom.cache_size
+    ret.dim = fwdsim.model.dim
+    ret.reps = (rhoreps, operationreps, ereps)
+    return ret
+
+
+def mapfill_prepared_atom(PreparedAtom prepared, double[:] array_to_fill):
+    """
+    Fill `array_to_fill` with the probabilities of a prepared atom's elements.
+
+    The GIL is released during the computation, so different atoms may be computed concurrently
+    by multiple threads (each uses its own state cache).
+    """
+    cdef vector[StateCRep*] rho_cache = create_rhocache(prepared.cache_size, prepared.dim)
+    with nogil:
+        dm_mapfill_probs(array_to_fill, prepared.c_layout_atom, prepared.c_opreps, prepared.c_rhos,
+                         prepared.c_ereps, &rho_cache, prepared.elabel_indices_per_circuit,
+                         prepared.final_indices_per_circuit, prepared.dim)
+    free_rhocache(rho_cache)
+
+
+cdef void dm_mapfill_probs(double[:] array_to_fill,
+                           vector[vector[INT]] c_layout_atom,
+                           vector[OpCRep*] c_opreps,
+                           vector[StateCRep*] c_rhoreps, vector[EffectCRep*] c_ereps,
+                           vector[StateCRep*]* prho_cache,
+                           vector[vector[INT]] elabel_indices_per_circuit,
+                           vector[vector[INT]] final_indices_per_circuit,
+                           INT dim) noexcept nogil:
 
     #Note: we need to take in rho_cache as a pointer b/c we may alter the values its
     # elements point to (instead of copying the states) - we just guarantee that in the end
     # all of the cache entries are filled with allocated (by 'new') states that the caller
     # can deallocate at will.
-    cdef INT k,l,i,istart, icache, iFirstOp, precomp_id
+    # Note: this function doesn't touch any Python objects, so it runs without the GIL and
+    # multiple atoms can be computed concurrently by different threads.
+    cdef INT k,l,i,j,istart, icache, iFirstOp, precomp_id
     cdef double p
     cdef StateCRep *init_state
     cdef StateCRep *prop1
@@ -209,6 +270,7 @@ cdef dm_mapfill_probs(double[:] array_to_fill,
     cdef StateCRep *shelved = new StateCRep(dim)
     cdef StateCRep *precomp_state
 
+    cdef vector[INT] intarray
     cdef vector[INT] final_indices
     cdef vector[INT] elabel_indices
 
@@ -216,7 +278,6 @@ cdef dm_mapfill_probs(double[:] array_to_fill,
     # - upon loop entry, prop2 is allocated and prop1 is not (it doesn't "own" any memory)
     # - all rho_cache entries have been allocated via "new"
     for k in range(<INT>c_layout_atom.size()):
-        t0 = pytime.time() # DEBUG
         intarray = c_layout_atom[k]
         i = intarray[0]
         istart = intarray[1]
@@ -326,8 +387,12 @@ def mapfill_dprobs_atom(fwdsim,
     probs = np.empty(nEls, 'd') #must be contiguous!
     probs2 = np.empty(nEls, 'd') #must be contiguous!
 
-    dm_mapfill_probs(probs, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
-                     elabel_indices_per_circuit, final_indices_per_circuit, fwdsim.model.dim)
+    cdef double[:] probs_view = probs
+    cdef double[:] probs2_view = probs2
+    cdef INT dim = fwdsim.model.dim
+    with nogil:
+        dm_mapfill_probs(probs_view, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
+                         elabel_indices_per_circuit, final_indices_per_circuit, dim)
 
     shared_mem_leader = resource_alloc.is_host_leader
 
@@ -345,8 +410,9 @@ def mapfill_dprobs_atom(fwdsim,
             # If probs2 were shared mem (seems not benefit to this?) it would need to only update `probs2` *if*
             # it were the host leader.
             if shared_mem_leader:  # don't fill assumed-shared array-to_fill on non-mem-leaders
-                dm_mapfill_probs(probs2, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
-                                 elabel_indices_per_circuit, final_indices_per_circuit, fwdsim.model.dim)
+                with nogil:
+                    dm_mapfill_probs(probs2_view, c_layout_atom, c_opreps, c_rhos, c_ereps, &rho_cache,
+                                     elabel_indices_per_circuit, final_indices_per_circuit, dim)
                 #_fas(array_to_fill, [dest_indices, iFinal], (probs2 - probs) / eps)  # I don't think this is needed
                 array_to_fill[dest_indices, iFinal] = (probs2 - probs) / eps
 
@@ -34,38 +34,72 @@ def mapfill_probs_atom(fwdsim, mx_to_fill, dest_indices, layout_atom, resource_a
     shared_mem_leader = resource_alloc.is_host_leader if (resource_alloc is not None) else True
 
     dest_indices = _slct.to_array(dest_indices)  # make sure this is an array and not a slice
-    cacheSize = layout_atom.cache_size
+    prepared = prepare_atom(fwdsim, layout_atom)
+
+    #TODO: if layout_atom is split, distribute somehow among processors(?) instead of punting for all but rank-0 above
+    for iDest, final_state in _propagate_prepared_atom(prepared):
+        ereps = [prepared.effectreps[j] for j in layout_atom.elbl_indices_by_expcircuit[iDest]]
+        final_indices = [dest_indices[j] for j in layout_atom.elindices_by_expcircuit[iDest]]
+
+        if shared_mem_leader:
+            for j, erep in zip(final_indices, ereps):
+                mx_to_fill[j] = erep.probability(final_state)  # outcome probability
+
+
+class PreparedAtom(object):
+    """
+    The reps needed to compute a layout atom's probabilities, see :func:`prepare_atom`.
+    """
+
+    def __init__(self, layout_atom, rhoreps, operationreps, effectreps):
+        self.layout_atom = layout_atom
+        self.rhoreps = rhoreps
+        self.operationreps = operationreps
+        self.effectreps = effectreps
+
 
-    #Create rhoCache
-    rho_cache = [None] * cacheSize  # so we can store (s,p) tuples in cache
+def prepare_atom(fwdsim, layout_atom):
+    """
+    Gather the model reps needed to compute a layout atom's probabilities, for use with :func:`mapfill_prepared_atom`.
 
+    The model's reps are updated in place by `fwdsim.model.from_vector`, so the returned object remains
+    valid for different model parameter values.
+    """
     #Get operationreps and ereps now so we don't make unnecessary ._rep references
     rhoreps = {rholbl: fwdsim.model._circuit_layer_operator(rholbl, 'prep')._rep for rholbl in layout_atom.rho_labels}
     operationreps = {gl: fwdsim.model._circuit_layer_operator(gl, 'op')._rep for gl in layout_atom.op_labels}
     effectreps = {i: fwdsim.model._circuit_layer_operator(Elbl, 'povm')._rep
                   for i, Elbl in enumerate(layout_atom.full_effect_labels)}  # cache these in future
+    return PreparedAtom(layout_atom, rhoreps, operationreps, effectreps)
 
-    #TODO: if layout_atom is split, distribute somehow among processors(?) instead of punting for all but rank-0 above
-    for iDest, iStart, remainder, iCache in layout_atom.table.contents:
+
+def mapfill_prepared_atom(prepared, array_to_fill):
+    """
+    Fill `array_to_fill` with the probabilities of a prepared atom's elements.
+    """
+    layout_atom = prepared.layout_atom
+    for iDest, final_state in _propagate_prepared_atom(prepared):
+        for j, k in zip(layout_atom.elindices_by_expcircuit[iDest], layout_atom.elbl_indices_by_expcircuit[iDest]):
+            array_to_fill[j] = prepared.effectreps[k].probability(final_state)  # outcome probability
+
+
+def _propagate_prepared_atom(prepared):
+    """ Iterate over the (expanded circuit index, final state) pairs of a prepared atom """
+    rho_cache = [None] * prepared.layout_atom.cache_size  # so we can store (s,p) tuples in cache
+    for iDest, iStart, remainder, iCache in prepared.layout_atom.table.contents:
         remainder = remainder.circuit_without_povm.layertup
 
         if iStart is None:  # then first element of remainder is a state prep label
             rholabel = remainder[0]
-            init_state = rhoreps[rholabel]
+            init_state = prepared.rhoreps[rholabel]
             remainder = remainder[1:]
         else:
             init_state = rho_cache[iStart]  # [:,None]
 
         #OLD final_state = self.propagate_state(init_state, remainder)
-        final_state = propagate_staterep(init_state, [operationreps[gl] for gl in remainder])
+        final_state = propagate_staterep(init_state, [prepared.operationreps[gl] for gl in remainder])
         if iCache is not None: rho_cache[iCache] = final_state  # [:,0] #store this state in the cache
-
-        ereps = [effectreps[j] for j in layout_atom.elbl_indices_by_expcircuit[iDest]]
-        final_indices = [dest_indices[j] for j in layout_atom.elindices_by_expcircuit[iDest]]
-
-        if shared_mem_leader:
-            for j, erep in zip(final_indices, ereps):
-                mx_to_fill[j] = erep.probability(final_state)  # outcome probability
+        yield iDest, final_state
 
 
 def mapfill_dprobs_atom(fwdsim, mx_to_fill, dest_indices, dest_param_indices, layout_atom, param_indices,
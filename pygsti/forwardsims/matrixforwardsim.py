@@ -37,6 +37,7 @@ _dummy_profiler = _DummyProfiler()
 _PSMALL = 1e-100
 _DSMALL = 1e-100
 _HSMALL = 1e-100
+_MAX_BATCH_ELEMENTS = 2**22  # maximum number of array elements in each batch of a level-batched dproduct computation
 
 
 class SimpleMatrixForwardSimulator(_ForwardSimulator):
@@ -873,6 +874,12 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         this can be a 0-, 1- or 2-tuple of integers or `None` values.  A block size of `None`
         means that there should be no division into blocks, and that each block processor
         computes all of its parameter indices at once.
+
+    layout_cache_dir : str or Path, optional
+        If not None, a directory where the processor-independent parts of created layouts
+        (circuit splittings and atoms) are persistently cached, keyed by a digest of the circuits,
+        model structure and observed outcomes.  Repeated analyses of the same circuits, e.g. on
+        new data with the same outcomes, then reuse these rather than rebuilding them.
     """
 
     @classmethod
@@ -887,16 +894,40 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
                 + cls._array_types_for_method('_compute_dproduct_cache') \
                 + cls._array_types_for_method('_compute_hproduct_cache')
 
+        if method_name in ('bulk_fill_dprobs_dot', 'bulk_fill_dprobs_transpose_dot'):
+            return cls._array_types_for_method('_compute_product_cache') + ('zdd',)  # tangent or adjoint cache
+
         if method_name == '_compute_product_cache': return ('zdd', 'z', 'z')  # cache of gates, scales, and scaleVals
         if method_name == '_compute_dproduct_cache': return ('zddb',)  # cache x dim x dim x distributed_nparams
         if method_name == '_compute_hproduct_cache': return ('zddbb',)  # cache x dim x dim x dist_np1 x dist_np2
         return super()._array_types_for_method(method_name)
 
     def __init__(self, model=None, distribute_by_timestamp=False, num_atoms=None, processor_grid=None,
-                 param_blk_sizes=None):
-        super().__init__(model, num_atoms, processor_grid, param_blk_sizes)
+                 param_blk_sizes=None, layout_cache_dir=None):
+        super().__init__(model, num_atoms, processor_grid, param_blk_sizes, layout_cache_dir)
         self._mode = "distribute_by_timestamp" if distribute_by_timestamp else "time_independent"
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        if '_scratch_arrays' in state: del state['_scratch_arrays']  # scratch space is never serialized
+        return state
+
+    def _scratch_array(self, name, shape):
+        """
+        Get an uninitialized array of the given shape that is reused between calls.
+
+        This avoids reallocating intermediate arrays every time a quantity is computed
+        (which happens on each iteration of an optimizer).  The array is only valid until
+        the next request for `name`.  Since scratch arrays live as long as this simulator,
+        they should only be used for arrays of bounded size, e.g. batch buffers.
+        """
+        if getattr(self, '_scratch_arrays', None) is None: self._scratch_arrays = {}
+        size = int(_np.prod(shape))
+        buf = self._scratch_arrays.get(name, None)
+        if buf is None or buf.size < size:
+            buf = self._scratch_arrays[name] = _np.empty(size, 'd')
+        return buf[0:size].reshape(shape)
+
     def copy(self):
         """
         Return a shallow copy of this MatrixForwardSimulator
@@ -905,12 +936,19 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         -------
         MatrixForwardSimulator
         """
-        return MatrixForwardSimulator(self.model)
+        return MatrixForwardSimulator(self.model, getattr(self, '_mode', None) == "distribute_by_timestamp",
+                                      self._num_atoms, self._processor_grid, self._pblk_sizes,
+                                      getattr(self, '_layout_cache_dir', None))
 
-    def _compute_product_cache(self, layout_atom_tree, resource_alloc):
+    def _compute_product_cache(self, layout_atom_tree, resource_alloc, caches_to_update=None, op_labels_to_update=None):
         """
         Computes an array of operation sequence products (process matrices).
 
+        If `caches_to_update` is a `(prodCache, scaleCache)` tuple of previously computed caches,
+        then only the products that involve an operation label in `op_labels_to_update` are
+        recomputed (in place).  This is used to update the products when only some operations
+        have changed, e.g. those that are time dependent.
+
         Note: will *not* parallelize computation:  parallelization should be
         done at a higher level.
         """
@@ -923,11 +961,23 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
 
         eval_tree = layout_atom_tree
         cacheSize = len(eval_tree)
-        prodCache = _np.zeros((cacheSize, dim, dim), 'd')
-        scaleCache = _np.zeros(cacheSize, 'd')
+        if caches_to_update is None:
+            if isinstance(eval_tree, _EvalTree):
+                return self._compute_product_cache_by_levels(eval_tree, dim)
+            prodCache = _np.zeros((cacheSize, dim, dim), 'd')
+            scaleCache = _np.zeros(cacheSize, 'd')
+        else:
+            prodCache, scaleCache = caches_to_update
+            updated = set()  # cache indices that have been recomputed
 
         for iDest, iRight, iLeft in eval_tree:
 
+            if caches_to_update is not None:  # only recompute products involving `op_labels_to_update`
+                needs_update = (iLeft in op_labels_to_update) if (iRight is None) \
+                    else (iLeft in updated or iRight in updated)
+                if not needs_update: continue
+                updated.add(iDest)
+
             #Special case of an "initial operation" that can be filled directly
             if iRight is None:  # then iLeft gives operation:
                 opLabel = iLeft
@@ -961,6 +1011,52 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
 
         return prodCache, scaleCache
 
+    def _compute_product_cache_by_levels(self, eval_tree, dim):
+        """
+        Computes the same product and scale caches as :method:`_compute_product_cache`, but processes
+        all of the tree elements within each of the tree's evaluation levels using a single stacked
+        matrix multiplication (see :method:`EvalTree.evaluation_levels`).
+        """
+        leaves, levels = eval_tree.evaluation_levels()
+        cacheSize = len(eval_tree)
+        prodCache = _np.zeros((cacheSize, dim, dim), 'd')
+        scaleCache = _np.zeros(cacheSize, 'd')
+
+        for iDest, opLabel in leaves:  # "initial operations" that can be filled directly
+            if opLabel is None:
+                prodCache[iDest] = _np.identity(dim)
+                # Note: scaleCache[i] = 0.0 from initialization
+            else:
+                gate = self.model.circuit_layer_operator(opLabel, 'op').to_dense(on_space='minimal')
+                nG = max(_nla.norm(gate), 1.0)
+                prodCache[iDest] = gate / nG
+                scaleCache[iDest] = _np.log(nG)
+
+        for dest, right, left in levels:
+            # LEXICOGRAPHICAL VS MATRIX ORDER Note: as in _compute_product_cache, we reverse left <=> right from
+            # eval_tree's naming so that matrixOf(circuit[dest]) = matrixOf(circuit[left]) * matrixOf(circuit[right])
+            L, R = prodCache[left], prodCache[right]
+            prods = _np.matmul(L, R)
+            scales = scaleCache[left] + scaleCache[right]
+
+            small = (prods.max(axis=(1, 2)) < _PSMALL) & (prods.min(axis=(1, 2)) > -_PSMALL)
+            if small.any():  # renormalize the factors of any products that have become too small
+                nL = _np.maximum(_np.maximum(_nla.norm(L[small], axis=(1, 2)), _np.exp(-scaleCache[left[small]])),
+                                 1e-300)
+                nR = _np.maximum(_np.maximum(_nla.norm(R[small], axis=(1, 2)), _np.exp(-scaleCache[right[small]])),
+                                 1e-300)
+                prods[small] = _np.matmul(L[small] / nL[:, None, None], R[small] / nR[:, None, None])
+                scales[small] += _np.log(nL) + _np.log(nR)
+
+            prodCache[dest] = prods
+            scaleCache[dest] = scales
+
+        nanOrInfCacheIndices = (~_np.isfinite(prodCache)).nonzero()[0]  # may be duplicates (a list, not a set)
+        # since all scaled gates start with norm <= 1, products should all have norm <= 1
+        assert(len(nanOrInfCacheIndices) == 0)
+
+        return prodCache, scaleCache
+
     def _compute_dproduct_cache(self, layout_atom_tree, prod_cache, scale_cache,
                                 resource_alloc=None, wrt_slice=None, profiler=None):
         """
@@ -1026,6 +1122,13 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         dProdCache = _np.zeros((cacheSize,) + deriv_shape)
         wrtIndices = _slct.indices(wrt_slice) if (wrt_slice is not None) else None
 
+        if isinstance(eval_tree, _EvalTree):
+            self._fill_dproduct_cache_by_levels(dProdCache, eval_tree, prod_cache, scale_cache, wrtIndices,
+                                                resource_alloc, profiler)
+            profiler.add_time("compute_dproduct_cache: serial", tSerialStart)
+            profiler.add_count("compute_dproduct_cache: num columns", nDerivCols)
+            return dProdCache
+
         for iDest, iRight, iLeft in eval_tree:
 
             #Special case of an "initial operation" that can be filled directly
@@ -1068,6 +1171,134 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
 
         return dProdCache
 
+    def _fill_dproduct_cache_by_levels(self, d_prod_cache, eval_tree, prod_cache, scale_cache, wrt_indices,
+                                       resource_alloc, profiler):
+        """
+        Fills `d_prod_cache` with the same values as :method:`_compute_dproduct_cache`'s per-element loop, but
+        processes the elements of each of the tree's evaluation levels together using broadcasted `np.matmul` calls.
+
+        Levels are processed in batches of at most `_MAX_BATCH_ELEMENTS` array elements, using scratch arrays
+        that are reused between calls.
+        """
+        leaves, levels = eval_tree.evaluation_levels()
+        nDerivCols, dim = d_prod_cache.shape[1], d_prod_cache.shape[2]
+        deriv_shape = d_prod_cache.shape[1:]
+
+        for iDest, opLabel in leaves:  # "initial operations" that can be filled directly
+            if opLabel is None:
+                d_prod_cache[iDest] = 0.0
+            else:
+                doperation = self._doperation(opLabel, wrt_filter=wrt_indices)
+                d_prod_cache[iDest] = doperation / _np.exp(scale_cache[iDest])
+
+        max_level_size = max([len(dest) for dest, _, _ in levels]) if len(levels) > 0 else 0
+        batch_size = max(min(max_level_size, _MAX_BATCH_ELEMENTS // max(nDerivCols * dim * dim, 1)), 1)
+        if resource_alloc is not None:  # (d_prod_cache isn't tracked by callers, so include it here)
+            resource_alloc.check_can_allocate_memory(d_prod_cache.size + 3 * batch_size * nDerivCols * dim * dim)
+        dL_buf = self._scratch_array('dproduct_left', (batch_size,) + deriv_shape)
+        dR_buf = self._scratch_array('dproduct_right', (batch_size,) + deriv_shape)
+        result_buf = self._scratch_array('dproduct_result', (batch_size,) + deriv_shape)
+
+        for level_dest, level_right, level_left in levels:
+            # LEXICOGRAPHICAL VS MATRIX ORDER Note: as in _compute_product_cache, we reverse left <=> right from
+            # eval_tree's naming so that matrixOf(circuit[dest]) = matrixOf(circuit[left]) * matrixOf(circuit[right])
+            for start in range(0, len(level_dest), batch_size):
+                tm = _time.time()
+                dest, right, left = (level_dest[start:start + batch_size], level_right[start:start + batch_size],
+                                     level_left[start:start + batch_size])
+                nB = len(dest)
+                dL, dR, result = dL_buf[0:nB], dR_buf[0:nB], result_buf[0:nB]
+                _np.take(d_prod_cache, left, axis=0, out=dL)
+                _np.take(d_prod_cache, right, axis=0, out=dR)
+                L, R = prod_cache[left][:, None, :, :], prod_cache[right][:, None, :, :]
+
+                _np.matmul(dL, R, out=result)
+                _np.matmul(L, dR, out=dL)  # dL is no longer needed, so reuse it
+                result += dL  # dot(dS, T) + dot(S, dT)
+                profiler.add_time("compute_dproduct_cache: dots", tm)
+                profiler.add_count("compute_dproduct_cache: dots", nB)
+
+                scale = scale_cache[dest] - (scale_cache[left] + scale_cache[right])
+                rescaled = abs(scale) > 1e-8
+                if _np.any(rescaled):
+                    result[rescaled] /= _np.exp(scale[rescaled])[:, None, None, None]
+
+                if nDerivCols > 0:
+                    flat_result = result.reshape((nB, -1))
+                    tiny = (flat_result.max(axis=1) < _DSMALL) & (flat_result.min(axis=1) > -_DSMALL)
+                    if _np.any(tiny & rescaled):
+                        _warnings.warn("Scaled dProd small in order to keep prod managable.")
+                    elif _np.any(tiny & ~rescaled & _np.any(flat_result != 0, axis=1)):
+                        _warnings.warn("Would have scaled dProd but now will not alter scale_cache.")
+
+                d_prod_cache[dest] = result
+
+    def _compute_tangent_product_cache(self, eval_tree, prod_cache, scale_cache, vec):
+        """
+        Computes the derivatives of the products in `prod_cache` along the parameter-space direction `vec`.
+
+        The returned `(cacheSize, dim, dim)` array equals `dot(dProdCache, vec)` for the `dProdCache`
+        computed by :method:`_compute_dproduct_cache` (and so is scaled in the same way as `prod_cache`),
+        but is computed with a single "forward-mode" sweep over the tree's evaluation levels.
+        """
+        leaves, levels = eval_tree.evaluation_levels()
+        dim = prod_cache.shape[1]
+        tangentCache = _np.zeros(prod_cache.shape, 'd')
+
+        for iDest, opLabel in leaves:  # "initial operations" that can be filled directly
+            if opLabel is not None:  # (the derivative of the identity is zero)
+                gate = self.model.circuit_layer_operator(opLabel, 'op')
+                dgate = _np.dot(gate.deriv_wrt_params(), vec[gate.gpindices_as_array()]).reshape((dim, dim))
+                tangentCache[iDest] = dgate / _np.exp(scale_cache[iDest])
+
+        for dest, right, left in levels:
+            # LEXICOGRAPHICAL VS MATRIX ORDER Note: see _compute_product_cache_by_levels
+            tangents = _np.matmul(tangentCache[left], prod_cache[right])
+            tangents += _np.matmul(prod_cache[left], tangentCache[right])  # dot(dS, T) + dot(S, dT)
+
+            scale = scale_cache[dest] - (scale_cache[left] + scale_cache[right])
+            rescaled = abs(scale) > 1e-8
+            if _np.any(rescaled):
+                tangents[rescaled] /= _np.exp(scale[rescaled])[:, None, None]
+            tangentCache[dest] = tangents
+
+        return tangentCache
+
+    def _accumulate_adjoint_product_cache(self, array_to_fill, eval_tree, prod_cache, scale_cache, adjoint_cache):
+        """
+        Adds to `array_to_fill` the gradient of a scalar function of the products in `prod_cache`.
+
+        On entry, `adjoint_cache[i]` holds the derivative of the function with respect to (the elements of)
+        the unscaled product `i`, multiplied by `exp(scale_cache[i])`, accounting *only* for the function's
+        direct dependence on product `i`.  A "reverse-mode" sweep over the tree's evaluation levels propagates
+        these to the products each product is composed of, and then to the model parameters of the
+        operations at the tree's leaves.  `adjoint_cache` is updated in place.
+        """
+        leaves, levels = eval_tree.evaluation_levels()
+
+        for dest, right, left in reversed(levels):  # all of an element's "parents" lie in later levels
+            adjoints = adjoint_cache[dest]
+            scale = scale_cache[dest] - (scale_cache[left] + scale_cache[right])
+            rescaled = abs(scale) > 1e-8
+            if _np.any(rescaled):
+                adjoints[rescaled] /= _np.exp(scale[rescaled])[:, None, None]
+
+            # d(S T) = dS T + S dT  =>  adjoint(S) += adjoint(S T) T^T and adjoint(T) += S^T adjoint(S T)
+            for indices, contrib in ((left, _np.matmul(adjoints, _np.transpose(prod_cache[right], (0, 2, 1)))),
+                                     (right, _np.matmul(_np.transpose(prod_cache[left], (0, 2, 1)), adjoints))):
+                if len(_np.unique(indices)) == len(indices):
+                    adjoint_cache[indices] += contrib
+                else:
+                    _np.add.at(adjoint_cache, indices, contrib)  # an element is used more than once in this level
+
+        for iDest, opLabel in leaves:
+            if opLabel is not None:
+                gate = self.model.circuit_layer_operator(opLabel, 'op')
+                gpindices = gate.gpindices_as_array()
+                if len(gpindices) > 0:
+                    array_to_fill[gpindices] += _np.dot(adjoint_cache[iDest].flatten(), gate.deriv_wrt_params()) \
+                        / _np.exp(scale_cache[iDest])
+
     def _compute_hproduct_cache(self, layout_atom_tree, prod_cache, d_prod_cache1,
                                 d_prod_cache2, scale_cache, resource_alloc=None,
                                 wrt_slice1=None, wrt_slice2=None):
@@ -1294,13 +1525,15 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         assert(_np.product((na,) + npp) <= nprocs), "Processor grid size exceeds available processors!"
 
         layout = _MatrixCOPALayout(circuits, self.model, dataset, natoms,
-                                   na, npp, param_dimensions, param_blk_sizes, resource_alloc, verbosity)
+                                   na, npp, param_dimensions, param_blk_sizes, resource_alloc, verbosity,
+                                   getattr(self, '_layout_cache_dir', None))
 
         if mem_limit is not None:
-            loc_nparams1 = num_params / npp[0] if len(npp) > 0 else 0
-            loc_nparams2 = num_params / npp[1] if len(npp) > 1 else 0
-            blk1 = param_blk_sizes[0] if len(param_blk_sizes) > 0 else 0
-            blk2 = param_blk_sizes[1] if len(param_blk_sizes) > 1 else 0
+            # parameter dimensions that the layout doesn't distribute are held in full by every processor
+            loc_nparams1 = num_params / npp[0] if len(npp) > 0 else num_params
+            loc_nparams2 = num_params / npp[1] if len(npp) > 1 else num_params
+            blk1 = param_blk_sizes[0] if len(param_blk_sizes) > 0 else None
+            blk2 = param_blk_sizes[1] if len(param_blk_sizes) > 1 else None
             if blk1 is None: blk1 = loc_nparams1
             if blk2 is None: blk2 = loc_nparams2
             global_layout = layout.global_layout
@@ -1317,7 +1550,7 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
                 max_atom_cachesize = layout.max_atom_cachesize
             mem_estimate = _bytes_for_array_types(array_types, global_layout.num_elements, max_local_els, max_atom_els,
                                                   global_layout.num_circuits, max_local_circuits,
-                                                  layout._param_dimensions, (loc_nparams1, loc_nparams2),
+                                                  (num_params, num_params), (loc_nparams1, loc_nparams2),
                                                   (blk1, blk2), max_atom_cachesize,
                                                   self.model.evotype.minimal_dim(self.model.state_space))
 
@@ -1625,6 +1858,71 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
 
         _np.seterr(**old_err)
 
+    def _rho_e_derivs_dot(self, spam_tuple, vec):
+        # Derivatives of the `_rho_e_from_spam_tuple` quantities along the parameter-space direction `vec`
+        rholabel, elabel = spam_tuple
+        rhoVec = self.model.circuit_layer_operator(rholabel, 'prep')
+        EVec = self.model.circuit_layer_operator(elabel, 'povm')
+        drho = _np.dot(rhoVec.deriv_wrt_params(), vec[rhoVec.gpindices_as_array()])[:, None]
+        dE = _np.conjugate(_np.dot(EVec.deriv_wrt_params(), vec[EVec.gpindices_as_array()]))[None, :]
+        return drho, dE
+
+    def _bulk_fill_dprobs_dot_atom(self, array_to_fill, layout_atom, vec, resource_alloc):
+        dim = self.model.evotype.minimal_dim(self.model.state_space)
+        resource_alloc.check_can_allocate_memory(2 * layout_atom.cache_size * dim**2)  # prod & tangent caches
+        prodCache, scaleCache = self._compute_product_cache(layout_atom.tree, resource_alloc)
+        if not resource_alloc.is_host_leader:
+            return  # Non-root host processors aren't used anymore to compute the result on the root proc
+
+        tangentCache = self._compute_tangent_product_cache(layout_atom.tree, prodCache, scaleCache, vec)
+        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scaleCache))
+        Gs = layout_atom.nonscratch_cache_view(prodCache, axis=0)
+        dGs = layout_atom.nonscratch_cache_view(tangentCache, axis=0)
+
+        old_err = _np.seterr(invalid='ignore', over='ignore')
+        for spam_tuple, (element_indices, tree_indices) in layout_atom.indices_by_spamtuple.items():
+            rho, E = self._rho_e_from_spam_tuple(spam_tuple)
+            drho, dE = self._rho_e_derivs_dot(spam_tuple, vec)
+            gs = Gs[tree_indices]
+            # d(E G rho) = E dG rho + dE G rho + E G drho  (each term has shape (1, nCircuits, 1))
+            dp = _np.dot(E, _np.dot(dGs[tree_indices], rho)) + _np.dot(dE, _np.dot(gs, rho)) \
+                + _np.dot(E, _np.dot(gs, drho))
+            dp = _np.squeeze(dp, axis=(0, 2)) * scaleVals[tree_indices]
+            dp[_np.isnan(dp)] = 0  # as in _dprobs_from_rho_e
+            _fas(array_to_fill, [element_indices], dp)
+        _np.seterr(**old_err)
+
+    def _bulk_fill_dprobs_transpose_dot_atom(self, array_to_fill, layout_atom, vec, resource_alloc):
+        dim = self.model.evotype.minimal_dim(self.model.state_space)
+        resource_alloc.check_can_allocate_memory(2 * layout_atom.cache_size * dim**2)  # prod & adjoint caches
+        prodCache, scaleCache = self._compute_product_cache(layout_atom.tree, resource_alloc)
+        if not resource_alloc.is_host_leader:
+            return  # Non-root host processors aren't used anymore to compute the result on the root proc
+
+        adjointCache = _np.zeros(prodCache.shape, 'd')
+        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scaleCache))
+        Gs = layout_atom.nonscratch_cache_view(prodCache, axis=0)
+        adjoints = layout_atom.nonscratch_cache_view(adjointCache, axis=0)
+
+        old_err = _np.seterr(invalid='ignore', over='ignore')
+        for spam_tuple, (element_indices, tree_indices) in layout_atom.indices_by_spamtuple.items():
+            rho, E = self._rho_e_from_spam_tuple(spam_tuple)
+            rhoVec = self.model.circuit_layer_operator(spam_tuple[0], 'prep')
+            EVec = self.model.circuit_layer_operator(spam_tuple[1], 'povm')
+            gs = Gs[tree_indices]
+            weights = vec[element_indices] * scaleVals[tree_indices]
+            weights[_np.isnan(weights)] = 0
+
+            # p = E G rho  =>  dp/dG = outer(E, rho), dp/drho = E G, and dp/dE = G rho
+            adjoints[tree_indices] += weights[:, None, None] * _np.outer(E[0], rho[:, 0])[None, :, :]
+            array_to_fill[rhoVec.gpindices_as_array()] += _np.dot(_np.dot(weights, _np.dot(E, gs)[0]),
+                                                                  rhoVec.deriv_wrt_params())
+            array_to_fill[EVec.gpindices_as_array()] += _np.dot(_np.dot(weights, _np.dot(gs, rho)[:, :, 0]),
+                                                                EVec.deriv_wrt_params())
+        _np.seterr(**old_err)
+
+        self._accumulate_adjoint_product_cache(array_to_fill, layout_atom.tree, prodCache, scaleCache, adjointCache)
+
     def _bulk_fill_hprobs_atom(self, array_to_fill, dest_param_slice1, dest_param_slice2, layout_atom,
                                param_slice1, param_slice2, resource_alloc):
         dim = self.model.evotype.minimal_dim(self.model.state_space)
@@ -1807,6 +2105,48 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
     ## TIME DEPENDENT functionality ----------------------------------------------------------------
     ## ---------------------------------------------------------------------------------------------
 
+    def _set_model_time(self, timestamp):
+        for _, obj in self.model._iter_parameterized_objs():
+            obj.set_time(timestamp)
+        for opcache in self.model._opcaches.values():
+            for obj in opcache.values():
+                obj.set_time(timestamp)
+
+    def _bulk_fill_probs_at_timestamps(self, array_to_fill, layout, timestamps):
+        """Note: `array_to_fill` is a purely local (not shared-memory) array, so all processors compute their atoms"""
+        for atom in layout.atoms:  # layout only holds local atoms
+            self._bulk_fill_probs_atom_at_timestamps(array_to_fill[:, atom.element_slice], atom, timestamps)
+
+    def _bulk_fill_probs_atom_at_timestamps(self, array_to_fill, layout_atom, timestamps):
+        # The atom's evaluation tree is reused for all the timestamps, and after the first timestamp only the
+        # products involving operations whose matrices have changed (i.e. time-dependent ones) are recomputed.
+        caches = prev_op_mxs = None
+        for probs_at_t, timestamp in zip(array_to_fill, timestamps):
+            self._set_model_time(timestamp)
+
+            op_mxs = {op_label: self.model.circuit_layer_operator(op_label, 'op').to_dense(on_space='minimal').copy()
+                      for _, iRight, op_label in layout_atom.tree
+                      if (iRight is None and op_label is not None)}  # the tree's "initial operations"
+            if caches is None:
+                caches = self._compute_product_cache(layout_atom.tree, None)
+            else:
+                changed_op_labels = set([op_label for op_label, mx in op_mxs.items()
+                                         if not _np.array_equal(mx, prev_op_mxs[op_label])])
+                if len(changed_op_labels) > 0:
+                    self._compute_product_cache(layout_atom.tree, None, caches, changed_op_labels)
+            prev_op_mxs = op_mxs
+            prodCache, scaleCache = caches
+
+            scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scaleCache))
+            Gs = layout_atom.nonscratch_cache_view(prodCache, axis=0)
+
+            old_err = _np.seterr(over='ignore')
+            for spam_tuple, (element_indices, tree_indices) in layout_atom.indices_by_spamtuple.items():
+                rho, E = self._rho_e_from_spam_tuple(spam_tuple)  # SPAM reps are evaluated at `timestamp`
+                _fas(probs_at_t, [element_indices],
+                     self._probs_from_rho_e(rho, E, Gs[tree_indices], scaleVals[tree_indices]))
+            _np.seterr(**old_err)
+
     def _ds_quantities(self, timestamp, ds_cache, layout, dataset, TIMETOL=1e-6):
         if timestamp not in ds_cache:
             if 'truncated_ds' not in ds_cache:
@@ -1892,11 +2232,7 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
                 self._ds_quantities(timestamp, ds_cache, layout, dataset)
             if counts is None: return  # no data at this time => no contribution
 
-            for _, obj in self.model._iter_parameterized_objs():
-                obj.set_time(timestamp)
-            for opcache in self.model._opcaches.values():
-                for obj in opcache.values():
-                    obj.set_time(timestamp)
+            self._set_model_time(timestamp)
 
             for atom in layout.atoms:  # layout only holds local atoms
                 self._bulk_fill_probs_atom(probs_array[atom.element_slice], atom, timestamp_processing_ralloc)
@@ -1956,11 +2292,7 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
             counts, totals, freqs, firsts, indicesOfCircuitsWithOmittedData = \
                 self._ds_quantities(timestamp, ds_cache, layout, dataset)
 
-            for _, obj in self.model._iter_parameterized_objs():
-                obj.set_time(timestamp)
-            for opcache in self.model._opcaches.values():
-                for obj in opcache.values():
-                    obj.set_time(timestamp)
+            self._set_model_time(timestamp)
 
             for atom in layout.atoms:  # layout only holds local atoms
                 self._bulk_fill_probs_atom(probs_array, atom, timestamp_processing_ralloc)
@@ -23,17 +23,18 @@ from pygsti import data as _data
 
 def load_dataset(filename, cache=False, collision_action="aggregate",
                  record_zero_counts=True, ignore_zero_count_lines=True,
-                 with_times="auto", circuit_parse_cache=None, verbosity=1):
+                 with_times="auto", circuit_parse_cache=None, num_processors=1, verbosity=1):
     """
     Load a DataSet from a file.
 
-    This function first tries to load file as a saved DataSet object,
-    then as a standard text-formatted DataSet.
+    This function first tries to load file as a saved DataSet object
+    (or a directory holding a columnar-format DataSet, see
+    :meth:`DataSet.save_columnar`), then as a standard text-formatted DataSet.
 
     Parameters
     ----------
     filename : string
-        The name of the file
+        The name of the file or columnar-format directory.
 
     cache : bool, optional
         When set to True, a pickle file with the name filename + ".cache"
@@ -70,6 +71,12 @@ def load_dataset(filename, cache=False, collision_action="aggregate",
         :class:`Circuit` objects, which can improve performance by reducing
         or eliminating the need to parse circuit strings.
 
+    num_processors : int or None, optional
+        The number of processes used to parse a text-formatted file.  When
+        not 1, the file is split into chunks that are parsed in parallel (see
+        :meth:`StdInputParser.parse_datafile_chunked`).  `None` means use all
+        available CPUs.
+
     verbosity : int, optional
         If zero, no output is shown.  If greater than zero,
         loading progress is shown.
@@ -79,6 +86,20 @@ def load_dataset(filename, cache=False, collision_action="aggregate",
     DataSet
     """
 
+    def parse_datafile(to_stdout):
+        parser = _stdinput.StdInputParser()
+        if num_processors == 1:
+            return parser.parse_datafile(filename, to_stdout,
+                                         collision_action=collision_action,
+                                         record_zero_counts=record_zero_counts,
+                                         ignore_zero_count_lines=ignore_zero_count_lines,
+                                         with_times=with_times)
+        return parser.parse_datafile_chunked(filename, num_processors,
+                                             collision_action=collision_action,
+                                             record_zero_counts=record_zero_counts,
+                                             ignore_zero_count_lines=ignore_zero_count_lines,
+                                             with_times=with_times, verbosity=printer)
+
     printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
     try:
         # a saved Dataset object is ok
@@ -104,25 +125,15 @@ def load_dataset(filename, cache=False, collision_action="aggregate",
                             + "be created after loading is completed")
 
             # otherwise must use standard dataset file format
-            parser = _stdinput.StdInputParser()
-            ds = parser.parse_datafile(filename, bToStdout,
-                                       collision_action=collision_action,
-                                       record_zero_counts=record_zero_counts,
-                                       ignore_zero_count_lines=ignore_zero_count_lines,
-                                       with_times=with_times)
+            ds = parse_datafile(bToStdout)
 
             printer.log("Writing cache file (to speed future loads): %s"
                         % cache_filename)
             ds.save(cache_filename)
         else:
             # otherwise must use standard dataset file format
-            parser = _stdinput.StdInputParser()
-            ds = parser.parse_datafile(filename, bToStdout,
-                                       collision_action=collision_action,
-                                       record_zero_counts=record_zero_counts,
-                                       ignore_zero_count_lines=ignore_zero_count_lines,
-                                       with_times=with_times)
-        return ds
+            ds = parse_datafile(bToStdout)
+    return ds
 
 
 def load_multidataset(filename, cache=False, collision_action="aggregate",
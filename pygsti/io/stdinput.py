@@ -11,10 +11,13 @@ Text-parsing classes and functions to read input files.
 #***************************************************************************************************
 
 import ast as _ast
+import functools as _functools
+import multiprocessing as _mp
 import os as _os
 import re as _re
 import sys as _sys
 import time as _time
+import uuid as _uuid
 import warnings as _warnings
 from collections import OrderedDict as _OrderedDict
 
@@ -32,6 +35,8 @@ from pygsti.models import gaugegroup as _gaugegroup
 from pygsti.circuits.circuit import Circuit as _Circuit
 from pygsti.circuits.circuitparser import CircuitParser as _CircuitParser
 from pygsti.data import DataSet as _DataSet, MultiDataSet as _MultiDataSet
+from pygsti.data.dataset import Oindex_type as _Oindex_type, Time_type as _Time_type, \
+    Repcount_type as _Repcount_type
 
 # A dictionary mapping qubit string representations into created
 # :class:`Circuit` objects, which can improve performance by reducing
@@ -397,56 +402,8 @@ class StdInputParser(object):
             A static DataSet object.
         """
 
-        #Parse preamble -- lines beginning with # or ## until first non-# line
-        preamble_directives = {}
-        preamble_comments = []
-        with open(filename, 'r') as datafile:
-            for line in datafile:
-                line = line.strip()
-                if len(line) == 0 or line[0] != '#': break
-                if line.startswith("## "):
-                    parts = line[len("## "):].split("=")
-                    if len(parts) == 2:  # key = value
-                        preamble_directives[parts[0].strip()] = parts[1].strip()
-                elif line.startswith("#"):
-                    preamble_comments.append(line[1:].strip())
-
-        def str_to_outcome(x):  # always return a tuple as the "outcome label" (even if length 1)
-            return tuple(x.strip().split(":"))
-
-        #Process premble
-        orig_cwd = _os.getcwd()
-        outcomeLabels = None
-        outcome_labels_specified_in_preamble = False
-        if len(_os.path.dirname(filename)) > 0: _os.chdir(
-            _os.path.dirname(filename))  # allow paths relative to datafile path
-        try:
-            if 'Lookup' in preamble_directives:
-                lookupDict = self.parse_dictfile(preamble_directives['Lookup'])
-            else: lookupDict = {}
-            if 'Columns' in preamble_directives:
-                colLabels = [l.strip() for l in preamble_directives['Columns'].split(",")]
-                #OLD: outcomeLabels, fillInfo = self._extract_labels_from_col_labels(colLabels)
-                fixed_column_outcome_labels = []
-                for i, colLabel in enumerate(colLabels):
-                    assert(colLabel.endswith(' count')), \
-                        "Invalid count column name `%s`! (Only *count* columns are supported now)" % colLabel
-                    outcomeLabel = str_to_outcome(colLabel[:-len(' count')])
-                    if outcomeLabel not in fixed_column_outcome_labels:
-                        fixed_column_outcome_labels.append(outcomeLabel)
-
-                nDataCols = len(colLabels)
-            else:
-                fixed_column_outcome_labels = None
-                nDataCols = -1  # no column count check
-            if 'Outcomes' in preamble_directives:
-                outcomeLabels = [l.strip().split(':') for l in preamble_directives['Outcomes'].split(",")]
-                outcome_labels_specified_in_preamble = True
-            if 'StdOutcomeQubits' in preamble_directives:
-                outcomeLabels = int(preamble_directives['Outcomes'])
-                outcome_labels_specified_in_preamble = True
-        finally:
-            _os.chdir(orig_cwd)
+        lookupDict, nDataCols, fixed_column_outcome_labels, outcomeLabels, outcome_labels_specified_in_preamble, \
+            preamble_comments = self._parse_datafile_preamble(filename)
 
         #Read data lines of data file
         dataset = _DataSet(outcome_labels=outcomeLabels, collision_action=collision_action,
@@ -467,23 +424,6 @@ class StdInputParser(object):
         warnings = []  # to display *after* display progress
         looking_for = "circuit_line"; current_item = {}
 
-        def parse_comment(comment, filename, i_line):
-            commentDict = {}
-            comment = comment.strip()
-            if len(comment) == 0: return {}
-            try:
-                if comment.startswith("{") and comment.endswith("}"):
-                    commentDict = _ast.literal_eval(comment)
-                else:  # put brackets around it
-                    commentDict = _ast.literal_eval("{ " + comment + " }")
-                #commentDict = _json.loads("{ " + comment + " }")
-                #Alt: safer(?) & faster, but need quotes around all keys & vals
-            except:
-                commentDict = {}
-                warnings.append("%s Line %d: Could not parse comment '%s'"
-                                % (filename, i_line, comment))
-            return commentDict
-
         last_circuit = last_commentDict = None
 
         with open(filename, 'r') as inputfile:
@@ -518,7 +458,7 @@ class StdInputParser(object):
                             self.parse_dataline(dataline, lookupDict, nDataCols,
                                                 create_subcircuits=not _Circuit.default_expand_subcircuits)
 
-                        commentDict = parse_comment(comment, filename, iLine)
+                        commentDict = _parse_comment(comment, filename, iLine, warnings)
 
                     except ValueError as e:
                         raise ValueError("%s Line %d: %s" % (filename, iLine, str(e)))
@@ -601,7 +541,7 @@ class StdInputParser(object):
                             except ValueError:  # raised if int(x) fails b/c reps are floats
                                 current_item['repetitions'] = [float(x) for x in parts[1:]]
                         elif parts[0] == 'aux:':
-                            current_item['aux'] = parse_comment(" ".join(parts[1:]), filename, iLine)
+                            current_item['aux'] = _parse_comment(" ".join(parts[1:]), filename, iLine, warnings)
                         else:
                             raise ValueError("Invalid circuit data-line prefix: '%s'" % parts[0])
 
@@ -619,6 +559,297 @@ class StdInputParser(object):
         dataset.done_adding_data()
         return dataset
 
+    def parse_datafile_chunked(self, filename, num_processors=None, chunk_size=2**24,
+                               collision_action="aggregate", record_zero_counts=True,
+                               ignore_zero_count_lines=True, with_times="auto", verbosity=0):
+        """
+        Parse a data set file into a DataSet object using a pool of processes.
+
+        The file is split at line boundaries into chunks of roughly `chunk_size`
+        bytes which are parsed in parallel (see :meth:`iter_datafile_chunks`), and
+        the parsed chunks are merged directly into a static DataSet.  This is much
+        faster than :meth:`parse_datafile` for large count-data files.  Files in
+        the time-stamped format can't be split into chunks, and are parsed by
+        :meth:`parse_datafile` instead.
+
+        Parameters
+        ----------
+        filename : string
+            The file to parse.
+
+        num_processors : int, optional
+            The number of processes to parse chunks with.  If `None`, the number
+            of CPUs is used.  If 1, all chunks are parsed by the current process.
+
+        chunk_size : int, optional
+            The approximate number of bytes in each chunk.
+
+        collision_action : {"aggregate", "keepseparate"}
+            Specifies how duplicate circuits should be handled.  "aggregate"
+            adds duplicate-circuit counts, whereas "keepseparate" tags duplicate
+            circuits by setting their `.occurrence` IDs to sequential positive integers.
+
+        record_zero_counts : bool, optional
+            Whether zero-counts are actually recorded (stored) in the returned
+            DataSet.  If False, then zero counts are ignored, except for potentially
+            registering new outcome labels.
+
+        ignore_zero_count_lines : bool, optional
+            Whether circuits for which there are no counts should be ignored
+            (i.e. omitted from the DataSet) or not.
+
+        with_times : bool or "auto", optional
+            Whether to the time-stamped data format should be read in.  If
+            "auto", then this format is allowed but not required.  Typically
+            you only need to set this to False when reading in a template file.
+
+        verbosity : int or VerbosityPrinter, optional
+            If greater than zero, the parsing throughput is reported.
+
+        Returns
+        -------
+        DataSet
+            A static DataSet object.
+        """
+        printer = _baseobjs.VerbosityPrinter.create_printer(verbosity)
+        if with_times is True:  # every circuit is followed by a time-stamped data block
+            return self.parse_datafile(filename, False, collision_action, record_zero_counts,
+                                       ignore_zero_count_lines, with_times)
+
+        preamble = self._parse_datafile_preamble(filename)
+        _, _, _, outcomeLabels, outcome_labels_specified_in_preamble, preamble_comments = preamble
+        olIndex = _DataSet(outcome_labels=outcomeLabels).olIndex if outcome_labels_specified_in_preamble \
+            else _OrderedDict()
+
+        circuits = []; row_lengths = []; outcome_indices = []; counts = []; aux_info = {}; warnings = []
+        filesize = _os.path.getsize(filename); nbytes = 0; tStart = _time.time()
+        for chunk in self._iter_datafile_chunk_results(filename, preamble, num_processors, chunk_size,
+                                                       record_zero_counts, ignore_zero_count_lines, with_times):
+            if chunk['timestamped']:
+                printer.log("Found time-stamped data in %s: parsing without chunks." % str(filename), 2)
+                return self.parse_datafile(filename, False, collision_action, record_zero_counts,
+                                           ignore_zero_count_lines, with_times)
+
+            if outcome_labels_specified_in_preamble:
+                outcome_indices.append(chunk['outcome_indices'])
+            else:  # map chunk-local outcome indices to those of the entire file
+                index_map = _np.array([olIndex.setdefault(ol, len(olIndex)) for ol in chunk['outcome_labels']],
+                                      _Oindex_type)
+                outcome_indices.append(index_map[chunk['outcome_indices']])
+            aux_info.update({chunk['circuits'][i]: aux for i, aux in chunk['aux'].items()})
+            circuits.extend(chunk['circuits'])
+            row_lengths.append(chunk['row_lengths'])
+            counts.append(chunk['counts'])
+            warnings.extend(chunk['warnings'])
+
+            nbytes += chunk['nbytes']
+            printer.log("Parsed %.1f of %.1f MB (%.1f MB/s)"
+                        % (nbytes / 1e6, filesize / 1e6, nbytes / 1e6 / max(_time.time() - tStart, 1e-6)), 2)
+
+        if warnings:
+            _warnings.warn('\n'.join(warnings))
+
+        offsets = _np.concatenate([[0], _np.cumsum(_np.concatenate(row_lengths + [_np.zeros(0, _np.int64)]))])
+        oliData = _np.concatenate(outcome_indices + [_np.zeros(0, _Oindex_type)])
+        repData = _np.concatenate(counts + [_np.zeros(0, _Repcount_type)])
+        if len(set(circuits)) == len(circuits):  # no duplicate circuits, so rows can be used as-is
+            circuit_indices = _OrderedDict([(circuit, slice(int(i), int(j))) for circuit, i, j
+                                            in zip(circuits, offsets[:-1], offsets[1:])])
+            dataset = _DataSet(oliData, _np.zeros(len(oliData), _Time_type), repData,
+                               circuit_indices=circuit_indices, outcome_label_indices=olIndex, static=True,
+                               collision_action=collision_action, comment="\n".join(preamble_comments),
+                               aux_info=aux_info)
+            dataset.uuid = _uuid.uuid4()
+        else:  # let the DataSet handle duplicates according to `collision_action`
+            dataset = _DataSet(outcome_label_indices=olIndex, collision_action=collision_action,
+                               comment="\n".join(preamble_comments))
+            for circuit, i, j in zip(circuits, offsets[:-1], offsets[1:]):
+                dataset.add_count_arrays(circuit, oliData[i:j], repData[i:j], aux=aux_info.get(circuit, {}))
+            dataset.done_adding_data()
+
+        tElapsed = _time.time() - tStart
+        printer.log("Parsed %d circuits from %s in %.1fs (%.1f MB/s)"
+                    % (len(dataset), str(filename), tElapsed, filesize / 1e6 / max(tElapsed, 1e-6)), 1)
+        return dataset
+
+    def iter_datafile_chunks(self, filename, num_processors=None, chunk_size=2**24,
+                             record_zero_counts=True, ignore_zero_count_lines=True):
+        """
+        Parse a data set file in chunks, iterating over the parsed chunks in file order.
+
+        The file is split at line boundaries into chunks of roughly `chunk_size`
+        bytes, which are parsed by a pool of processes.  Since each parsed chunk
+        only holds compact arrays, this can be used to process files that are
+        too large to load into memory at once.  Time-stamped data can't be
+        parsed this way.
+
+        Parameters
+        ----------
+        filename : string
+            The file to parse.
+
+        num_processors : int, optional
+            The number of processes to parse chunks with.  If `None`, the number
+            of CPUs is used.  If 1, all chunks are parsed by the current process.
+
+        chunk_size : int, optional
+            The approximate number of bytes in each chunk.
+
+        record_zero_counts : bool, optional
+            Whether zero-counts are included in the parsed chunks.
+
+        ignore_zero_count_lines : bool, optional
+            Whether circuits for which there are no counts should be omitted
+            from the parsed chunks.
+
+        Returns
+        -------
+        generator
+            Yields a dictionary for each chunk with keys:
+
+            - `"circuits"`: a list of the chunk's circuits.
+            - `"row_lengths"`: an array giving the number of counts for each circuit.
+            - `"outcome_indices"`: an array of the (concatenated) outcome indices of
+              each circuit's counts.  These index the `"outcome_labels"` list.
+            - `"counts"`: an array of the (concatenated) counts of each circuit.
+            - `"outcome_labels"`: the outcome labels referenced by `"outcome_indices"`.
+            - `"aux"`: a dictionary of auxiliary-information dictionaries, keyed by
+              the index of each circuit that has any.
+            - `"warnings"`: a list of warning messages.
+            - `"nbytes"`: the number of bytes in the chunk.
+        """
+        preamble = self._parse_datafile_preamble(filename)
+        for chunk in self._iter_datafile_chunk_results(filename, preamble, num_processors, chunk_size,
+                                                       record_zero_counts, ignore_zero_count_lines, "auto"):
+            if chunk['timestamped']:
+                raise ValueError("%s contains time-stamped data, which can't be parsed in chunks" % str(filename))
+            yield {k: v for k, v in chunk.items() if k not in ('timestamped', 'first_line_blank', 'trailing_circuit')}
+
+    def _iter_datafile_chunk_results(self, filename, preamble, num_processors, chunk_size,
+                                     record_zero_counts, ignore_zero_count_lines, with_times):
+        lookupDict, nDataCols, fixed_column_outcome_labels, outcomeLabels, outcome_labels_specified_in_preamble, _ \
+            = preamble
+        olIndex = _DataSet(outcome_labels=outcomeLabels).olIndex if outcome_labels_specified_in_preamble else None
+        filesize = _os.path.getsize(filename)
+        if num_processors is None: num_processors = _mp.cpu_count()
+
+        def byte_ranges():  # chunks of ~chunk_size bytes, ending at line boundaries
+            with open(filename, 'rb') as f:
+                start = 0
+                while start < filesize:
+                    f.seek(min(start + chunk_size, filesize)); f.readline()
+                    yield (start, f.tell())
+                    start = f.tell()
+
+        parse_chunk = _functools.partial(_parse_datafile_chunk, filename=filename, lookup=lookupDict,
+                                         num_data_cols=nDataCols,
+                                         fixed_column_outcome_labels=fixed_column_outcome_labels,
+                                         outcome_label_indices=olIndex, record_zero_counts=record_zero_counts,
+                                         ignore_zero_count_lines=ignore_zero_count_lines, with_times=with_times,
+                                         create_subcircuits=not _Circuit.default_expand_subcircuits)
+
+        def resolve_trailing_circuit(chunk, next_chunk):
+            # A chunk's final line may hold just a circuit, which (as in parse_datafile) is added without
+            # data when it's followed by a blank line or the end of the file, or when zero-count lines are kept.
+            if chunk['trailing_circuit'] is None: return chunk
+            if next_chunk is None or next_chunk['first_line_blank'] or ignore_zero_count_lines is False:
+                circuit, aux = chunk['trailing_circuit']
+                if aux: chunk['aux'][len(chunk['circuits'])] = aux
+                chunk['circuits'].append(circuit)
+                chunk['row_lengths'] = _np.append(chunk['row_lengths'], 0)
+            chunk['trailing_circuit'] = None
+            return chunk
+
+        def resolved(chunks):
+            last_chunk = None
+            for chunk in chunks:
+                if last_chunk is not None: yield resolve_trailing_circuit(last_chunk, chunk)
+                last_chunk = chunk
+            if last_chunk is not None: yield resolve_trailing_circuit(last_chunk, None)
+
+        if num_processors == 1:
+            yield from resolved(map(parse_chunk, byte_ranges()))
+        else:
+            with _mp.Pool(num_processors) as pool:
+                yield from resolved(pool.imap(parse_chunk, byte_ranges()))
+
+    def _parse_datafile_preamble(self, filename):
+        """
+        Parse the preamble (the initial comment and directive lines) of a data set file.
+
+        Parameters
+        ----------
+        filename : string
+            The data set file.
+
+        Returns
+        -------
+        lookup_dict : dict
+            The circuit lookup dictionary given by any "Lookup" directive.
+        num_data_cols : int
+            The number of count columns, or -1 when the file isn't in fixed-column format.
+        fixed_column_outcome_labels : list or None
+            The outcome labels of the count columns in fixed-column format.
+        outcome_labels : list or int or None
+            The outcome labels specified in the preamble, if any.
+        outcome_labels_specified : bool
+            Whether `outcome_labels` were specified in the preamble.
+        comments : list
+            The preamble's comment lines.
+        """
+        #Parse preamble -- lines beginning with # or ## until first non-# line
+        preamble_directives = {}
+        preamble_comments = []
+        with open(filename, 'r') as datafile:
+            for line in datafile:
+                line = line.strip()
+                if len(line) == 0 or line[0] != '#': break
+                if line.startswith("## "):
+                    parts = line[len("## "):].split("=")
+                    if len(parts) == 2:  # key = value
+                        preamble_directives[parts[0].strip()] = parts[1].strip()
+                elif line.startswith("#"):
+                    preamble_comments.append(line[1:].strip())
+
+        def str_to_outcome(x):  # always return a tuple as the "outcome label" (even if length 1)
+            return tuple(x.strip().split(":"))
+
+        #Process premble
+        orig_cwd = _os.getcwd()
+        outcomeLabels = None
+        outcome_labels_specified_in_preamble = False
+        if len(_os.path.dirname(filename)) > 0: _os.chdir(
+            _os.path.dirname(filename))  # allow paths relative to datafile path
+        try:
+            if 'Lookup' in preamble_directives:
+                lookupDict = self.parse_dictfile(preamble_directives['Lookup'])
+            else: lookupDict = {}
+            if 'Columns' in preamble_directives:
+                colLabels = [l.strip() for l in preamble_directives['Columns'].split(",")]
+                #OLD: outcomeLabels, fillInfo = self._extract_labels_from_col_labels(colLabels)
+                fixed_column_outcome_labels = []
+                for i, colLabel in enumerate(colLabels):
+                    assert(colLabel.endswith(' count')), \
+                        "Invalid count column name `%s`! (Only *count* columns are supported now)" % colLabel
+                    outcomeLabel = str_to_outcome(colLabel[:-len(' count')])
+                    if outcomeLabel not in fixed_column_outcome_labels:
+                        fixed_column_outcome_labels.append(outcomeLabel)
+
+                nDataCols = len(colLabels)
+            else:
+                fixed_column_outcome_labels = None
+                nDataCols = -1  # no column count check
+            if 'Outcomes' in preamble_directives:
+                outcomeLabels = [l.strip().split(':') for l in preamble_directives['Outcomes'].split(",")]
+                outcome_labels_specified_in_preamble = True
+            if 'StdOutcomeQubits' in preamble_directives:
+                outcomeLabels = int(preamble_directives['Outcomes'])
+                outcome_labels_specified_in_preamble = True
+        finally:
+            _os.chdir(orig_cwd)
+        return lookupDict, nDataCols, fixed_column_outcome_labels, outcomeLabels, \
+            outcome_labels_specified_in_preamble, preamble_comments
+
     def parse_multidatafile(self, filename, show_progress=True,
                             collision_action="aggregate", record_zero_counts=True, ignore_zero_count_lines=True):
         """
@@ -935,6 +1166,179 @@ class StdInputParser(object):
         return dataset
 
 
+def _parse_comment(comment, filename, i_line, warnings):
+    """
+    Parse the comment of a data-file line into an auxiliary-information dictionary.
+
+    Parameters
+    ----------
+    comment : str
+        The comment, i.e. the text following a '#' character.
+
+    filename : str
+        The name of the file being parsed (for warning messages).
+
+    i_line : int
+        The line number being parsed (for warning messages).
+
+    warnings : list
+        A list that any warning messages are appended to.
+
+    Returns
+    -------
+    dict
+    """
+    commentDict = {}
+    comment = comment.strip()
+    if len(comment) == 0: return {}
+    try:
+        if comment.startswith("{") and comment.endswith("}"):
+            commentDict = _ast.literal_eval(comment)
+        else:  # put brackets around it
+            commentDict = _ast.literal_eval("{ " + comment + " }")
+        #commentDict = _json.loads("{ " + comment + " }")
+        #Alt: safer(?) & faster, but need quotes around all keys & vals
+    except:
+        commentDict = {}
+        warnings.append("%s Line %d: Could not parse comment '%s'"
+                        % (filename, i_line, comment))
+    return commentDict
+
+
+def _parse_datafile_chunk(byte_range, filename, lookup, num_data_cols, fixed_column_outcome_labels,
+                          outcome_label_indices, record_zero_counts, ignore_zero_count_lines, with_times,
+                          create_subcircuits):
+    """
+    Parse the (count-format) data lines of a data set file lying within a range of bytes.
+
+    This is the unit of work of :meth:`StdInputParser.iter_datafile_chunks`,
+    and is a module-level function so it can be run by a process pool.
+
+    Parameters
+    ----------
+    byte_range : tuple
+        A `(start, end)` tuple of byte offsets into the file, which must lie
+        at line boundaries.
+
+    filename : str
+        The data set file.
+
+    lookup : dict
+        A dictionary with keys == reflbls and values == tuples of operation labels
+        which can be used for substitutions using the S<reflbl> syntax.
+
+    num_data_cols : int
+        The number of count columns, or -1 when the file isn't in fixed-column format.
+
+    fixed_column_outcome_labels : list or None
+        The outcome labels of the count columns in fixed-column format.
+
+    outcome_label_indices : dict or None
+        The outcome-label indices to use, as specified by the file's preamble.  If
+        `None`, outcome labels are assigned chunk-local indices as they are found.
+
+    record_zero_counts : bool
+        Whether zero-counts are recorded.
+
+    ignore_zero_count_lines : bool
+        Whether circuits for which there are no counts should be ignored.
+
+    with_times : bool or "auto"
+        Whether the time-stamped data format is allowed (`"auto"`) or not (`False`).
+
+    create_subcircuits : bool
+        Whether to create sub-circuit-labels when parsing circuit strings.
+
+    Returns
+    -------
+    dict
+    """
+    start, end = byte_range
+    parser = StdInputParser()
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode().splitlines()
+
+    outcomeLabelIndices = _OrderedDict() if (outcome_label_indices is None) else outcome_label_indices
+    circuits = []; row_lengths = []; outcome_indices = []; counts = []; aux = {}; warnings = []
+    first_line_blank = None; pending = None; timestamped = False; layer_labels = {}
+
+    def add_row(circuit, oli, cnts, comment_dict):
+        if comment_dict: aux[len(circuits)] = comment_dict
+        circuits.append(circuit); row_lengths.append(len(oli))
+        outcome_indices.extend(oli); counts.extend(cnts)
+
+    for iLine, line in enumerate(lines):
+        line = line.strip()
+        if '#' in line:
+            i = line.index('#')
+            dataline, comment = line[:i], line[i + 1:]
+        else:
+            dataline, comment = line, ""
+        if first_line_blank is None: first_line_blank = (len(dataline) == 0)
+
+        if pending is not None:
+            # the previous line held just a circuit, which (like parse_datafile) we add without any data when it's
+            # followed by a blank line -- an empty time-stamped data block -- or when zero-count lines are kept.
+            if len(dataline) == 0 or ignore_zero_count_lines is False: add_row(pending[0], [], [], pending[1])
+            pending = None
+
+        if len(dataline) == 0: continue
+        parts = dataline.split()
+        if parts[0] in ('times:', 'outcomes:', 'repetitions:', 'aux:'):
+            timestamped = True; break  # time-stamped data blocks can't be parsed in chunks
+
+        try:
+            circuit, valueList = parser.parse_dataline(dataline, lookup, num_data_cols,
+                                                       create_subcircuits=create_subcircuits)
+            commentDict = _parse_comment(comment, filename, iLine, warnings)
+        except ValueError as e:
+            raise ValueError("%s Line %d of chunk at byte %d: %s" % (filename, iLine, start, str(e)))
+        circuit._labels = tuple([layer_labels.setdefault(l, l) for l in circuit._labels])  # share equal labels so
+        # that each distinct label is only pickled once when the results are sent back from a worker process.
+
+        if with_times is False or len(valueList) > 0:
+            if 'BAD' in valueList:  # entire line is known to be BAD => no data for this circuit
+                labels, count_values = [], []
+            elif fixed_column_outcome_labels is not None:
+                labels_and_values = [(nm, v) for (nm, v) in zip(fixed_column_outcome_labels, valueList)
+                                     if v != '--']  # drop "empty" sentinels
+                labels, count_values = zip(*labels_and_values) if len(labels_and_values) else ([], [])
+            else:  # valueList is a list of (outcomeLabel, count) tuples -- see parse_dataline
+                labels, count_values = zip(*valueList) if len(valueList) else ([], [])
+
+            if outcome_label_indices is None:
+                oli = [outcomeLabelIndices.setdefault(ol, len(outcomeLabelIndices)) for ol in labels]
+            else:
+                oli = [outcomeLabelIndices[ol] for ol in labels]
+
+            if all([(abs(v) < 1e-9) for v in count_values]) and ignore_zero_count_lines is True:
+                if not ('BAD' in valueList):  # supress "no data" warning for known-bad circuits
+                    s = circuit.str if len(circuit.str) < 40 else circuit.str[0:37] + "..."
+                    warnings.append("Dataline for circuit '%s' has zero counts and will be ignored" % s)
+                continue  # skip lines in dataset file with zero counts (no experiments done)
+            add_row(circuit, oli, count_values, commentDict)
+        else:
+            pending = (circuit, commentDict)  # just a circuit: how it's handled depends on the following line
+
+    row_lengths = _np.array(row_lengths, _np.int64)
+    outcome_indices = _np.array(outcome_indices, _Oindex_type)
+    counts = _np.array(counts, _Repcount_type)
+    if not record_zero_counts:
+        nonzero = counts != 0  # (note: == float comparison *is* desired)
+        if not _np.all(nonzero):
+            row_lengths = _np.bincount(_np.repeat(_np.arange(len(row_lengths)), row_lengths)[nonzero],
+                                       minlength=len(row_lengths))
+            outcome_indices = outcome_indices[nonzero]
+            counts = counts[nonzero]
+
+    return {'circuits': circuits, 'row_lengths': row_lengths, 'outcome_indices': outcome_indices,
+            'counts': counts, 'outcome_labels': list(outcomeLabelIndices.keys()), 'aux': aux,
+            'warnings': warnings, 'nbytes': end - start, 'timestamped': timestamped,
+            'first_line_blank': bool(first_line_blank),
+            'trailing_circuit': pending}
+
+
 def _eval_element(el, b_complex):
     myLocal = {'pi': _np.pi, 'sqrt': _np.sqrt}
     exec("element = %s" % el, {"__builtins__": None}, myLocal)
@@ -210,6 +210,15 @@ class CircuitOutcomeProbabilityArrayLayout(object):
             self._outcomes[i_unique] = tuple(outcomes)
             self._element_indices[i_unique] = _slct.list_to_slice(elindices, array_ok=True)
 
+        self._element_circuit_index = None  # built on demand by `element_circuit_index`
+        self._param_dependency_index = None  # built on demand by `param_dependency_index`
+
+    def __setstate__(self, state_dict):
+        # layouts pickled before these lazily-built indices existed don't have them
+        state_dict.setdefault('_element_circuit_index', None)
+        state_dict.setdefault('_param_dependency_index', None)
+        self.__dict__.update(state_dict)
+
     def __len__(self):
         return self._size  # the number of computed *elements* (!= number of circuits)
 
@@ -692,6 +701,166 @@ class CircuitOutcomeProbabilityArrayLayout(object):
         unique_circuit_index = self._to_unique[index]
         return self._element_indices[unique_circuit_index], self._outcomes[unique_circuit_index]
 
+    def element_circuit_index(self):
+        """
+        A compressed sparse row (CSR) style index of the elements belonging to each of this layout's circuits.
+
+        The element indices of the `i`-th circuit (in the order of :attr:`circuits`, and so
+        the indices given by :method:`indices_for_index`) are `element_indices[offsets[i]:offsets[i+1]]`.
+        Note that the elements of duplicate circuits appear once for each duplicate.  This index is
+        built the first time it's needed and stored with this layout, and it allows per-circuit
+        quantities to be computed without looping over circuits (see :method:`reduce_by_circuit`).
+
+        Returns
+        -------
+        offsets : numpy.ndarray
+            An integer array of length `num_circuits + 1`.
+
+        element_indices : numpy.ndarray
+            An integer array of element indices.
+        """
+        if self._element_circuit_index is None:
+            num_unique = len(self._unique_circuits)
+            unique_elements = [_np.zeros(0, _np.int64)] * num_unique
+            for i_unique, element_indices in self._element_indices.items():
+                unique_elements[i_unique] = _slct.to_array(element_indices)
+            unique_offsets = _np.zeros(num_unique + 1, _np.int64)
+            _np.cumsum([len(elements) for elements in unique_elements], out=unique_offsets[1:])
+            all_unique_elements = _np.concatenate(unique_elements + [_np.zeros(0, _np.int64)])
+
+            to_unique = _np.array([self._to_unique[i] for i in range(self.num_circuits)], _np.int64)
+            counts = _np.diff(unique_offsets)[to_unique]
+            offsets = _np.zeros(self.num_circuits + 1, _np.int64)
+            _np.cumsum(counts, out=offsets[1:])
+            # position of each circuit's elements within `all_unique_elements`
+            positions = _np.repeat(unique_offsets[to_unique] - offsets[:-1], counts) + _np.arange(offsets[-1])
+            self._element_circuit_index = (offsets, all_unique_elements[positions])
+        return self._element_circuit_index
+
+    def reduce_by_circuit(self, array, ufunc=_np.add, circuit_indices=None):
+        """
+        Reduces the per-element values in `array` over the elements of each circuit.
+
+        For example, the per-circuit sums of per-element values (e.g., objective function
+        terms) are given by `reduce_by_circuit(array, numpy.add)`.  The reductions are performed
+        with a single call to the `reduceat` method of `ufunc`, rather than a loop over circuits.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            An array whose first dimension indexes this layout's elements.  Any additional
+            trailing "extra" elements (e.g. penalty terms) are ignored, and the reduction is
+            performed separately for the indices of any remaining dimensions.
+
+        ufunc : numpy.ufunc, optional
+            The binary function used to perform the reduction, e.g. `numpy.add` or `numpy.maximum`.
+
+        circuit_indices : numpy.ndarray, optional
+            The indices (into :attr:`circuits`) of the circuits to compute values for.  If None,
+            then all of the circuits.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `(len(circuit_indices),) + array.shape[1:]`.  The values for circuits
+            without any elements are the identity of `ufunc` (or NaN if `ufunc` has no identity).
+        """
+        offsets, element_indices = self.element_circuit_index()
+        if circuit_indices is None:
+            starts, counts = offsets[:-1], _np.diff(offsets)
+            if len(element_indices) == self._size and _np.array_equal(element_indices, _np.arange(self._size)):
+                circuit_values = array[0:self._size]  # elements are already in circuit order (the usual case)
+            else:
+                circuit_values = array[element_indices]
+        else:
+            circuit_indices = _np.asarray(circuit_indices, _np.int64)
+            starts, counts = offsets[circuit_indices], offsets[circuit_indices + 1] - offsets[circuit_indices]
+            sub_starts = _np.cumsum(counts) - counts  # where each circuit's elements start in `circuit_values`
+            positions = _np.repeat(starts - sub_starts, counts) + _np.arange(_np.sum(counts))
+            circuit_values = array[element_indices[positions]]
+            starts = sub_starts
+
+        fill_value = ufunc.identity if (ufunc.identity is not None) else _np.nan
+        ret = _np.full((len(counts),) + array.shape[1:], fill_value, dtype=array.dtype)
+        nonempty = counts > 0  # `reduceat` doesn't handle empty segments the way we want
+        if _np.any(nonempty):
+            ret[nonempty] = ufunc.reduceat(circuit_values, starts[nonempty], axis=0)
+        return ret
+
+    def sum_by_circuit(self, array, circuit_indices=None):
+        """
+        Sums the per-element values in `array` over the elements of each circuit.
+
+        This is shorthand for :method:`reduce_by_circuit` with `ufunc=numpy.add`.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            An array whose first dimension indexes this layout's elements.
+
+        circuit_indices : numpy.ndarray, optional
+            The indices (into :attr:`circuits`) of the circuits to compute sums for.  If None,
+            then all of the circuits.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return self.reduce_by_circuit(array, _np.add, circuit_indices)
+
+    def max_by_circuit(self, array, circuit_indices=None):
+        """
+        The maximum of the per-element values in `array` over the elements of each circuit.
+
+        This is shorthand for :method:`reduce_by_circuit` with `ufunc=numpy.maximum`.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            An array whose first dimension indexes this layout's elements.
+
+        circuit_indices : numpy.ndarray, optional
+            The indices (into :attr:`circuits`) of the circuits to compute maxima for.  If None,
+            then all of the circuits.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return self.reduce_by_circuit(array, _np.maximum, circuit_indices)
+
+    def add_by_circuit(self, array, circuit_values, circuit_indices=None):
+        """
+        Adds per-circuit values, in place, to each of the elements of the corresponding circuits.
+
+        This is the transpose (adjoint) of :method:`sum_by_circuit`: the value for the `i`-th
+        circuit is added to every element of `array` belonging to that circuit.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            An array whose first dimension indexes this layout's elements.  Any additional
+            trailing "extra" elements (e.g. penalty terms) are left unchanged.
+
+        circuit_values : numpy.ndarray
+            An array of shape `(len(circuit_indices),) + array.shape[1:]`.
+
+        circuit_indices : numpy.ndarray, optional
+            The indices (into :attr:`circuits`) of the circuits that `circuit_values` correspond
+            to.  If None, then all of the circuits.
+
+        Returns
+        -------
+        None
+        """
+        offsets, element_indices = self.element_circuit_index()
+        if circuit_indices is None:
+            circuit_indices = _np.arange(self.num_circuits)
+        circuit_indices = _np.asarray(circuit_indices, _np.int64)
+        starts, counts = offsets[circuit_indices], offsets[circuit_indices + 1] - offsets[circuit_indices]
+        positions = _np.repeat(starts - (_np.cumsum(counts) - counts), counts) + _np.arange(_np.sum(counts))
+        _np.add.at(array, element_indices[positions], _np.repeat(circuit_values, counts, axis=0))
+
     def __iter__(self):
         for circuit, i in self._unique_circuit_index.items():
             for element_index, outcome in zip(self._element_indices[i], self._outcomes[i]):
@@ -713,6 +882,30 @@ class CircuitOutcomeProbabilityArrayLayout(object):
         for circuit, i in self._unique_circuit_index.items():
             yield self._element_indices[i], circuit, self._outcomes[i]
 
+    def param_dependency_index(self, model):
+        """
+        The model parameters that each of this layout's unique circuits depends upon.
+
+        The index is built the first time it's needed and is stored with this layout,
+        so that it is only rebuilt if `model`'s parameter structure (its parameter labels
+        and the parameter indices of its members, see
+        :method:`CircuitParamDependencyIndex.param_structure_key`) differs from that of the
+        model it was built for.
+
+        Parameters
+        ----------
+        model : Model
+            The model whose parameters the circuit outcome probabilities depend upon.
+
+        Returns
+        -------
+        CircuitParamDependencyIndex
+        """
+        structure_key = CircuitParamDependencyIndex.param_structure_key(model)
+        if self._param_dependency_index is None or self._param_dependency_index.structure_key != structure_key:
+            self._param_dependency_index = CircuitParamDependencyIndex.create_from(self, model, structure_key)
+        return self._param_dependency_index
+
     def copy(self):
         """
         Create a copy of this layout.
@@ -749,3 +942,197 @@ class CircuitOutcomeProbabilityArrayLayout(object):
         if empty_if_missing:
             return _ResourceAllocation(None)
         raise KeyError("COPA layout has no '%s' resource alloc" % str(sub_alloc_name))
+
+
+class CircuitParamDependencyIndex(object):
+    """
+    An index of the model parameters that each unique circuit of a layout depends upon.
+
+    The outcome probabilities of a circuit can only depend on the parameters of its layer
+    operations, state preparation and POVM effects, i.e., on the union of these objects'
+    `gpindices`.  For models built from many small operations, e.g. local-noise and
+    cloud-noise models, this is usually a small fraction of all the model's parameters, and
+    this index allows derivative computations to skip circuits that don't depend on the
+    parameters being differentiated with respect to.
+
+    The index is stored in compressed sparse row (CSR) format: the parameter indices of
+    the `i`-th unique circuit (in the order of the layout's :method:`iter_unique_circuits`)
+    are `indices[indptr[i]:indptr[i+1]]`, and are sorted.
+
+    Parameters
+    ----------
+    circuit_param_indices : list
+        A list of sorted integer arrays, one per unique circuit, giving the parameter
+        indices that each circuit depends upon.
+
+    element_circuits : numpy.ndarray
+        An integer array giving the index of the unique circuit of each layout element.
+
+    num_params : int
+        The number of parameters of the model this index was built for.
+
+    structure_key : tuple, optional
+        The :method:`param_structure_key` of the model this index was built for.
+    """
+
+    @classmethod
+    def param_structure_key(cls, model):
+        """
+        A hashable key identifying how the parameters of `model` are assigned to its members.
+
+        Two models with the same key have the same parameter labels and their members have
+        the same `gpindices`, so that a circuit depends on the same parameters in each.
+
+        Parameters
+        ----------
+        model : Model
+            The model.
+
+        Returns
+        -------
+        tuple
+        """
+        def gpindices_key(gpindices):
+            if isinstance(gpindices, slice):
+                return (gpindices.start, gpindices.stop, gpindices.step)
+            return None if (gpindices is None) else tuple(gpindices)
+
+        num_params = model.num_params  # (also rebuilds model's parameter vector & labels if needed)
+        return (num_params, tuple(model.parameter_labels),
+                tuple((lbl, gpindices_key(obj.gpindices)) for lbl, obj in model._iter_parameterized_objs()))
+
+    @classmethod
+    def create_from(cls, layout, model, structure_key=None):
+        """
+        Build the index of the model parameters that the unique circuits of `layout` depend upon.
+
+        Parameters
+        ----------
+        layout : CircuitOutcomeProbabilityArrayLayout
+            The layout whose (local) unique circuits are indexed.
+
+        model : Model
+            The model whose parameters the circuit outcome probabilities depend upon.
+
+        structure_key : tuple, optional
+            The :method:`param_structure_key` of `model`, if it has already been computed.
+
+        Returns
+        -------
+        CircuitParamDependencyIndex
+        """
+        if structure_key is None: structure_key = cls.param_structure_key(model)
+        gpindices_cache = {}  # parameter indices of each (layer_label, type), which are shared by many circuits
+
+        def layer_param_indices(lbl, typ):
+            if (lbl, typ) not in gpindices_cache:
+                gpindices_cache[(lbl, typ)] = model.circuit_layer_operator(lbl, typ).gpindices_as_array()
+            return gpindices_cache[(lbl, typ)]
+
+        circuit_param_indices = []
+        element_circuits = _np.empty(len(layout), _np.int64)
+        for i, (element_indices, circuit, outcomes) in enumerate(layout.iter_unique_circuits()):
+            param_indices = set()
+            for spc in circuit.expand_instruments_and_separate_povm(model, outcomes):  # SeparatePOVMCircuits
+                param_indices.update(layer_param_indices(spc.circuit_without_povm[0], 'prep'))  # always a prep
+                for lbl in spc.circuit_without_povm[1:]:
+                    param_indices.update(layer_param_indices(lbl, 'op'))
+                for elbl in spc.full_effect_labels:
+                    param_indices.update(layer_param_indices(elbl, 'povm'))
+            circuit_param_indices.append(_np.array(sorted(param_indices), _np.int64))
+            element_circuits[element_indices] = i
+        return cls(circuit_param_indices, element_circuits, model.num_params, structure_key)
+
+    def __init__(self, circuit_param_indices, element_circuits, num_params, structure_key=None):
+        self.num_params = num_params
+        self.structure_key = structure_key
+        self.element_circuits = element_circuits
+        self.indptr = _np.zeros(len(circuit_param_indices) + 1, _np.int64)
+        _np.cumsum([len(inds) for inds in circuit_param_indices], out=self.indptr[1:])
+        self.indices = _np.concatenate(circuit_param_indices) if len(circuit_param_indices) > 0 \
+            else _np.zeros(0, _np.int64)
+        self._element_param_indices = {}  # caches `param_indices_for_elements` results, keyed by (start, stop)
+
+    @property
+    def num_circuits(self):
+        """
+        The number of (unique) circuits in this index.
+        """
+        return len(self.indptr) - 1
+
+    def param_indices(self, circuit_index):
+        """
+        The sorted indices of the parameters that a circuit depends upon.
+
+        Parameters
+        ----------
+        circuit_index : int
+            The index of the unique circuit, in the order of the layout's :method:`iter_unique_circuits`.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return self.indices[self.indptr[circuit_index]:self.indptr[circuit_index + 1]]
+
+    def circuits_depending_on(self, param_slice):
+        """
+        Which unique circuits depend on at least one of the given parameters.
+
+        Parameters
+        ----------
+        param_slice : slice or numpy.ndarray
+            The (global) model-parameter indices.  If None, all the model's parameters.
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array of length :attr:`num_circuits`.
+        """
+        if param_slice is None:
+            return _np.diff(self.indptr) > 0
+        is_dependency = _np.isin(self.indices, _slct.to_array(param_slice))
+        circuits = _np.repeat(_np.arange(self.num_circuits), _np.diff(self.indptr))
+        return _np.bincount(circuits[is_dependency], minlength=self.num_circuits) > 0
+
+    def param_indices_for_elements(self, element_slice):
+        """
+        The sorted indices of the parameters that any of a contiguous range of elements depends upon.
+
+        This is useful for determining the parameters that a layout atom's outcome probabilities
+        depend upon.  Results are cached, since they're usually needed many times.
+
+        Parameters
+        ----------
+        element_slice : slice
+            A contiguous range of (local) layout element indices.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        key = (element_slice.start, element_slice.stop)
+        if key not in self._element_param_indices:
+            circuits = _np.unique(self.element_circuits[element_slice])
+            self._element_param_indices[key] = _np.unique(_np.concatenate(
+                [self.param_indices(i) for i in circuits] + [_np.zeros(0, _np.int64)]))
+        return self._element_param_indices[key]
+
+    def element_sparsity_pattern(self):
+        """
+        The structurally non-zero elements of the `(num_elements, num_params)` jacobian of the layout's elements.
+
+        All of the elements (outcomes) of a circuit depend upon the same parameters, namely
+        the circuit's :method:`param_indices`.
+
+        Returns
+        -------
+        indptr, indices : numpy.ndarray
+            The CSR-format index arrays of the non-zero elements.
+        """
+        counts = _np.diff(self.indptr)[self.element_circuits]
+        indptr = _np.zeros(len(self.element_circuits) + 1, _np.int64)
+        _np.cumsum(counts, out=indptr[1:])
+        # position of each entry within its circuit's row of `self.indices`
+        offsets = _np.repeat(self.indptr[self.element_circuits] - indptr[:-1], counts)
+        return indptr, self.indices[offsets + _np.arange(indptr[-1])]
@@ -750,6 +750,8 @@ class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
 
         self.atoms = [atoms_dict[i] for i in myAtomIndices]
         self.param_dimension_blk_sizes = param_dimension_blk_sizes
+        self._num_atom_processors = num_atom_processors
+        self._num_param_dimension_processors = num_param_dimension_processors
 
         self._global_layout = _CircuitOutcomeProbabilityArrayLayout(circuits, unique_circuits, to_unique,
                                                                     global_elindex_outcome_tuples,
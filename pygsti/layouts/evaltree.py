@@ -188,6 +188,46 @@ class EvalTree(list):
 
         return eval_tree
 
+    def evaluation_levels(self):
+        """
+        Groups this tree's instructions into "levels" whose elements can all be computed at once.
+
+        An element's level is one more than the largest level of the two elements it is
+        composed of, so all of the elements within a level depend only on elements in
+        earlier levels.  This allows the products (or other quantities) of an entire level
+        to be computed using a single batched operation, which is much faster than processing
+        elements one at a time when the quantities are small (e.g. 1- and 2-qubit gates).
+
+        Returns
+        -------
+        leaves : list
+            A list of `(iDest, label)` tuples giving the elements that are not composed of other
+            elements: the element at index `iDest` is a single label, or the empty circuit when
+            `label` is `None`.
+        levels : list
+            A list of `(dest_indices, left_indices, right_indices)` tuples of integer numpy arrays,
+            one per level, in evaluation order.  Element `dest_indices[k]` is the concatenation of
+            elements `left_indices[k]` and `right_indices[k]` (as sequences).
+        """
+        if getattr(self, '_evaluation_levels', None) is None:
+            leaves = []
+            level_of = {}  # level of each element (by index)
+            instructions_by_level = []
+            for iDest, iLeft, iRight in self:
+                if iLeft is None:
+                    leaves.append((iDest, iRight))
+                    level_of[iDest] = 0
+                    continue
+                lvl = max(level_of[iLeft], level_of[iRight]) + 1
+                level_of[iDest] = lvl
+                if lvl > len(instructions_by_level): instructions_by_level.append([])
+                instructions_by_level[lvl - 1].append((iDest, iLeft, iRight))
+
+            levels = [tuple(_np.array(inds, _np.int64) for inds in zip(*instructions))
+                      for instructions in instructions_by_level]
+            self._evaluation_levels = (leaves, levels)
+        return self._evaluation_levels
+
     def _create_single_item_trees(self, num_elements):
         # num_elements == number of elements *to evaluate* (can be < len(self))
         #  Create disjoint set of subtrees generated by single items
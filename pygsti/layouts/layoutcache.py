@@ -0,0 +1,154 @@
+"""
+Defines the LayoutCache class and supporting functions.
+"""
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+
+import hashlib as _hashlib
+import os as _os
+import pathlib as _pathlib
+import pickle as _pickle
+import uuid as _uuid
+
+#: The version of the (pickled) layout-atom format.  This is part of every layout digest, and should be
+#: incremented whenever the attributes of layouts or their atoms change, so that stale cache entries
+#: (which are otherwise indistinguishable when pyGSTi's version number doesn't change) are never loaded.
+LAYOUT_FORMAT_VERSION = 3
+
+
+def layout_digest(layout_type, circuits, model, dataset=None, ds_circuits=None, extra_info=()):
+    """
+    Computes a digest identifying the processor-independent structure of a layout.
+
+    Two layouts with the same digest are built from the same circuit list, the same
+    model *structure* (parameter values don't matter) and the same observed outcomes,
+    so that their atoms are identical.  The digest also includes pyGSTi's version and
+    :data:`LAYOUT_FORMAT_VERSION`, so cache entries written in an older format are ignored.
+
+    Parameters
+    ----------
+    layout_type : str
+        A name for the kind of layout, e.g. `"matrix"` or `"map"`.
+
+    circuits : list or CircuitList
+        The circuits given to the layout (including any duplicates).
+
+    model : Model
+        The model used to complete and expand the circuits.
+
+    dataset : DataSet, optional
+        If not None, the data set whose observed outcomes restrict the layout's elements.
+
+    ds_circuits : list, optional
+        The (unique, alias-applied) circuits used to access `dataset`.  Required when
+        `dataset` is not None.
+
+    extra_info : tuple, optional
+        Additional (repr-able) values that the layout's structure depends upon, e.g.
+        the number of atoms.
+
+    Returns
+    -------
+    str
+        A hexadecimal digest string.
+    """
+    from pygsti import __version__ as _version
+    md5 = _hashlib.md5()
+
+    def add(x):
+        md5.update(repr(x).encode('utf-8'))
+
+    add((_version, LAYOUT_FORMAT_VERSION, layout_type, tuple(extra_info)))
+
+    add(getattr(circuits, 'op_label_aliases', None))
+    for c in circuits:
+        md5.update(('%s %s\n' % (c.str, c.line_labels)).encode('utf-8'))
+
+    add((model.__class__.__name__, str(model.state_space)))
+    add((model.primitive_prep_labels, model.primitive_op_labels))  # (order determines default SPAM labels)
+    add([(lbl, model._effect_labels_for_povm(lbl)) for lbl in model.primitive_povm_labels])
+    add([(lbl, model._member_labels_for_instrument(lbl)) for lbl in model.primitive_instrument_labels])
+
+    if dataset is not None:
+        for c in ds_circuits:
+            add(dataset[c].unique_outcomes)
+    else:
+        add(None)
+
+    return md5.hexdigest()
+
+
+class LayoutCache(object):
+    """
+    An on-disk cache of the processor-independent parts of a distributable layout.
+
+    Building a layout for a long list of circuits (finding sub-tree or sub-table splittings and
+    constructing the per-atom evaluation trees or prefix tables) can take a significant amount of
+    time, and is repeated every time a layout is created for the same circuits.  A `LayoutCache`
+    stores these pieces as pickle files in a directory keyed by a digest (see :func:`layout_digest`)
+    so they can simply be reloaded.  Only quantities that don't depend on the processor division
+    are stored, so the distribution of atoms among processors is always recomputed.
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+        The root directory of the cache.  Entries are stored in `<cache_dir>/<digest>/`.
+
+    digest : str
+        The digest identifying the layout being cached.
+    """
+
+    def __init__(self, cache_dir, digest):
+        self.digest = digest
+        self.path = _pathlib.Path(cache_dir) / digest
+
+    def load(self, name):
+        """
+        Load a cached object.
+
+        Parameters
+        ----------
+        name : str
+            The name of the object.
+
+        Returns
+        -------
+        object or None
+            The cached object, or `None` if there is no (readable) cache entry named `name`.
+        """
+        try:
+            with open(str(self.path / (name + '.pkl')), 'rb') as f:
+                return _pickle.load(f)
+        except Exception:  # missing, partially written or stale entries are just cache misses
+            return None
+
+    def save(self, name, obj):
+        """
+        Save an object to the cache.
+
+        The object is written to a temporary file that is then moved into place, so that
+        multiple processors may safely write the same entry simultaneously.
+
+        Parameters
+        ----------
+        name : str
+            The name of the object.
+
+        obj : object
+            The (picklable) object to save.
+
+        Returns
+        -------
+        None
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path / ('%s.%s.tmp' % (name, _uuid.uuid4().hex))
+        with open(str(tmp_path), 'wb') as f:
+            _pickle.dump(obj, f, protocol=_pickle.HIGHEST_PROTOCOL)
+        _os.replace(str(tmp_path), str(self.path / (name + '.pkl')))
@@ -11,9 +11,12 @@ Defines the MapCOPALayout class.
 #***************************************************************************************************
 
 import collections as _collections
+import copy as _copy
 
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
 from pygsti.layouts.distlayout import _DistributableAtom
+from pygsti.layouts.layoutcache import LayoutCache as _LayoutCache
+from pygsti.layouts.layoutcache import layout_digest as _layout_digest
 from pygsti.layouts.prefixtable import PrefixTable as _PrefixTable
 from pygsti.circuits.circuitlist import CircuitList as _CircuitList
 from pygsti.tools import listtools as _lt
@@ -76,7 +79,7 @@ class _MapCOPALayoutAtom(_DistributableAtom):
 
         self.rho_labels = sorted(all_rholabels)
         self.op_labels = sorted(all_oplabels)
-        self.full_effect_labels = all_elabels
+        self.full_effect_labels = sorted(all_elabels)  # a list: a set's order can differ once (un)pickled
         self.elabel_lookup = {elbl: i for i, elbl in enumerate(self.full_effect_labels)}
 
         #Lookup arrays for faster replib computation.
@@ -197,24 +200,43 @@ class MapCOPALayout(_DistributableCOPALayout):
     verbosity : int or VerbosityPrinter
         Determines how much output to send to stdout.  0 means no output, higher
         integers mean more output.
+
+    layout_cache_dir : str or Path, optional
+        If not None, a directory used to persistently cache the (processor-independent)
+        sub-table splitting and atoms of this layout.  When a layout with the same circuits,
+        model structure, observed outcomes, cache size and number of sub-tables has been built
+        before, these are loaded from disk instead of being recomputed.  See :class:`LayoutCache`.
     """
 
     def __init__(self, circuits, model, dataset=None, max_cache_size=None,
                  num_sub_tables=None, num_table_processors=1, num_param_dimension_processors=(),
-                 param_dimensions=(), param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0):
+                 param_dimensions=(), param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0,
+                 layout_cache_dir=None):
 
         unique_circuits, to_unique = self._compute_unique_circuits(circuits)
         aliases = circuits.op_label_aliases if isinstance(circuits, _CircuitList) else None
         ds_circuits = _lt.apply_aliases_to_circuits(unique_circuits, aliases)
-        unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
-        unique_povmless_circuits = [model.split_circuit(c, split_prep=False)[1] for c in unique_complete_circuits]
 
-        max_sub_table_size = None  # was an argument but never used; remove in future
-        if (num_sub_tables is not None and num_sub_tables > 1) or max_sub_table_size is not None:
-            circuit_table = _PrefixTable(unique_povmless_circuits, max_cache_size)
-            groups = circuit_table.find_splitting(max_sub_table_size, num_sub_tables, verbosity=verbosity)
+        layout_cache = _LayoutCache(layout_cache_dir, _layout_digest('map', circuits, model, dataset, ds_circuits,
+                                                                     (max_cache_size, num_sub_tables))) \
+            if (layout_cache_dir is not None) else None
+        cached_plan = layout_cache.load('plan') if (layout_cache is not None) else None
+
+        if cached_plan is not None:
+            unique_complete_circuits, groups = cached_plan
         else:
-            groups = [set(range(len(unique_complete_circuits)))]
+            unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
+            unique_povmless_circuits = [model.split_circuit(c, split_prep=False)[1] for c in unique_complete_circuits]
+
+            max_sub_table_size = None  # was an argument but never used; remove in future
+            if (num_sub_tables is not None and num_sub_tables > 1) or max_sub_table_size is not None:
+                circuit_table = _PrefixTable(unique_povmless_circuits, max_cache_size)
+                groups = circuit_table.find_splitting(max_sub_table_size, num_sub_tables, verbosity=verbosity)
+            else:
+                groups = [set(range(len(unique_complete_circuits)))]
+
+            if layout_cache is not None:
+                layout_cache.save('plan', (unique_complete_circuits, groups))
 
         #atoms = []
         #elindex_outcome_tuples = _collections.OrderedDict(
@@ -226,15 +248,33 @@ class MapCOPALayout(_DistributableCOPALayout):
         #                                    model, dataset, offset, elindex_outcome_tuples, max_cache_size))
         #    offset += atoms[-1].num_elements
 
-        def _create_atom(group):
-            return _MapCOPALayoutAtom(unique_complete_circuits, ds_circuits, group,
-                                      model, dataset, max_cache_size)
+        atoms_by_index = {}
+
+        def _create_atom(args):
+            i, group = args
+            atom = layout_cache.load('atom%d' % i) if (layout_cache is not None) else None
+            if atom is None:
+                atom = _MapCOPALayoutAtom(unique_complete_circuits, ds_circuits, group,
+                                          model, dataset, max_cache_size)
+                if layout_cache is not None:
+                    layout_cache.save('atom%d' % i, atom)  # save *before* base class sets element indices
+            atoms_by_index[i] = atom
+            return atom
 
+        atom_args = list(enumerate(groups))
         super().__init__(circuits, unique_circuits, to_unique, unique_complete_circuits,
-                         _create_atom, groups, num_table_processors,
+                         _create_atom, atom_args, num_table_processors,
                          num_param_dimension_processors, param_dimensions,
                          param_dimension_blk_sizes, resource_alloc, verbosity)
+        self._finish_atoms()
+
+        # Retain the (processor-independent) information needed to extend this layout - see :method:`extend`
+        self._max_cache_size = max_cache_size
+        self._ds_circuits = ds_circuits
+        self._atom_args = atom_args
+        self._atoms_by_index = atoms_by_index
 
+    def _finish_atoms(self):
         # For time dependent calcs:
         # connect unique -> orig indices of final layout now that base class has created it
         # (don't do this before because the .circuits of this local layout may not be *all* the circuits,
@@ -243,3 +283,94 @@ class MapCOPALayout(_DistributableCOPALayout):
         for atom in self.atoms:
             for expanded_circuit_i, unique_i in atom.unique_indices_by_expcircuit.items():
                 atom.orig_indices_by_expcircuit[expanded_circuit_i] = unique_to_orig[unique_i]
+
+    def extend(self, new_circuits, model, dataset=None, num_new_sub_tables=None, verbosity=0):
+        """
+        Create a layout for this layout's circuits followed by `new_circuits`.
+
+        The atoms (and prefix tables) of this layout are reused as they are, and only
+        the circuits in `new_circuits` that aren't already in this layout are placed into
+        new atoms.  This avoids rebuilding the prefix tables for circuits that have already
+        been processed, e.g. when a growing sequence of circuit lists is analyzed.
+
+        Parameters
+        ----------
+        new_circuits : list
+            A list of :class:`Circuit` objects to append to this layout's (global) circuit list.
+
+        model : Model
+            The model used to complete and expand the circuits.  This should have the
+            same structure as the model used to create this layout.
+
+        dataset : DataSet, optional
+            If not None, restrict the circuit outcomes of the new circuits to only the
+            outcomes observed in this data set.  This should be the data set (if any)
+            used to create this layout.
+
+        num_new_sub_tables : int, optional
+            The number of new atoms (sub-tables) to divide the new circuits into.  If None,
+            this is chosen so that new atoms have roughly the same size as existing ones.
+
+        verbosity : int or VerbosityPrinter
+            Determines how much output to send to stdout.  0 means no output, higher
+            integers mean more output.
+
+        Returns
+        -------
+        MapCOPALayout
+        """
+        old_circuits = self.global_layout.circuits
+        circuits = _CircuitList(list(old_circuits) + list(new_circuits), old_circuits.op_label_aliases)
+        unique_circuits, to_unique = self._compute_unique_circuits(circuits)
+        num_old_unique = len(self._ds_circuits)
+        new_unique_circuits = unique_circuits[num_old_unique:]  # old unique circuits always come first
+        ds_circuits = self._ds_circuits + _lt.apply_aliases_to_circuits(new_unique_circuits, circuits.op_label_aliases)
+        new_unique_complete_circuits = [model.complete_circuit(c) for c in new_unique_circuits]
+        unique_complete_circuits = self.global_layout._unique_complete_circuits + new_unique_complete_circuits
+
+        if num_new_sub_tables is None:
+            num_new_sub_tables = int(round(len(self._atom_args) * len(new_unique_circuits)
+                                           / max(num_old_unique, 1)))
+        num_new_sub_tables = min(max(num_new_sub_tables, 1), max(len(new_unique_circuits), 1))
+
+        if len(new_unique_circuits) == 0:
+            new_groups = []
+        elif num_new_sub_tables > 1:
+            new_povmless_circuits = [model.split_circuit(c, split_prep=False)[1] for c in new_unique_complete_circuits]
+            circuit_table = _PrefixTable(new_povmless_circuits, self._max_cache_size)
+            new_groups = circuit_table.find_splitting(None, num_new_sub_tables, verbosity=verbosity)
+        else:
+            new_groups = [set(range(len(new_unique_circuits)))]
+
+        atom_args = self._atom_args + [(len(self._atom_args) + k, set([i + num_old_unique for i in group]))
+                                       for k, group in enumerate(new_groups)]
+
+        # existing atoms have had their unique-circuit indices updated to this (local) layout's indices
+        global_unique_index = self.global_layout._unique_circuit_index
+        global_unique_is = [global_unique_index[c] for c in self._unique_circuits]
+        atoms_by_index = {}
+
+        def _create_atom(args):
+            i, group = args
+            if i in self._atoms_by_index:
+                atom = _copy.copy(self._atoms_by_index[i])  # shares this layout's prefix table
+                atom.unique_indices_by_expcircuit = {k: global_unique_is[unique_i] for k, unique_i
+                                                     in self._atoms_by_index[i].unique_indices_by_expcircuit.items()}
+                atom.orig_indices_by_expcircuit = {}
+            else:  # a new atom or an existing one that is held by another processor
+                atom = _MapCOPALayoutAtom(unique_complete_circuits, ds_circuits, group,
+                                          model, dataset, self._max_cache_size)
+            atoms_by_index[i] = atom
+            return atom
+
+        layout = MapCOPALayout.__new__(MapCOPALayout)
+        _DistributableCOPALayout.__init__(layout, circuits, unique_circuits, to_unique, unique_complete_circuits,
+                                          _create_atom, atom_args, self._num_atom_processors,
+                                          self._num_param_dimension_processors, self._param_dimensions,
+                                          self.param_dimension_blk_sizes, self.resource_alloc(), verbosity)
+        layout._finish_atoms()
+        layout._max_cache_size = self._max_cache_size
+        layout._ds_circuits = ds_circuits
+        layout._atom_args = atom_args
+        layout._atoms_by_index = atoms_by_index
+        return layout
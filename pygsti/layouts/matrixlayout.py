@@ -11,12 +11,16 @@ Defines the MatrixCOPALayout class.
 #***************************************************************************************************
 
 import collections as _collections
+import copy as _copy
+import itertools as _itertools
 
 import numpy as _np
 
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
 from pygsti.layouts.distlayout import _DistributableAtom
 from pygsti.layouts.evaltree import EvalTree as _EvalTree
+from pygsti.layouts.layoutcache import LayoutCache as _LayoutCache
+from pygsti.layouts.layoutcache import layout_digest as _layout_digest
 from pygsti.circuits.circuitlist import CircuitList as _CircuitList
 from pygsti.tools import listtools as _lt
 from pygsti.tools import slicetools as _slct
@@ -271,11 +275,17 @@ class MatrixCOPALayout(_DistributableCOPALayout):
     verbosity : int or VerbosityPrinter
         Determines how much output to send to stdout.  0 means no output, higher
         integers mean more output.
+
+    layout_cache_dir : str or Path, optional
+        If not None, a directory used to persistently cache the (processor-independent)
+        sub-tree splitting and atoms of this layout.  When a layout with the same circuits,
+        model structure, observed outcomes and number of sub-trees has been built before,
+        these are loaded from disk instead of being recomputed.  See :class:`LayoutCache`.
     """
 
     def __init__(self, circuits, model, dataset=None, num_sub_trees=None, num_tree_processors=1,
                  num_param_dimension_processors=(), param_dimensions=(),
-                 param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0):
+                 param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0, layout_cache_dir=None):
 
         #OUTDATED: TODO - revise this:
         # 1. pre-process => get complete circuits => spam-tuples list for each no-spam circuit (no expanding yet)
@@ -290,30 +300,44 @@ class MatrixCOPALayout(_DistributableCOPALayout):
         unique_circuits, to_unique = self._compute_unique_circuits(circuits)
         aliases = circuits.op_label_aliases if isinstance(circuits, _CircuitList) else None
         ds_circuits = _lt.apply_aliases_to_circuits(unique_circuits, aliases)
-        unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
-        #Note: "unique" means a unique circuit *before* circuit-completion, so there could be duplicate
-        # "unique circuits" after completion, e.g. "rho0Gx" and "Gx" could both complete to "rho0GxMdefault_0".
-
-        circuits_by_unique_nospam_circuits = _collections.OrderedDict()
-        for i, c in enumerate(unique_complete_circuits):
-            _, nospam_c, _ = model.split_circuit(c)
-            if nospam_c in circuits_by_unique_nospam_circuits:
-                circuits_by_unique_nospam_circuits[nospam_c].append(i)
-            else:
-                circuits_by_unique_nospam_circuits[nospam_c] = [i]
-        unique_nospam_circuits = list(circuits_by_unique_nospam_circuits.keys())
-
-        # Split circuits into groups that will make good subtrees (all procs do this)
-        max_sub_tree_size = None  # removed from being an argument (unused)
-        if (num_sub_trees is not None and num_sub_trees > 1) or max_sub_tree_size is not None:
-            circuit_tree = _EvalTree.create(unique_nospam_circuits)
-            groups, helpful_scratch = circuit_tree.find_splitting(len(unique_nospam_circuits),
-                                                                  max_sub_tree_size, num_sub_trees, verbosity - 1)
-            #print("%d circuits => tree of size %d" % (len(unique_nospam_circuits), len(circuit_tree)))
+
+        layout_cache = _LayoutCache(layout_cache_dir, _layout_digest('matrix', circuits, model, dataset, ds_circuits,
+                                                                     (num_sub_trees,))) \
+            if (layout_cache_dir is not None) else None
+        cached_plan = layout_cache.load('plan') if (layout_cache is not None) else None
+
+        if cached_plan is not None:
+            unique_complete_circuits, circuits_by_unique_nospam_circuits, groups, helpful_scratch = cached_plan
+            unique_nospam_circuits = list(circuits_by_unique_nospam_circuits.keys())
         else:
-            groups = [set(range(len(unique_nospam_circuits)))]
-            helpful_scratch = [set()]
-        # (elements of `groups` contain indices into `unique_nospam_circuits`)
+            unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
+            #Note: "unique" means a unique circuit *before* circuit-completion, so there could be duplicate
+            # "unique circuits" after completion, e.g. "rho0Gx" and "Gx" could both complete to "rho0GxMdefault_0".
+
+            circuits_by_unique_nospam_circuits = _collections.OrderedDict()
+            for i, c in enumerate(unique_complete_circuits):
+                _, nospam_c, _ = model.split_circuit(c)
+                if nospam_c in circuits_by_unique_nospam_circuits:
+                    circuits_by_unique_nospam_circuits[nospam_c].append(i)
+                else:
+                    circuits_by_unique_nospam_circuits[nospam_c] = [i]
+            unique_nospam_circuits = list(circuits_by_unique_nospam_circuits.keys())
+
+            # Split circuits into groups that will make good subtrees (all procs do this)
+            max_sub_tree_size = None  # removed from being an argument (unused)
+            if (num_sub_trees is not None and num_sub_trees > 1) or max_sub_tree_size is not None:
+                circuit_tree = _EvalTree.create(unique_nospam_circuits)
+                groups, helpful_scratch = circuit_tree.find_splitting(len(unique_nospam_circuits),
+                                                                      max_sub_tree_size, num_sub_trees, verbosity - 1)
+                #print("%d circuits => tree of size %d" % (len(unique_nospam_circuits), len(circuit_tree)))
+            else:
+                groups = [set(range(len(unique_nospam_circuits)))]
+                helpful_scratch = [set()]
+            # (elements of `groups` contain indices into `unique_nospam_circuits`)
+
+            if layout_cache is not None:
+                layout_cache.save('plan', (unique_complete_circuits, circuits_by_unique_nospam_circuits,
+                                           groups, helpful_scratch))
 
         # Divide `groups` into num_tree_processors roughly equal sets (each containing
         # potentially multiple groups)
@@ -334,13 +358,132 @@ class MatrixCOPALayout(_DistributableCOPALayout):
         #                                       elindex_outcome_tuples))
         #    offset += my_atoms[-1].num_elements
 
-        def _create_atom(args):
-            group, helpful_scratch_group = args
-            return _MatrixCOPALayoutAtom(unique_complete_circuits, unique_nospam_circuits,
-                                         circuits_by_unique_nospam_circuits, ds_circuits,
-                                         group, helpful_scratch_group, model, dataset)
+        atoms_by_index = {}
 
+        def _create_atom(args):
+            i, (group, helpful_scratch_group) = args
+            atom = layout_cache.load('atom%d' % i) if (layout_cache is not None) else None
+            if atom is None:
+                atom = _MatrixCOPALayoutAtom(unique_complete_circuits, unique_nospam_circuits,
+                                             circuits_by_unique_nospam_circuits, ds_circuits,
+                                             group, helpful_scratch_group, model, dataset)
+                if layout_cache is not None:
+                    layout_cache.save('atom%d' % i, atom)  # save *before* base class sets element indices
+            atoms_by_index[i] = atom
+            return atom
+
+        atom_args = list(enumerate(zip(groups, helpful_scratch)))
         super().__init__(circuits, unique_circuits, to_unique, unique_complete_circuits,
-                         _create_atom, list(zip(groups, helpful_scratch)), num_tree_processors,
+                         _create_atom, atom_args, num_tree_processors,
                          num_param_dimension_processors, param_dimensions,
                          param_dimension_blk_sizes, resource_alloc, verbosity)
+
+        # Retain the (processor-independent) information needed to extend this layout - see :method:`extend`
+        self._nospam_circuits = unique_nospam_circuits
+        self._unique_indices_by_nospam_circuit = [circuits_by_unique_nospam_circuits[c] for c in unique_nospam_circuits]
+        self._ds_circuits = ds_circuits
+        self._atom_args = atom_args
+        self._atoms_by_index = atoms_by_index
+
+    def extend(self, new_circuits, model, dataset=None, num_new_sub_trees=None, verbosity=0):
+        """
+        Create a layout for this layout's circuits followed by `new_circuits`.
+
+        The atoms (and evaluation trees) of this layout are reused as they are, and only
+        the circuits in `new_circuits` that aren't already in this layout are placed into
+        new atoms.  This avoids rebuilding the evaluation trees for circuits that have already
+        been processed, e.g. when a growing sequence of circuit lists is analyzed.  Note that,
+        since evaluation trees are not shared between atoms, the resulting layout can require
+        somewhat more computation than one created from scratch for all of the circuits.
+
+        Parameters
+        ----------
+        new_circuits : list
+            A list of :class:`Circuit` objects to append to this layout's (global) circuit list.
+
+        model : Model
+            The model used to complete and expand the circuits.  This should have the
+            same structure as the model used to create this layout.
+
+        dataset : DataSet, optional
+            If not None, restrict the circuit outcomes of the new circuits to only the
+            outcomes observed in this data set.  This should be the data set (if any)
+            used to create this layout.
+
+        num_new_sub_trees : int, optional
+            The number of new atoms (sub-trees) to divide the new circuits into.  If None,
+            this is chosen so that new atoms have roughly the same size as existing ones.
+
+        verbosity : int or VerbosityPrinter
+            Determines how much output to send to stdout.  0 means no output, higher
+            integers mean more output.
+
+        Returns
+        -------
+        MatrixCOPALayout
+        """
+        old_circuits = self.global_layout.circuits
+        circuits = _CircuitList(list(old_circuits) + list(new_circuits), old_circuits.op_label_aliases)
+        unique_circuits, to_unique = self._compute_unique_circuits(circuits)
+        new_unique_circuits = unique_circuits[len(self._ds_circuits):]  # old unique circuits always come first
+        ds_circuits = self._ds_circuits + _lt.apply_aliases_to_circuits(new_unique_circuits, circuits.op_label_aliases)
+        unique_complete_circuits = self.global_layout._unique_complete_circuits \
+            + [model.complete_circuit(c) for c in new_unique_circuits]
+
+        # New no-spam circuits are indexed after existing ones, even if the same circuit already appears in an
+        # existing atom, so that every atom's group and helpful-scratch indices are consistent with a single list.
+        circuits_by_new_nospam_circuits = _collections.OrderedDict()
+        for i in range(len(self._ds_circuits), len(unique_complete_circuits)):
+            _, nospam_c, _ = model.split_circuit(unique_complete_circuits[i])
+            circuits_by_new_nospam_circuits.setdefault(nospam_c, []).append(i)
+        new_nospam_circuits = list(circuits_by_new_nospam_circuits.keys())
+        nospam_circuits = self._nospam_circuits + new_nospam_circuits
+        unique_indices_by_nospam_circuit = self._unique_indices_by_nospam_circuit \
+            + list(circuits_by_new_nospam_circuits.values())
+
+        if num_new_sub_trees is None:
+            num_new_sub_trees = int(round(len(self._atom_args) * len(new_nospam_circuits)
+                                          / max(len(self._nospam_circuits), 1)))
+        num_new_sub_trees = min(max(num_new_sub_trees, 1), max(len(new_nospam_circuits), 1))
+
+        if len(new_nospam_circuits) == 0:
+            new_groups = []; new_helpful_scratch = []
+        elif num_new_sub_trees > 1:
+            circuit_tree = _EvalTree.create(new_nospam_circuits)
+            new_groups, new_helpful_scratch = circuit_tree.find_splitting(len(new_nospam_circuits), None,
+                                                                          num_new_sub_trees, verbosity - 1)
+        else:
+            new_groups = [set(range(len(new_nospam_circuits)))]
+            new_helpful_scratch = [set()]
+
+        offset = len(self._nospam_circuits)
+        atom_args = self._atom_args + [(len(self._atom_args) + k, (set([i + offset for i in group]),
+                                                                   set([i + offset for i in helpful_scratch_group])))
+                                       for k, (group, helpful_scratch_group)
+                                       in enumerate(zip(new_groups, new_helpful_scratch))]
+        atoms_by_index = {}
+
+        def _create_atom(args):
+            i, (group, helpful_scratch_group) = args
+            if i in self._atoms_by_index:
+                atom = _copy.copy(self._atoms_by_index[i])  # a shallow copy, as only the element slice gets updated
+            else:  # a new atom or an existing one that is held by another processor
+                circuits_by_unique_nospam_circuits = {nospam_circuits[j]: unique_indices_by_nospam_circuit[j]
+                                                      for j in _itertools.chain(group, helpful_scratch_group)}
+                atom = _MatrixCOPALayoutAtom(unique_complete_circuits, nospam_circuits,
+                                             circuits_by_unique_nospam_circuits, ds_circuits,
+                                             group, helpful_scratch_group, model, dataset)
+            atoms_by_index[i] = atom
+            return atom
+
+        layout = MatrixCOPALayout.__new__(MatrixCOPALayout)
+        _DistributableCOPALayout.__init__(layout, circuits, unique_circuits, to_unique, unique_complete_circuits,
+                                          _create_atom, atom_args, self._num_atom_processors,
+                                          self._num_param_dimension_processors, self._param_dimensions,
+                                          self.param_dimension_blk_sizes, self.resource_alloc(), verbosity)
+        layout._nospam_circuits = nospam_circuits
+        layout._unique_indices_by_nospam_circuit = unique_indices_by_nospam_circuit
+        layout._ds_circuits = ds_circuits
+        layout._atom_args = atom_args
+        layout._atoms_by_index = atoms_by_index
+        return layout
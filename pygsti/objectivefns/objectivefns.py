@@ -15,6 +15,7 @@ import sys as _sys
 import time as _time
 
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti import tools as _tools
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
@@ -1228,10 +1229,7 @@ class MDCObjectiveFunction(ObjectiveFunction, EvaluatedModelDatasetCircuitsStore
             #Aggregate over outcomes:
             # obj_per_el[iElement] contains contributions per element - now aggregate over outcomes
             # percircuit[iCircuit] will contain contributions for each original circuit (aggregated over outcomes)
-            percircuit = _np.empty(num_circuits, 'd')
-            for i in range(num_circuits):
-                percircuit[i] = _np.sum(terms[self.layout.indices_for_index(i)], axis=0)
-            return percircuit
+            return self.layout.sum_by_circuit(terms)
 
     def dpercircuit(self, paramvec=None):
         """
@@ -1258,10 +1256,7 @@ class MDCObjectiveFunction(ObjectiveFunction, EvaluatedModelDatasetCircuitsStore
             #Aggregate over outcomes:
             # obj_per_el[iElement] contains contributions per element - now aggregate over outcomes
             # percircuit[iCircuit] will contain contributions for each original circuit (aggregated over outcomes)
-            dpercircuit = _np.empty((num_circuits, self.nparams), 'd')
-            for i in range(num_circuits):
-                dpercircuit[i] = _np.sum(dterms[self.layout.indices_for_index(i)], axis=0)
-            return dpercircuit
+            return self.layout.sum_by_circuit(dterms)
 
     def fn_local(self, paramvec=None):
         """
@@ -1346,6 +1341,29 @@ class MDCObjectiveFunction(ObjectiveFunction, EvaluatedModelDatasetCircuitsStore
         """
         raise NotImplementedError("Derived classes should implement this!")
 
+    def hessian_dot(self, vec, paramvec=None):
+        """
+        Compute the product of the Hessian of this objective function and a vector.
+
+        Derivatives are takes with respect to model parameters.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            A vector of length equal to the number of model parameters.
+
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `(nParams,)` where `nParams` is the number
+            of model parameters.
+        """
+        raise NotImplementedError("Derived classes should implement this!")
+
     def approximate_hessian(self, paramvec=None):
         """
         Compute an approximate Hessian of this objective function.
@@ -4011,10 +4029,19 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         if method_name == 'lsvec': return fsim._array_types_for_method('bulk_fill_probs') + ('e',)
         if method_name == 'terms': return fsim._array_types_for_method('bulk_fill_probs') + ('e',)
         if method_name == 'dlsvec': return fsim._array_types_for_method('bulk_fill_dprobs') + ('e', 'e')
+        if method_name == 'dlsvec_lazy':  # includes the cached (persistent) probability derivatives
+            return fsim._array_types_for_method('bulk_fill_dprobs_param_blocks') + ('ep', 'e', 'e')
+        if method_name == 'dlsvec_dot': return fsim._array_types_for_method('bulk_fill_dprobs_dot') + ('e', 'e', 'e')
+        if method_name == 'dlsvec_transpose_dot':
+            return fsim._array_types_for_method('bulk_fill_dprobs_transpose_dot') + ('e', 'e', 'e')
+        if method_name == 'jtj_and_jtf':
+            return fsim._array_types_for_method('iter_dprobs_by_element_blocks') + ('e', 'e', 'e', 'PP')
+        if method_name == 'dlsvec_sparse': return fsim._array_types_for_method('bulk_dprobs_sparse') + ('e', 'e')
         if method_name == 'dterms': return fsim._array_types_for_method('bulk_fill_dprobs')
         if method_name == 'hessian_brute': return fsim._array_types_for_method('bulk_fill_hprobs') \
            + ('e', 'e', 'epp', 'epp', 'PP')
         if method_name == 'hessian': return fsim._array_types_for_method('_iter_atom_hprobs_by_rectangle') + ('PP',)
+        if method_name == 'hessian_dot': return fsim._array_types_for_method('bulk_fill_hprobs_dot') + ('e', 'e', 'e')
         if method_name == 'approximate_hessian': return fsim._array_types_for_method('bulk_fill_dprobs') + ('e', 'PP')
         return super()._array_types_for_method(method_name, fsim)
 
@@ -4024,8 +4051,8 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         # (not-intermediate). These are filled in other routines and *not* included in
         # the output of _array_types_for_method since these are *not* allocated in methods.
         array_types = ('e',) * 4  # self.probs + 3x add_count_vectors
-        if any([x in ('dlsvec', 'dterms', 'dpercircuit', 'jacobian', 'approximate_hessian', 'hessian')
-                for x in method_names]):
+        if any([x in ('dlsvec', 'dlsvec_lazy', 'dterms', 'dpercircuit', 'jacobian', 'approximate_hessian',
+                      'hessian') for x in method_names]):
             array_types += ('ep',)
 
         # array types for methods
@@ -4057,6 +4084,8 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
            or 'epp' in self.array_types or 'EPP' in self.array_types):
             self.jac = self.layout.allocate_local_array('ep', 'd', memory_tracker=self.resource_alloc,
                                                         extra_elements=self.ex)
+        self._lazy_dprobs = None  # cached probability derivatives used by dlsvec_lazy (allocated when needed)
+        self._lazy_paramvec = None
 
         #self.maxCircuitLength = max([len(x) for x in self.circuits])
         # If desired, we may need to make it local to this processor, which may not have data for all of self.circuits
@@ -4070,6 +4099,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         self.layout.free_local_array(self.probs)
         self.layout.free_local_array(self.obj)
         self.layout.free_local_array(self.jac)
+        self.layout.free_local_array(self._lazy_dprobs)
 
     #Model-based regularization and penalty support functions
     def set_penalties(self, regularize_factor=0, cptp_penalty_factor=0, spam_penalty_factor=0,
@@ -4304,8 +4334,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         -------
         numpy.ndarray
         """
-        omitted_probs = 1.0 - _np.array([_np.sum(probs[self.layout.indices_for_index(i)])
-                                         for i in self.indicesOfCircuitsWithOmittedData])
+        omitted_probs = 1.0 - self.layout.sum_by_circuit(probs, self.indicesOfCircuitsWithOmittedData)
         return self.raw_objfn.zero_freq_terms(self.total_counts[self.firsts], omitted_probs)
 
     def _update_lsvec_for_omitted_probs(self, lsvec, probs):
@@ -4373,8 +4402,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             array of length equal to the number of circuits with omitted
             contributions.
         """
-        omitted_probs = 1.0 - _np.array([_np.sum(probs[self.layout.indices_for_index(i)])
-                                         for i in self.indicesOfCircuitsWithOmittedData])
+        omitted_probs = 1.0 - self.layout.sum_by_circuit(probs, self.indicesOfCircuitsWithOmittedData)
         return self.raw_objfn.zero_freq_dterms(self.total_counts[self.firsts], omitted_probs)
 
     def _update_dterms_for_omitted_probs(self, dterms, probs, dprobs_omitted_rowsum):
@@ -4624,28 +4652,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             #           else slice(0, self.model.num_params)
 
             self.model.sim.bulk_fill_dprobs(dprobs, self.layout, self.probs)  # wrtSlice)
-            self._clip_probs()  # clips self.probs in place w/shared mem sync
-
-            if shared_mem_leader:
-                if self.firsts is not None:
-                    for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
-                        self.dprobs_omitted_rowsum[ii, :] = _np.sum(dprobs[self.layout.indices_for_index(i), :], axis=0)
-
-                #if shared_mem_leader:  # Note: no need for barrier directly below as barrier further down suffices
-                dg_dprobs, lsvec = self.raw_objfn.dlsvec_and_lsvec(self.probs, self.counts, self.total_counts,
-                                                                   self.freqs)
-                dprobs *= dg_dprobs[:, None]
-                # (nelements,N) * (nelements,1)   (N = dim of vectorized model)
-                # this multiply also computes jac, which is just dprobs
-                # with a different shape (jac.shape == [nelements,nparams])
-
-        if shared_mem_leader:  # only "leader" modifies shared mem (dprobs & self.jac)
-            if self.firsts is not None:
-                #Note: lsvec is assumed to be *not* updated w/omitted probs contribution
-                self._update_dlsvec_for_omitted_probs(dprobs, lsvec, self.probs, self.dprobs_omitted_rowsum)
-
-            if self._process_penalties and shared_mem_leader:
-                self._fill_lspenaltyvec_jac(paramvec, self.jac[self.nelements:, :])  # jac.shape == (nelements+N,N)
+            self._convert_dprobs_to_dlsvec(dprobs, paramvec, shared_mem_leader)
         unit_ralloc.host_comm_barrier()  # have non-leader procs wait for leaders to set shared mem
 
         # REMOVE => unit tests?
@@ -4657,6 +4664,390 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         self.raw_objfn.resource_alloc.profiler.add_time("JACOBIAN", tm)
         return self.jac
 
+    def _convert_dprobs_to_dlsvec(self, dprobs, paramvec, shared_mem_leader):
+        """ Turns `dprobs`, the first `nelements` rows of `self.jac`, into the least-squares jacobian (in place) """
+        self._clip_probs()  # clips self.probs in place w/shared mem sync
+        if not shared_mem_leader:
+            return  # only "leader" modifies shared mem (dprobs & self.jac)
+
+        if self.firsts is not None:
+            self.dprobs_omitted_rowsum[:, :] = self.layout.sum_by_circuit(dprobs, self.indicesOfCircuitsWithOmittedData)
+
+        dg_dprobs, lsvec = self.raw_objfn.dlsvec_and_lsvec(self.probs, self.counts, self.total_counts,
+                                                           self.freqs)
+        dprobs *= dg_dprobs[:, None]
+        # (nelements,N) * (nelements,1)   (N = dim of vectorized model)
+        # this multiply also computes jac, which is just dprobs
+        # with a different shape (jac.shape == [nelements,nparams])
+
+        if self.firsts is not None:
+            #Note: lsvec is assumed to be *not* updated w/omitted probs contribution
+            self._update_dlsvec_for_omitted_probs(dprobs, lsvec, self.probs, self.dprobs_omitted_rowsum)
+
+        if self._process_penalties:
+            self._fill_lspenaltyvec_jac(paramvec, self.jac[self.nelements:, :])  # jac.shape == (nelements+N,N)
+
+    def dlsvec_lazy(self, paramvec=None, block_tol=1e-6, refresh=False):
+        """
+        The (possibly approximate) jacobian of the least-squares vector, reusing unchanged parameter blocks.
+
+        The derivatives of the circuit outcome probabilities are cached between calls, and
+        only the columns of the parameter blocks (see :method:`_lazy_param_blocks`) whose
+        parameters have moved by more than `block_tol` since their columns were last computed
+        are recomputed.  Since the derivatives with respect to one block of parameters generally
+        depend on the values of the others, the result is only an approximation of
+        :method:`dlsvec` unless `refresh` is True.  The probabilities, and so the factors that
+        relate the probability derivatives to the least-squares jacobian, are always computed
+        exactly.  This is useful in late optimization iterations, when only a few parameter
+        blocks (e.g. the SPAM parameters or those of a single gate) move appreciably.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        block_tol : float, optional
+            The largest absolute change in a parameter block's values for which the block's
+            cached derivative columns are reused.
+
+        refresh : bool, optional
+            If True, all of the derivative columns are recomputed, so that the exact jacobian
+            is returned.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `(nElements,nParams)` where `nElements` is the number
+            of circuit outcomes and `nParams` is the number of model parameters.
+        """
+        tm = _time.time()
+        dprobs = self.jac[0:self.nelements, :]  # avoid mem copying: use jac mem for dprobs
+        dprobs.shape = (self.nelements, self.nparams)
+        if paramvec is not None:
+            self.model.from_vector(paramvec)
+        else:
+            paramvec = self.model.to_vector()
+
+        unit_ralloc = self.layout.resource_alloc('param-processing')
+        shared_mem_leader = unit_ralloc.is_host_leader
+
+        if self._lazy_dprobs is None:
+            self._lazy_dprobs = self.layout.allocate_local_array('ep', 'd', memory_tracker=self.resource_alloc)
+            self._lazy_paramvec = None
+
+        if refresh or self._lazy_paramvec is None:
+            stale_slices = [slice(0, self.model.num_params)]
+            self._lazy_paramvec = paramvec.copy()
+        else:
+            stale_slices = [pslc for pslc in self._lazy_param_blocks()
+                            if _np.max(_np.abs(paramvec[pslc] - self._lazy_paramvec[pslc])) > block_tol]
+            for pslc in stale_slices:
+                self._lazy_paramvec[pslc] = paramvec[pslc]
+
+        with self.resource_alloc.temporarily_track_memory(2 * self.nelements):  # 'e' (dg_dprobs, lsvec)
+            self.model.sim.bulk_fill_dprobs_param_blocks(self._lazy_dprobs, self.layout, stale_slices, self.probs)
+            if shared_mem_leader:
+                dprobs[:, :] = self._lazy_dprobs
+            self._convert_dprobs_to_dlsvec(dprobs, paramvec, shared_mem_leader)
+        unit_ralloc.host_comm_barrier()  # have non-leader procs wait for leaders to set shared mem
+
+        self.raw_objfn.resource_alloc.profiler.add_time("LAZY JACOBIAN", tm)
+        return self.jac
+
+    def _lazy_param_blocks(self):
+        """
+        The contiguous blocks of model parameters whose cached derivatives :method:`dlsvec_lazy` updates together.
+
+        These are the finest slices of parameter indices that don't straddle the boundary of any
+        (contiguous run of the) parameters of a parameterized model member.
+
+        Returns
+        -------
+        list
+            A list of slices that partitions the range of parameter indices.
+        """
+        boundaries = {0, self.model.num_params}
+        try:
+            for _, obj in self.model._iter_parameterized_objs():
+                indices = _np.sort(obj.gpindices_as_array())
+                if len(indices) == 0: continue
+                breaks = _np.nonzero(_np.diff(indices) != 1)[0] + 1  # where contiguous runs of indices begin
+                boundaries.update(indices[_np.concatenate(([0], breaks))])
+                boundaries.update(indices[_np.concatenate((breaks - 1, [len(indices) - 1]))] + 1)
+        except NotImplementedError:
+            pass  # a single block of all the parameters
+        boundaries = sorted(boundaries)
+        return [slice(int(start), int(stop)) for start, stop in zip(boundaries[:-1], boundaries[1:])]
+
+    def _dlsvec_coefficients(self):
+        """
+        Computes, from `self.probs`, the factors that relate the jacobian of the least-squares vector to `dprobs`.
+
+        The (non-penalty) rows of the least-squares jacobian are `dg_dprobs[:, None] * dprobs`, except that
+        the rows in `self.firsts` are further multiplied by `first_scales` and have `first_coeffs[:, None]`
+        times the summed `dprobs` rows of their circuit subtracted from them (see
+        :method:`_update_dlsvec_for_omitted_probs`).
+
+        Returns
+        -------
+        dg_dprobs, first_scales, first_coeffs : numpy.ndarray
+            The latter two are `None` when there are no omitted probabilities.
+        """
+        dg_dprobs, lsvec = self.raw_objfn.dlsvec_and_lsvec(self.probs, self.counts, self.total_counts, self.freqs)
+        if self.firsts is None:
+            return dg_dprobs, None, None
+
+        lsvec_firsts = lsvec[self.firsts]
+        updated_lsvec = _np.sqrt(lsvec_firsts**2 + self._omitted_prob_first_terms(self.probs))
+        updated_lsvec = _np.where(updated_lsvec == 0, 1.0, updated_lsvec)  # avoid 0/0 where lsvec & deriv == 0
+        return (dg_dprobs, lsvec_firsts / updated_lsvec,
+                (0.5 / updated_lsvec) * self._omitted_prob_first_dterms(self.probs))
+
+    def _lspenaltyvec_jac(self, paramvec):
+        """ Allocates and fills the jacobian of the least-squares penalty vector (see :method:`_lspenaltyvec`) """
+        lspenaltyvec_jac = _np.empty((self.local_ex, self.nparams), 'd')
+        self._fill_lspenaltyvec_jac(paramvec, lspenaltyvec_jac)
+        return lspenaltyvec_jac
+
+    def dlsvec_sparse(self, paramvec=None):
+        """
+        The derivative (jacobian) of the least-squares vector, as a sparse matrix.
+
+        This is the same as :method:`dlsvec` except that only the structurally non-zero
+        derivatives are computed and held in memory (see :method:`ForwardSimulator.bulk_dprobs_sparse`).
+        This saves a great deal of memory and computation when each circuit depends on only a small
+        fraction of the model's parameters, as is the case for local-noise and cloud-noise models on
+        many qubits.  Each row of the jacobian that accounts for omitted probabilities has the
+        non-zero columns of all its circuit's rows, which are the same.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            A matrix of shape `(nElements + nPenaltyTerms, nParams)`.
+        """
+        tm = _time.time()
+        if paramvec is not None:
+            self.model.from_vector(paramvec)
+        else:
+            paramvec = self.model.to_vector()
+
+        with self.resource_alloc.temporarily_track_memory(2 * self.nelements):  # 'e' (dg_dprobs, lsvec)
+            dprobs = self.model.sim.bulk_dprobs_sparse(self.layout, self.probs)
+            self._clip_probs()  # clips self.probs in place w/shared mem sync
+            dg_dprobs, first_scales, first_coeffs = self._dlsvec_coefficients()
+
+            # jac = M * dprobs, where M is diagonal except for the rows of `self.firsts`, which also subtract the
+            # (scaled) sum of their circuit's rows (see _update_dlsvec_for_omitted_probs)
+            if self.firsts is not None:
+                dg_dprobs = dg_dprobs.copy()
+                dg_dprobs[self.firsts] *= first_scales
+                element_indices = _np.arange(self.nelements)
+                omitted_rows = []; omitted_cols = []; omitted_vals = []
+                for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
+                    cols = element_indices[self.layout.indices_for_index(i)]
+                    omitted_rows.append(_np.full(len(cols), self.firsts[ii])); omitted_cols.append(cols)
+                    omitted_vals.append(_np.full(len(cols), -first_coeffs[ii]))
+                M = _sps.csr_matrix((_np.concatenate(omitted_vals),
+                                     (_np.concatenate(omitted_rows), _np.concatenate(omitted_cols))),
+                                    shape=(self.nelements, self.nelements)) + _sps.diags(dg_dprobs, format='csr')
+                jac = M @ dprobs
+            else:
+                jac = _sps.diags(dg_dprobs, format='csr') @ dprobs
+
+        if self._process_penalties and self.local_ex > 0:
+            jac = _sps.vstack([jac, _sps.csr_matrix(self._lspenaltyvec_jac(paramvec))], format='csr')
+
+        self.raw_objfn.resource_alloc.profiler.add_time("SPARSE JACOBIAN", tm)
+        return jac
+
+    def dlsvec_dot(self, vec, paramvec=None):
+        """
+        The product of the jacobian of the least-squares vector and a parameter-space vector.
+
+        This is `dot(self.dlsvec(paramvec), vec)`, computed without constructing the jacobian
+        (see :method:`ForwardSimulator.bulk_fill_dprobs_dot`), and is used by matrix-free
+        optimization methods.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            A vector of length equal to the number of model parameters.
+
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `(nElements,)` where `nElements` is the number
+            of circuit outcomes (plus the number of penalty terms).
+        """
+        tm = _time.time()
+        if paramvec is not None:
+            self.model.from_vector(paramvec)
+        else:
+            paramvec = self.model.to_vector()
+        jac_vec = _np.empty(self.nelements + self.local_ex, 'd')
+        dprobs_vec = jac_vec[0:self.nelements]
+
+        with self.resource_alloc.temporarily_track_memory(3 * self.nelements):  # 'e' (jac_vec, dg_dprobs, lsvec)
+            self.model.sim.bulk_fill_dprobs_dot(dprobs_vec, self.layout, vec, self.probs)
+            self._clip_probs()  # clips self.probs in place w/shared mem sync
+            dg_dprobs, first_scales, first_coeffs = self._dlsvec_coefficients()
+
+            if self.firsts is not None:
+                omitted_rowsum_vec = self.layout.sum_by_circuit(dprobs_vec, self.indicesOfCircuitsWithOmittedData)
+            dprobs_vec *= dg_dprobs
+            if self.firsts is not None:
+                dprobs_vec[self.firsts] *= first_scales
+                dprobs_vec[self.firsts] -= first_coeffs * omitted_rowsum_vec
+
+        if self._process_penalties and self.local_ex > 0:
+            jac_vec[self.nelements:] = _np.dot(self._lspenaltyvec_jac(paramvec), vec)
+
+        self.raw_objfn.resource_alloc.profiler.add_time("JACOBIAN-VECTOR PRODUCT", tm)
+        return jac_vec
+
+    def dlsvec_transpose_dot(self, vec, paramvec=None):
+        """
+        The product of the transpose of the jacobian of the least-squares vector and a vector.
+
+        This is `dot(vec, self.dlsvec(paramvec))`, computed without constructing the jacobian
+        (see :method:`ForwardSimulator.bulk_fill_dprobs_transpose_dot`), and is used by
+        matrix-free optimization methods.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            A vector of length equal to that of the least-squares vector (see :method:`lsvec`).
+
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of length equal to the number of model parameters.
+        """
+        tm = _time.time()
+        if paramvec is not None:
+            self.model.from_vector(paramvec)
+        else:
+            paramvec = self.model.to_vector()
+        jacT_vec = _np.zeros(self.model.num_params, 'd')
+
+        with self.resource_alloc.temporarily_track_memory(3 * self.nelements):  # 'e' (weights, dg_dprobs, lsvec)
+            self.model.sim.bulk_fill_probs(self.probs, self.layout)
+            self._clip_probs()  # clips self.probs in place w/shared mem sync
+            dg_dprobs, first_scales, first_coeffs = self._dlsvec_coefficients()
+
+            weights = vec[0:self.nelements] * dg_dprobs
+            if self.firsts is not None:
+                weights[self.firsts] *= first_scales
+                for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
+                    weights[self.layout.indices_for_index(i)] -= first_coeffs[ii] * vec[self.firsts[ii]]
+            self.model.sim.bulk_fill_dprobs_transpose_dot(jacT_vec, self.layout, weights)
+
+        if self._process_penalties and self.local_ex > 0:
+            jacT_vec += _np.dot(vec[self.nelements:], self._lspenaltyvec_jac(paramvec))
+        jacT_vec = self.layout.allsum_local_quantity('e', jacT_vec, use_shared_mem=False)
+
+        self.raw_objfn.resource_alloc.profiler.add_time("JACOBIAN-VECTOR PRODUCT", tm)
+        return jacT_vec
+
+    def jtj_and_jtf(self, paramvec=None, blk_size=None):
+        """
+        The products `J^T J` and `J^T f` of the least-squares jacobian, `J`, and least-squares vector, `f`.
+
+        These products are accumulated from blocks of the rows of `J` (see
+        :method:`ForwardSimulator.iter_dprobs_by_element_blocks`), which are discarded as soon as they
+        have been used, so that the full `(nElements, nParams)` jacobian is never held in memory.
+        Distributed forward simulators compute one layout atom at a time, so it is the size of the
+        atoms that limits the memory needed.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        blk_size : int, optional
+            The maximum number of jacobian rows to process at once.  If None, the blocks
+            are as large as the forward simulator computes them (e.g. a whole atom).
+
+        Returns
+        -------
+        jtj : numpy.ndarray
+            The `(nParams, nParams)` matrix `J^T J`.
+
+        jtf : numpy.ndarray
+            The length-`nParams` vector `J^T f`.
+        """
+        tm = _time.time()
+        lsvec = self.lsvec(paramvec)  # also computes (clipped) self.probs and sets the model's parameters
+        paramvec = self.model.to_vector()
+        jtj = _np.zeros((self.nparams, self.nparams), 'd')
+        jtf = _np.zeros(self.nparams, 'd')
+
+        # Only the leaders of the groups of processors computing the same atom contribute (see the sum below)
+        unit_ralloc = self.layout.resource_alloc('atom-processing')
+        shared_mem_leader = unit_ralloc.is_host_leader
+
+        with self.resource_alloc.temporarily_track_memory(3 * self.nelements):  # 'e' (dg_dprobs, lsvec, weights)
+            dg_dprobs, first_scales, first_coeffs = self._dlsvec_coefficients()
+
+            if self.firsts is not None:
+                # The rows of `self.firsts` depend on *all* the dprobs rows of their circuits, so these are
+                # accumulated separately from the blocks and added once all the blocks have been processed.
+                omitted_index = _np.full(self.nelements, -1, dtype=int)
+                for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
+                    omitted_index[self.layout.indices_for_index(i)] = ii
+                first_index = _np.full(self.nelements, -1, dtype=int)
+                first_index[self.firsts] = _np.arange(len(self.firsts))
+                dprobs_omitted_rowsum = _np.zeros((len(self.firsts), self.nparams), 'd')
+                dprobs_firsts = _np.zeros((len(self.firsts), self.nparams), 'd')
+                first_scales = first_scales * dg_dprobs[self.firsts]
+                dg_dprobs = dg_dprobs.copy()
+                dg_dprobs[self.firsts] = 0.0  # exclude these rows from the block-wise accumulation
+
+            for element_slice, dprobs_blk in self.model.sim.iter_dprobs_by_element_blocks(self.layout, blk_size):
+                if not shared_mem_leader: continue
+                if self.firsts is not None:
+                    blk_omitted_index = omitted_index[element_slice]
+                    in_omitted = blk_omitted_index >= 0
+                    _np.add.at(dprobs_omitted_rowsum, blk_omitted_index[in_omitted], dprobs_blk[in_omitted])
+                    blk_first_index = first_index[element_slice]
+                    is_first = blk_first_index >= 0
+                    dprobs_firsts[blk_first_index[is_first]] = dprobs_blk[is_first]
+
+                jac_blk = dg_dprobs[element_slice, None] * dprobs_blk
+                jtj += _np.dot(jac_blk.T, jac_blk)
+                jtf += _np.dot(jac_blk.T, lsvec[element_slice])
+
+            if self.firsts is not None and shared_mem_leader:
+                jac_firsts = first_scales[:, None] * dprobs_firsts - first_coeffs[:, None] * dprobs_omitted_rowsum
+                jtj += _np.dot(jac_firsts.T, jac_firsts)
+                jtf += _np.dot(jac_firsts.T, lsvec[self.firsts])
+
+        if self._process_penalties and self.local_ex > 0 and shared_mem_leader:
+            lspenaltyvec_jac = self._lspenaltyvec_jac(paramvec)
+            jtj += _np.dot(lspenaltyvec_jac.T, lspenaltyvec_jac)
+            jtf += _np.dot(lspenaltyvec_jac.T, lsvec[self.nelements:])
+
+        jtj = self.layout.allsum_local_quantity('e', jtj, use_shared_mem=False)
+        jtf = self.layout.allsum_local_quantity('e', jtf, use_shared_mem=False)
+        self.raw_objfn.resource_alloc.profiler.add_time("JTJ ACCUMULATION", tm)
+        return jtj, jtf
+
     def dterms(self, paramvec=None):
         """
         Compute the jacobian of the terms of the objective function.
@@ -4697,8 +5088,8 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
 
             if shared_mem_leader:
                 if self.firsts is not None:
-                    for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
-                        self.dprobs_omitted_rowsum[ii, :] = _np.sum(dprobs[self.layout.indices_for_index(i), :], axis=0)
+                    self.dprobs_omitted_rowsum[:, :] = self.layout.sum_by_circuit(
+                        dprobs, self.indicesOfCircuitsWithOmittedData)
 
                 #if shared_mem_leader:  # Note: barrier below work suffices for this condition too
                 dprobs *= self.raw_objfn.dterms(self.probs, self.counts, self.total_counts, self.freqs)[:, None]
@@ -4859,6 +5250,68 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         if paramvec is not None: self.model.from_vector(paramvec)
         return self._gather_hessian(self._construct_hessian(self.counts, self.total_counts, self.prob_clip_interval))
 
+    def hessian_dot(self, vec, paramvec=None):
+        """
+        The product of the Hessian of this objective function and a vector.
+
+        This is `dot(self.hessian(paramvec), vec)`, computed without constructing the Hessian or
+        any of the per-element probability Hessians.  Using the notation of :method:`_hessian_from_block`,
+        the product is `J^T (d2g/dprobs2 * J vec) + sum_e dg/dprobs[e] * dot(hprobs[e], vec)`, where the first
+        term requires one jacobian-vector and one jacobian-transpose-vector product, and the second is computed
+        by :method:`ForwardSimulator.bulk_fill_hprobs_dot`.  The memory required therefore scales with the
+        number of circuit outcomes and not with the square of the number of model parameters, making this
+        suitable for iterative (e.g. conjugate-gradient) methods on models with many parameters.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            A vector of length equal to the number of model parameters.
+
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of length equal to the number of model parameters.
+        """
+        if self.ex != 0: raise NotImplementedError("Hessian is not implemented for penalty terms yet!")
+        tm = _time.time()
+        if paramvec is not None: self.model.from_vector(paramvec)
+        hessian_vec = _np.zeros(self.model.num_params, 'd')
+        hprobs_vec = _np.zeros(self.model.num_params, 'd')
+        dprobs_vec = _np.empty(self.nelements, 'd')
+
+        with self.resource_alloc.temporarily_track_memory(3 * self.nelements):  # 'e' (dprobs_vec, coeffs x2)
+            self.model.sim.bulk_fill_dprobs_dot(dprobs_vec, self.layout, vec, self.probs)
+            self._clip_probs()  # clips self.probs in place w/shared mem sync
+
+            dprobs12_coeffs = self.raw_objfn.hterms(self.probs, self.counts, self.total_counts, self.freqs)
+            hprobs_coeffs = self.raw_objfn.dterms(self.probs, self.counts, self.total_counts, self.freqs)
+            dprobs12_coeffs *= dprobs_vec
+
+            if self.firsts is not None:
+                # terms for the omitted probabilities, 1 - sum(probs), of each circuit with omitted data
+                omitted_probs = 1.0 - self.layout.sum_by_circuit(self.probs, self.indicesOfCircuitsWithOmittedData)
+                omitted_dprobs_vec = self.layout.sum_by_circuit(dprobs_vec, self.indicesOfCircuitsWithOmittedData)
+                omitted_dprobs12_coeffs = self.raw_objfn.zero_freq_hterms(self.total_counts[self.firsts],
+                                                                          omitted_probs) * omitted_dprobs_vec
+                omitted_hprobs_coeffs = -self.raw_objfn.zero_freq_dterms(self.total_counts[self.firsts],
+                                                                         omitted_probs)
+                # each omitted probability depends on all the probabilities of its circuit
+                self.layout.add_by_circuit(dprobs12_coeffs, omitted_dprobs12_coeffs,
+                                           self.indicesOfCircuitsWithOmittedData)
+                self.layout.add_by_circuit(hprobs_coeffs, omitted_hprobs_coeffs, self.indicesOfCircuitsWithOmittedData)
+
+            self.model.sim.bulk_fill_dprobs_transpose_dot(hessian_vec, self.layout, dprobs12_coeffs)
+            self.model.sim.bulk_fill_hprobs_dot(hprobs_vec, self.layout, vec, hprobs_coeffs)
+            hessian_vec += hprobs_vec
+
+        hessian_vec = self.layout.allsum_local_quantity('e', hessian_vec, use_shared_mem=False)
+        self.raw_objfn.resource_alloc.profiler.add_time("HESSIAN-VECTOR PRODUCT", tm)
+        return hessian_vec
+
     def _hessian_from_block(self, hprobs, dprobs12, probs, counts, total_counts, freqs, resource_alloc):
         """ Factored-out computation of hessian from raw components """
 
@@ -4878,15 +5331,9 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         hprobs_coeffs = self.raw_objfn.dterms(probs, counts, total_counts, freqs)
 
         if self.firsts is not None:
-            #Allocate these above?  Need to know block sizes of dprobs12 & hprobs...
-            dprobs12_omitted_rowsum = _np.empty((len(self.firsts),) + dprobs12.shape[1:], 'd')
-            hprobs_omitted_rowsum = _np.empty((len(self.firsts),) + hprobs.shape[1:], 'd')
-
-            omitted_probs = 1.0 - _np.array([_np.sum(probs[self.layout.indices_for_index(i)])
-                                             for i in self.indicesOfCircuitsWithOmittedData])
-            for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
-                dprobs12_omitted_rowsum[ii, :, :] = _np.sum(dprobs12[self.layout.indices_for_index(i), :, :], axis=0)
-                hprobs_omitted_rowsum[ii, :, :] = _np.sum(hprobs[self.layout.indices_for_index(i), :, :], axis=0)
+            omitted_probs = 1.0 - self.layout.sum_by_circuit(probs, self.indicesOfCircuitsWithOmittedData)
+            dprobs12_omitted_rowsum = self.layout.sum_by_circuit(dprobs12, self.indicesOfCircuitsWithOmittedData)
+            hprobs_omitted_rowsum = self.layout.sum_by_circuit(hprobs, self.indicesOfCircuitsWithOmittedData)
 
             dprobs12_omitted_coeffs = -self.raw_objfn.zero_freq_hterms(total_counts[self.firsts], omitted_probs)
             hprobs_omitted_coeffs = -self.raw_objfn.zero_freq_dterms(total_counts[self.firsts], omitted_probs)
@@ -6291,9 +6738,7 @@ class CachedObjectiveFunction(object):
         #local_percircuit = objective_function.percircuit()
         #self.percircuit = objfn_layout.allgather_local_array('c', local_percircuit)
         self.num_circuits = len(self.layout.circuits)
-        self.percircuit = _np.empty(self.num_circuits, 'd')
-        for i in range(self.num_circuits):
-            self.percircuit[i] = _np.sum(self.terms[self.layout.indices_for_index(i)], axis=0)
+        self.percircuit = self.layout.sum_by_circuit(self.terms)
         self.chi2k_distributed_percircuit = objective_function.chi2k_distributed_qty(self.percircuit)
 
         if isinstance(objective_function, TimeIndependentMDCObjectiveFunction):
@@ -231,6 +231,16 @@ class WildcardBudget(object):
         D_precomp = _np.logical_and(~C_precomp, freqs == 0)  # probs_in != freqs and freqs == 0
         circuits = layout.circuits
 
+        # per-circuit sums (and minima) are computed all at once, rather than within the loop below
+        initialTVDs = layout.sum_by_circuit(tvd_precomp)  # 0.5 * sum(_np.abs(qvec - fvec))
+        sums_fA = layout.sum_by_circuit(_np.where(A_precomp, freqs, 0.0))
+        sums_fB = layout.sum_by_circuit(_np.where(B_precomp, freqs, 0.0))
+        sums_qA = layout.sum_by_circuit(_np.where(A_precomp, probs_in, 0.0))
+        sums_qB = layout.sum_by_circuit(_np.where(B_precomp, probs_in, 0.0))
+        sums_qC = layout.sum_by_circuit(_np.where(C_precomp, probs_in, 0.0))
+        sums_qD = layout.sum_by_circuit(_np.where(D_precomp, probs_in, 0.0))
+        min_qvecs = layout.reduce_by_circuit(probs_in, _np.minimum)
+
         precomp_info = []
 
         for i, circ in enumerate(circuits):
@@ -238,20 +248,20 @@ class WildcardBudget(object):
             fvec = freqs[elInds]
             qvec = probs_in[elInds]
 
-            initialTVD = sum(tvd_precomp[elInds])  # 0.5 * sum(_np.abs(qvec - fvec))
+            initialTVD = initialTVDs[i]
 
             A = A_precomp[elInds]
             B = B_precomp[elInds]
             C = C_precomp[elInds]
             D = D_precomp[elInds]
-            sum_fA = float(_np.sum(fvec[A]))
-            sum_fB = float(_np.sum(fvec[B]))
-            sum_qA = float(_np.sum(qvec[A]))
-            sum_qB = float(_np.sum(qvec[B]))
-            sum_qC = float(_np.sum(qvec[C]))
-            sum_qD = float(_np.sum(qvec[D]))
-
-            min_qvec = _np.min(qvec)
+            sum_fA = float(sums_fA[i])
+            sum_fB = float(sums_fB[i])
+            sum_qA = float(sums_qA[i])
+            sum_qB = float(sums_qB[i])
+            sum_qC = float(sums_qC[i])
+            sum_qD = float(sums_qD[i])
+
+            min_qvec = min_qvecs[i]
 
             # sort(abs(qvec[A] / fvec[A] - 1.0)) but abs and 1.0 irrelevant since ratio is always > 1
             iA = sorted(zip(_np.nonzero(A)[0], qvec[A] / fvec[A]), key=lambda x: x[1])
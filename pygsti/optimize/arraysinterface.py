@@ -11,6 +11,7 @@ Implements the ArraysInterface object and supporting functionality.
 #***************************************************************************************************
 
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti.tools import sharedmemtools as _smt
 
@@ -580,6 +581,82 @@ class UndistributedArraysInterface(ArraysInterface):
         return _np.diag_indices_from(jtj)
 
 
+class SparseJacobianArraysInterface(UndistributedArraysInterface):
+    """
+    An undistributed arrays interface for Jacobians held as `scipy.sparse` matrices.
+
+    The Jacobian-related operations use sparse kernels, so that the cost of computing `J^T J`
+    and `J^T f` scales with the number of non-zero Jacobian elements.  Dense (`numpy.ndarray`)
+    Jacobians, e.g. those computed by finite differences, are also accepted.
+
+    Parameters
+    ----------
+    num_global_elements : int
+        The total number of objective function "elements", i.e. the size of the
+        objective function array `f`.
+
+    num_global_params : int
+        The total number of (model) parameters, i.e. the size of the `x` array.
+    """
+
+    def norm2_jac(self, j):
+        """
+        Compute the Frobenius norm squared of an Jacobian matrix (`ep`-type).
+
+        Parameters
+        ----------
+        j : scipy.sparse.spmatrix or numpy.ndarray
+            The Jacobian to operate on.
+
+        Returns
+        -------
+        float
+        """
+        return _np.linalg.norm(j.data) if _sps.issparse(j) else _np.linalg.norm(j)
+
+    def fill_jtf(self, j, f, jtf):
+        """
+        Compute dot(Jacobian.T, f) in supplied memory.
+
+        Parameters
+        ----------
+        j : scipy.sparse.spmatrix or numpy.ndarray
+            Jacobian matrix (type `ep`).
+
+        f : numpy.ndarray
+            Objective function vector (type `e`).
+
+        jtf : numpy.ndarray
+            Output array, type `jtf`.  Filled with `dot(j.T, f)` values.
+
+        Returns
+        -------
+        None
+        """
+        jtf[:] = j.T @ f
+
+    def fill_jtj(self, j, jtj, shared_mem_buf=None):
+        """
+        Compute dot(Jacobian.T, Jacobian) in supplied memory.
+
+        Parameters
+        ----------
+        j : scipy.sparse.spmatrix or numpy.ndarray
+            Jacobian matrix (type `ep`).
+
+        jtf : numpy.ndarray
+            Output array, type `jtj`.  Filled with `dot(j.T, j)` values.
+
+        shared_mem_buf : tuple or None
+            Unused.
+
+        Returns
+        -------
+        None
+        """
+        jtj[:, :] = (j.T @ j).toarray() if _sps.issparse(j) else _np.dot(j.T, j)
+
+
 class DistributedArraysInterface(ArraysInterface):
     """
     An arrays interface where the arrays are distributed according to a distributed layout.
@@ -15,8 +15,11 @@ import time as _time
 
 import numpy as _np
 import scipy as _scipy
+import scipy.sparse as _sps
 
 from pygsti.optimize import arraysinterface as _ari
+from pygsti.optimize.customsolve import custom_cholesky_factor as _custom_cholesky_factor
+from pygsti.optimize.customsolve import custom_cholesky_solve as _custom_cholesky_solve
 from pygsti.optimize.customsolve import custom_solve as _custom_solve
 from pygsti.baseobjs.verbosityprinter import VerbosityPrinter as _VerbosityPrinter
 from pygsti.baseobjs.resourceallocation import ResourceAllocation as _ResourceAllocation
@@ -198,11 +201,85 @@ class CustomLMOptimizer(Optimizer):
         Gaussian Elimination (with partial pivoting) algorithm coded in Python. Since SciPy's
         implementation is more efficient, it's not worth using the parallel version until there
         are many processors to spread the work among.
+
+    linear_solver : {"elimination", "cholesky"}, optional
+        The algorithm used to solve the (symmetric positive definite) damped normal equations
+        when `solver == "direct"` and they are distributed over at least `serial_solve_proc_threshold`
+        processors: Gaussian elimination with partial pivoting or a blocked Cholesky decomposition.
+        With `"cholesky"` the (serial or parallel) Cholesky factor of each damped `J^T J` is kept and
+        reused for the solve needed by the acceleration term (see `use_acceleration`).
+
+    damping_sweep : {"solve", "eigen", "auto"}, optional
+        How the damped normal equations are re-solved for the different damping values (`mu`) tried
+        within a single iteration, when `damping_mode == "identity"` and `damping_basis ==
+        "diagonal_values"`.  `"solve"` solves the equations anew for each value, and `"eigen"` computes the
+        eigendecomposition of `J^T J` once per iteration, after which each solve only costs a pair of
+        matrix-vector products.  `"auto"` switches between these based on a running average of the number
+        of solves (i.e. rejected steps + 1) per iteration, using `"eigen"` when this exceeds `eigen_cost`.
+
+    eigen_cost : float, optional
+        The cost of an eigendecomposition of `J^T J` relative to that of a single linear solve, used to
+        select a strategy when `damping_sweep == "auto"`.
+
+    solver : {"direct", "cg"}, optional
+        How the damped normal equations are solved at each step.  `"direct"` constructs the
+        Jacobian (J) and `J^T J` and solves the equations directly.  `"cg"` instead uses a
+        matrix-free method (see :func:`custom_matrix_free_leastsq`) that solves them using
+        preconditioned conjugate gradients and only products of J and its transpose with vectors.
+        This needs far less memory for models with many parameters, but requires a single
+        processor and that `damping_mode` be `"identity"` or `"JTJ"`.  Finite-difference
+        iterations (`fditer`) are not performed when `solver == "cg"`, and the out-of-bounds,
+        acceleration, and uphill-step options are ignored.
+
+    cg_tol : float, optional
+        The relative tolerance of each conjugate gradient solve when `solver == "cg"`.
+
+    cg_maxiter : int, optional
+        The maximum number of iterations of each conjugate gradient solve when `solver == "cg"`.
+        If None, the number of model parameters is used.
+
+    stream_jtj : bool, optional
+        When `True` (and `solver == "direct"`), `J^T J` and `J^T f` are accumulated from blocks
+        of the Jacobian's rows (see :method:`TimeIndependentMDCObjectiveFunction.jtj_and_jtf`)
+        rather than computed from the full Jacobian, which is never held in memory.  Distributed
+        forward simulators compute one layout atom at a time, so the memory required is set by the
+        size of the atoms rather than the total number of circuit outcomes.  This requires a single
+        processor and that `use_acceleration` be `False`.  Finite-difference iterations (`fditer`)
+        are not performed in this mode.
+
+    stream_blk_size : int, optional
+        The maximum number of Jacobian rows processed at once when `stream_jtj == True`.
+        If None, blocks are as large as the forward simulator computes them (e.g. whole atoms).
+
+    sparse_jacobian : bool, optional
+        When `True` (and `solver == "direct"`), the Jacobian is computed and held as a sparse matrix
+        containing only the derivatives of each circuit's outcomes with respect to the parameters of
+        the circuit's operations (see :method:`TimeIndependentMDCObjectiveFunction.dlsvec_sparse`), and
+        `J^T J` and `J^T f` are computed using sparse kernels.  This is much more efficient for models in
+        which circuits only depend on a small fraction of the parameters, e.g. local-noise and cloud-noise
+        models on many qubits.  This requires a single processor and cannot be used with `stream_jtj`.
+        Approximate jacobians (`jac_refresh_interval`) are not used in this mode.
+
+    jac_refresh_interval : int, optional
+        The maximum number of consecutive iterations that use an approximate, cheaper to compute,
+        jacobian (see `lazy_jac_tol`) before the exact jacobian is recomputed.  The default of 1
+        means the exact jacobian is always used.  Only used when `solver == "direct"` and
+        `stream_jtj == False`.
+
+    lazy_jac_tol : float, optional
+        When `jac_refresh_interval > 1`, this selects how approximate jacobians are obtained.  If
+        None, a Broyden rank-one update of the previous jacobian is used (requiring that only a
+        single processor is used).  Otherwise, only the derivative columns of the parameter blocks
+        (e.g. a single gate's parameters) that moved by more than `lazy_jac_tol` since they were last
+        computed are recomputed (see :method:`TimeIndependentMDCObjectiveFunction.dlsvec_lazy`).
     """
     def __init__(self, maxiter=100, maxfev=100, tol=1e-6, fditer=0, first_fditer=0, damping_mode="identity",
                  damping_basis="diagonal_values", damping_clip=None, use_acceleration=False,
                  uphill_step_threshold=0.0, init_munu="auto", oob_check_interval=0,
-                 oob_action="reject", oob_check_mode=0, serial_solve_proc_threshold=100):
+                 oob_action="reject", oob_check_mode=0, serial_solve_proc_threshold=100,
+                 solver="direct", cg_tol=1e-4, cg_maxiter=None, stream_jtj=False, stream_blk_size=None,
+                 jac_refresh_interval=1, lazy_jac_tol=None, linear_solver="elimination", damping_sweep="solve",
+                 eigen_cost=10.0, sparse_jacobian=False):
 
         if isinstance(tol, float): tol = {'relx': 1e-8, 'relf': tol, 'f': 1.0, 'jac': tol, 'maxdx': 1.0}
         self.maxiter = maxiter
@@ -219,9 +296,38 @@ class CustomLMOptimizer(Optimizer):
         self.oob_check_interval = oob_check_interval
         self.oob_action = oob_action
         self.oob_check_mode = oob_check_mode
-        self.array_types = 3 * ('p',) + ('e', 'ep')  # see custom_leastsq fn "-type"s  -need to add 'jtj' type
-        self.called_objective_methods = ('lsvec', 'dlsvec')  # the objective function methods we use (for mem estimate)
         self.serial_solve_proc_threshold = serial_solve_proc_threshold
+        self.solver = solver
+        self.cg_tol = cg_tol
+        self.cg_maxiter = cg_maxiter
+        self.stream_jtj = stream_jtj
+        self.stream_blk_size = stream_blk_size
+        self.jac_refresh_interval = jac_refresh_interval
+        self.lazy_jac_tol = lazy_jac_tol
+        self.linear_solver = linear_solver
+        self.damping_sweep = damping_sweep
+        self.eigen_cost = eigen_cost
+        self.sparse_jacobian = sparse_jacobian
+        if stream_jtj and sparse_jacobian:
+            raise ValueError("`stream_jtj` and `sparse_jacobian` cannot both be True!")
+        if solver == "direct" and stream_jtj:
+            self.array_types = 3 * ('p',) + ('e',)  # see custom_leastsq fn "-type"s (no jacobian is allocated)
+            self.called_objective_methods = ('lsvec', 'jtj_and_jtf')
+        elif solver == "direct" and sparse_jacobian:
+            self.array_types = 3 * ('p',) + ('e',)  # see custom_leastsq fn "-type"s (the jacobian is sparse)
+            self.called_objective_methods = ('lsvec', 'dlsvec_sparse')
+        elif solver == "direct":
+            self.array_types = 3 * ('p',) + ('e', 'ep')  # see custom_leastsq fn "-type"s  -need to add 'jtj' type
+            self.called_objective_methods = ('lsvec', 'dlsvec')  # the objective function methods we use (for mem est)
+            if jac_refresh_interval > 1 and lazy_jac_tol is None:
+                self.array_types += ('e',)  # the objective function where the last jacobian was computed
+            elif jac_refresh_interval > 1:
+                self.called_objective_methods = ('lsvec', 'dlsvec_lazy')
+        elif solver == "cg":
+            self.array_types = 9 * ('p',) + ('e', 'e')  # see custom_matrix_free_leastsq (x, dx, CG vectors, etc.)
+            self.called_objective_methods = ('lsvec', 'dlsvec_dot', 'dlsvec_transpose_dot')
+        else:
+            raise ValueError("Invalid `solver`: '%s'" % str(solver))
 
     def run(self, objective, profiler, printer):
 
@@ -249,16 +355,63 @@ class CustomLMOptimizer(Optimizer):
         # Check memory limit can handle what custom_leastsq will "allocate"
         nExtra = objective.ex  # number of additional "extra" elements
         nEls = objective.layout.num_elements + nExtra; nP = len(x0)  # 'e' and 'p' for array types
-        objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nEls * nP + nP * nP)  # see array_types above
 
-        from ..layouts.distlayout import DistributableCOPALayout as _DL
-        ari = _ari.DistributedArraysInterface(objective.layout, nExtra) \
-            if isinstance(objective.layout, _DL) else _ari.UndistributedArraysInterface(nEls, nP)
+        if self.solver == "cg":
+            if objective.resource_alloc.comm_size > 1:
+                raise NotImplementedError("The matrix-free ('cg') solver doesn't support multiple processors yet.")
+            objective.resource_alloc.check_can_allocate_memory(9 * nP + 2 * nEls)  # see array_types above
+            opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj = custom_matrix_free_leastsq(
+                objective_func, objective.dlsvec_dot, objective.dlsvec_transpose_dot, x0,
+                f_norm2_tol=self.tol.get('f', 1.0),
+                jac_norm_tol=self.tol.get('jac', 1e-6),
+                rel_ftol=self.tol.get('relf', 1e-6),
+                rel_xtol=self.tol.get('relx', 1e-8),
+                max_iter=self.maxiter,
+                max_dx_scale=self.tol.get('maxdx', 1.0),
+                damping_mode=self.damping_mode,
+                init_munu=self.init_munu,
+                cg_tol=self.cg_tol,
+                cg_maxiter=self.cg_maxiter,
+                x_limits=x_limits,
+                verbosity=printer - 1, profiler=profiler)
+            return self._finish_run(objective, opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj, printer)
+
+        if self.stream_jtj:
+            if objective.resource_alloc.comm_size > 1:
+                raise NotImplementedError("Streaming J^T J accumulation doesn't support multiple processors yet.")
+            objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nP * nP)  # see array_types above
+            ari = _ari.UndistributedArraysInterface(nEls, nP)  # layout needn't have a parameter dimension
+
+            def jtj_and_jtf(x):
+                return objective.jtj_and_jtf(x, self.stream_blk_size)
+            jacobian = approx_jacobian = None
+        elif self.sparse_jacobian:
+            if objective.resource_alloc.comm_size > 1:
+                raise NotImplementedError("Sparse jacobians don't support multiple processors yet.")
+            objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nP * nP)  # see array_types above
+            ari = _ari.SparseJacobianArraysInterface(nEls, nP)
+            jacobian = objective.dlsvec_sparse
+            approx_jacobian = jtj_and_jtf = None
+        else:
+            objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nEls * nP + nP * nP)  # see above
+            if self.jac_refresh_interval > 1 and self.lazy_jac_tol is not None:
+                def jacobian(x):
+                    return objective.dlsvec_lazy(x, refresh=True)  # exact, but also updates the lazy-jacobian cache
+
+                def approx_jacobian(x):
+                    return objective.dlsvec_lazy(x, self.lazy_jac_tol)
+            else:
+                approx_jacobian = None  # Broyden updates, if jac_refresh_interval > 1
+
+            from ..layouts.distlayout import DistributableCOPALayout as _DL
+            ari = _ari.DistributedArraysInterface(objective.layout, nExtra) \
+                if isinstance(objective.layout, _DL) else _ari.UndistributedArraysInterface(nEls, nP)
+            jtj_and_jtf = None
 
         opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj = custom_leastsq(
             objective_func, jacobian, x0,
             max_iter=self.maxiter,
-            num_fd_iters=self.fditer,
+            num_fd_iters=0 if self.stream_jtj else self.fditer,
             f_norm2_tol=self.tol.get('f', 1.0),
             jac_norm_tol=self.tol.get('jac', 1e-6),
             rel_ftol=self.tol.get('relf', 1e-6),
@@ -276,14 +429,23 @@ class CustomLMOptimizer(Optimizer):
             resource_alloc=objective.resource_alloc,
             arrays_interface=ari,
             serial_solve_proc_threshold=self.serial_solve_proc_threshold,
+            linear_solver=self.linear_solver,
+            damping_sweep=self.damping_sweep,
+            eigen_cost=self.eigen_cost,
             x_limits=x_limits,
-            verbosity=printer - 1, profiler=profiler)
-
+            verbosity=printer - 1, profiler=profiler,
+            jtj_and_jtf_fn=jtj_and_jtf,
+            jac_refresh_interval=1 if (self.stream_jtj or self.sparse_jacobian) else self.jac_refresh_interval,
+            approx_jac_fn=approx_jacobian)
+        return self._finish_run(objective, opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj, printer)
+
+    def _finish_run(self, objective, opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj, printer):
+        """ Checks convergence, ensures `objective` was last evaluated at `opt_x` and creates the result """
         printer.log("Least squares message = %s" % msg, 2)
         assert(converged), "Failed to converge: %s" % msg
         current_v = objective.model.to_vector()
         if not _np.allclose(current_v, opt_x):  # ensure the last model evaluation was at opt_x
-            objective_func(opt_x)
+            objective.lsvec(opt_x)
             #objective.model.from_vector(opt_x)  # performed within line above
 
         #DEBUG CHECK SYNC between procs (especially for shared mem) - could REMOVE
@@ -320,7 +482,9 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                    damping_clip=None, use_acceleration=False, uphill_step_threshold=0.0,
                    init_munu="auto", oob_check_interval=0, oob_action="reject", oob_check_mode=0,
                    resource_alloc=None, arrays_interface=None, serial_solve_proc_threshold=100,
-                   x_limits=None, verbosity=0, profiler=None):
+                   x_limits=None, verbosity=0, profiler=None, jtj_and_jtf_fn=None,
+                   jac_refresh_interval=1, approx_jac_fn=None, linear_solver="elimination",
+                   damping_sweep="solve", eigen_cost=10.0):
     """
     An implementation of the Levenberg-Marquardt least-squares optimization algorithm customized for use within pyGSTi.
 
@@ -335,8 +499,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         length N and M respectively.  Same form as scipy.optimize.leastsq.
 
     jac_fn : function
-        The jacobian function (not optional!).  Accepts a 1D array of length N
-        and returns an array of shape (M,N).
+        The jacobian function (not optional unless `jtj_and_jtf_fn` is given).  Accepts a
+        1D array of length N and returns an array of shape (M,N).
 
     x0 : numpy.ndarray
         Initial evaluation point.
@@ -456,6 +620,44 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     profiler : Profiler, optional
         A profiler object used for to track timing and memory usage.
 
+    jtj_and_jtf_fn : function, optional
+        If not None, a function that accepts a 1D array of length N and returns the (global)
+        `(N,N)` and length-N arrays `dot(J.T, J)` and `dot(J.T, f)`, where `J` and `f` are the
+        jacobian and objective function at the given point.  This is used instead of `jac_fn`
+        so that the jacobian never needs to be held in memory, and cannot be used with
+        finite-difference iterations or `use_acceleration`.
+
+    jac_refresh_interval : int, optional
+        The maximum number of consecutive outer iterations that use a (cheaper) approximate
+        jacobian.  The exact jacobian is computed, using `jac_fn`, at least every
+        `jac_refresh_interval`-th iteration, and whenever no step has been accepted since the
+        last jacobian was computed or a convergence criterion is met using an approximate
+        jacobian.  The default value of 1 means that approximate jacobians are never used.
+        Note that the returned `JTJ` may be computed from an approximate jacobian.
+
+    approx_jac_fn : function, optional
+        A function with the same signature as `jac_fn` that returns an approximate jacobian,
+        used when `jac_refresh_interval > 1`.  If None, the previous jacobian is updated using
+        a rank-one Broyden update, which requires that only a single processor is used.
+
+    linear_solver : {"elimination", "cholesky"}, optional
+        How the damped normal equations are solved when they are distributed over at least
+        `serial_solve_proc_threshold` processors (see :func:`custom_solve`).  When `"cholesky"`,
+        the Cholesky factor of the damped `JTJ` is also reused to solve for the acceleration term.
+
+    damping_sweep : {"solve", "eigen", "auto"}, optional
+        How the damped normal equations are solved for the (increasing) values of `mu` tried within
+        one iteration when `damping_mode == "identity"` and `damping_basis == "diagonal_values"`.
+        `"solve"` uses a linear solve for each value.  `"eigen"` computes the eigendecomposition
+        `JTJ = V diag(s) V^T` once per iteration, so that `dx = -V diag(1/(s + mu)) V^T JTf` is
+        obtained for each `mu` using only matrix-vector products.  `"auto"` uses `"eigen"` whenever
+        the running average of the number of solves per iteration exceeds `eigen_cost`.  When
+        `damping_mode` or `damping_basis` take other values, `"auto"` is the same as `"solve"`.
+
+    eigen_cost : float, optional
+        The cost of the eigendecomposition of `JTJ`, in units of the cost of a single linear solve.
+        Only used when `damping_sweep == "auto"`.
+
     Returns
     -------
     x : numpy.ndarray
@@ -465,8 +667,21 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     msg : str
         A message indicating why the solution converged (or didn't).
     """
+    if jtj_and_jtf_fn is not None and (num_fd_iters > 0 or use_acceleration):
+        raise ValueError("`jtj_and_jtf_fn` cannot be used with finite-difference iterations or acceleration!")
+    if jtj_and_jtf_fn is not None and jac_refresh_interval > 1:
+        raise ValueError("`jtj_and_jtf_fn` cannot be used with approximate jacobians (`jac_refresh_interval > 1`)!")
+    if linear_solver not in ("elimination", "cholesky"):
+        raise ValueError("Invalid `linear_solver`: '%s'" % str(linear_solver))
+    if damping_sweep not in ("solve", "eigen", "auto"):
+        raise ValueError("Invalid `damping_sweep`: '%s'" % str(damping_sweep))
+    can_sweep_eigen = bool(damping_mode == 'identity' and damping_basis == 'diagonal_values')
+    if damping_sweep == "eigen" and not can_sweep_eigen:
+        raise ValueError("`damping_sweep == 'eigen'` requires the 'identity' damping mode and 'diagonal_values' basis!")
     resource_alloc = _ResourceAllocation.cast(resource_alloc)
     comm = resource_alloc.comm
+    if jac_refresh_interval > 1 and approx_jac_fn is None and comm is not None and comm.Get_size() > 1:
+        raise NotImplementedError("Broyden jacobian updates don't support multiple processors yet.")
     printer = _VerbosityPrinter.create_printer(verbosity, comm)
     ari = arrays_interface  # shorthand
 
@@ -501,8 +716,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         ari.allscatter_x(x_limits[:, 0], x_lower_limits)
         ari.allscatter_x(x_limits[:, 1], x_upper_limits)
 
-    if damping_basis == "singular_values":
-        Jac_V = ari.allocate_jtj()
+    if damping_basis == "singular_values" or (can_sweep_eigen and damping_sweep != "solve"):
+        Jac_V = ari.allocate_jtj()  # eigenvectors of JTJ
 
     if damping_mode == 'adaptive':
         dx_lst = [ari.allocate_jtf(), ari.allocate_jtf(), ari.allocate_jtf()]
@@ -551,6 +766,17 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     rawJTJ_scratch = None
     jtj_buf = ari.allocate_jtj_shared_mem_buf()
 
+    use_approx_jacs = bool(jac_refresh_interval > 1)
+    if use_approx_jacs:
+        jac_x = None  # the (global) x-value at which the last jacobian was computed
+        jac_f = None  # the objective function at `jac_x` (only needed for Broyden updates)
+        last_Jac = None
+        jac_is_approx = False
+        num_approx_jacs = 0  # the number of consecutive approximate jacobians used
+
+    expected_num_solves = 1.0  # running average of the number of (inner-loop) linear solves per iteration
+    num_solves = 0
+
     try:
 
         for k in range(max_iter):  # outer loop
@@ -579,8 +805,31 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             if profiler: profiler.memory_check("custom_leastsq: begin outer iter")
 
             # unnecessary b/c global_x is already valid: ari.allgather_x(x, global_x)
-            if k >= num_fd_iters:
+            if jtj_and_jtf_fn is not None:
+                pass  # JTJ and JTf are computed directly below
+            elif use_approx_jacs and k > num_fd_iters:
+                # Use an approximate jacobian unless a refresh is due or we haven't moved since the last jacobian
+                jac_is_approx = bool(num_approx_jacs < jac_refresh_interval - 1 and jac_x is not None
+                                     and not _np.array_equal(global_x, jac_x))
+                if not jac_is_approx:
+                    Jac = jac_fn(global_x)
+                elif approx_jac_fn is not None:
+                    Jac = approx_jac_fn(global_x)
+                else:  # Broyden (rank-one secant) update of the last jacobian: J += (df - J*dx) dx^T / |dx|^2
+                    Jac = last_Jac
+                    broyden_dx = global_x - jac_x
+                    Jac += _np.outer(f - jac_f - _np.dot(Jac, broyden_dx),
+                                     broyden_dx / _np.dot(broyden_dx, broyden_dx))
+                num_approx_jacs = num_approx_jacs + 1 if jac_is_approx else 0
+                jac_x = global_x.copy()
+                if approx_jac_fn is None:
+                    last_Jac = Jac; jac_f = f.copy()
+            elif k >= num_fd_iters:
                 Jac = jac_fn(global_x)  # 'EP'-type, but doesn't actually allocate any more mem (!)
+                if use_approx_jacs:
+                    jac_x = global_x.copy()
+                    if approx_jac_fn is None:
+                        last_Jac = Jac; jac_f = f.copy()
             else:
                 # Note: x holds only number of "fine"-division params - need to use global_x, and
                 # Jac only holds a subset of the derivative and element columns and rows, respectively.
@@ -606,26 +855,35 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
 
             # DB: from ..tools import matrixtools as _mt
             # DB: print("DB JAC (%s)=" % str(Jac.shape)); _mt.print_mx(Jac,prec=0,width=4); assert(False)
-            if profiler: profiler.memory_check("custom_leastsq: after jacobian:"
-                                               + "shape=%s, GB=%.2f" % (str(Jac.shape),
-                                                                        Jac.nbytes / (1024.0**3)))
-            Jnorm = _np.sqrt(ari.norm2_jac(Jac))
+            tm = _time.time()
+            if jtj_and_jtf_fn is not None:
+                global_JTJ, global_JTf = jtj_and_jtf_fn(global_x)
+                Jnorm = _np.sqrt(_np.trace(global_JTJ))  # Frobenius norm of J
+            else:
+                if profiler: profiler.memory_check("custom_leastsq: after jacobian:"
+                                                   + "shape=%s, GB=%.2f" % (str(Jac.shape),
+                                                                            (Jac.data.nbytes if _sps.issparse(Jac)
+                                                                             else Jac.nbytes) / (1024.0**3)))
+                Jnorm = _np.sqrt(ari.norm2_jac(Jac))
             xnorm = _np.sqrt(ari.norm2_x(x))
             printer.log("--- Outer Iter %d: norm_f = %g, mu=%g, |x|=%g, |J|=%g" % (k, norm_f, mu, xnorm, Jnorm))
 
             #assert(_np.isfinite(Jac).all()), "Non-finite Jacobian!" # NaNs tracking
             #assert(_np.isfinite(_np.linalg.norm(Jac))), "Finite Jacobian has inf norm!" # NaNs tracking
 
-            tm = _time.time()
-
             #OLD MPI-enabled JTJ computation
             ##if my_mpidot_qtys is None:
             ##    my_mpidot_qtys = _mpit.distribute_for_dot(Jac.T.shape, Jac.shape, resource_alloc)
             #JTJ, JTJ_shm = _mpit.mpidot(Jac.T, Jac, my_mpidot_qtys[0], my_mpidot_qtys[1],
             #                            my_mpidot_qtys[2], resource_alloc, JTJ, JTJ_shm)  # _np.dot(Jac.T,Jac) 'PP'
 
-            ari.fill_jtj(Jac, JTJ, jtj_buf)
-            ari.fill_jtf(Jac, f, JTf)  # 'P'-type
+            if jtj_and_jtf_fn is not None:
+                ari.scatter_jtj(global_JTJ, JTJ)
+                ari.scatter_jtf(global_JTf, JTf)  # 'P'-type
+                global_JTJ = global_JTf = None
+            else:
+                ari.fill_jtj(Jac, JTJ, jtj_buf)
+                ari.fill_jtf(Jac, f, JTf)  # 'P'-type
 
             if profiler: profiler.add_time("custom_leastsq: dotprods", tm)
             #assert(not _np.isnan(JTJ).any()), "NaN in JTJ!" # NaNs tracking
@@ -649,14 +907,7 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                 # Jac_U, Jac_s, Jac_Vh = _np.linalg.svd(Jac, full_matrices=False)
                 # Jac_V = _np.conjugate(Jac_Vh.T)
 
-                global_JTJ = ari.gather_jtj(JTJ)
-                if comm is None or comm.rank == 0:
-                    global_Jac_s2, global_Jac_V = _np.linalg.eigh(global_JTJ)
-                    ari.scatter_jtj(global_Jac_V, Jac_V)
-                    comm.bcast(global_Jac_s2, root=0)
-                else:
-                    ari.scatter_jtj(None, Jac_V)
-                    global_Jac_s2 = comm.bcast(None, root=0)
+                global_Jac_s2 = _eigendecompose_jtj(JTJ, Jac_V, ari, comm)
 
                 #print("Rank %d: min s2 = %g" % (comm.rank, min(global_Jac_s2)))
                 #if min(global_Jac_s2) < -1e-4 and (comm is None or comm.rank == 0):
@@ -674,7 +925,11 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                 #                          num_large_svals, len(Jac_s)))
 
             if norm_JTf < jac_norm_tol:
-                if oob_check_interval <= 1:
+                if use_approx_jacs and jac_is_approx:
+                    printer.log("** Converged using an approximate jacobian - recomputing the exact jacobian **", 2)
+                    jac_x = None  # forces the exact jacobian to be computed
+                    continue
+                elif oob_check_interval <= 1:
                     msg = "norm(jacobian) is at most %g" % jac_norm_tol
                     converged = True; break
                 else:
@@ -707,6 +962,13 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     rawJTJ_scratch[idiag] = undamped_JTJ_diag  # no damping; the "raw" JTJ
                     best_x_state = best_x_state[0:5] + (rawJTJ_scratch,)  # update mu,nu,JTJ of initial "best state"
 
+            # decide whether to re-solve for each damping value or reuse an eigendecomposition of JTJ
+            if k > 0: expected_num_solves = 0.5 * (expected_num_solves + num_solves)
+            num_solves = 0
+            use_eigen_sweep = bool(can_sweep_eigen and (damping_sweep == "eigen" or (
+                damping_sweep == "auto" and expected_num_solves > eigen_cost)))
+            jtj_evals = None  # the eigenvalues of the *undamped* JTJ, computed on the first solve if needed
+
             #determing increment using adaptive damping
             while True:  # inner loop
 
@@ -760,6 +1022,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     if profiler: profiler.memory_check("custom_leastsq: before linsolve")
                     tm = _time.time()
                     success = True
+                    jtj_factor = None  # Cholesky factor of the damped JTJ, when linear_solver == "cholesky"
+                    num_solves += 1
 
                     if damping_basis == 'diagonal_values':
                         if damping_mode == 'adaptive':
@@ -768,7 +1032,16 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                                 #dx_lst.append(_scipy.linalg.solve(JTJ, -JTf, sym_pos=True))
                                 #dx_lst.append(custom_solve(JTJ, -JTf, resource_alloc))
                                 _custom_solve(JTJ, minus_JTf, dx_lst[ii], ari, resource_alloc,
-                                              serial_solve_proc_threshold)
+                                              serial_solve_proc_threshold, linear_solver)
+                        elif use_eigen_sweep:
+                            if jtj_evals is None:  # JTJ currently holds undamped_JTJ + mu*I, with the same evecs
+                                jtj_evals = _eigendecompose_jtj(JTJ, Jac_V, ari, comm) - mu
+                                eig_VT_mJTf = ari.global_svd_dot(Jac_V, minus_JTf)
+                            ari.fill_dx_svd(Jac_V, eig_VT_mJTf / (jtj_evals + mu), dx)
+                        elif linear_solver == "cholesky":
+                            jtj_factor = _custom_cholesky_factor(JTJ, ari, resource_alloc,
+                                                                 serial_solve_proc_threshold)
+                            _custom_cholesky_solve(jtj_factor, minus_JTf, dx, ari, resource_alloc)
                         else:
                             #dx = _scipy.linalg.solve(JTJ, -JTf, sym_pos=True)
                             _custom_solve(JTJ, minus_JTf, dx, ari, resource_alloc, serial_solve_proc_threshold)
@@ -814,7 +1087,12 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                         ari.fill_jtf(Jac, df2, JTdf2)
                         JTdf2 *= -0.5  # keep using JTdf2 memory in solve call below
                         #dx2 = _scipy.linalg.solve(JTJ, -0.5 * JTdf2, sym_pos=True)  # Note: JTJ not init w/'adaptive'
-                        _custom_solve(JTJ, JTdf2, dx2, ari, resource_alloc, serial_solve_proc_threshold)
+                        if jtj_factor is not None:  # reuse the factor of the (unchanged) damped JTJ
+                            _custom_cholesky_solve(jtj_factor, JTdf2, dx2, ari, resource_alloc)
+                        elif use_eigen_sweep:
+                            ari.fill_dx_svd(Jac_V, ari.global_svd_dot(Jac_V, JTdf2) / (jtj_evals + mu), dx2)
+                        else:
+                            _custom_solve(JTJ, JTdf2, dx2, ari, resource_alloc, serial_solve_proc_threshold)
                         dx1[:] = dx[:]
                         dx += dx2  # add acceleration term to dx
                     except _scipy.linalg.LinAlgError:
@@ -925,7 +1203,13 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     #print("DB: new_x = ", new_x)
 
                     if norm_dx < (rel_xtol**2) * norm_x:  # and mu < MU_TOL2:
-                        if oob_check_interval <= 1:
+                        if use_approx_jacs and jac_is_approx:
+                            printer.log("** Converged using an approximate jacobian - recomputing the exact "
+                                        "jacobian **", 2)
+                            jac_x = None  # forces the exact jacobian to be computed
+                            f[:] = obj_fn(global_x)  # `f` may hold the objective at a rejected point
+                            break
+                        elif oob_check_interval <= 1:
                             msg = "Relative change, |dx|/|x|, is at most %g" % rel_xtol
                             converged = True; break
                         else:
@@ -1081,7 +1365,13 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
 
                         if dL / norm_f < rel_ftol and dF >= 0 and dF / norm_f < rel_ftol \
                            and dF / dL < 2.0 and accel_ratio <= alpha:
-                            if oob_check_interval <= 1:  # (if 0 then no oob checking is done)
+                            if use_approx_jacs and jac_is_approx:
+                                printer.log("** Converged using an approximate jacobian - recomputing the exact "
+                                            "jacobian **", 2)
+                                jac_x = None  # forces the exact jacobian to be computed
+                                f[:] = obj_fn(global_x)  # `f` may hold the objective at a rejected point
+                                break
+                            elif oob_check_interval <= 1:  # (if 0 then no oob checking is done)
                                 msg = "Both actual and predicted relative reductions in the" + \
                                     " sum of squares are at most %g" % rel_ftol
                                 converged = True; break
@@ -1246,6 +1536,335 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     #return solution
 
 
+def _eigendecompose_jtj(jtj, jtj_evecs, ari, comm):
+    """
+    Computes the eigendecomposition of a (distributed) `jtj`-type matrix on the root processor.
+
+    Parameters
+    ----------
+    jtj : numpy.ndarray or LocalNumpyArray
+        The symmetric `jtj`-type matrix to decompose.
+
+    jtj_evecs : numpy.ndarray or LocalNumpyArray
+        A `jtj`-type array that is filled with the eigenvectors (columns) of `jtj`.
+
+    ari : ArraysInterface
+        An object that provides an interface for creating and manipulating data arrays.
+
+    comm : mpi4py.MPI.Comm or None
+        The communicator used to broadcast the eigenvalues.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (global) eigenvalues of `jtj`, in ascending order.
+    """
+    global_jtj = ari.gather_jtj(jtj)
+    if comm is None or comm.rank == 0:
+        evals, global_evecs = _np.linalg.eigh(global_jtj)
+        ari.scatter_jtj(global_evecs, jtj_evecs)
+        if comm is not None: comm.bcast(evals, root=0)
+    else:
+        ari.scatter_jtj(None, jtj_evecs)
+        evals = comm.bcast(None, root=0)
+    return evals
+
+
+def custom_matrix_free_leastsq(obj_fn, jac_dot_fn, jac_t_dot_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
+                               rel_ftol=1e-6, rel_xtol=1e-6, max_iter=100, max_dx_scale=1.0,
+                               damping_mode="identity", init_munu="auto", cg_tol=1e-4, cg_maxiter=None,
+                               num_diag_probes=8, x_limits=None, verbosity=0, profiler=None):
+    """
+    A matrix-free (Jacobian-free) version of :func:`custom_leastsq`.
+
+    Each Levenberg-Marquardt step solves the damped normal equations, `(J^T J + mu*D) dx = -J^T f`,
+    using Jacobi-preconditioned conjugate gradients (CG).  This only requires products of the Jacobian
+    `J` and its transpose with vectors, so that neither `J` nor `J^T J` is ever constructed, and memory
+    usage scales with the number of elements *plus* (rather than *times*) the number of parameters.
+    The diagonal of `J^T J`, which is used by the preconditioner (and for `D` when `damping_mode == "JTJ"`),
+    is estimated stochastically using `num_diag_probes` random vectors at each outer iteration.
+
+    Parameters
+    ----------
+    obj_fn : function
+        The objective function.  Must accept and return 1D numpy ndarrays of
+        length N and M respectively.
+
+    jac_dot_fn : function
+        Computes `dot(J, v)` for a length-N vector `v`.  Called as `jac_dot_fn(v, x)`, where `x`
+        is the point at which the Jacobian is evaluated, or `None` to indicate the same point as
+        in the last call to `jac_dot_fn` or `jac_t_dot_fn`.
+
+    jac_t_dot_fn : function
+        Computes `dot(J.T, u)` for a length-M vector `u`.  Called as `jac_t_dot_fn(u, x)` with
+        `x` as for `jac_dot_fn`.
+
+    x0 : numpy.ndarray
+        Initial evaluation point.
+
+    f_norm2_tol : float, optional
+        Tolerace for `F^2` where `F = `norm( sum(obj_fn(x)**2) )` is the
+        least-squares residual.  If `F**2 < f_norm2_tol`, then mark converged.
+
+    jac_norm_tol : float, optional
+        Tolerance for jacobian norm, namely if `infn(dot(J.T,f)) < jac_norm_tol`
+        then mark converged, where `infn` is the infinity-norm and
+        `f = obj_fn(x)`.
+
+    rel_ftol : float, optional
+        Tolerance on the relative reduction in `F^2`, that is, if
+        `d(F^2)/F^2 < rel_ftol` then mark converged.
+
+    rel_xtol : float, optional
+        Tolerance on the relative value of `|x|`, so that if
+        `d(|x|)/|x| < rel_xtol` then mark converged.
+
+    max_iter : int, optional
+        The maximum number of (outer) interations.
+
+    max_dx_scale : float, optional
+        If not None, impose a limit on the magnitude of the step, so that
+        `|dx|^2 < max_dx_scale^2 * len(dx)` (so elements of `dx` should be,
+        roughly, less than `max_dx_scale`).
+
+    damping_mode : {'identity', 'JTJ'}
+        How damping is applied.  `'identity'` means that the damping parameter mu
+        multiplies the identity matrix.  `'JTJ'` means that mu multiplies the
+        (estimated) diagonal of the JTJ matrix.
+
+    init_munu : tuple, optional
+        If not None, a (mu, nu) tuple of 2 floats giving the initial values
+        for mu and nu.
+
+    cg_tol : float, optional
+        The relative tolerance of each CG solve: iterations stop once the norm of the
+        residual is less than `cg_tol` times the norm of `J^T f`.
+
+    cg_maxiter : int, optional
+        The maximum number of iterations of each CG solve.  If None, the number of
+        parameters (N) is used.
+
+    num_diag_probes : int, optional
+        The number of random vectors used to estimate the diagonal of `J^T J`.  Each
+        requires one product with `J` and one with `J^T`.  If zero, the diagonal is
+        approximated by a multiple of the identity.
+
+    x_limits : numpy.ndarray, optional
+        A (num_params, 2)-shaped array, holding on each row the (min, max) values for the corresponding
+        parameter (element of the "x" vector).  If `None`, then no limits are imposed.
+
+    verbosity : int, optional
+        Amount of detail to print to stdout.
+
+    profiler : Profiler, optional
+        A profiler object used for to track timing and memory usage.
+
+    Returns
+    -------
+    x : numpy.ndarray
+        The optimal solution.
+    converged : bool
+        Whether the solution converged.
+    msg : str
+        A message indicating why the solution converged (or didn't).
+    mu, nu : float
+        The final damping parameter and damping-increase factor.
+    norm_f : float
+        The final value of `F^2`.
+    f : numpy.ndarray
+        The objective function value at `x`.
+    jtj : None
+        Always None, since `J^T J` is never computed (this keeps the return values
+        aligned with those of :func:`custom_leastsq`).
+    """
+    if damping_mode not in ('identity', 'JTJ'):
+        raise ValueError("Invalid damping mode for a matrix-free optimization: %s" % damping_mode)
+    printer = _VerbosityPrinter.create_printer(verbosity)
+
+    msg = ""
+    converged = False
+    x = x0.copy()
+    f = obj_fn(x).copy()
+    norm_f = _np.dot(f, f)
+    half_max_nu = 2**62
+    tau = 1e-3
+    nu = 2
+    mu = 1  # just a guess - initialized on 1st iter and only used if rejected
+    if init_munu != "auto":
+        mu, nu = init_munu
+    if cg_maxiter is None: cg_maxiter = len(x)
+    max_norm_dx = (max_dx_scale**2) * len(x) if max_dx_scale else None
+
+    if not _np.isfinite(norm_f):
+        msg = "Infinite norm of objective function at initial point!"
+
+    if len(x) == 0:  # a model with 0 parameters - nothing to optimize
+        msg = "No parameters to optimize"; converged = True
+
+    def jtj_dot(v):  # the undamped J^T J times `v`, at the current point
+        return jac_t_dot_fn(jac_dot_fn(v, None), None)
+
+    try:
+
+        for k in range(max_iter):  # outer loop
+            if len(msg) > 0:
+                break  # exit outer loop if an exit-message has been set
+
+            if norm_f < f_norm2_tol:
+                msg = "Sum of squares is at most %g" % f_norm2_tol
+                converged = True; break
+
+            tm = _time.time()
+            minus_JTf = -jac_t_dot_fn(f, x)  # evaluates products at `x` until obj_fn is called again below
+            norm_JTf = _np.max(_np.abs(minus_JTf))
+            norm_x = _np.dot(x, x)
+            printer.log("--- Outer Iter %d: norm_f = %g, mu=%g, |x|=%g, |JTf|=%g"
+                        % (k, norm_f, mu, _np.sqrt(norm_x), norm_JTf))
+
+            if norm_JTf < jac_norm_tol:
+                msg = "norm(jacobian) is at most %g" % jac_norm_tol
+                converged = True; break
+
+            JTJ_diag = _estimate_jtj_diagonal(jtj_dot, minus_JTf, num_diag_probes, _np.random.RandomState(k))
+            if profiler: profiler.add_time("custom_matrix_free_leastsq: JTJ diagonal", tm)
+
+            if k == 0 and init_munu == "auto":
+                if damping_mode == 'identity':
+                    mu = tau * _np.max(JTJ_diag)  # initial damping element
+                else:
+                    mu = min(1.0e5, _np.max(JTJ_diag) / norm_JTf)  # same heuristic as custom_leastsq
+            damping_diag = _np.ones(len(x), 'd') if (damping_mode == 'identity') else JTJ_diag
+
+            while True:  # inner loop
+                tm = _time.time()
+                dx, num_cg_iters = _solve_damped_normal_eqns_cg(jtj_dot, minus_JTf, mu * damping_diag,
+                                                                JTJ_diag + mu * damping_diag, cg_tol, cg_maxiter)
+                if profiler: profiler.add_time("custom_matrix_free_leastsq: CG", tm)
+
+                #ensure dx isn't too large - don't let any component change by more than ~max_dx_scale
+                norm_dx = _np.dot(dx, dx)
+                if max_norm_dx and norm_dx > max_norm_dx:
+                    dx *= _np.sqrt(max_norm_dx / norm_dx)
+
+                new_x = x + dx
+                if x_limits is not None:  # project x into valid space by simply clipping out-of-bounds values
+                    _np.clip(new_x, x_limits[:, 0], x_limits[:, 1], out=new_x)
+                    dx = new_x - x
+                norm_dx = _np.dot(dx, dx)
+                printer.log("  - Inner Loop: mu=%g, norm_dx=%g (%d CG iterations)" % (mu, norm_dx, num_cg_iters), 2)
+
+                if norm_dx < (rel_xtol**2) * norm_x:
+                    msg = "Relative change, |dx|/|x|, is at most %g" % rel_xtol
+                    converged = True; break
+
+                if norm_dx > (norm_x + rel_xtol) / (_MACH_PRECISION**2):
+                    msg = "(near-)singular linear system"; break
+
+                # dL = expected decrease in ||F||^2 from the linear model (computed before obj_fn moves the point)
+                J_dx = jac_dot_fn(dx, None)
+                dL = 2 * _np.dot(dx, minus_JTf) - _np.dot(J_dx, J_dx)
+
+                new_f = obj_fn(new_x)
+                norm_new_f = _np.dot(new_f, new_f)
+                if not _np.isfinite(norm_new_f):  # avoid infinite loop...
+                    msg = "Infinite norm of objective function!"; break
+                dF = norm_f - norm_new_f  # actual decrease in ||F||^2
+
+                printer.log("      (cont): norm_new_f=%g, dL=%g, dF=%g, reldL=%g, reldF=%g" %
+                            (norm_new_f, dL, dF, dL / norm_f, dF / norm_f), 2)
+
+                if dL / norm_f < rel_ftol and dF >= 0 and dF / norm_f < rel_ftol and dF / dL < 2.0:
+                    msg = "Both actual and predicted relative reductions in the" + \
+                        " sum of squares are at most %g" % rel_ftol
+                    converged = True; break
+
+                if dL > 0 and dF > 0:
+                    # reduction in error: increment accepted!
+                    t = 1.0 - (2 * dF / dL - 1.0)**3  # dF/dL == gain ratio
+                    # always reduce mu for accepted step when |dx| is small
+                    mu_factor = max(t, 1.0 / 3.0) if norm_dx > 1e-8 else 0.3
+                    mu *= mu_factor
+                    nu = 2
+                    x = new_x; f = new_f.copy(); norm_f = norm_new_f
+                    printer.log("      Accepted! gain ratio=%g  mu * %g => %g" % (dF / dL, mu_factor, mu), 2)
+                    break  # exit inner loop normally
+
+                #Increase damping (mu), then increase damping factor to
+                # accelerate further damping increases.
+                mu *= nu
+                if nu > half_max_nu:  # watch for nu getting too large (&overflow)
+                    msg = "Stopping after nu overflow!"; break
+                nu = 2 * nu
+                printer.log("      Rejected!  mu => mu*nu = %g, nu => 2*nu = %g" % (mu, nu), 2)
+            #end of inner loop
+
+        #end of outer loop
+        else:
+            #if no break stmt hit, then we've exceeded max_iter
+            msg = "Maximum iterations (%d) exceeded" % max_iter
+            converged = True  # call result "converged" even in this case, but issue warning:
+            printer.warning("Treating result as *converged* after maximum iterations (%d) were exceeded." % max_iter)
+
+    except KeyboardInterrupt:
+        printer.log("Caught keyboard interrupt!  Returning the current solution as being *converged*.")
+        msg = "Keyboard interrupt!"
+        converged = True
+
+    return x, converged, msg, mu, nu, norm_f, f, None
+
+
+def _estimate_jtj_diagonal(jtj_dot, jtf, num_probes, rand_state):
+    """
+    Estimates the diagonal of `J^T J` using only products with it.
+
+    Uses the (Hutchinson-type) estimator `mean(z * dot(JTJ, z))` over random vectors `z` with +/-1 elements,
+    clipped so that all the values are positive.  When `num_probes == 0`, every diagonal element is set to
+    the Rayleigh quotient of `J^T J` along the gradient direction `jtf` instead.
+    """
+    if num_probes > 0:
+        diag = _np.zeros(len(jtf), 'd')
+        for i in range(num_probes):
+            z = rand_state.choice((-1.0, 1.0), size=len(jtf))
+            diag += z * jtj_dot(z)
+        diag /= num_probes
+    else:
+        diag = _np.full(len(jtf), _np.dot(jtf, jtj_dot(jtf)) / _np.dot(jtf, jtf))
+
+    floor = 1e-6 * _np.max(_np.abs(diag)) if len(diag) > 0 else 0.0
+    return _np.maximum(diag, max(floor, _MACH_PRECISION))
+
+
+def _solve_damped_normal_eqns_cg(jtj_dot, minus_jtf, damping, precond_diag, tol, maxiter):
+    """
+    Solves `(JTJ + diag(damping)) dx = minus_jtf` using Jacobi-preconditioned conjugate gradients.
+
+    `jtj_dot(v)` computes the product `dot(JTJ, v)`.  Starting from `dx = 0`, iterations continue until
+    the norm of the residual is at most `tol * norm(minus_jtf)` or `maxiter` iterations have been performed.
+    Returns the solution and the number of iterations performed.
+    """
+    dx = _np.zeros(len(minus_jtf), 'd')
+    r = minus_jtf.copy()
+    z = r / precond_diag
+    p = z.copy()
+    rz = _np.dot(r, z)
+    stop_norm2 = (tol**2) * _np.dot(minus_jtf, minus_jtf)
+
+    for i in range(maxiter):
+        if _np.dot(r, r) <= stop_norm2:
+            return dx, i
+        Ap = jtj_dot(p) + damping * p
+        pAp = _np.dot(p, Ap)
+        if pAp <= 0: return dx, i  # the system is (numerically) no longer positive definite
+        alpha = rz / pAp
+        dx += alpha * p
+        r -= alpha * Ap
+        z = r / precond_diag
+        rz_new = _np.dot(r, z)
+        p *= rz_new / rz; p += z
+        rz = rz_new
+    return dx, maxiter
+
+
 def _hack_dx(obj_fn, x, dx, jac, jtj, jtf, f, norm_f):
     #HACK1
     #if nRejects >= 2:
@@ -23,7 +23,7 @@ except ImportError:
     _fastcalc = None
 
 
-def custom_solve(a, b, x, ari, resource_alloc, proc_threshold=100):
+def custom_solve(a, b, x, ari, resource_alloc, proc_threshold=100, method="elimination"):
     """
     Simple parallel Gaussian Elimination with pivoting.
 
@@ -70,10 +70,22 @@ def custom_solve(a, b, x, ari, resource_alloc, proc_threshold=100):
         (the rank 0) processor, call SciPy's serial linear solver, `scipy.linalg.solve`, and
         scatter the results back onto all the processors.
 
+    method : {"elimination", "cholesky"}, optional
+        The algorithm used when `a` is distributed over more than `proc_threshold` processors.
+        `"elimination"` uses the Gaussian elimination described above, and `"cholesky"` uses
+        a blocked Cholesky decomposition (see :func:`custom_cholesky_factor`), which requires
+        that `a` be symmetric and positive definite.
+
     Returns
     -------
     None
     """
+    if method == "cholesky":
+        factor = custom_cholesky_factor(a, ari, resource_alloc, proc_threshold)
+        custom_cholesky_solve(factor, b, x, ari, resource_alloc)
+        return
+    elif method != "elimination":
+        raise ValueError("Invalid linear solver method: '%s'" % str(method))
 
     #DEBUG
     #for i in range(a.shape[1]):
@@ -206,6 +218,204 @@ def custom_solve(a, b, x, ari, resource_alloc, proc_threshold=100):
     return
 
 
+class _CholeskyFactor(object):
+    """
+    The Cholesky factor of a symmetric positive definite matrix, as computed by :func:`custom_cholesky_factor`.
+
+    Parameters
+    ----------
+    mode : {"serial", "root", "distributed"}
+        Where the factor is held: wholly on the current processor, wholly on the root
+        processor, or distributed by row over all the processors.
+
+    factor : numpy.ndarray or tuple or None
+        For `"serial"` and `"root"` modes the `(c, lower)` tuple returned by
+        `scipy.linalg.cho_factor` (None on non-root processors), and for `"distributed"`
+        mode the local rows of the lower-triangular factor `L`.
+
+    diag_blocks : list, optional
+        For `"distributed"` mode, the `(start, stop, L_kk)` diagonal blocks of `L`, which are
+        held by all the processors.
+    """
+
+    def __init__(self, mode, factor, diag_blocks=None):
+        self.mode = mode
+        self.factor = factor
+        self.diag_blocks = diag_blocks
+
+
+def custom_cholesky_factor(a, ari, resource_alloc, proc_threshold=100, blk_size=None):
+    """
+    Computes the Cholesky decomposition, `a = L L^T`, of a symmetric positive definite matrix.
+
+    The returned factor can be used to solve any number of linear systems with the
+    matrix `a` via :func:`custom_cholesky_solve`, each at a cost much less than that of
+    factoring `a`.  When `a` is distributed over at least `proc_threshold` processors (or is too
+    large to gather onto a single processor) a right-looking blocked algorithm is used: for each
+    block of `blk_size` columns, the diagonal block is reduced and factored on every processor, the
+    processors owning rows below it compute their part of the panel using a triangular solve, and
+    the panel is reduced and used to update each processor's rows of the trailing sub-matrix.
+    Otherwise, `a` is gathered to the root processor and factored there using SciPy.
+
+    Parameters
+    ----------
+    a : LocalNumpyArray
+        A 2D array with the `'jtj'` distribution, holding the rows of the `a` matrix belonging
+        to the current processor.  This array is not altered.
+
+    ari : ArraysInterface
+        An object that provides an interface for creating and manipulating data arrays.
+
+    resource_alloc : ResourceAllocation
+        Gives the resources (e.g., processors and memory) available for use.
+
+    proc_threshold : int, optional
+        Below this number of processors `a` is gathered to the root processor and factored
+        there using `scipy.linalg.cho_factor`.
+
+    blk_size : int, optional
+        The number of columns in each block of the distributed algorithm.  If None, a default
+        of 128 is used.
+
+    Returns
+    -------
+    _CholeskyFactor
+    """
+    comm = resource_alloc.comm
+
+    if comm is None or isinstance(ari, _UndistributedArraysInterface):
+        return _CholeskyFactor("serial", _scipy.linalg.cho_factor(a, lower=True))
+
+    n = a.shape[1]
+    use_root = bool(comm.size < proc_threshold and n < 10000)
+    if not use_root:  # the distributed algorithm requires that each row of `a` is owned by exactly one processor
+        use_root = bool(comm.allreduce(a.shape[0]) != n)
+
+    if use_root:
+        ok_buf = _np.empty(1, int)
+        global_a, a_shm = ari.gather_jtj(a, return_shared=True)
+        if comm.rank == 0:
+            try:
+                factor = _scipy.linalg.cho_factor(global_a, lower=True)  # makes a copy of global_a
+                ok_buf[0] = 1  # ok
+            except _scipy.linalg.LinAlgError as e:
+                ok_buf[0] = 0  # failure!
+                err = e
+        else:
+            factor = None
+            err = _scipy.linalg.LinAlgError("Cholesky decomposition failed on root proc!")  # just in case...
+
+        comm.Bcast(ok_buf, root=0)
+        _smt.cleanup_shared_ndarray(a_shm)
+        if ok_buf[0] == 0:
+            raise err  # all procs must raise in sync
+        return _CholeskyFactor("root", factor)
+
+    if blk_size is None: blk_size = 128
+    my_row_slice = ari.jtf_param_slice()
+    my_start, my_stop = my_row_slice.start, my_row_slice.stop
+    L = _np.array(a, 'd')  # working copy of my rows, overwritten (left of the diagonal) by those of L
+    diag_blocks = []
+
+    for k0 in range(0, n, blk_size):
+        k1 = min(k0 + blk_size, n)
+
+        # Step 1: reduce the (updated) diagonal block and factor it on every proc (so failures are in sync)
+        diag_blk = _np.zeros((k1 - k0, k1 - k0), 'd')
+        r0, r1 = max(k0, my_start), min(k1, my_stop)
+        if r0 < r1:
+            diag_blk[r0 - k0:r1 - k0, :] = L[r0 - my_start:r1 - my_start, k0:k1]
+        comm.Allreduce(diag_blk.copy(), diag_blk)
+        Lkk = _scipy.linalg.cholesky(diag_blk, lower=True)
+        diag_blocks.append((k0, k1, Lkk))
+        if r0 < r1:
+            L[r0 - my_start:r1 - my_start, k0:k1] = Lkk[r0 - k0:r1 - k0, :]
+
+        # Step 2: compute my rows of the panel below the diagonal block: L_ik = A_ik L_kk^{-T}
+        r0 = max(k1, my_start)
+        panel = _np.zeros((n - k1, k1 - k0), 'd')
+        if r0 < my_stop:
+            my_panel = _scipy.linalg.solve_triangular(Lkk, L[r0 - my_start:, k0:k1].T, lower=True).T
+            L[r0 - my_start:, k0:k1] = my_panel
+            panel[r0 - k1:my_stop - k1, :] = my_panel
+        comm.Allreduce(panel.copy(), panel)
+
+        # Step 3: update my rows of the trailing sub-matrix
+        if r0 < my_stop:
+            L[r0 - my_start:, k1:] -= _np.dot(L[r0 - my_start:, k0:k1], panel.T)
+
+    return _CholeskyFactor("distributed", L, diag_blocks)
+
+
+def custom_cholesky_solve(factor, b, x, ari, resource_alloc):
+    """
+    Solves `a @ x = b` given the Cholesky factor of `a` computed by :func:`custom_cholesky_factor`.
+
+    Parameters
+    ----------
+    factor : _CholeskyFactor
+        The factor of `a`, as returned by :func:`custom_cholesky_factor`.
+
+    b : LocalNumpyArray
+        A 1D array with the `'jtf'` distribution, holding the rows of the `b` vector belonging
+        to the current processor.
+
+    x : LocalNumpyArray
+        A 1D array with the `'jtf'` distribution, holding the rows of the `x` vector belonging
+        to the current processor.  This vector is filled by this function.
+
+    ari : ArraysInterface
+        An object that provides an interface for creating and manipulating data arrays.
+
+    resource_alloc : ResourceAllocation
+        Gives the resources (e.g., processors and memory) available for use.
+
+    Returns
+    -------
+    None
+    """
+    comm = resource_alloc.comm
+
+    if factor.mode == "serial":
+        x[:] = _scipy.linalg.cho_solve(factor.factor, b)
+        return
+
+    if factor.mode == "root":
+        global_b, b_shm = ari.gather_jtf(b, return_shared=True)
+        global_x = _scipy.linalg.cho_solve(factor.factor, global_b) if comm.rank == 0 else None
+        ari.scatter_x(global_x, x)
+        _smt.cleanup_shared_ndarray(b_shm)
+        return
+
+    L = factor.factor
+    my_row_slice = ari.jtf_param_slice()
+    my_start, my_stop = my_row_slice.start, my_row_slice.stop
+    n = L.shape[1]
+
+    # Forward substitution, L y = b, one block of rows at a time
+    y = _np.zeros(n, 'd')
+    for k0, k1, Lkk in factor.diag_blocks:
+        rhs = _np.zeros(k1 - k0, 'd')
+        r0, r1 = max(k0, my_start), min(k1, my_stop)
+        if r0 < r1:
+            rhs[r0 - k0:r1 - k0] = b[r0 - my_start:r1 - my_start] \
+                - _np.dot(L[r0 - my_start:r1 - my_start, 0:k0], y[0:k0])
+        comm.Allreduce(rhs.copy(), rhs)
+        y[k0:k1] = _scipy.linalg.solve_triangular(Lkk, rhs, lower=True)
+
+    # Back substitution, L^T x = y, one block of rows at a time
+    global_x = _np.zeros(n, 'd')
+    for k0, k1, Lkk in reversed(factor.diag_blocks):
+        partial = _np.zeros(k1 - k0, 'd')
+        r0 = max(k1, my_start)
+        if r0 < my_stop:
+            partial[:] = _np.dot(L[r0 - my_start:, k0:k1].T, global_x[r0:my_stop])
+        comm.Allreduce(partial.copy(), partial)
+        global_x[k0:k1] = _scipy.linalg.solve_triangular(Lkk, y[k0:k1] - partial, lower=True, trans='T')
+
+    x[:] = global_x[my_start:my_stop]
+
+
 def _find_pivot(a, b, icol, potential_pivot_inds, my_row_slice, shared_floats, shared_ints,
                 resource_alloc, comm, host_comm, buf1, buf2, buf3, best_host_indices, best_host_vals):
 
@@ -36,8 +36,7 @@ def optimize_wildcard_budget_neldermead(budget, L1weights, wildcard_objfn, two_d
 
     def _wildcard_fit_criteria(wv):
         dlogl_elements = wildcard_objfn.terms(wv)
-        for i in range(num_circuits):
-            dlogl_percircuit[i] = _np.sum(dlogl_elements[layout.indices_for_index(i)], axis=0)
+        dlogl_percircuit[:] = layout.sum_by_circuit(dlogl_elements)
 
         two_dlogl_percircuit = 2 * dlogl_percircuit
         two_dlogl = sum(two_dlogl_percircuit)
@@ -128,6 +128,7 @@ class ConfidenceRegionFactory(object):
         self.hessian_projection_parameters = _collections.OrderedDict()
         self.inv_hessian_projections = _collections.OrderedDict()
         self.linresponse_gstfit_params = None
+        self.iterative_inv_hessian = None
         self.nNonGaugeParams = self.nGaugeParams = None
 
         self.model_lbl = model_lbl
@@ -144,10 +145,15 @@ class ConfidenceRegionFactory(object):
             to_pickle['linresponse_gstfit_params'] = self.linresponse_gstfit_params.copy()
             del to_pickle['linresponse_gstfit_params']['resource_alloc']  # one *cannot* pickle Comm objects
 
+        # *don't* pickle the objective function (and its layout & Comm) used for iterative error bars
+        to_pickle['iterative_inv_hessian'] = None
+
         return to_pickle
 
     def __setstate__(self, state_dict):
         self.__dict__.update(state_dict)
+        if 'iterative_inv_hessian' not in state_dict:
+            self.iterative_inv_hessian = None  # for backward compatibility
         self.parent = None  # initialize to None upon unpickling
 
     def set_parent(self, parent):
@@ -442,6 +448,106 @@ class ConfidenceRegionFactory(object):
         self.nNonGaugeParams = self.model.num_params
         self.nGaugeParams = 0
 
+    def enable_iterative_errorbars(self, comm=None, mem_limit=None, tol=1e-8, maxiter=None):
+        """
+        Stores what is needed to compute (on-demand) Hessian-based error bars without computing the Hessian.
+
+        The error bars computed by views of this factory are the same as those obtained using
+        :method:`compute_hessian` followed by `project_hessian('std')`, but the products of the
+        inverse of the projected Hessian with the gradients of quantities are computed by solving
+        linear systems using the conjugate gradient method.  This only requires products of the
+        Hessian with vectors (see :method:`MDCObjectiveFunction.hessian_dot`), and so avoids
+        constructing the full Hessian matrix, which can be prohibitively costly on large parameter
+        spaces.  Each error bar requires its own solve, so this is most useful when error bars are
+        needed on relatively few quantities.
+
+        What is stored holds an objective function, and so isn't saved when this factory (or
+        its views) is pickled; this method must be called again after loading saved results.
+
+        Parameters
+        ----------
+        comm : mpi4py.MPI.Comm, optional
+            When not None, an MPI communicator for distributing the Hessian-vector
+            products across multiple processors.
+
+        mem_limit : int, optional
+            A rough memory limit in bytes which restricts the amount of intermediate
+            values that are computed and stored.
+
+        tol : float, optional
+            The relative tolerance (on the residual norm) of the conjugate gradient solves.
+
+        maxiter : int, optional
+            The maximum number of conjugate gradient iterations per solve.  If None, then
+            ten times the number of model parameters.
+
+        Returns
+        -------
+        None
+        """
+        from ..objectivefns import objectivefns as _objfns
+        assert(self.parent is not None)  # Estimate
+        assert(self.parent.parent is not None)  # Results
+
+        model = self.parent.models[self.model_lbl].copy()  # the objective function updates its model's parameters
+        circuit_list = self.parent.parent.circuit_lists[self.circuit_list_lbl]
+        dataset = self.parent.parent.dataset
+
+        #extract any parameters we can get from the Estimate
+        parameters = self.parent.parameters
+        obj = parameters.get('objective', 'logl')
+        minProbClip = parameters.get('minProbClip', 1e-4)
+        minProbClipForWeighting = parameters.get('minProbClipForWeighting', 1e-4)
+        probClipInterval = parameters.get('probClipInterval', (-1e6, 1e6))
+        radius = parameters.get('radius', 1e-4)
+        cptp_penalty_factor = parameters.get('cptpPenaltyFactor', 0)
+        spam_penalty_factor = parameters.get('spamPenaltyFactor', 0)
+        useFreqWt = parameters.get('useFreqWeightedChiSq', False)
+        aliases = parameters.get('opLabelAliases', None)
+        if mem_limit is None:
+            mem_limit = parameters.get('mem_limit', None)
+
+        assert(cptp_penalty_factor == 0), 'cptp_penalty_factor unsupported in hessian computation'
+        assert(spam_penalty_factor == 0), 'spam_penalty_factor unsupported in hessian computation'
+        assert(useFreqWt is False), 'useFreqWeightedChiSq unsupported in hessian computation'
+
+        #Expand operation label aliases used in DataSet lookups
+        ds_circuit_list = _tools.apply_aliases_to_circuits(circuit_list, aliases)
+
+        nModelParams = model.num_nongauge_params
+        nDataParams = dataset.degrees_of_freedom(ds_circuit_list)
+        #number of independent parameters in dataset (max. model # of params)
+
+        MIN_NON_MARK_RADIUS = 1e-8  # must be >= 0
+
+        # Note: the Hessian of these objectives is the *negative* of the log-likelihood Hessian computed by
+        #  `compute_hessian` when obj == 'logl', but only the magnitudes of the resulting error bars matter.
+        if obj == 'logl':
+            objfn = _objfns._objfn(_objfns.PoissonPicDeltaLogLFunction, model, dataset, circuit_list,
+                                   {'min_prob_clip': minProbClip, 'radius': radius},
+                                   {'prob_clip_interval': probClipInterval},
+                                   aliases, comm, mem_limit, ('hessian_dot',), ())
+            nonMarkRadiusSq = max(2 * (_tools.logl_max(model, dataset)
+                                       - _tools.logl(model, dataset,
+                                                     op_label_aliases=aliases))
+                                  - (nDataParams - nModelParams), MIN_NON_MARK_RADIUS)
+
+        elif obj == 'chi2':
+            objfn = _objfns._objfn(_objfns.Chi2Function, model, dataset, circuit_list,
+                                   {'min_prob_clip_for_weighting': minProbClipForWeighting},
+                                   {'prob_clip_interval': probClipInterval},
+                                   aliases, comm, mem_limit, ('hessian_dot',), ())
+            nonMarkRadiusSq = max(objfn.fn() - (nDataParams - nModelParams), MIN_NON_MARK_RADIUS)
+        else:
+            raise ValueError("Invalid objective '%s'" % obj)
+
+        proj_non_gauge = model.compute_nongauge_projector()
+        self.iterative_inv_hessian = _IterativeInverseProjectedHessian(objfn.hessian_dot, proj_non_gauge,
+                                                                       tol, maxiter)
+        self.nonMarkRadiusSq = nonMarkRadiusSq
+        self.nNonGaugeParams = _np.linalg.matrix_rank(proj_non_gauge, P_RANK_TOL)
+        self.nGaugeParams = model.num_params - self.nNonGaugeParams
+
     def view(self, confidence_level, region_type='normal',
              hessian_projection_label=None):
         """
@@ -473,6 +579,7 @@ class ConfidenceRegionFactory(object):
         """
         inv_hessian_projection = None
         linresponse_gstfit_params = None
+        iterative_inv_hessian = None
 
         assert(self.parent is not None)  # Estimate
         model = self.parent.models[self.model_lbl]
@@ -485,6 +592,10 @@ class ConfidenceRegionFactory(object):
             assert(hessian_projection_label in self.inv_hessian_projections.keys()), \
                 "Hessian projection '%s' does not exist!" % hessian_projection_label
             inv_hessian_projection = self.inv_hessian_projections[hessian_projection_label]
+        elif self.iterative_inv_hessian is not None:
+            assert(hessian_projection_label is None), \
+                "Must set `hessian_projection_label` to None when using iterative error bars"
+            iterative_inv_hessian = self.iterative_inv_hessian
         else:
             assert(self.linresponse_gstfit_params is not None), \
                 "Must either compute & project a Hessian matrix or enable linear response parameters"
@@ -502,7 +613,7 @@ class ConfidenceRegionFactory(object):
 
         return ConfidenceRegionFactoryView(model, inv_hessian_projection, linresponse_gstfit_params,
                                            confidence_level, nonMarkRadiusSq,
-                                           self.nNonGaugeParams, self.nGaugeParams)
+                                           self.nNonGaugeParams, self.nGaugeParams, iterative_inv_hessian)
 
         #TODO: where to move this?
         ##Check that number of gauge parameters reported by model is consistent with confidence region
@@ -654,10 +765,15 @@ class ConfidenceRegionFactoryView(object):
     n_gauge_params : int
         The numbers of gauge parameters.  This could be computed from `model`
         but can be passed in to save compuational time.
+
+    iterative_inv_hessian : object, optional
+        An object that computes products with the inverse of the non-gauge-projected
+        Hessian iteratively.  Used in place of `inv_projected_hessian` for iterative
+        error bars (see :method:`ConfidenceRegionFactory.enable_iterative_errorbars`).
     """
 
     def __init__(self, model, inv_projected_hessian, mlgst_params, confidence_level,
-                 non_mark_radius_sq, n_non_gauge_params, n_gauge_params):
+                 non_mark_radius_sq, n_non_gauge_params, n_gauge_params, iterative_inv_hessian=None):
         """
         Creates a new ConfidenceRegionFactoryView.
 
@@ -695,6 +811,11 @@ class ConfidenceRegionFactoryView(object):
         n_non_gauge_params, n_gauge_params : int
             The numbers of non-gauge and gauge parameters, respectively.  These could be
             computed from `model` but they're passed in to save compuational time.
+
+        iterative_inv_hessian : object, optional
+            An object that computes products with the inverse of the non-gauge-projected
+            Hessian iteratively.  Used in place of `inv_projected_hessian` for iterative
+            error bars (see :method:`ConfidenceRegionFactory.enable_iterative_errorbars`).
         """
 
         # Scale projected Hessian for desired confidence level => quadratic form for confidence region assume hessian
@@ -728,6 +849,10 @@ class ConfidenceRegionFactoryView(object):
                 self.invRegionQuadcForm = inv_projected_hessian * C1
             else:
                 self.invRegionQuadcForm = None
+            if iterative_inv_hessian is not None:
+                self.invRegionQuadcOperator = iterative_inv_hessian.scaled(C1)
+            else:
+                self.invRegionQuadcOperator = None
 
             self.intervalScaling = _np.sqrt(Ck / C1)  # multiplicative scaling required to convert intervals
             # to those obtained using a full (using Ck) confidence region.
@@ -747,6 +872,10 @@ class ConfidenceRegionFactoryView(object):
                 self.invRegionQuadcForm /= _np.sqrt(n_non_gauge_params)  # make a *worst case* non-mark. region...
             else:
                 self.invRegionQuadcForm = None
+            if iterative_inv_hessian is not None:
+                self.invRegionQuadcOperator = iterative_inv_hessian.scaled(C1 / _np.sqrt(n_non_gauge_params))
+            else:
+                self.invRegionQuadcOperator = None
 
             self.intervalScaling = _np.sqrt(Ck / C1)  # multiplicative scaling required to convert intervals
             # to those obtained using a full (using Ck) confidence region.
@@ -783,8 +912,14 @@ class ConfidenceRegionFactoryView(object):
         to_pickle = self.__dict__.copy()
         if self.mlgst_params and "comm" in self.mlgst_params:
             del self.mlgst_params['comm']  # one *cannot* pickle Comm objects
+        to_pickle['invRegionQuadcOperator'] = None  # holds an objective function (and its layout & Comm)
         return to_pickle
 
+    def __setstate__(self, state_dict):
+        self.__dict__.update(state_dict)
+        if 'invRegionQuadcOperator' not in state_dict:
+            self.invRegionQuadcOperator = None  # for backward compatibility
+
     @property
     def errorbar_type(self):
         """
@@ -820,32 +955,46 @@ class ConfidenceRegionFactoryView(object):
             One-dimensional array of (positive) interval half-widths which specify
             a symmetric confidence interval.
         """
-        if self.profLCI is None:
+        if self.profLCI is None and self.invRegionQuadcOperator is None:
             raise NotImplementedError("Profile-likelihood confidence intervals"
                                       "are not implemented for this type of confidence region")
         if label is None:
-            return self.profLCI
+            return self._profile_likelihood_cis(slice(None))
 
         elif label in self.model.operations:
-            return self.profLCI[self.model.operations[label].gpindices]
+            return self._profile_likelihood_cis(self.model.operations[label].gpindices)
 
         elif label in self.model.preps:
-            return self.profLCI[self.model.preps[label].gpindices]
+            return self._profile_likelihood_cis(self.model.preps[label].gpindices)
 
         elif label in self.model.povms:
             if component_label is not None:
-                return self.profLCI[self.model.povms[label][component_label].gpindices]
-            return self.profLCI[self.model.povms[label].gpindices]
+                return self._profile_likelihood_cis(self.model.povms[label][component_label].gpindices)
+            return self._profile_likelihood_cis(self.model.povms[label].gpindices)
 
         elif label in self.model.instruments:
             if component_label is not None:
-                return self.profLCI[self.model.instruments[label][component_label].gpindices]
-            return self.profLCI[self.model.instruments[label].gpindices]
+                return self._profile_likelihood_cis(self.model.instruments[label][component_label].gpindices)
+            return self._profile_likelihood_cis(self.model.instruments[label].gpindices)
 
         else:
             raise ValueError(("Invalid item label (%s) for computing" % label)
                              + "profile likelihood confidence intervals")
 
+    def _profile_likelihood_cis(self, indices):
+        """ The profile-likelihood confidence intervals for the model parameters given by `indices` """
+        if self.profLCI is not None:
+            return self.profLCI[indices]
+        # only compute the (diagonal) elements of the inverse quadratic form that are needed
+        indices = _np.arange(self.model.num_params)[indices]
+        return _np.sqrt(abs(self.invRegionQuadcOperator.diagonal(indices)))
+
+    def _inv_region_quadc_form_dot(self, vec):
+        """ The product of the inverse of the confidence region's quadratic form with `vec` """
+        if self.invRegionQuadcForm is not None:
+            return _np.dot(self.invRegionQuadcForm, vec)
+        return self.invRegionQuadcOperator.dot(vec)
+
     def compute_confidence_interval(self, fn_obj, eps=1e-7,
                                     return_fn_val=False, verbosity=0):
         """
@@ -945,7 +1094,7 @@ class ConfidenceRegionFactoryView(object):
             return self._compute_df_from_grad_f(grad_f, f0, return_fn_val, verbosity)
 
     def _compute_df_from_grad_f(self, grad_f, f0, return_fn_val, verbosity):
-        if self.invRegionQuadcForm is None:
+        if self.invRegionQuadcForm is None and self.invRegionQuadcOperator is None:
             df = self._compute_df_from_grad_f_linresponse(
                 grad_f, f0, verbosity)
         else:
@@ -1020,11 +1169,11 @@ class ConfidenceRegionFactoryView(object):
             #arg = _np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f))
             #print "HERE: taking sqrt(abs(%s))" % arg
 
-            df = _np.sqrt(abs(_np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f))))
+            df = _np.sqrt(abs(_np.dot(gradFdag, self._inv_region_quadc_form_dot(grad_f))))
         elif isinstance(f0, complex):
             gradFdag = _np.transpose(grad_f)  # conjugate?
-            df = _np.sqrt(abs(_np.dot(gradFdag.real, _np.dot(self.invRegionQuadcForm, grad_f.real)))) \
-                + 1j * _np.sqrt(abs(_np.dot(gradFdag.imag, _np.dot(self.invRegionQuadcForm, grad_f.imag))))
+            df = _np.sqrt(abs(_np.dot(gradFdag.real, self._inv_region_quadc_form_dot(grad_f.real)))) \
+                + 1j * _np.sqrt(abs(_np.dot(gradFdag.imag, self._inv_region_quadc_form_dot(grad_f.imag))))
         else:
             fDims = len(f0.shape)
             grad_f = _np.rollaxis(grad_f, 0, 1 + fDims)  # roll parameter axis to be the last index, preceded by f-shape
@@ -1033,24 +1182,24 @@ class ConfidenceRegionFactoryView(object):
             if f0.dtype == _np.dtype("complex"):  # real and imaginary parts separately
                 if fDims == 0:  # same as float case above
                     gradFdag = _np.transpose(grad_f)  # conjugate?
-                    df = _np.sqrt(abs(_np.dot(gradFdag.real, _np.dot(self.invRegionQuadcForm, grad_f.real)))) \
-                        + 1j * _np.sqrt(abs(_np.dot(gradFdag.imag, _np.dot(self.invRegionQuadcForm, grad_f.imag))))
+                    df = _np.sqrt(abs(_np.dot(gradFdag.real, self._inv_region_quadc_form_dot(grad_f.real)))) \
+                        + 1j * _np.sqrt(abs(_np.dot(gradFdag.imag, self._inv_region_quadc_form_dot(grad_f.imag))))
                 elif fDims == 1:
                     for i in range(f0.shape[0]):
                         gradFdag = _np.transpose(grad_f[i])  # conjugate?
-                        df[i] = (_np.sqrt(abs(_np.dot(gradFdag.real, _np.dot(self.invRegionQuadcForm, grad_f[i].real))))
+                        df[i] = (_np.sqrt(abs(_np.dot(gradFdag.real, self._inv_region_quadc_form_dot(grad_f[i].real))))
                                  + 1j * _np.sqrt(abs(_np.dot(gradFdag.imag,
-                                                             _np.dot(self.invRegionQuadcForm, grad_f[i].imag)))))
+                                                             self._inv_region_quadc_form_dot(grad_f[i].imag)))))
                 elif fDims == 2:
                     for i in range(f0.shape[0]):
                         for j in range(f0.shape[1]):
                             gradFdag = _np.transpose(grad_f[i, j])  # conjugate?
                             df[i, j] = _np.sqrt(abs(_np.dot(
                                 gradFdag.real,
-                                _np.dot(self.invRegionQuadcForm, grad_f[i, j].real)))) \
+                                self._inv_region_quadc_form_dot(grad_f[i, j].real)))) \
                                 + 1j * \
-                                _np.sqrt(abs(_np.dot(gradFdag.imag, _np.dot(
-                                    self.invRegionQuadcForm, grad_f[i, j].imag))))
+                                _np.sqrt(abs(_np.dot(gradFdag.imag, self._inv_region_quadc_form_dot(
+                                    grad_f[i, j].imag))))
                 else:
                     raise ValueError("Unsupported number of dimensions returned by fnOfOp or fnOfModel: %d" % fDims)
 
@@ -1062,16 +1211,16 @@ class ConfidenceRegionFactoryView(object):
                     #arg = _np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f))
                     #print "HERE2: taking sqrt(abs(%s))" % arg
 
-                    df = _np.sqrt(abs(_np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f))))
+                    df = _np.sqrt(abs(_np.dot(gradFdag, self._inv_region_quadc_form_dot(grad_f))))
                 elif fDims == 1:
                     for i in range(f0.shape[0]):
                         gradFdag = _np.conjugate(_np.transpose(grad_f[i]))
-                        df[i] = _np.sqrt(abs(_np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f[i]))))
+                        df[i] = _np.sqrt(abs(_np.dot(gradFdag, self._inv_region_quadc_form_dot(grad_f[i]))))
                 elif fDims == 2:
                     for i in range(f0.shape[0]):
                         for j in range(f0.shape[1]):
                             gradFdag = _np.conjugate(_np.transpose(grad_f[i, j]))
-                            df[i, j] = _np.sqrt(abs(_np.dot(gradFdag, _np.dot(self.invRegionQuadcForm, grad_f[i, j]))))
+                            df[i, j] = _np.sqrt(abs(_np.dot(gradFdag, self._inv_region_quadc_form_dot(grad_f[i, j]))))
                 else:
                     raise ValueError("Unsupported number of dimensions returned by fnOfOp or fnOfModel: %d" % fDims)
 
@@ -1079,6 +1228,135 @@ class ConfidenceRegionFactoryView(object):
 
         return df
 
+
+class _IterativeInverseProjectedHessian(object):
+    """
+    Computes products with the inverse of a non-gauge-projected Hessian without constructing the Hessian.
+
+    Products with the (pseudo-)inverse of `P H P`, where `H` is the Hessian and `P` projects
+    onto the non-gauge space, are computed by solving `(P H P) x = P v` using the conjugate
+    gradient method, which only requires products of `H` with vectors.  Starting from `x = 0`,
+    all the iterates lie in the non-gauge space, so the result agrees with the inverse formed
+    by :method:`ConfidenceRegionFactory.project_hessian` using the `'std'` projection.
+
+    Because `hessian_dot` usually holds an objective function (along with its layout and
+    any MPI communicator), it is *not* pickled.  An unpickled object can only return the
+    diagonal elements it computed before it was pickled; all other products raise an error.
+
+    Parameters
+    ----------
+    hessian_dot : function
+        A function of a parameter-space vector, `v`, which returns `dot(H, v)`.
+
+    proj_non_gauge : numpy.ndarray
+        The (symmetric) projector onto the non-gauge space.
+
+    tol : float, optional
+        The relative tolerance (on the residual norm) of the conjugate gradient solves.
+
+    maxiter : int, optional
+        The maximum number of iterations per solve.  If None, ten times the number of parameters.
+
+    scale : float, optional
+        A factor multiplying all of the computed products.
+    """
+
+    def __init__(self, hessian_dot, proj_non_gauge, tol=1e-8, maxiter=None, scale=1.0):
+        self.hessian_dot = hessian_dot
+        self.proj_non_gauge = proj_non_gauge
+        self.tol = tol
+        self.maxiter = maxiter if (maxiter is not None) else 10 * proj_non_gauge.shape[0]
+        self.scale = scale
+        self._diagonal = {}  # cached *unscaled* diagonal elements, keyed by parameter index
+
+    def __getstate__(self):
+        to_pickle = self.__dict__.copy()
+        to_pickle['hessian_dot'] = None  # holds an objective function (and its layout & Comm)
+        return to_pickle
+
+    def scaled(self, scale):
+        """
+        A copy of this object whose products are multiplied by `scale` (the cache of computed elements is shared).
+
+        Parameters
+        ----------
+        scale : float
+            The additional scale factor.
+
+        Returns
+        -------
+        _IterativeInverseProjectedHessian
+        """
+        ret = _IterativeInverseProjectedHessian(self.hessian_dot, self.proj_non_gauge, self.tol, self.maxiter,
+                                                self.scale * scale)
+        ret._diagonal = self._diagonal
+        return ret
+
+    def _solve(self, vec):
+        if self.hessian_dot is None:
+            raise ValueError(("Cannot compute products with an iterative inverse Hessian that has been unpickled"
+                              " (its Hessian-vector product isn't saved)!  Re-create it by calling"
+                              " ConfidenceRegionFactory.enable_iterative_errorbars(...)."))
+        P = self.proj_non_gauge
+        b = _np.dot(P, vec)
+        x = _np.zeros(len(b), 'd')
+        r = b.copy(); p = r.copy()
+        rr = _np.dot(r, r)
+        stop_rr = (self.tol * _np.linalg.norm(b))**2
+        for _ in range(self.maxiter):
+            if rr <= stop_rr: break
+            Hp = _np.dot(P, self.hessian_dot(_np.dot(P, p)))
+            alpha = rr / _np.dot(p, Hp)
+            x += alpha * p
+            r -= alpha * Hp
+            rr_new = _np.dot(r, r)
+            p = r + (rr_new / rr) * p
+            rr = rr_new
+        else:
+            if rr > stop_rr:
+                _warnings.warn("Conjugate gradient solve for an iterative error bar did not converge"
+                               " (relative residual = %g)" % (_np.sqrt(rr) / _np.linalg.norm(b)))
+        return x
+
+    def dot(self, vec):
+        """
+        The product of the (scaled) inverse projected Hessian with `vec`.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            A parameter-space vector, or a 2D array whose columns are such vectors.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        vec = _np.asarray(vec)
+        if vec.ndim == 1:
+            return self.scale * self._solve(vec)
+        return self.scale * _np.column_stack([self._solve(vec[:, j]) for j in range(vec.shape[1])])
+
+    def diagonal(self, indices):
+        """
+        Selected diagonal elements of the (scaled) inverse projected Hessian.
+
+        Each element not computed previously requires its own solve.
+
+        Parameters
+        ----------
+        indices : iterable
+            The parameter indices of the diagonal elements to compute.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        for i in indices:
+            if i not in self._diagonal:
+                unit_vec = _np.zeros(self.proj_non_gauge.shape[0], 'd'); unit_vec[i] = 1.0
+                self._diagonal[i] = self._solve(unit_vec)[i]
+        return self.scale * _np.array([self._diagonal[i] for i in indices], 'd')
+
 #Helper functions
 
 
@@ -366,6 +366,20 @@ class GSTInitialModel(object):
 
     contract_start_to_cptp : bool, optional
         Whether the Model should be forced ("contracted") to being CPTP just prior to running GST.
+
+    num_random_starts : int, optional
+        The number of additional, randomized, starting points that GST is run from (the best
+        resulting fit is kept).  Each is the starting model with its parameters randomly kicked
+        by up to `random_start_scale`.  All of the starting points are optimized using the same
+        circuit layout and data-dependent quantities.  Only the first optimization of the first
+        GST iteration is multi-started; later optimizations, and the re-optimizations performed
+        in response to a bad fit (see :class:`GSTBadFitOptions`), begin from the best fit so far.
+
+    random_start_scale : float, optional
+        The maximum (absolute) amount each parameter is kicked by in the randomized starting points.
+
+    random_start_seed : int, optional
+        A seed for the random number generator used to create the randomized starting points.
     """
 
     @classmethod
@@ -385,7 +399,8 @@ class GSTInitialModel(object):
         return obj if isinstance(obj, GSTInitialModel) else cls(obj)
 
     def __init__(self, model=None, target_model=None, starting_point=None, depolarize_start=0, randomize_start=0,
-                 lgst_gaugeopt_tol=1e-6, contract_start_to_cptp=False):
+                 lgst_gaugeopt_tol=1e-6, contract_start_to_cptp=False, num_random_starts=0,
+                 random_start_scale=0.01, random_start_seed=None):
         # Note: starting_point can be an initial model or string
         self.model = model
         self.target_model = target_model
@@ -398,6 +413,9 @@ class GSTInitialModel(object):
         self.contract_start_to_cptp = contract_start_to_cptp
         self.depolarize_start = depolarize_start
         self.randomize_start = randomize_start
+        self.num_random_starts = num_random_starts
+        self.random_start_scale = random_start_scale
+        self.random_start_seed = random_start_seed
 
     def get_model(self, edesign, gaugeopt_target, dataset, comm):
         """
@@ -514,6 +532,41 @@ class GSTInitialModel(object):
 
         return mdl_start
 
+    def get_extra_start_models(self, mdl_start, comm):
+        """
+        Retrieve the additional, randomized, starting-point models (see `num_random_starts`).
+
+        Parameters
+        ----------
+        mdl_start : Model
+            The (main) starting-point model, as returned by :method:`get_model`.
+
+        comm : mpi4py.MPI.Comm
+            A MPI communicator to divide workload amoung multiple processors.
+
+        Returns
+        -------
+        list
+            A list of `num_random_starts` models.
+        """
+        if self.num_random_starts == 0:
+            return []
+
+        v = mdl_start.to_vector()
+        if comm is None or comm.Get_rank() == 0:  # generate random kicks on root proc & distribute them
+            rndm = _np.random.RandomState(self.random_start_seed)
+            kicks = 2 * (rndm.random_sample((self.num_random_starts, len(v))) - 0.5) * self.random_start_scale
+            if comm is not None: kicks = comm.bcast(kicks, root=0)
+        else:
+            kicks = comm.bcast(None, root=0)
+
+        extra_models = []
+        for kick in kicks:
+            mdl = mdl_start.copy()
+            mdl.from_vector(v + kick)
+            extra_models.append(mdl)
+        return extra_models
+
 
 class GSTBadFitOptions(object):
     """
@@ -709,17 +762,23 @@ class GateSetTomography(_proto.Protocol):
         The name of this protocol, also used to (by default) name the
         results produced by this protocol.  If None, the class name will
         be used.
+
+    extend_layouts : bool, optional
+        When `True`, each GST iteration whose circuit list begins with the previous
+        iteration's circuits extends the previous iteration's layout rather than
+        creating a new one (see :func:`run_iterative_gst`).
     """
 
     def __init__(self, initial_model=None, gaugeopt_suite='stdgaugeopt',
                  gaugeopt_target=None, objfn_builders=None, optimizer=None,
-                 badfit_options=None, verbosity=2, name=None):
+                 badfit_options=None, verbosity=2, name=None, extend_layouts=False):
         super().__init__(name)
         self.initial_model = GSTInitialModel.cast(initial_model)
         self.gaugeopt_suite = gaugeopt_suite
         self.gaugeopt_target = gaugeopt_target
         self.badfit_options = GSTBadFitOptions.cast(badfit_options)
         self.verbosity = verbosity
+        self.extend_layouts = extend_layouts
 
         if isinstance(optimizer, _opt.Optimizer):
             self.optimizer = optimizer
@@ -814,6 +873,7 @@ class GateSetTomography(_proto.Protocol):
 
         tnxt = _time.time(); profiler.add_time('GST: loading', tref); tref = tnxt
         mdl_start = self.initial_model.get_model(data.edesign, self.gaugeopt_target, data.dataset, comm)
+        extra_start_models = self.initial_model.get_extra_start_models(mdl_start, comm)
 
         tnxt = _time.time(); profiler.add_time('GST: Prep Initial seed', tref); tref = tnxt
 
@@ -821,7 +881,7 @@ class GateSetTomography(_proto.Protocol):
         mdl_lsgst_list, optimums_list, final_objfn = _alg.run_iterative_gst(
             ds, mdl_start, bulk_circuit_lists, self.optimizer,
             self.iteration_builders, self.final_builders,
-            resource_alloc, printer)
+            resource_alloc, printer, extend_layouts=self.extend_layouts, extra_start_models=extra_start_models)
 
         tnxt = _time.time(); profiler.add_time('GST: total iterative optimization', tref); tref = tnxt
 
@@ -1571,6 +1631,9 @@ def _add_badfit_estimates(results, base_estimate_label, badfit_options,
     """
     Add any and all "bad fit" estimates to `results`.
 
+    Re-optimizations start from the base estimate's final model only, i.e., they are
+    never multi-started from random starting points (see `GSTInitialModel.num_random_starts`).
+
     Parameters
     ----------
     results : ModelEstimateResults
@@ -1923,9 +1986,7 @@ def _compute_wildcard_budget(objfn_cache, mdc_objfn, parameters, badfit_options,
         def _evaluate_constraints(wv):
             layout = mdc_objfn.layout
             dlogl_elements = logl_wildcard_fn.lsvec(wv)**2  # b/c WC fn only has sqrt of terms implemented now
-            dlogl_percircuit = _np.empty(len(layout.circuits), 'd')  # *local* circuits
-            for i in range(len(layout.circuits)):
-                dlogl_percircuit[i] = _np.sum(dlogl_elements[layout.indices_for_index(i)], axis=0)
+            dlogl_percircuit = layout.sum_by_circuit(dlogl_elements)  # *local* circuits
 
             two_dlogl_percircuit = 2 * dlogl_percircuit
             two_dlogl = sum(two_dlogl_percircuit)
@@ -1613,11 +1613,11 @@ class ProtocolData(_TreeNode):
             # Note: could also use (path.stat().st_size >= max_size) to condition on size of data files
         else:
             #Load dataset or multidataset based on what files exist
-            dataset_files = sorted(list(data_dir.glob('*.txt')))
+            dataset_files = sorted(list(data_dir.glob('*.txt')) + list(data_dir.glob('*.columnar')))
             if len(dataset_files) == 0:  # assume same dataset as parent
                 if parent is None: parent = ProtocolData.from_dir(dirname / '..')
                 dataset = parent.dataset
-            elif len(dataset_files) == 1 and dataset_files[0].name == 'dataset.txt':  # a single dataset.txt file
+            elif len(dataset_files) == 1 and dataset_files[0].stem == 'dataset':  # a single dataset file or directory
                 dataset = _io.load_dataset(dataset_files[0], ignore_zero_count_lines=False, verbosity=0)
             else:
                 dataset = {pth.stem: _io.load_dataset(pth, ignore_zero_count_lines=False, verbosity=0)
@@ -1767,7 +1767,7 @@ class ProtocolData(_TreeNode):
         filtered_edesign = self.edesign.prune_tree(paths, paths_are_sorted)
         return build_data(filtered_edesign, self)
 
-    def write(self, dirname=None, parent=None):
+    def write(self, dirname=None, parent=None, dataset_format='text'):
         """
         Write this protocol data to a directory.
 
@@ -1784,6 +1784,13 @@ class ProtocolData(_TreeNode):
             The parent protocol data, when a parent is writing this
             data as a sub-protocol-data object.  Otherwise leave as None.
 
+        dataset_format : {'text', 'columnar'}
+            The format used to write data set(s).  `'text'` writes standard
+            text-formatted `.txt` data set files, whereas `'columnar'` writes
+            each data set as a `.columnar` directory in the binary format of
+            :meth:`DataSet.save_columnar`, which is memory-mapped when loaded.
+            Sub-data objects are written using the same format.
+
         Returns
         -------
         None
@@ -1801,19 +1808,24 @@ class ProtocolData(_TreeNode):
 
         if self.dataset is not None:  # otherwise don't write any dataset
             if parent and (self.dataset is parent.dataset):  # then no need to write any data
-                assert(len(list(data_dir.glob('*.txt'))) == 0), "There shouldn't be *.txt files in %s!" % str(data_dir)
+                assert(len(list(data_dir.glob('*.txt')) + list(data_dir.glob('*.columnar'))) == 0), \
+                    "There shouldn't be *.txt or *.columnar files in %s!" % str(data_dir)
             else:
                 data_dir.mkdir(exist_ok=True)
-                if isinstance(self.dataset, (_data.MultiDataSet, dict)):
-                    for dsname, ds in self.dataset.items():
+                datasets = self.dataset.items() if isinstance(self.dataset, (_data.MultiDataSet, dict)) \
+                    else [('dataset', self.dataset)]
+                for dsname, ds in datasets:
+                    if dataset_format == 'text':
                         _io.write_dataset(data_dir / (dsname + '.txt'), ds)
-                else:
-                    _io.write_dataset(data_dir / 'dataset.txt', self.dataset)
+                    elif dataset_format == 'columnar':
+                        ds.save_columnar(data_dir / (dsname + '.columnar'))
+                    else:
+                        raise ValueError("Invalid `dataset_format`: %s" % str(dataset_format))
 
         if self.cache:
             _io.write_dict_to_json_or_pkl_files(self.cache, data_dir / 'cache')
 
-        self._write_children(dirname, write_subdir_json=False)  # writes sub-datas
+        self._write_children(dirname, write_subdir_json=False, dataset_format=dataset_format)  # writes sub-datas
 
     def setup_nameddict(self, final_dict):
         """
@@ -221,7 +221,7 @@ class TreeNode(object):
         # #  write_subdir_json = True  # True only for the "master" type that defines the directory keys ('edesign')
         # self.write_children(dirname, write_subdir_json)
 
-    def _write_children(self, dirname, write_subdir_json=True):
+    def _write_children(self, dirname, write_subdir_json=True, **kwargs):
         """
         Writes this node's children to directories beneath `dirname`.
 
@@ -240,6 +240,9 @@ class TreeNode(object):
             and sometimes it's useful to name children with a tuple rather than
             just a string).
 
+        **kwargs
+            Additional keyword arguments passed to each child's `write` method.
+
         Returns
         -------
         None
@@ -257,4 +260,4 @@ class TreeNode(object):
             subdir = self._dirs[nm]
             outdir = dirname / subdir
             outdir.mkdir(exist_ok=True)
-            self._vals[nm].write(outdir, parent=self)
+            self._vals[nm].write(outdir, parent=self, **kwargs)
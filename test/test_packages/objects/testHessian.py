@@ -388,6 +388,57 @@ class TestHessianMethods(BaseTestCase):
 
         #TODO: make sure ci_std and ci_std2 are the same
 
+    def test_iterative_confidenceRegion(self):
+        edesign = proto.CircuitListsDesign([pygsti.circuits.CircuitList(circuit_struct)
+                                            for circuit_struct in self.gss])
+        data = proto.ProtocolData(edesign, self.ds)
+        res = proto.ModelEstimateResults(data, proto.StandardGST(modes="TP"))
+
+        for key in ("dense", "iterative"):
+            res.add_estimate(
+                proto.estimate.Estimate.create_gst_estimate(
+                    res, stdxyi.target_model(), stdxyi.target_model(),
+                    [self.model] * len(self.maxLengthList), parameters={'objective': 'logl'}),
+                estimate_key=key
+            )
+            res.estimates[key].add_confidence_region_factory('final iteration estimate', 'final')
+
+        cfctry = res.estimates['dense'].create_confidence_region_factory('final iteration estimate', 'final')
+        cfctry.compute_hessian()
+        cfctry.project_hessian('std')
+
+        cfctryIt = res.estimates['iterative'].create_confidence_region_factory('final iteration estimate', 'final')
+        self.assertFalse(cfctryIt.can_construct_views())  # b/c no hessian or iterative error bars enabled yet...
+        cfctryIt.enable_iterative_errorbars()
+        self.assertFalse(cfctryIt.has_hessian)
+        self.assertTrue(cfctryIt.can_construct_views())
+        self.assertAlmostEqual(cfctry.nonMarkRadiusSq, cfctryIt.nonMarkRadiusSq)
+
+        ci_std = cfctry.view(95.0, 'normal', 'std')
+        ci_it = cfctryIt.view(95.0, 'normal')
+        self.assertArraysAlmostEqual(ci_std.retrieve_profile_likelihood_confidence_intervals(L("Gx")),
+                                     ci_it.retrieve_profile_likelihood_confidence_intervals(L("Gx")))
+
+        def fnOfGate_1D(mx, b):
+            return mx[0, :]
+        FnClass = gsf.opfn_factory(fnOfGate_1D)
+        FnObj = FnClass(self.model, 'Gx')
+        self.assertArraysAlmostEqual(ci_std.compute_confidence_interval(FnObj),
+                                     ci_it.compute_confidence_interval(FnObj))
+
+        s = pickle.dumps(cfctryIt)  # test pickle
+        pickle.loads(s)
+
+        # the Hessian-vector product isn't pickled, so an unpickled operator can only give cached elements
+        inv_hessian = cfctryIt.iterative_inv_hessian
+        diag = inv_hessian.diagonal([0, 1])
+        inv_hessian2 = pickle.loads(pickle.dumps(inv_hessian))
+        self.assertArraysAlmostEqual(inv_hessian2.diagonal([0, 1]), diag)
+        with self.assertRaises(ValueError):
+            inv_hessian2.diagonal([2])
+        with self.assertRaises(ValueError):
+            inv_hessian2.dot(np.ones(self.model.num_params, 'd'))
+
 
     def test_mapcalc_hessian(self):
         chi2Hessian = pygsti.chi2_hessian(self.model, self.ds)
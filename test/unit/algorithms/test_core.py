@@ -6,7 +6,8 @@ from pygsti.algorithms import core
 from pygsti.baseobjs import Label
 from pygsti.circuits import Circuit, CircuitList
 from pygsti.objectivefns import Chi2Function, FreqWeightedChi2Function, \
-    PoissonPicDeltaLogLFunction
+    PoissonPicDeltaLogLFunction, ModelDatasetCircuitsStore, ObjectiveFunctionBuilder
+from pygsti.optimize import CustomLMOptimizer
 from . import fixtures
 from ..util import BaseCase
 
@@ -113,6 +114,14 @@ class CoreMC2GSTTester(CoreStdData, BaseCase):
                                             )
         # TODO assert correctness
 
+    def test_do_mc2gst_sparse_jacobian(self):
+        result, mdl_lsgst = core.run_gst_fit_simple(self.ds, self.mdl_clgst, self.lsgstStrings[0],
+                                                    CustomLMOptimizer(tol=1e-5), "chi2", resource_alloc=None)
+        sparse_result, sparse_mdl_lsgst = core.run_gst_fit_simple(self.ds, self.mdl_clgst, self.lsgstStrings[0],
+                                                                  CustomLMOptimizer(tol=1e-5, sparse_jacobian=True),
+                                                                  "chi2", resource_alloc=None)
+        self.assertAlmostEqual(sparse_result.f, result.f, places=5)
+
     def test_do_mc2gst_regularize_factor(self):
         obj_builder = Chi2Function.builder(
             name='chi2',
@@ -195,6 +204,51 @@ class CoreMC2GSTTester(CoreStdData, BaseCase):
         )
         # TODO assert correctness
 
+    def test_do_iterative_mc2gst_extend_layouts(self):
+        circuit_lists = [CircuitList(lst) for lst in self.lsgstStrings]
+        models, _, _ = core.run_iterative_gst(
+            self.ds, self.mdl_clgst, circuit_lists,
+            optimizer={'tol': 1e-5},
+            iteration_objfn_builders=['chi2'],
+            final_objfn_builders=[],
+            resource_alloc=None
+        )
+        extended_models, _, final_objfn = core.run_iterative_gst(
+            self.ds, self.mdl_clgst, circuit_lists,
+            optimizer={'tol': 1e-5},
+            iteration_objfn_builders=['chi2'],
+            final_objfn_builders=[],
+            resource_alloc=None,
+            extend_layouts=True
+        )
+        self.assertEqual(len(final_objfn.layout.global_layout.circuits), len(circuit_lists[-1]))
+        self.assertGreater(len(final_objfn.layout.atoms), 1)  # new circuits were placed in new atoms
+        self.assertArraysAlmostEqual(models[-1].to_vector(), extended_models[-1].to_vector(), places=4)
+
+    def test_do_mc2gst_multistart(self):
+        optimizer = CustomLMOptimizer(tol=1e-5)
+        array_types = optimizer.array_types + \
+            ObjectiveFunctionBuilder.create_from('chi2').compute_array_types(optimizer.called_objective_methods,
+                                                                             self.mdl_clgst.sim)
+        mdc_store = ModelDatasetCircuitsStore(self.mdl_clgst.copy(), self.ds, self.lsgstStrings[0],
+                                              array_types=array_types)
+        v0 = self.mdl_clgst.to_vector()
+        start_vecs = [v0, v0 + 0.01 * np.random.RandomState(1234).random_sample(len(v0))]
+        best_result, objfn, all_results = core.run_gst_fit_multistart(mdc_store, optimizer, 'chi2', start_vecs)
+        self.assertEqual(len(all_results), 2)
+        self.assertAlmostEqual(best_result.f, min([r.f for r in all_results]))
+        self.assertArraysAlmostEqual(objfn.model.to_vector(), best_result.x)
+
+        models, _, _ = core.run_iterative_gst(
+            self.ds, self.mdl_clgst, self.lsgstStrings,
+            optimizer={'tol': 1e-5},
+            iteration_objfn_builders=['chi2'],
+            final_objfn_builders=[],
+            resource_alloc=None,
+            extra_start_models=[objfn.model.copy()]
+        )
+        self.assertEqual(len(models), len(self.lsgstStrings))
+
     def test_do_iterative_mc2gst_regularize_factor(self):
         obj_builder = Chi2Function.builder(
             name='chi2',
@@ -1,5 +1,10 @@
+from unittest import mock
+
+import numpy as np
+
 import pygsti.algorithms.fiducialpairreduction as fpr
 import pygsti.circuits as pc
+from pygsti.baseobjs import ProcessComm
 from pygsti.circuits import Circuit
 from . import fixtures
 from ..util import BaseCase
@@ -7,6 +12,11 @@ from ..util import BaseCase
 _SEED = 1234
 
 
+def _find_pairs_per_germ(comm, model, preps, effects, germs):
+    return fpr.find_sufficient_fiducial_pairs_per_germ(model, preps, effects, germs,
+                                                       search_mode='sequential', comm=comm)
+
+
 class FiducialPairReductionStdData(object):
     def setUp(self):
         super(FiducialPairReductionStdData, self).setUp()
@@ -74,6 +84,20 @@ class FindSufficientFiducialPairsBase(object):
         )
         # TODO assert correctness
 
+    def test_find_sufficient_fiducial_pairs_greedy(self):
+        test_lengths = (8, 64)
+        fiducial_pairs = fpr.find_sufficient_fiducial_pairs(
+            self.model, self.preps, self.effects, self.germs,
+            test_lengths=test_lengths, search_mode='greedy'
+        )
+        all_pairs = [(i, j) for i in range(len(self.preps)) for j in range(len(self.effects))]
+        self.assertEqual(
+            fpr.test_fiducial_pairs(fiducial_pairs, self.model, self.preps, self.effects, self.germs,
+                                    test_lengths=test_lengths),
+            fpr.test_fiducial_pairs(all_pairs, self.model, self.preps, self.effects, self.germs,
+                                    test_lengths=test_lengths)
+        )
+
 
 class FindSufficientFiducialPairsPerGermBase(object):
     def test_find_sufficient_fiducial_pairs_per_germ_sequential(self):
@@ -84,6 +108,23 @@ class FindSufficientFiducialPairsPerGermBase(object):
         self.assertTrue(fiducial_pairs == self.fiducial_pairs_per_germ or
                         fiducial_pairs == self.fiducial_pairs_per_germ_alt)
 
+    def test_find_sufficient_fiducial_pairs_per_germ_greedy(self):
+        fiducial_pairs = fpr.find_sufficient_fiducial_pairs_per_germ(
+            self.model, self.preps, self.effects, self.germs,
+            search_mode='greedy'
+        )
+        self.assertEqual({germ: len(pairs) for germ, pairs in fiducial_pairs.items()},
+                         {germ: len(pairs) for germ, pairs in self.fiducial_pairs_per_germ.items()})
+
+    def test_find_sufficient_fiducial_pairs_per_germ_with_comm(self):
+        serial_pairs = fpr.find_sufficient_fiducial_pairs_per_germ(
+            self.model, self.preps, self.effects, self.germs,
+            search_mode='sequential'
+        )
+        for fiducial_pairs in ProcessComm.run(_find_pairs_per_germ, 3,
+                                              args=(self.model, self.preps, self.effects, self.germs)):
+            self.assertEqual(fiducial_pairs, serial_pairs)
+
     def test_find_sufficient_fiducial_pairs_per_germ_random(self):
         fiducial_pairs = fpr.find_sufficient_fiducial_pairs_per_germ(
             self.model, self.preps, self.effects, self.germs,
@@ -119,6 +160,26 @@ class FindSufficientFiducialPairsExceptionTester(FiducialPairReductionStdData, B
                 self.model, insuff_fids, insuff_fids, self.germs
             )
 
+    def test_find_sufficient_fiducial_pairs_per_germ_greedy_raises_when_nothing_sufficient(self):
+        with mock.patch.object(fpr, '_find_pair_list_greedily', return_value=None):
+            with self.assertRaises(ValueError):
+                fpr.find_sufficient_fiducial_pairs_per_germ(
+                    self.model, self.preps, self.effects, self.germs, search_mode='greedy'
+                )
+
+    def test_find_pair_list_greedily_returns_none_when_nothing_sufficient(self):
+        dp = np.random.random((6, 2))
+        el_indices_for_pairs = [[0, 1], [2, 3], [4, 5]]
+
+        def test_fn(singular_values):
+            return np.count_nonzero(singular_values[0] > 1e-7), False  # never sufficient
+        self.assertIsNone(fpr._find_pair_list_greedily([dp], [el_indices_for_pairs], test_fn))
+
+        def rank_test_fn(singular_values):
+            rank = np.count_nonzero(singular_values[0] > 1e-7)
+            return rank, rank == 2
+        self.assertEqual(len(fpr._find_pair_list_greedily([dp], [el_indices_for_pairs], rank_test_fn)), 1)
+
 
 # TODO optimize
 class _TestFiducialPairsBase(object):
@@ -1,7 +1,11 @@
+from unittest import mock
+
 import numpy as np
 
 import pygsti.circuits as pc
 from pygsti.algorithms import germselection as germsel
+from pygsti.algorithms.scoring import CompositeScore
+from pygsti.baseobjs import ProcessComm
 from pygsti.modelmembers.operations import StaticArbitraryOp
 from . import fixtures
 from ..util import BaseCase
@@ -9,6 +13,10 @@ from ..util import BaseCase
 _SEED = 2019
 
 
+def _find_germs_with_comm(comm, find_germs_fn, *args, **kwargs):
+    return find_germs_fn(*args, comm=comm, **kwargs)
+
+
 class GermSelectionData(object):
     @classmethod
     def setUpClass(cls):
@@ -76,6 +84,35 @@ class GermSelectionTester(GermSelectionData, BaseCase):
         )
         # TODO assert correctness
 
+    def test_bulk_twirled_deriv(self):
+        for model in (self.mdl_target_noisy, fixtures.model):  # (the latter has degenerate germ eigenvalues)
+            reduced_model = germsel._remove_spam_vectors(model)
+            twirled_derivs = germsel._bulk_twirled_deriv(model, self.germ_set, 1e-5)
+            for twirled_deriv, germ in zip(twirled_derivs, self.germ_set):
+                self.assertArraysAlmostEqual(twirled_deriv, germsel._twirled_deriv(reduced_model, germ, 1e-5))
+
+            chunks = list(germsel._bulk_twirled_deriv_chunks(model, self.germ_set, 1e-5, chunk_size=3))
+            self.assertEqual([start for start, _ in chunks], list(range(0, len(self.germ_set), 3)))
+            self.assertArraysAlmostEqual(np.concatenate([chunk for _, chunk in chunks], axis=0), twirled_derivs)
+
+    def test_germ_set_gramian(self):
+        germ_lengths = np.array([len(g) for g in self.germ_set])
+        DDD = germsel._compute_bulk_twirled_ddd(self.mdl_target_noisy, self.germ_set, 1e-5,
+                                                germ_lengths=germ_lengths)
+        factors = germsel._compute_bulk_twirled_ddd_factors(self.mdl_target_noisy, self.germ_set, 1e-5,
+                                                            germ_lengths=germ_lengths)
+        norm = np.max(np.abs(DDD))
+        for ddd, factor in zip(DDD, factors):
+            self.assertLessEqual(factor.shape[0], self.mdl_target_noisy.dim**2)
+            self.assertArraysAlmostEqual(np.dot(factor.conjugate().T, factor) / norm, ddd / norm)
+
+        # eigenvalues of the germ set's J-sum after adding a candidate germ (w/ & w/out the low-rank shortcut)
+        gramian = germsel._GermSetGramian(DDD.shape[1])
+        for i, factor in enumerate(factors):
+            evals = gramian.sorted_eigenvalues_with(factor)
+            self.assertArraysAlmostEqual(evals / norm, np.linalg.eigvalsh(np.sum(DDD[0:i + 1], axis=0)) / norm)
+            gramian.add(factor)
+
     def test_randomize_model_list(self):
         # XXX does this need coverage?  EGN: does it take a long time?
         neighborhood = germsel.randomize_model_list(
@@ -176,6 +213,15 @@ class SlackGermSetOptimizationTester(GermSelectionData, BaseCase):
         )
         self.assertEqual(finalGerms_driver, finalGerms)
 
+    def test_optimize_integer_germs_slack_with_comm(self):
+        finalGerms = germsel.find_germs_integer_slack(
+            self.mdl_target_noisy, self.germ_set, fixed_slack=0.1, verbosity=0
+        )
+        for germs in ProcessComm.run(_find_germs_with_comm, 3,
+                                     args=(germsel.find_germs_integer_slack, self.mdl_target_noisy, self.germ_set),
+                                     kwargs=dict(fixed_slack=0.1, verbosity=0)):
+            self.assertEqual(germs, finalGerms)
+
     def test_optimize_integer_germs_slack_with_slack_fraction(self):
         finalGerms = germsel.find_germs_integer_slack(
             self.mdl_target_noisy, self.germ_set, slack_frac=0.1,
@@ -254,6 +300,25 @@ class GRASPGermSetOptimizationTester(GermSelectionWithNeighbors, BaseCase):
         )
         # TODO assert correctness
 
+    def test_grasp_germ_set_optimization_with_comm(self):
+        # more processors than iterations, so some iterations are shared by multiple processors
+        options = dict(self.options, iterations=2, return_all=True, verbosity=0)
+        solns = germsel.find_germs_grasp(self.neighbors, self.germ_set, alpha=0.1, **options)
+        for comm_solns in ProcessComm.run(_find_germs_with_comm, 3,
+                                          args=(germsel.find_germs_grasp, self.neighbors, self.germ_set, 0.1),
+                                          kwargs=options):
+            self.assertEqual(comm_solns, solns)
+
+    def test_grasp_germ_set_optimization_shuffle_is_seeded(self):
+        options = dict(self.options, shuffle=True, verbosity=0)
+        with mock.patch.object(germsel._grasp, 'get_swap_neighbors',
+                               side_effect=germsel._grasp.get_swap_neighbors) as mock_neighbors:
+            germsel.find_germs_grasp(self.neighbors, self.germ_set, alpha=0.1, **options)
+        self.assertGreater(mock_neighbors.call_count, 0)
+        for call in mock_neighbors.call_args_list:  # neighborhoods are shuffled by the iteration's seeded RNG
+            self.assertTrue(call.kwargs['shuffle'])
+            self.assertIsInstance(call.kwargs['rand_state'], np.random.RandomState)
+
     def test_grasp_germ_set_optimization_force_strings(self):
         forceStrs = pc.to_circuits([('Gx',), ('Gy')])
         soln = germsel.find_germs_grasp(
@@ -285,6 +350,19 @@ class GreedyGermSelectionTester(GermSelectionWithNeighbors, BaseCase):
         germs = germsel.find_germs_depthfirst(self.neighbors, self.germ_set, **self.options)
         # TODO assert correctness
 
+    def test_build_up_with_comm(self):
+        germs = germsel.find_germs_depthfirst(self.neighbors, self.germ_set, **self.options)
+        for comm_germs in ProcessComm.run(_find_germs_with_comm, 3,
+                                          args=(germsel.find_germs_depthfirst, self.neighbors, self.germ_set),
+                                          kwargs=self.options):
+            self.assertEqual(comm_germs, germs)
+
+    def test_build_up_raises_when_no_candidate_scores(self):
+        with mock.patch.object(germsel, 'compute_composite_germ_set_score',
+                               return_value=CompositeScore(1.0e100, 0, None)):
+            with self.assertRaises(ValueError):
+                germsel.find_germs_depthfirst(self.neighbors, self.germ_set, **self.options)
+
     def test_build_up_force_strings(self):
         forceStrs = pc.to_circuits([('Gx',), ('Gy')])
         germs = germsel.find_germs_depthfirst(
@@ -312,6 +390,23 @@ class GreedyGermSelectionTester(GermSelectionWithNeighbors, BaseCase):
         )
         # TODO assert correctness
 
+    def test_build_up_breadth_single_jac(self):
+        germs = germsel.find_germs_breadthfirst(self.neighbors, self.germ_set, **self.options)
+
+        # a memory limit too small to hold every germ's low-rank J.H*J factors, forcing single-Jac mode
+        Np, dim = self.neighbors[0].num_params, self.neighbors[0].dim
+        mem_limit = germsel.FLOATSIZE * 3 * len(self.neighbors) * (Np**2 + dim**2 * Np)
+        single_jac_germs = germsel.find_germs_breadthfirst(self.neighbors, self.germ_set, mem_limit=mem_limit,
+                                                           **self.options)
+        self.assertEqual(single_jac_germs, germs)
+
+    def test_build_up_breadth_with_comm(self):
+        germs = germsel.find_germs_breadthfirst(self.neighbors, self.germ_set, **self.options)
+        for comm_germs in ProcessComm.run(_find_germs_with_comm, 3,
+                                          args=(germsel.find_germs_breadthfirst, self.neighbors, self.germ_set),
+                                          kwargs=self.options):
+            self.assertEqual(comm_germs, germs)
+
     def test_build_up_breadth_force_strings(self):
         forceStrs = pc.to_circuits([('Gx',), ('Gy')])
         germs = germsel.find_germs_breadthfirst(
@@ -103,3 +103,17 @@ independent of their order in the source code
                 feasible_fn=None, initial_elements=[0], seed=1234,
                 verbosity=3
             )
+
+    def test_get_swap_neighbors_shuffle_uses_rand_state(self):
+        weights = np.array([1, 0, 1, 0, 0, 1])
+        forced_weights = np.array([1, 0, 0, 0, 0, 0])
+        neighbors = grasp.get_swap_neighbors(weights, forced_weights)
+        self.assertEqual(len(neighbors), 2 * 3)  # 2 swappable 1s (the forced 1 stays) x 3 zeros
+
+        shuffled = grasp.get_swap_neighbors(weights, forced_weights, shuffle=True,
+                                            rand_state=np.random.RandomState(1234))
+        np.random.seed(4321)  # the global random number generator doesn't affect the shuffle
+        self.assertArraysEqual(np.array(grasp.get_swap_neighbors(weights, forced_weights, shuffle=True,
+                                                                 rand_state=np.random.RandomState(1234))),
+                               np.array(shuffled))
+        self.assertEqual(sorted(map(tuple, shuffled)), sorted(map(tuple, neighbors)))
@@ -62,6 +62,31 @@ class DataSetConstructionTester(BaseCase):
         for dr1, dr2 in zip(dataset1.values(), dataset2.values()):
             self.assertEqual(dr1.counts, dr2.counts)
 
+    def test_generate_fake_data_vectorized(self):
+        circuits = self.lsgst_lists[3]
+        for sample_error in ('multinomial', 'binomial', 'round'):
+            for record_zero_counts in (True, False):
+                ds = pdata.simulate_data(self.depolGateset, circuits, num_samples=100, sample_error=sample_error,
+                                         seed=100, record_zero_counts=record_zero_counts)
+                ds_vec = pdata.simulate_data(self.depolGateset, circuits, num_samples=100, sample_error=sample_error,
+                                             seed=100, record_zero_counts=record_zero_counts, vectorized=True)
+                self.assertEqual(list(ds.keys()), list(ds_vec.keys()))
+                self.assertEqual(ds.olIndex, ds_vec.olIndex)
+                self.assertArraysEqual(ds.oliData, ds_vec.oliData)
+                self.assertArraysEqual(ds.repData, ds_vec.repData)
+
+    def test_generate_fake_data_vectorized_with_times(self):
+        mdl = self.depolGateset.copy()
+        mdl.sim = 'map'
+        times = [0.0, 0.5, 1.0]
+        ds = pdata.simulate_data(mdl, self.lsgst_lists[1], num_samples=100, seed=100, times=times)
+        ds_vec = pdata.simulate_data(mdl, self.lsgst_lists[1], num_samples=100, seed=100, times=times,
+                                     vectorized=True)
+        for c in ds.keys():
+            self.assertArraysEqual(ds[c].time, ds_vec[c].time)
+            self.assertArraysEqual(ds[c].reps, ds_vec[c].reps)
+            self.assertEqual(ds[c].outcomes, ds_vec[c].outcomes)
+
     def test_generate_fake_data_raises_on_bad_sample_error(self):
         with self.assertRaises(ValueError):
             pdata.simulate_data(self.dataset, self.circuit_list, num_samples=None,
@@ -121,3 +121,45 @@ class DataSetLoaderTester(BaseCase):
         self.assertEqual(ds[Circuit('Gc2')].aux['test'], 1)
         self.assertEqual(ds[Circuit('Gc3')].aux['test'], 1)
         self.assertEqual(ds[Circuit('Gc4')].aux['test'], 1)
+
+    @with_temp_path
+    def test_load_chunked(self, pth):
+        contents = ("## Outcomes = 0, 1\n"
+                    "Gc0 0:10 1:23  # {'test': 1}\n"
+                    "Gc1 BAD\n"
+                    "Gc2 0:0 1:0\n"
+                    "Gc3\n"
+                    "Gc4 0:43 1:23\n"
+                    "Gc5 0:7\n")
+        with open(pth, 'w') as f:
+            f.write(contents)
+
+        for ignore_zero_count_lines in (True, False):
+            ds = io.load_dataset(pth, ignore_zero_count_lines=ignore_zero_count_lines, verbosity=0)
+            for num_processors in (1, 2):
+                ds_chunked = io.StdInputParser().parse_datafile_chunked(
+                    pth, num_processors, chunk_size=16, ignore_zero_count_lines=ignore_zero_count_lines)
+                self.assertEqual(list(ds.keys()), list(ds_chunked.keys()))
+                self.assertEqual(ds.outcome_labels, ds_chunked.outcome_labels)
+                for circuit in ds:
+                    self.assertEqual(ds[circuit].counts, ds_chunked[circuit].counts)
+                    self.assertEqual(ds[circuit].aux, ds_chunked[circuit].aux)
+
+        chunks = list(io.StdInputParser().iter_datafile_chunks(pth, 1, chunk_size=16, ignore_zero_count_lines=False))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum([len(chunk['circuits']) for chunk in chunks]), len(ds))
+
+    @with_temp_path
+    def test_load_chunked_with_times(self, pth):
+        contents = ("Gc0\n"
+                    "times: 0 1 2\n"
+                    "outcomes: 0 1 0\n"
+                    "\n"
+                    "Gc1 0:1 1:1\n")
+        with open(pth, 'w') as f:
+            f.write(contents)
+
+        ds = io.StdInputParser().parse_datafile_chunked(pth, 1, chunk_size=16)  # falls back to parse_datafile
+        self.assertEqual(list(ds[Circuit('Gc0')].time), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            list(io.StdInputParser().iter_datafile_chunks(pth, 1, chunk_size=16))
@@ -7,7 +7,7 @@ import pygsti.circuits as pc
 from pygsti.baseobjs import outcomelabeldict as ld
 from pygsti.circuits import Circuit
 from pygsti.data import DataSet
-from ..util import BaseCase
+from ..util import BaseCase, with_temp_path
 
 
 class DataSetTester(BaseCase):
@@ -213,6 +213,23 @@ class DataSetMethodBase(object):
             for expected, actual in zip(expected_row, actual_row):
                 self.assertEqual(expected, actual)
 
+    @with_temp_path
+    def test_save_load_columnar(self, tmp_path):
+        self.ds.save_columnar(tmp_path)
+        for memory_map in (True, False):
+            ds_loaded = DataSet()
+            ds_loaded.load_columnar(tmp_path, memory_map=memory_map)
+            self.assertTrue(ds_loaded.bStatic)
+            self.assertEqual(list(self.ds.keys()), list(ds_loaded.keys()))
+            for circuit in self.ds:
+                self.assertArraysEqual(self.ds[circuit].oli, ds_loaded[circuit].oli)
+                self.assertArraysEqual(self.ds[circuit].time, ds_loaded[circuit].time)
+                self.assertEqual(self.ds[circuit].counts, ds_loaded[circuit].counts)
+
+        ds_loaded = DataSet(file_to_load_from=tmp_path)  # directories are loaded as columnar data
+        self.assertIsInstance(ds_loaded.oliData, np.memmap)
+        self.assertEqual(len(self.ds), len(ds_loaded))
+
     # Row instance tests
     def test_row_get_expanded_ol(self):
         self.dsRow.expanded_ol
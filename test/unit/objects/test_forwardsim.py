@@ -1,16 +1,58 @@
 # XXX rewrite or remove
 
+import json
+import os
+import pickle
+import subprocess
+import sys
 from unittest import mock
 
 import numpy as np
 
+import pygsti
 import pygsti.models as models
+from pygsti.data import simulate_data
+from pygsti.baseobjs import ResourceAllocation
+from pygsti.forwardsims import matrixforwardsim
 from pygsti.forwardsims.forwardsim import ForwardSimulator
 from pygsti.forwardsims.mapforwardsim import MapForwardSimulator
 from pygsti.models import ExplicitOpModel
 from pygsti.circuits import Circuit
+from pygsti.layouts.evaltree import EvalTree
+from pygsti.layouts import layoutcache
+from pygsti.layouts.layoutcache import LayoutCache
+from pygsti.modelmembers.operations import DenseOperator, FullArbitraryOp
 from pygsti.baseobjs import Label as L
-from ..util import BaseCase
+from ..util import BaseCase, with_temp_path
+
+
+# Computes outcome probabilities of a map-simulated model using a layout from `sys.argv[1]`'s layout cache
+# and using an uncached layout, and prints them (run in a separate interpreter by the tests below).
+_CACHED_MAP_PROBS_SCRIPT = """
+import json, sys
+import numpy as np
+from pygsti.forwardsims.mapforwardsim import MapForwardSimulator
+from pygsti.modelpacks import smq1Q_XYI
+model = smq1Q_XYI.target_model().depolarize(op_noise=0.01, spam_noise=0.01)
+circuits = list(smq1Q_XYI.get_gst_circuits(1))
+ret = []
+for cache_dir in (sys.argv[1], None):
+    model.sim = MapForwardSimulator(num_atoms=2, layout_cache_dir=cache_dir)
+    layout = model.sim.create_layout(circuits)
+    probs = np.empty(layout.num_elements, 'd')
+    model.sim.bulk_fill_probs(probs, layout)
+    ret.append([list(probs[layout.indices(c)]) for c in circuits])
+print(json.dumps(ret))
+"""
+
+
+def _cached_map_probs(cache_dir, hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(pygsti.__file__)))]
+                                        + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    out = subprocess.run([sys.executable, '-c', _CACHED_MAP_PROBS_SCRIPT, str(cache_dir)], env=env,
+                         stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
 
 
 def Ls(*args):
@@ -18,6 +60,30 @@ def Ls(*args):
     return tuple([L(x) for x in args])
 
 
+class _TimeDependentIdle(DenseOperator):
+    """ An idle that depolarizes at a parameterized rate over time """
+    def __init__(self, depol_rate, evotype="default"):
+        super(_TimeDependentIdle, self).__init__(np.identity(4, 'd'), evotype)
+        self.from_vector([depol_rate])
+        self.set_time(0.0)
+
+    @property
+    def num_params(self):
+        return 1
+
+    def to_vector(self):
+        return np.array([self.depol_rate], 'd')
+
+    def from_vector(self, v, close=False, dirty_value=True):
+        self.depol_rate = v[0]
+        self.dirty = dirty_value
+
+    def set_time(self, t):
+        a = 1.0 - min(self.depol_rate * t, 1.0)
+        self._ptr[:, :] = np.diag([1, a, a, a])
+        self._ptr_has_changed()
+
+
 class AbstractForwardSimTester(BaseCase):
     # XXX is it really neccessary to test an abstract base class?
     def setUp(self):
@@ -72,12 +138,198 @@ class ForwardSimBase(object):
         self.fwdsim.bulk_fill_probs(pmx, self.layout)
         # TODO assert correctness
 
+    def test_bulk_fill_probs_at_times(self):
+        pmx = np.empty(self.nEls, 'd')
+        self.fwdsim.bulk_fill_probs(pmx, self.layout)
+        pmx_at_times = np.empty((3, self.nEls), 'd')
+        self.fwdsim.bulk_fill_probs_at_times(pmx_at_times, self.layout, [0.0, 0.5, 1.0])
+        for row in pmx_at_times:  # time-independent model => same probabilities at all times
+            self.assertArraysAlmostEqual(row, pmx)
+
+    @with_temp_path
+    def test_create_layout_with_cache_dir(self, tmp_path):
+        mdl = self.model.copy()
+        mdl.sim = self.fwdsim.__class__(num_atoms=2, layout_cache_dir=tmp_path)
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gx'), ('Gy',), ('Gx', 'Gy'), ('Gy', 'Gy', 'Gi')]]
+        layout = mdl.sim.create_layout(circuits)
+        self.assertEqual(len(os.listdir(tmp_path)), 1)  # one cache entry (directory) per layout digest
+        entry_path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+        mtimes = {fn: os.path.getmtime(os.path.join(entry_path, fn)) for fn in os.listdir(entry_path)}
+
+        sim_copy = mdl.sim.copy()
+        self.assertEqual(sim_copy._layout_cache_dir, tmp_path)
+        with mock.patch.object(LayoutCache, 'save') as mock_save, \
+                mock.patch.object(LayoutCache, 'load', autospec=True, side_effect=LayoutCache.load) as mock_load:
+            cached_layout = sim_copy.create_layout(circuits)
+        mock_save.assert_not_called()  # everything was loaded from disk
+        self.assertGreater(mock_load.call_count, 0)
+        self.assertEqual(mtimes, {fn: os.path.getmtime(os.path.join(entry_path, fn)) for fn in os.listdir(entry_path)})
+        self.assertEqual(cached_layout.num_elements, layout.num_elements)
+        element_indices = np.arange(layout.num_elements)
+        for c in circuits:
+            self.assertArraysEqual(element_indices[cached_layout.indices(c)], element_indices[layout.indices(c)])
+            self.assertEqual(cached_layout.outcomes(c), layout.outcomes(c))
+        pmx = np.empty(layout.num_elements, 'd')
+        cached_pmx = np.empty(layout.num_elements, 'd')
+        mdl.sim.bulk_fill_probs(pmx, layout)
+        mdl.sim.bulk_fill_probs(cached_pmx, cached_layout)
+        self.assertArraysAlmostEqual(pmx, cached_pmx)
+
+        mdl.sim.create_layout(circuits[0:3])  # different circuits => a new cache entry
+        self.assertEqual(len(os.listdir(tmp_path)), 2)
+
+        with mock.patch.object(layoutcache, 'LAYOUT_FORMAT_VERSION', layoutcache.LAYOUT_FORMAT_VERSION + 1):
+            mdl.sim.create_layout(circuits)  # a new layout format => a new cache entry
+        self.assertEqual(len(os.listdir(tmp_path)), 3)
+
+    def test_extend_layout(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gx'), ('Gy',), ('Gx', 'Gy'), ('Gy', 'Gy', 'Gi')]]
+        new_circuits = [Circuit(c) for c in [('Gx', 'Gy', 'Gy'), ('Gx',), ('Gy', 'Gx', 'Gx', 'Gi'), ('Gi',)]]
+        layout = self.fwdsim.create_layout(circuits)
+        extended_layout = layout.extend(new_circuits, self.model)
+        full_layout = self.fwdsim.create_layout(circuits + new_circuits)
+        self.assertEqual(extended_layout.num_elements, full_layout.num_elements)
+        self.assertGreater(len(extended_layout.atoms), len(layout.atoms))
+
+        pmx = np.empty(extended_layout.num_elements, 'd')
+        full_pmx = np.empty(full_layout.num_elements, 'd')
+        self.fwdsim.bulk_fill_probs(pmx, extended_layout)
+        self.fwdsim.bulk_fill_probs(full_pmx, full_layout)
+        for c in circuits + new_circuits:
+            self.assertEqual(extended_layout.outcomes(c), full_layout.outcomes(c))
+            self.assertArraysAlmostEqual(pmx[extended_layout.indices(c)], full_pmx[full_layout.indices(c)])
+
     def test_bulk_fill_dprobs(self):
         dmx = np.empty((self.nEls, self.nP), 'd')
         pmx = np.empty(self.nEls, 'd')
         self.fwdsim.bulk_fill_dprobs(dmx, self.layout, pr_array_to_fill=pmx)
         # TODO assert correctness
 
+    def test_bulk_fill_dprobs_dot(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gx'), ('Gy', 'Gx'), ('Gx', 'Gy', 'Gi')]]
+        layout = self.fwdsim.create_layout(circuits, array_types=('e', 'ep'))
+        nEls = layout.num_elements
+        dmx = np.empty((nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, layout)
+
+        rand_state = np.random.RandomState(1234)
+        vec = rand_state.normal(size=self.nP)
+        jvec = np.empty(nEls, 'd')
+        pmx = np.empty(nEls, 'd')
+        self.fwdsim.bulk_fill_dprobs_dot(jvec, layout, vec, pr_array_to_fill=pmx)
+        self.assertArraysAlmostEqual(jvec, np.dot(dmx, vec))
+
+        uvec = rand_state.normal(size=nEls)
+        jtu = np.empty(self.nP, 'd')
+        self.fwdsim.bulk_fill_dprobs_transpose_dot(jtu, layout, uvec)
+        self.assertArraysAlmostEqual(jtu, np.dot(uvec, dmx))
+
+    def test_bulk_fill_hprobs_dot(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gx'), ('Gy', 'Gx'), ('Gx', 'Gy', 'Gi')]]
+        layout = self.fwdsim.create_layout(circuits, array_types=('e', 'epp'))
+        nEls = layout.num_elements
+        hmx = np.zeros((nEls, self.nP, self.nP), 'd')
+        self.fwdsim.bulk_fill_hprobs(hmx, layout)
+
+        rand_state = np.random.RandomState(1234)
+        vec = rand_state.normal(size=self.nP)
+        weights = rand_state.normal(size=nEls)
+        hvec = np.empty(self.nP, 'd')
+        v0 = self.model.to_vector()
+        self.fwdsim.bulk_fill_hprobs_dot(hvec, layout, vec, weights)
+        self.assertArraysAlmostEqual(self.model.to_vector(), v0)  # model parameters are restored
+        hvec_check = np.einsum('e,eij,j->i', weights, hmx, vec)
+        norm = np.linalg.norm(hvec_check)  # some simulators' hprobs are themselves finite-difference approximations
+        self.assertArraysAlmostEqual(hvec / norm, hvec_check / norm, places=3)
+
+    def test_iter_dprobs_by_element_blocks(self):
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+        for blk_size in (None, 1):
+            blocked_dmx = np.zeros((self.nEls, self.nP), 'd')
+            for element_slice, dprobs_blk in self.fwdsim.iter_dprobs_by_element_blocks(self.layout, blk_size):
+                if blk_size is not None: self.assertLessEqual(dprobs_blk.shape[0], blk_size)
+                blocked_dmx[element_slice] += dprobs_blk
+            self.assertArraysAlmostEqual(blocked_dmx, dmx)
+
+    def test_bulk_fill_dprobs_param_blocks(self):
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+        first_half, second_half = slice(0, self.nP // 2), slice(self.nP // 2, self.nP)
+        blocked_dmx = np.zeros((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs_param_blocks(blocked_dmx, self.layout, [second_half])
+        self.assertArraysAlmostEqual(blocked_dmx[:, first_half], np.zeros((self.nEls, self.nP // 2), 'd'))
+        self.assertArraysAlmostEqual(blocked_dmx[:, second_half], dmx[:, second_half])
+
+    def test_bulk_dprobs_sparse(self):
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+        pmx = np.empty(self.nEls, 'd')
+        sparse_dmx = self.fwdsim.bulk_dprobs_sparse(self.layout, pmx)
+        self.assertEqual(sparse_dmx.shape, (self.nEls, self.nP))
+        self.assertArraysAlmostEqual(sparse_dmx.toarray(), dmx)
+        self.assertArraysAlmostEqual(self.fwdsim.bulk_dprobs_sparse(self.layout, blk_size=3).toarray(), dmx)
+
+    def test_param_dependency_index(self):
+        index = self.layout.param_dependency_index(self.model)
+        self.assertIs(self.layout.param_dependency_index(self.model), index)  # built only once
+        gx_params = self.model.operations['Gx'].gpindices_as_array()
+        gy_params = self.model.operations['Gy'].gpindices_as_array()
+        self.assertEqual(index.num_circuits, 2)
+        for i in range(index.num_circuits):
+            self.assertTrue(set(gx_params).issubset(index.param_indices(i)))
+            self.assertEqual(set(gy_params) & set(index.param_indices(i)), set())
+        self.assertTrue(np.all(index.circuits_depending_on(gx_params)))
+        self.assertFalse(np.any(index.circuits_depending_on(gy_params)))
+
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+        self.assertArraysAlmostEqual(dmx[:, gy_params], np.zeros((self.nEls, len(gy_params)), 'd'))
+
+        # re-adding Gx moves its parameters after Gy's: same number of parameters, different structure
+        mdl = self.model.copy()
+        gx = mdl.operations['Gx'].copy()
+        del mdl.operations['Gx']
+        mdl.operations['Gx'] = gx
+        self.assertEqual(mdl.num_params, self.nP)
+        moved_index = self.layout.param_dependency_index(mdl)
+        self.assertIsNot(moved_index, index)
+        self.assertTrue(np.all(moved_index.circuits_depending_on(mdl.operations['Gx'].gpindices_as_array())))
+        self.assertFalse(np.any(moved_index.circuits_depending_on(mdl.operations['Gy'].gpindices_as_array())))
+
+    def test_reduce_by_circuit(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gy'), ('Gx',), ('Gy', 'Gy', 'Gi')]]  # w/duplicate
+        layout = self.fwdsim.create_layout(circuits)
+        values = np.random.random((layout.num_elements, 3))
+        offsets, element_indices = layout.element_circuit_index()
+        self.assertEqual(len(offsets), len(circuits) + 1)
+
+        sums = layout.sum_by_circuit(values)
+        maxes = layout.max_by_circuit(values[:, 0])
+        for i in range(len(circuits)):
+            inds = layout.indices_for_index(i)
+            self.assertArraysAlmostEqual(values[element_indices[offsets[i]:offsets[i + 1]]], values[inds])
+            self.assertArraysAlmostEqual(sums[i], np.sum(values[inds], axis=0))
+            self.assertAlmostEqual(maxes[i], np.max(values[inds, 0]))
+
+        subset = np.array([3, 0])
+        self.assertArraysAlmostEqual(layout.sum_by_circuit(values, subset), sums[subset])
+        self.assertArraysAlmostEqual(layout.reduce_by_circuit(values[:, 1], np.minimum, subset),
+                                     [np.min(values[layout.indices_for_index(i), 1]) for i in subset])
+
+        # adding per-circuit values to elements is the transpose of summing over them
+        circuit_values = np.random.random((len(subset), 3))
+        added = np.zeros(values.shape, 'd')
+        layout.add_by_circuit(added, circuit_values, subset)
+        self.assertAlmostEqual(np.sum(added * values), np.sum(circuit_values * sums[subset]))
+
+        # layouts pickled before the (lazily built) element-circuit index existed still work
+        old_layout = self.fwdsim.create_layout(circuits)
+        del old_layout.__dict__['_element_circuit_index']
+        del old_layout.__dict__['_param_dependency_index']
+        unpickled_layout = pickle.loads(pickle.dumps(old_layout))
+        self.assertArraysAlmostEqual(unpickled_layout.sum_by_circuit(values), sums)
+
     def test_bulk_fill_dprobs_with_block_size(self):
         dmx = np.empty((self.nEls, self.nP), 'd')
         self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
@@ -144,6 +396,78 @@ class MatrixForwardSimTester(ForwardSimBase, BaseCase):
         hgflat = self.fwdsim._hoperation(L('Gx'), flat=True)
         # TODO assert correctness
 
+    def test_product_cache_by_levels(self):
+        mdl = self.model.copy()
+        mdl.operations['Gi'] = FullArbitraryOp(mdl.operations['Gi'].to_dense() * 1e-30)  # so products need rescaling
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gy'), ('Gi',) * 5, ('Gx', 'Gi', 'Gi', 'Gi', 'Gi', 'Gy'),
+                                         ('Gy', 'Gx', 'Gx', 'Gi'), ()]]
+        tree = EvalTree.create(circuits)
+        self.assertGreater(len(tree.evaluation_levels()[1]), 1)
+
+        prods, scales = mdl.sim._compute_product_cache(tree, None)  # batched over tree levels
+        loop_prods, loop_scales = mdl.sim._compute_product_cache(list(tree), None)  # one element at a time
+        self.assertTrue(np.any(np.abs(prods).max(axis=(1, 2)) < 1e-100))
+        self.assertArraysAlmostEqual(scales, loop_scales)
+        self.assertArraysAlmostEqual(prods, loop_prods)
+
+    def test_time_dependent_probs(self):
+        mdl = self.model.copy()
+        mdl.operations['Gi'] = _TimeDependentIdle(1.0, mdl.evotype)
+        map_mdl = mdl.copy()
+        map_mdl.sim = MapForwardSimulator()
+        circuits = [Circuit(c) for c in [('Gx',), ('Gi', 'Gx'), ('Gx', 'Gi', 'Gi'), ('Gy', 'Gy')]]
+        times = [0.0, 0.1, 0.5]
+
+        layout = mdl.sim.create_layout(circuits)
+        map_layout = map_mdl.sim.create_layout(circuits)
+        probs = np.empty((len(times), layout.num_elements), 'd')
+        map_probs = np.empty((len(times), map_layout.num_elements), 'd')
+        mdl.sim.bulk_fill_probs_at_times(probs, layout, times)
+        map_mdl.sim.bulk_fill_probs_at_times(map_probs, map_layout, times)
+        for c in circuits:
+            self.assertArraysAlmostEqual(probs[:, layout.indices(c)], map_probs[:, map_layout.indices(c)])
+        self.assertGreater(np.max(np.abs(probs[0] - probs[-1])), 0.1)  # the idle's circuits change over time
+
+        # only updating the products that contain the time-dependent idle
+        tree = EvalTree.create(circuits)
+        mdl.sim._set_model_time(0.0)
+        caches = mdl.sim._compute_product_cache(tree, None)
+        mdl.sim._set_model_time(0.5)
+        mdl.sim._compute_product_cache(tree, None, caches, {L('Gi')})
+        prods, scales = mdl.sim._compute_product_cache(tree, None)
+        self.assertArraysAlmostEqual(caches[0], prods)
+        self.assertArraysAlmostEqual(caches[1], scales)
+
+        ds = simulate_data(mdl, circuits, 100, sample_error='none', times=times)
+        map_ds = simulate_data(map_mdl, circuits, 100, sample_error='none', times=times)
+        for c in circuits:
+            self.assertArraysAlmostEqual(ds[c].time, map_ds[c].time)
+            self.assertArraysAlmostEqual(ds[c].reps, map_ds[c].reps)
+
+    def test_dproduct_cache_by_levels(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gy'), ('Gi',) * 5, ('Gx', 'Gi', 'Gi', 'Gi', 'Gi', 'Gy'),
+                                         ('Gy', 'Gx', 'Gx', 'Gi'), ()]]
+        tree = EvalTree.create(circuits)
+        prods, scales = self.fwdsim._compute_product_cache(tree, None)
+
+        dprods = self.fwdsim._compute_dproduct_cache(tree, prods, scales)  # batched over tree levels
+        loop_dprods = self.fwdsim._compute_dproduct_cache(list(tree), prods, scales)  # one element at a time
+        self.assertArraysAlmostEqual(dprods, loop_dprods)
+
+        wrt_slice = slice(2, 7)
+        block_dprods = self.fwdsim._compute_dproduct_cache(tree, prods, scales, wrt_slice=wrt_slice)
+        self.assertArraysAlmostEqual(block_dprods, loop_dprods[:, wrt_slice])
+
+        # only the (bounded) batch buffers are kept between calls, and they count against memory limits
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+        self.assertNotIn('dproduct_cache', self.fwdsim._scratch_arrays)
+        max_batch_elements = matrixforwardsim._MAX_BATCH_ELEMENTS
+        for buf in self.fwdsim._scratch_arrays.values():
+            self.assertLessEqual(buf.size, max_batch_elements)
+        with self.assertRaises(MemoryError):
+            self.fwdsim._compute_dproduct_cache(tree, prods, scales, ResourceAllocation(mem_limit=dprods.nbytes))
+
     #REMOVE
     #def test_hproduct(self):
     #    self.fwdsim.hproduct(Ls('Gx', 'Gx'), flat=True, wrt_filter1=[0, 1], wrt_filter2=[1, 2, 3])
@@ -167,3 +491,37 @@ class MapForwardSimTester(ForwardSimBase, BaseCase):
         super(MapForwardSimTester, cls).setUpClass()
         cls.model = cls.model.copy()
         cls.model.sim = MapForwardSimulator()
+
+    @with_temp_path
+    def test_layout_cache_across_processes(self, tmp_path):
+        # a cache entry written by one interpreter is read by others with different string hashing
+        written_probs, _ = _cached_map_probs(tmp_path, 0)
+        self.assertEqual(len(os.listdir(tmp_path)), 1)
+        for hash_seed in (1, 2, 3, 37):
+            cached_probs, uncached_probs = _cached_map_probs(tmp_path, hash_seed)
+            for p_cached, p_uncached, p_written in zip(cached_probs, uncached_probs, written_probs):
+                self.assertArraysAlmostEqual(np.array(p_cached), np.array(p_uncached))
+                self.assertArraysAlmostEqual(np.array(p_cached), np.array(p_written))
+        self.assertEqual(len(os.listdir(tmp_path)), 1)  # all the readers used the same cache entry
+
+    def test_bulk_fill_with_threads(self):
+        circuits = [Circuit(c) for c in [('Gx',), ('Gx', 'Gx'), ('Gy',), ('Gx', 'Gy'), ('Gy', 'Gy', 'Gi')]]
+        layout = self.fwdsim.create_layout(circuits, array_types=('e', 'ep'))
+        dmx = np.empty((layout.num_elements, self.nP), 'd')
+        pmx = np.empty(layout.num_elements, 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, layout, pr_array_to_fill=pmx)
+
+        mdl = self.model.copy()
+        mdl.sim = MapForwardSimulator(num_atoms=3, num_threads=2)
+        threaded_layout = mdl.sim.create_layout(circuits, array_types=('e', 'ep'))
+        self.assertEqual(len(threaded_layout.atoms), 3)
+        threaded_dmx = np.empty((layout.num_elements, self.nP), 'd')
+        threaded_pmx = np.empty(layout.num_elements, 'd')
+        mdl.sim.bulk_fill_dprobs(threaded_dmx, threaded_layout, pr_array_to_fill=threaded_pmx)
+        for c in circuits:
+            self.assertArraysAlmostEqual(threaded_pmx[threaded_layout.indices(c)], pmx[layout.indices(c)])
+            self.assertArraysAlmostEqual(threaded_dmx[threaded_layout.indices(c)], dmx[layout.indices(c)])
+
+        mdl.sim.bulk_fill_probs(threaded_pmx, threaded_layout)
+        for c in circuits:
+            self.assertArraysAlmostEqual(threaded_pmx[threaded_layout.indices(c)], pmx[layout.indices(c)])
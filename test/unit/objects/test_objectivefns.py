@@ -319,6 +319,26 @@ class TimeIndependentMDSObjectiveFunctionTester(ObjectiveFunctionData):
                 self.assertArraysAlmostEqual(dterms / nEls, 2 * lsvec[:, None] * dlsvec / nEls,
                                              places=4)  # each *element* should match to 4 places
 
+                # matrix-free products should agree with the full jacobian
+                dlsvec = objfn.dlsvec(v0).copy()
+                rand_state = np.random.RandomState(1234)
+                vec = rand_state.normal(size=dlsvec.shape[1])
+                uvec = rand_state.normal(size=dlsvec.shape[0])
+                self.assertArraysAlmostEqual(objfn.dlsvec_dot(vec, v0), np.dot(dlsvec, vec))
+                self.assertArraysAlmostEqual(objfn.dlsvec_transpose_dot(uvec, v0), np.dot(uvec, dlsvec))
+
+                # lazily-updated jacobians are exact when refreshed or when the parameters haven't moved
+                self.assertArraysAlmostEqual(objfn.dlsvec_lazy(v0, refresh=True), dlsvec)
+                self.assertArraysAlmostEqual(objfn.dlsvec_lazy(v0), dlsvec)
+                self.assertArraysAlmostEqual(objfn.dlsvec_sparse(v0).toarray(), dlsvec)
+
+                # so should J^T J and J^T f accumulated from blocks of the jacobian's rows
+                lsvec = objfn.lsvec(v0).copy()
+                jtj, jtf = objfn.jtj_and_jtf(v0, blk_size=5)
+                norm = np.linalg.norm(np.dot(dlsvec.T, dlsvec))
+                self.assertArraysAlmostEqual(jtj / norm, np.dot(dlsvec.T, dlsvec) / norm)
+                self.assertArraysAlmostEqual(jtf / norm, np.dot(dlsvec.T, lsvec) / norm)
+
     def test_approximate_hessian(self):
         if not self.enable_hessian_tests:
             return  # don't test the hessian for this objective function
@@ -350,6 +370,16 @@ class TimeIndependentMDSObjectiveFunctionTester(ObjectiveFunctionData):
             norm = np.maximum(np.abs(hessian), 1e-2) * hessian.size
             self.assertArraysAlmostEqual(hessian / norm, fd_hessian / norm, places=3)
 
+            # Hessian-vector products should agree with the full Hessian
+            vec = np.random.RandomState(1234).normal(size=len(v0))
+            hessian_vec = np.dot(objfn.hessian(v0), vec)
+            try:
+                hessian_dot = objfn.hessian_dot(vec, v0)
+            except NotImplementedError:
+                continue  # not implemented for penalty terms
+            norm = np.linalg.norm(hessian_vec)
+            self.assertArraysAlmostEqual(hessian_dot / norm, hessian_vec / norm, places=6)
+
 
 class Chi2FunctionTester(TimeIndependentMDSObjectiveFunctionTester, BaseCase):
     computes_lsvec = True
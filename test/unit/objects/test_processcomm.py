@@ -0,0 +1,71 @@
+import numpy as np
+
+from pygsti.baseobjs import ProcessComm, ResourceAllocation
+from pygsti.forwardsims import MatrixForwardSimulator
+from pygsti.modelpacks import smq1Q_XY
+from ..util import BaseCase
+
+
+def _collectives(comm):
+    rank = comm.Get_rank()
+    assert comm.Get_size() == 3
+    ret = {'bcast': comm.bcast(rank + 10 if rank == 0 else None, root=0),
+           'allreduce': comm.allreduce(rank + 1),
+           'allgather': comm.allgather(rank),
+           'gather': comm.gather(rank * 2, root=0)}
+
+    ar = np.full(3, float(rank))
+    total = np.empty(3, 'd')
+    comm.Allreduce(ar, total)
+    ret['Allreduce'] = total
+
+    sub = comm.Split(color=rank % 2, key=-rank)
+    ret['split'] = (sub.Get_size(), sub.Get_rank(), sub.allreduce(rank))
+    comm.barrier()
+    return ret
+
+
+def _distributed_probs(comm, model, circuits):
+    resource_alloc = ResourceAllocation(comm)
+    resource_alloc.build_hostcomms()  # so the layout's arrays are in shared memory
+    layout = model.sim.create_layout(circuits, array_types=('E',), resource_alloc=resource_alloc)
+    probs = layout.allocate_local_array('e', 'd')
+    model.sim.bulk_fill_probs(probs, layout)
+    global_probs = layout.gather_local_array('e', probs)
+    layout.free_local_array(probs)
+    if comm.Get_rank() == 0:
+        return {c: global_probs[layout.global_layout.indices(c)] for c in circuits}
+    return None
+
+
+class ProcessCommTester(BaseCase):
+    def test_collectives(self):
+        results = ProcessComm.run(_collectives, 3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual([r['bcast'] for r in results], [10] * 3)
+        self.assertEqual([r['allreduce'] for r in results], [6] * 3)
+        self.assertEqual(results[1]['allgather'], [0, 1, 2])
+        self.assertEqual(results[0]['gather'], [0, 2, 4])
+        self.assertEqual(results[1]['gather'], None)
+        self.assertArraysAlmostEqual(results[2]['Allreduce'], np.full(3, 3.0))
+        self.assertEqual([r['split'] for r in results], [(2, 1, 2), (1, 0, 1), (2, 0, 2)])
+
+    def test_exception_propagates(self):
+        with self.assertRaises(RuntimeError):
+            ProcessComm.run(_raise_on_rank_one, 2)
+
+    def test_distributed_forward_simulation(self):
+        model = smq1Q_XY.target_model().depolarize(op_noise=0.01, spam_noise=0.01)
+        model.sim = MatrixForwardSimulator(num_atoms=2)
+        circuits = list(smq1Q_XY.get_gst_circuits(2))
+
+        serial_probs = model.sim.bulk_probs(circuits)
+        distributed_probs = ProcessComm.run(_distributed_probs, 2, args=(model, circuits))[0]
+        for c in circuits:
+            self.assertArraysAlmostEqual(distributed_probs[c], np.array(list(serial_probs[c].values())))
+
+
+def _raise_on_rank_one(comm):
+    if comm.rank == 1:
+        raise ValueError("Test error")
+    return comm.bcast(None)
@@ -41,3 +41,89 @@ class CustomLMTester(BaseCase):
         xf, converged, msg, *_ = lm.custom_leastsq(g, gjac, x0, max_iter=100, arrays_interface=ari,
                                                    x_limits=xlimits)
         self.assertAlmostEqual(xf[0], 1.0)
+
+    def test_custom_leastsq_broyden_updates(self):
+        # Rosenbrock function residuals, with minimum at (1, 1)
+        def rosen(x):
+            return np.array([10 * (x[1] - x[0]**2), 1 - x[0]], 'd')
+
+        def rosen_jac(x):
+            return np.array([[-20 * x[0], 10], [-1, 0]], 'd')
+
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        xf, converged, msg, *_ = lm.custom_leastsq(rosen, rosen_jac, x0, f_norm2_tol=1e-20, jac_norm_tol=1e-12,
+                                                   rel_ftol=1e-12, rel_xtol=1e-12, max_iter=500,
+                                                   arrays_interface=ari, jac_refresh_interval=4)
+        self.assertTrue(converged)
+        self.assertArraysAlmostEqual(xf, np.array([1.0, 1.0], 'd'))
+
+    def test_custom_matrix_free_leastsq(self):
+        # linear least squares problem, so the solution is known in closed form
+        rand_state = np.random.RandomState(1234)
+        A = rand_state.normal(size=(20, 5))
+        b = rand_state.normal(size=20)
+
+        def obj_fn(x):
+            return np.dot(A, x) - b
+
+        def jac_dot(v, x=None):
+            return np.dot(A, v)
+
+        def jac_t_dot(u, x=None):
+            return np.dot(u, A)
+
+        x0 = np.zeros(5, 'd')
+        xf, converged, msg, *_ = lm.custom_matrix_free_leastsq(obj_fn, jac_dot, jac_t_dot, x0, f_norm2_tol=1e-12,
+                                                               jac_norm_tol=1e-10, rel_ftol=1e-12, rel_xtol=1e-12,
+                                                               max_iter=100, max_dx_scale=1.0, cg_tol=1e-10)
+        self.assertTrue(converged)
+        self.assertArraysAlmostEqual(xf, np.linalg.lstsq(A, b, rcond=None)[0])
+
+    def test_custom_leastsq_cholesky_solver(self):
+        def rosen(x):
+            return np.array([10 * (x[1] - x[0]**2), 1 - x[0]], 'd')
+
+        def rosen_jac(x):
+            return np.array([[-20 * x[0], 10], [-1, 0]], 'd')
+
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        xf, converged, msg, *_ = lm.custom_leastsq(rosen, rosen_jac, x0, f_norm2_tol=1e-20, jac_norm_tol=1e-12,
+                                                   rel_ftol=1e-12, rel_xtol=1e-12, max_iter=500,
+                                                   arrays_interface=ari, linear_solver="cholesky")
+        self.assertTrue(converged)
+        self.assertArraysAlmostEqual(xf, np.array([1.0, 1.0], 'd'))
+
+        # the Cholesky factor is reused to compute acceleration terms
+        xf_elim, *_ = lm.custom_leastsq(rosen, rosen_jac, x0, max_iter=20, arrays_interface=ari,
+                                        use_acceleration=True)
+        xf_chol, *_ = lm.custom_leastsq(rosen, rosen_jac, x0, max_iter=20, arrays_interface=ari,
+                                        use_acceleration=True, linear_solver="cholesky")
+        self.assertArraysAlmostEqual(xf_elim, xf_chol)
+
+        with self.assertRaises(ValueError):
+            lm.custom_leastsq(rosen, rosen_jac, x0, arrays_interface=ari, linear_solver="foobar")
+
+    def test_custom_leastsq_eigen_damping_sweep(self):
+        def rosen(x):
+            return np.array([10 * (x[1] - x[0]**2), 1 - x[0]], 'd')
+
+        def rosen_jac(x):
+            return np.array([[-20 * x[0], 10], [-1, 0]], 'd')
+
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        results = [lm.custom_leastsq(rosen, rosen_jac, x0, f_norm2_tol=1e-20, jac_norm_tol=1e-12, rel_ftol=1e-12,
+                                     rel_xtol=1e-12, max_iter=500, arrays_interface=ari, damping_sweep=sweep,
+                                     eigen_cost=0.5)
+                   for sweep in ("solve", "eigen", "auto")]
+        for xf, converged, msg, mu, *_ in results:
+            self.assertTrue(converged)
+            self.assertArraysAlmostEqual(xf, np.array([1.0, 1.0], 'd'))
+            self.assertAlmostEqual(mu, results[0][3])
+
+        with self.assertRaises(ValueError):
+            lm.custom_leastsq(rosen, rosen_jac, x0, arrays_interface=ari, damping_sweep="foobar")
+        with self.assertRaises(ValueError):
+            lm.custom_leastsq(rosen, rosen_jac, x0, arrays_interface=ari, damping_mode="JTJ", damping_sweep="eigen")
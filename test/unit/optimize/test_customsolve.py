@@ -0,0 +1,78 @@
+import numpy as np
+import scipy
+
+from pygsti.baseobjs import ProcessComm
+from pygsti.baseobjs.resourceallocation import ResourceAllocation
+from pygsti.forwardsims import MatrixForwardSimulator
+from pygsti.modelpacks import smq1Q_XY
+from pygsti.optimize import arraysinterface as _ari
+from pygsti.optimize import customsolve as cs
+from ..util import BaseCase
+
+
+def _distributed_cholesky_solve(comm, model, circuits, a, bs, proc_threshold, blk_size):
+    resource_alloc = ResourceAllocation(comm)
+    layout = model.sim.create_layout(circuits, array_types=('ep',), resource_alloc=resource_alloc)
+    ari = _ari.DistributedArraysInterface(layout)
+    my_rows = ari.jtf_param_slice()
+
+    local_a = ari.allocate_jtj()
+    local_a[:, :] = a[my_rows, :]
+    factor = cs.custom_cholesky_factor(local_a, ari, resource_alloc, proc_threshold, blk_size)
+
+    xs = []
+    for b in bs:
+        local_b = ari.allocate_jtf(); local_x = ari.allocate_jtf()
+        local_b[:] = b[my_rows]
+        cs.custom_cholesky_solve(factor, local_b, local_x, ari, resource_alloc)
+        xs.append(np.concatenate([x for _, x in sorted(comm.allgather((my_rows.start, local_x.copy())))]))
+        ari.deallocate_jtf(local_b); ari.deallocate_jtf(local_x)
+    ari.deallocate_jtj(local_a)
+    return factor.mode, xs
+
+
+class CustomSolveTester(BaseCase):
+    def setUp(self):
+        rng = np.random.RandomState(1234)
+        J = rng.randn(20, 8)
+        self.a = J.T @ J + 0.1 * np.identity(8)
+        self.b = rng.randn(8)
+        self.ari = _ari.UndistributedArraysInterface(20, 8)
+        self.resource_alloc = ResourceAllocation()
+
+    def test_custom_solve_cholesky(self):
+        x = np.zeros(8, 'd')
+        cs.custom_solve(self.a, self.b, x, self.ari, self.resource_alloc, method="cholesky")
+        self.assertArraysAlmostEqual(x, np.linalg.solve(self.a, self.b))
+
+        with self.assertRaises(ValueError):
+            cs.custom_solve(self.a, self.b, x, self.ari, self.resource_alloc, method="foobar")
+
+    def test_cholesky_factor_reuse(self):
+        factor = cs.custom_cholesky_factor(self.a, self.ari, self.resource_alloc)
+        for b in (self.b, np.arange(8, dtype='d')):
+            x = np.zeros(8, 'd')
+            cs.custom_cholesky_solve(factor, b, x, self.ari, self.resource_alloc)
+            self.assertArraysAlmostEqual(x, np.linalg.solve(self.a, b))
+
+    def test_cholesky_factor_not_positive_definite(self):
+        with self.assertRaises(scipy.linalg.LinAlgError):
+            cs.custom_cholesky_factor(-self.a, self.ari, self.resource_alloc)
+
+    def test_cholesky_with_comm(self):
+        model = smq1Q_XY.target_model()
+        model.sim = MatrixForwardSimulator(num_atoms=1)  # so parameters (the rows of `a`) are divided among procs
+        circuits = list(smq1Q_XY.get_gst_circuits(1))
+        n = model.num_params
+        rng = np.random.RandomState(1234)
+        J = rng.randn(2 * n, n)
+        a = J.T @ J + 0.1 * np.identity(n)
+        bs = [rng.randn(n), np.arange(n, dtype='d')]
+
+        for proc_threshold, expected_mode in ((100, "root"), (1, "distributed")):
+            results = ProcessComm.run(_distributed_cholesky_solve, 3,
+                                      args=(model, circuits, a, bs, proc_threshold, 8))  # 8 => several blocks
+            for mode, xs in results:
+                self.assertEqual(mode, expected_mode)
+                for b, x in zip(bs, xs):
+                    self.assertArraysAlmostEqual(x, np.linalg.solve(a, b))
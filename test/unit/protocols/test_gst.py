@@ -1,4 +1,11 @@
+from unittest import mock
+
+import numpy as np
+
+from pygsti.baseobjs import ProcessComm
 from pygsti.data import simulate_data
+from pygsti.forwardsims.matrixforwardsim import MatrixForwardSimulator
+from pygsti.layouts.matrixlayout import MatrixCOPALayout
 from pygsti.modelpacks import smq1Q_XYI
 from pygsti.modelpacks.legacy import std1Q_XYI, std2Q_XYICNOT
 from pygsti.objectivefns.objectivefns import PoissonPicDeltaLogLFunction
@@ -100,6 +107,10 @@ class StandardGSTDesignTester(BaseCase):
                                     [1, 2])
 
 
+def _extra_start_kicks(comm, initial_model, mdl):
+    return [extra_mdl.to_vector() - mdl.to_vector() for extra_mdl in initial_model.get_extra_start_models(mdl, comm)]
+
+
 class GSTInitialModelTester(BaseCase):
     """
     Tests for methods in the GSTInitialModel class.
@@ -142,6 +153,23 @@ class GSTInitialModelTester(BaseCase):
         self.assertEqual(im.starting_point, 'target')
         self.assertTrue(depol_model.frobeniusdist(mdl) < 1e-6)
 
+    def test_get_extra_start_models(self):
+        im = gst.GSTInitialModel(self.edesign.create_target_model('full TP'), num_random_starts=2,
+                                 random_start_scale=0.01, random_start_seed=1234)
+        mdl = im.get_model(self.edesign, None, None, None)
+        extra_models = im.get_extra_start_models(mdl, None)
+        self.assertEqual(len(extra_models), 2)
+        for extra_mdl in extra_models:
+            kick = extra_mdl.to_vector() - mdl.to_vector()
+            self.assertLessEqual(np.max(np.abs(kick)), 0.01)
+            self.assertGreater(np.linalg.norm(kick), 0)
+        self.assertEqual(gst.GSTInitialModel().get_extra_start_models(mdl, None), [])
+
+        # the root's random kicks are used by all processors
+        for kicks in ProcessComm.run(_extra_start_kicks, 2, args=(im, mdl)):
+            self.assertArraysAlmostEqual(np.array(kicks), np.array([m.to_vector() - mdl.to_vector()
+                                                                    for m in extra_models]))
+
     def test_get_model_lgst(self):
         #LGST
         datagen_model = self.edesign.create_target_model('full').depolarize(op_noise=0.1)
@@ -224,11 +252,37 @@ class GateSetTomographyTester(BaseProtocolData, BaseCase):
         proto = gst.GateSetTomography(smq1Q_XYI.target_model("CPTP"), 'stdgaugeopt', name="testGST")
         results = proto.run(self.gst_data)
 
-
         mdl_result = results.estimates["testGST"].models['stdgaugeopt']
         twoDLogL = two_delta_logl(mdl_result, self.gst_data.dataset)
         self.assertLessEqual(twoDLogL, 1.0)  # should be near 0 for perfect data
 
+    def test_run_with_random_starts(self):
+        initial_model = gst.GSTInitialModel(smq1Q_XYI.target_model("full TP"), num_random_starts=1,
+                                            random_start_seed=1234)
+        proto = gst.GateSetTomography(initial_model, 'none', name="testGST")
+        results = proto.run(self.gst_data)
+
+        mdl_result = results.estimates["testGST"].models['final iteration estimate']
+        twoDLogL = two_delta_logl(mdl_result, self.gst_data.dataset)
+        self.assertLessEqual(twoDLogL, 1.0)  # should be near 0 for perfect data
+
+    def test_run_with_extended_layouts(self):
+        proto = gst.GateSetTomography(smq1Q_XYI.target_model("full TP"), 'none', name="testGST",
+                                      extend_layouts=True)
+        with mock.patch.object(MatrixForwardSimulator, 'create_layout', autospec=True,
+                               side_effect=MatrixForwardSimulator.create_layout) as mock_create, \
+                mock.patch.object(MatrixCOPALayout, 'extend', autospec=True,
+                                  side_effect=MatrixCOPALayout.extend) as mock_extend:
+            results = proto.run(self.gst_data)
+
+        num_iterations = len(self.gst_design.circuit_lists)
+        self.assertEqual(mock_create.call_count, 1)  # only the first iteration's layout is created...
+        self.assertEqual(mock_extend.call_count, num_iterations - 1)  # ... and the others extend it
+
+        mdl_result = results.estimates["testGST"].models['final iteration estimate']
+        twoDLogL = two_delta_logl(mdl_result, self.gst_data.dataset)
+        self.assertLessEqual(twoDLogL, 1.0)  # should be near 0 for perfect data
+
 
 class LinearGateSetTomographyTester(BaseProtocolData, BaseCase):
     """
@@ -88,3 +88,18 @@ class ExperimentDesignTester(BaseCase):
         self.assertTrue(all([a == b for a,b in zip(edesign3['subdir1'].all_circuits_needing_data, self.gst_design.circuit_lists[0])]))
         self.assertTrue(all([a == b for a,b in zip(edesign3['subdir2'].all_circuits_needing_data, self.gst_design.circuit_lists[1])]))
 
+
+class ProtocolDataTester(BaseCase):
+
+    @with_temp_path
+    def test_write_columnar_dataset(self, root_path):
+        edesign = pygsti.protocols.ExperimentDesign(pygsti.circuits.to_circuits(["{}@(0)", "Gxpi2:0", "Gypi2:0"]))
+        ds = pygsti.data.simulate_data(std.target_model(), edesign.all_circuits_needing_data, num_samples=100,
+                                       seed=1234)
+        data = pygsti.protocols.ProtocolData(edesign, ds)
+        data.write(root_path, dataset_format='columnar')
+        self.assertTrue((pathlib.Path(root_path) / 'data' / 'dataset.columnar').is_dir())
+
+        loaded_data = pygsti.io.load_data_from_dir(root_path)
+        for circuit in edesign.all_circuits_needing_data:
+            self.assertEqual(ds[circuit].counts, loaded_data.dataset[circuit].counts)